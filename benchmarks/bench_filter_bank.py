@@ -0,0 +1,188 @@
+"""
+Filter-bank vs Welch band power: agreement, class separation and cost
+
+Every live-sized window of the recorded calibration trials is featurized by
+both engines: 'welch' (preprocess + Welch, as RealtimeBCIPipeline does by
+default) and 'filterbank' (FilterBankBandPower over the whole trial, read at
+each window end, as the live stream gives it). Reported:
+
+    agreement   per band: median filterbank / welch ratio, median |log
+                ratio| and Pearson r of the log powers on windows both
+                engines keep
+    separation  trial-grouped cross-validated LDA accuracy on log powers
+    cost        microseconds per window for each engine's live path
+
+Usage:
+    python benchmarks/bench_filter_bank.py                      # data/calibration/*.npz
+    python benchmarks/bench_filter_bank.py data/calibration/alice_calibration.npz
+    python benchmarks/bench_filter_bank.py --synthetic 40       # no recordings needed
+"""
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from benchmarks.harness import run_suite
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from src.dataset.epochs import load_epochs, sliding_windows
+from src.features.band_power import BandPowerExtractor
+from src.features.filter_bank import FilterBankBandPower
+from src.preprocessing.filters import RealtimePreprocessor
+from config.settings import Config
+
+def recorded_trials(paths):
+    """
+    Returns:
+        tuple: (epochs list, labels (n_trials,)) from calibration files with raw epochs
+    """
+    epochs, labels = [], []
+    for path in paths:
+        stored = load_epochs(path)
+        if stored is None or stored['fs'] != Config.SAMPLING_RATE:
+            print(f"  skipping {Path(path).name} (no raw epochs at {Config.SAMPLING_RATE:g} Hz)")
+            continue
+        epochs.extend(stored['epochs'])
+        labels.extend(stored['labels'])
+    return epochs, np.array(labels, dtype=int)
+
+def synthetic_trials(n_trials, seed=0):
+    """Alternating rest/imagery trials with mains and a few blinks"""
+    duration = Config.TRIAL_DURATION
+    generator = SyntheticEEGGenerator(rest_duration=duration, imagery_duration=duration,
+                                      mains_amp=10.0, artifact_rate=0.05, seed=seed)
+    n = int(duration * Config.SAMPLING_RATE)
+    epochs = [generator.generate(n) for _ in range(n_trials)]
+    return epochs, np.arange(n_trials) % 2
+
+def engine_features(epochs):
+    """
+    Both engines' features for every window, nothing dropped
+
+    Returns:
+        dict: 'welch', 'filterbank' (n_windows, n_features), 'welch_clean',
+            'filterbank_clean' (n_windows,) bool and 'trial' (n_windows,)
+    """
+    preprocessor = RealtimePreprocessor()
+    extractor = BandPowerExtractor()
+    bank = FilterBankBandPower()
+    out = {'welch': [], 'filterbank': [], 'welch_clean': [], 'filterbank_clean': [],
+           'trial': []}
+    for i, epoch in enumerate(epochs):
+        windows = sliding_windows(np.asarray(epoch, dtype=float), Config.WINDOW_SAMPLES,
+                                  Config.STEP_SAMPLES)
+        if len(windows) == 0:
+            continue
+        preprocessed, is_clean = preprocessor.preprocess_batch(windows)
+        out['welch'].append(extractor.extract_batch(preprocessed))
+        out['welch_clean'].append(is_clean)
+        out['filterbank'].append(bank.window_powers(epoch, Config.STEP_SAMPLES))
+        out['filterbank_clean'].append(np.max(np.abs(windows), axis=-1) <= Config.ARTIFACT_MAX_UV)
+        out['trial'].append(np.full(len(windows), i))
+    return {key: np.concatenate(value) for key, value in out.items()}
+
+def agreement(welch, filterbank):
+    """
+    Returns:
+        list of dict: per feature median ratio, median |log ratio| and
+            Pearson r of log powers
+    """
+    rows = []
+    for j, name in enumerate(BandPowerExtractor.FEATURE_NAMES):
+        log_w, log_f = np.log(welch[:, j]), np.log(filterbank[:, j])
+        rows.append({
+            'feature': name,
+            'median_ratio': float(np.exp(np.median(log_f - log_w))),
+            'median_abs_log_ratio': float(np.median(np.abs(log_f - log_w))),
+            'pearson_r': float(np.corrcoef(log_w, log_f)[0, 1]) if len(log_w) > 1 else float('nan')
+        })
+    return rows
+
+def separation(features, labels, groups, n_splits=5):
+    """Trial-grouped cross-validated LDA accuracy on log band powers"""
+    from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
+    from sklearn.model_selection import GroupKFold, cross_val_score
+
+    n_splits = min(n_splits, len(np.unique(groups)))
+    if n_splits < 2 or len(np.unique(labels)) < 2:
+        return float('nan')
+    scores = cross_val_score(LinearDiscriminantAnalysis(), np.log(features), labels,
+                             groups=groups, cv=GroupKFold(n_splits=n_splits))
+    return float(np.mean(scores))
+
+def cost(epoch):
+    """
+    Live cost per window of each engine
+
+    Returns:
+        dict: harness results for the welch window path, the filterbank
+            step (chunked) and the filterbank step fed sample by sample
+    """
+    window = np.asarray(epoch[:Config.WINDOW_SAMPLES], dtype=float)
+    step = window[-Config.STEP_SAMPLES:]
+    preprocessor = RealtimePreprocessor()
+    extractor = BandPowerExtractor()
+    bank = FilterBankBandPower()
+    bank.add_samples(window)
+
+    def per_sample():
+        for x in step:
+            bank.add_sample(x)
+
+    return run_suite({
+        'welch (preprocess + extract)':
+            lambda: extractor.extract(preprocessor.preprocess(window)[0]),
+        'filterbank.add_samples(step)': lambda: bank.add_samples(step),
+        'filterbank.add_sample x step': per_sample,
+    }, warmup=5, repeat=30, rounds=2)
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare filter-bank and Welch band power')
+    parser.add_argument('files', nargs='*', help='Calibration .npz files with raw epochs '
+                        '(default: every file in the calibration directory)')
+    parser.add_argument('--synthetic', type=int, default=0, metavar='N',
+                       help='Use N synthetic trials instead of recordings')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("NEUROSENSE AI - FILTER BANK vs WELCH")
+    print("="*60)
+    if args.synthetic:
+        epochs, labels = synthetic_trials(args.synthetic)
+        source = f"{args.synthetic} synthetic trials"
+    else:
+        paths = args.files or sorted(Path(Config.CALIBRATION_DIR).glob('*_calibration.npz'))
+        epochs, labels = recorded_trials(paths)
+        source = f"{len(epochs)} recorded trials from {len(paths)} file(s)"
+        if not epochs:
+            print("No recorded trials found, using 40 synthetic trials")
+            epochs, labels = synthetic_trials(40)
+            source = "40 synthetic trials"
+    print(f"Data: {source}")
+
+    features = engine_features(epochs)
+    both = features['welch_clean'] & features['filterbank_clean']
+    print(f"Windows: {len(both)} ({np.count_nonzero(both)} clean in both engines)")
+
+    print("\nAgreement (filterbank vs welch, windows clean in both):")
+    for row in agreement(features['welch'][both], features['filterbank'][both]):
+        print(f"  {row['feature']:12s} ratio {row['median_ratio']:6.3f}   "
+              f"median |log ratio| {row['median_abs_log_ratio']:6.3f}   "
+              f"r(log) {row['pearson_r']:6.3f}")
+
+    window_labels = labels[features['trial']]
+    print("\nClass separation (LDA, trial-grouped CV):")
+    for engine in ('welch', 'filterbank'):
+        keep = features[f'{engine}_clean']
+        accuracy = separation(features[engine][keep], window_labels[keep],
+                              features['trial'][keep])
+        print(f"  {engine:12s} {accuracy:6.1%} on {np.count_nonzero(keep)} windows")
+
+    print("\nCost per window (live path):")
+    cost(epochs[0])
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Import-time budget for the real-time pipeline
+
+Each measurement imports the module in a fresh interpreter (best of
+--repeat runs), and also checks that modules meant to be loaded lazily
+(sklearn estimators, joblib, pyserial) were not pulled in by the import.
+
+Usage:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --budget 1500 --detail
+
+Exits with status 1 if the budget is exceeded or a lazy module was imported.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.settings import Config
+
+MODULE = 'src.pipeline.realtime_bci'
+LAZY_MODULES = ['sklearn.svm', 'sklearn.linear_model', 'sklearn.discriminant_analysis',
+                'sklearn.preprocessing', 'joblib', 'serial']
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{'ms': elapsed * 1000,
+                   'loaded': [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+def measure_import(module=MODULE, repeat=5, lazy_modules=LAZY_MODULES):
+    """
+    Returns:
+        dict: 'best_ms', 'runs_ms' and 'eager' (lazy modules that got imported)
+    """
+    code = _PROBE.format(root=str(project_root), module=module, lazy=lazy_modules)
+    runs = []
+    eager = set()
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                             text=True, check=True, cwd=project_root)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        runs.append(result['ms'])
+        eager.update(result['loaded'])
+    return {'best_ms': min(runs), 'runs_ms': runs, 'eager': sorted(eager)}
+
+def slowest_imports(module=MODULE, top=15):
+    """
+    Returns:
+        list of tuple: (cumulative_us, module) from python -X importtime
+    """
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                         capture_output=True, text=True, cwd=project_root)
+    rows = []
+    for line in out.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].strip()))
+    return sorted(rows, reverse=True)[:top]
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Check the pipeline import-time budget')
+    parser.add_argument('--module', default=MODULE, help='Module to import')
+    parser.add_argument('--budget', type=float, default=Config.IMPORT_BUDGET_MS,
+                       help='Allowed import time (ms)')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters (best kept)')
+    parser.add_argument('--detail', action='store_true', help='Show the slowest imports')
+    args = parser.parse_args()
+
+    result = measure_import(args.module, args.repeat)
+    print(f"import {args.module}: {result['best_ms']:.0f} ms "
+          f"(best of {args.repeat}, budget {args.budget:.0f} ms)")
+
+    if args.detail:
+        for cumulative_us, name in slowest_imports(args.module):
+            print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if result['eager']:
+        print(f"✗ Imported eagerly: {', '.join(result['eager'])}")
+        failed = True
+    if result['best_ms'] > args.budget:
+        print(f"✗ Over budget by {result['best_ms'] - args.budget:.0f} ms")
+        failed = True
+    if not failed:
+        print("✓ Within budget")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
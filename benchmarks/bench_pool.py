@@ -0,0 +1,166 @@
+"""
+Process-pool scaling benchmark: windows/sec against worker count
+
+For each worker count a SessionSupervisor runs sessions_per_worker sessions
+per worker. Their shared rings are filled from in-memory synthetic signals
+as fast as the workers drain them (at most lead steps ahead, so no window
+is overwritten), and the supervisor counts the commands that come back.
+Near-linear scaling keeps windows/sec at n workers close to n times the
+1-worker rate (efficiency near 1).
+
+Usage:
+    python benchmarks/bench_pool.py
+    python benchmarks/bench_pool.py --workers 1 2 4 8 --duration 10 --save pool.json
+
+The supervisor loop runs in this process as well; leave it a core (workers
+below the CPU count) or it competes with the workers it measures.
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from benchmarks.bench_throughput import train_model
+from hardware.bioamp_reader import BioAmpReader
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from src.pipeline.process_pool import SessionSupervisor
+from config.settings import Config, SessionConfig
+
+WORKERS = [1, 2, 4, 8]
+
+def run_pool(n_workers, sessions_per_worker=2, duration=5.0, fs=Config.SAMPLING_RATE,
+             lead=4, seed=0, startup_timeout=60.0):
+    """
+    Drive n_workers * sessions_per_worker sessions through the pool
+
+    Args:
+        n_workers: worker processes
+        sessions_per_worker: sessions per worker
+        duration: measured seconds (after every session produced a window)
+        fs: sampling rate (Hz)
+        lead: unprocessed windows a ring may hold before it is topped up
+        startup_timeout: seconds allowed for spawning and warming up workers
+
+    Returns:
+        dict: workers, sessions, windows, elapsed_s, wps (windows/sec),
+              overruns and restarts
+    """
+    config = SessionConfig(SAMPLING_RATE=fs)
+    window, step = config.WINDOW_SAMPLES, config.STEP_SAMPLES
+    n_sessions = n_workers * sessions_per_worker
+    # Signals long enough to loop without a visible seam in the load
+    length = max(window, int(10 * fs)) // step * step
+    signals = [SyntheticEEGGenerator(fs=fs, seed=seed + i).generate(length)
+               for i in range(n_sessions)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = Path(tmp) / 'model.pkl'
+        normalizer_path = Path(tmp) / 'normalizer.pkl'
+        classifier, normalizer = train_model(fs, seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            classifier.save(model_path)
+            normalizer.save(normalizer_path)
+
+        supervisor = SessionSupervisor(n_workers=n_workers, rebalance_interval=float('inf'))
+        try:
+            ids = [f"s{i}" for i in range(n_sessions)]
+            for session_id in ids:
+                supervisor.add_session(session_id, BioAmpReader(config=config), model_path,
+                                       normalizer_path, config=config)
+            rings = [supervisor.sessions[sid]['ring'] for sid in ids]
+            written = [0] * n_sessions
+            processed = dict.fromkeys(ids, 0)
+
+            def pump():
+                for i, ring in enumerate(rings):
+                    while ((written[i] - window) // step + 1 - processed[ids[i]]) < lead:
+                        start = written[i] % length
+                        ring.extend(signals[i][start:start + step])
+                        written[i] += step
+                for session_id, _, _, _ in supervisor.poll(timeout=0):
+                    processed[session_id] += 1
+
+            deadline = time.perf_counter() + startup_timeout
+            while min(processed.values()) == 0:
+                if time.perf_counter() > deadline:
+                    raise RuntimeError("Workers did not start within startup_timeout")
+                pump()
+
+            start_windows = sum(processed.values())
+            t0 = time.perf_counter()
+            while time.perf_counter() - t0 < duration:
+                pump()
+            elapsed = time.perf_counter() - t0
+            windows = sum(processed.values()) - start_windows
+            metrics = supervisor.metrics()
+        finally:
+            supervisor.close()
+
+    return {
+        'workers': n_workers,
+        'sessions': n_sessions,
+        'windows': windows,
+        'elapsed_s': elapsed,
+        'wps': windows / elapsed,
+        'overruns': sum(s['overruns'] for s in metrics['sessions'].values()),
+        'restarts': metrics['restarts']
+    }
+
+def add_efficiency(rows):
+    """
+    Scaling efficiency: wps / (workers * wps per worker of the smallest pool)
+
+    Returns:
+        list of dict: rows with 'efficiency' added
+    """
+    base = min(rows, key=lambda row: row['workers'])
+    per_worker = base['wps'] / base['workers']
+    for row in rows:
+        row['efficiency'] = row['wps'] / (row['workers'] * per_worker) if per_worker else 0.0
+    return rows
+
+def print_row(row):
+    print(f"{row['workers']:7d} {row['sessions']:8d} {row['windows']:8d} "
+          f"{row['wps']:9.1f} {row['efficiency']:10.0%} {row['overruns']:8d}")
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure process-pool scaling')
+    parser.add_argument('--workers', type=int, nargs='*',
+                       default=[n for n in WORKERS if n < (os.cpu_count() or 2)] or [1],
+                       help='Worker counts (default: up to one less than the CPU count)')
+    parser.add_argument('--sessions-per-worker', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=5.0,
+                       help='Measured seconds per worker count')
+    parser.add_argument('--fs', type=int, default=Config.SAMPLING_RATE,
+                       help='Sampling rate (Hz)')
+    parser.add_argument('--save', help='Write the rows as JSON')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("NEUROSENSE AI - PROCESS-POOL SCALING")
+    print("="*60)
+    rows = [run_pool(n, args.sessions_per_worker, args.duration, args.fs)
+            for n in sorted(args.workers)]
+    add_efficiency(rows)
+    print(f"{'workers':>7s} {'sessions':>8s} {'windows':>8s} {'win/s':>9s} "
+          f"{'efficiency':>10s} {'overruns':>8s}")
+    for row in rows:
+        print_row(row)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'fs': args.fs, 'rows': rows}, f, indent=2)
+        print(f"Scaling table saved to {args.save}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
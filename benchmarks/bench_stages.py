@@ -0,0 +1,152 @@
+"""
+Stage-level benchmark suite with baseline regression checks
+
+Usage:
+    python benchmarks/bench_stages.py --save benchmarks/baselines/stages.json
+    python benchmarks/bench_stages.py --compare benchmarks/baselines/stages.json
+
+--compare exits with status 1 if any stage's median slowed down by more than
+--tolerance relative to the baseline. Baselines are machine specific.
+"""
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from benchmarks.harness import run_suite, save_results, load_results, compare, print_comparison
+from src.acquisition.circular_buffer import CircularBuffer
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from src.preprocessing.filters import RealtimePreprocessor
+from src.features.band_power import BandPowerExtractor
+from src.features.feature_set import FEATURES
+from src.features.stft import SpectrogramRing
+from src.features.filter_bank import FilterBankBandPower
+from src.features.normalizer import FeatureNormalizer
+from src.models.classifier import MotorImageryClassifier, ThresholdClassifier
+from src.control.command_mapper import CommandMapper
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+from src.preprocessing.artifact_detector import StreamingArtifactDetector
+from src.monitoring.signal_quality import SignalQualityMonitor
+from config.settings import Config
+
+def build_stages(seed=0):
+    """
+    Returns:
+        dict: stage name -> zero-argument callable
+    """
+    rng = np.random.default_rng(seed)
+    generator = SyntheticEEGGenerator(seed=seed)
+    window = generator.generate(Config.WINDOW_SAMPLES)
+    step = generator.generate(Config.STEP_SAMPLES)
+
+    buffer = CircularBuffer()
+    buffer.add_samples(generator.generate(Config.WINDOW_SAMPLES + Config.STEP_SAMPLES))
+
+    def buffer_per_sample():
+        for x in step:
+            buffer.add_sample(x)
+            buffer.get_window()
+
+    detector = StreamingArtifactDetector()
+    detector.add_samples(window)
+    quality = SignalQualityMonitor()
+
+    preprocessor = RealtimePreprocessor()
+    preprocessed, _ = preprocessor.preprocess(window)
+    extractor = BandPowerExtractor()
+    features = extractor.extract(preprocessed)
+    every_feature = BandPowerExtractor(feature_names=tuple(FEATURES))
+    stft = SpectrogramRing()
+    stft.add_samples(window)
+    frames = stft.window_frames()
+    gain = preprocessor.power_response(stft.freqs)
+    bank = FilterBankBandPower()
+    bank.add_samples(window)
+
+    # Training data around realistic band powers
+    X = np.abs(features + rng.standard_normal((200, 2)) * features * 0.3)
+    y = (rng.random(200) > 0.5).astype(int)
+    X[y == 1] *= 0.6
+
+    normalizer = FeatureNormalizer()
+    normalizer.fit(X)
+    X_norm = normalizer.normalize(X)
+    normalized = normalizer.normalize(features)
+
+    stages = {
+        'buffer.add_sample+get_window': buffer_per_sample,
+        'buffer.add_samples': lambda: buffer.add_samples(step),
+        'artifact_detector.add_samples': lambda: detector.add_samples(step),
+        'quality_monitor.add_samples': lambda: quality.add_samples(step),
+        'preprocess': lambda: preprocessor.preprocess(window),
+        'band_power.extract': lambda: extractor.extract(preprocessed),
+        'band_power.extract.all_features': lambda: every_feature.extract(preprocessed),
+        'stft.add_samples': lambda: stft.add_samples(step),
+        'band_power.extract_frames': lambda: extractor.extract_frames(frames, gain),
+        'filter_bank.add_samples': lambda: bank.add_samples(step),
+        'filter_bank.add_sample': lambda: bank.add_sample(step[0]),
+        'normalizer.normalize': lambda: normalizer.normalize(features),
+    }
+
+    for model_type in ['LDA', 'SVM', 'LogisticRegression']:
+        classifier = MotorImageryClassifier(model_type=model_type)
+        classifier.train(X_norm, y)
+        stages[f'classify.{model_type}'] = (
+            lambda c=classifier: (c.predict(normalized), c.predict_proba(normalized)))
+
+    threshold = ThresholdClassifier()
+    erd = np.array([-0.4, -0.1])
+    stages['classify.Threshold'] = lambda: (threshold.predict(erd), threshold.predict_proba(erd))
+
+    mapper = CommandMapper()
+    stages['command_mapper.map_binary'] = lambda: mapper.map_binary(1, 0.9)
+
+    lda = MotorImageryClassifier(model_type='LDA')
+    lda.train(X_norm, y)
+    pipeline = RealtimeBCIPipeline(model_path=None, classifier=lda, normalizer=normalizer)
+    stages['process_window'] = lambda: pipeline.process_window(window)
+    stages['process_window.rejected'] = lambda: pipeline.process_window(window, 'amplitude')
+
+    return stages
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark every pipeline stage')
+    parser.add_argument('--repeat', type=int, default=100, help='Timed samples per stage')
+    parser.add_argument('--warmup', type=int, default=20, help='Untimed warmup calls')
+    parser.add_argument('--rounds', type=int, default=3,
+                       help='Interleaved passes (best round per stage is kept)')
+    parser.add_argument('--only', nargs='*', help='Stage names to run')
+    parser.add_argument('--save', help='Write results as a JSON baseline')
+    parser.add_argument('--compare', help='Baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                       help='Allowed slowdown before failing (0.25 = 25%%)')
+    parser.add_argument('--metric', default='p50_us', help='Statistic compared')
+    args = parser.parse_args()
+
+    stages = build_stages()
+    if args.only:
+        stages = {name: fn for name, fn in stages.items() if name in args.only}
+
+    print("="*60)
+    print("NEUROSENSE AI - STAGE BENCHMARKS")
+    print("="*60)
+    results = run_suite(stages, warmup=args.warmup, repeat=args.repeat, rounds=args.rounds)
+
+    if args.save:
+        save_results(results, args.save, repeat=args.repeat, rounds=args.rounds)
+
+    if args.compare:
+        rows = compare(results, load_results(args.compare), args.tolerance, args.metric)
+        print_comparison(rows, args.metric)
+        regressed = [row['name'] for row in rows if row['regressed']]
+        if regressed:
+            print(f"\n✗ Regression beyond {args.tolerance:.0%}: {', '.join(regressed)}")
+            return 1
+        print(f"\n✓ No stage regressed beyond {args.tolerance:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Throughput saturation benchmark: how many streams at what sample rate
+
+Every stream is an in-memory SyntheticEEGGenerator feeding its own pipeline,
+configured for the stream's rate and step, in 10 ms chunks interleaved in
+arrival order as one host process would see them. Each chunk goes through
+feed() (buffer, raw artifact check, spectrogram ring or filter bank, quality
+monitor) and every completed window through process_window() (features,
+LDA, command), as in the live loop. Processing runs as fast
+as possible; the measured per-chunk service times are then replayed through
+a single-server queue against the chunks' real arrival times to get the
+decision latency each window would have had live.
+
+Usage:
+    python benchmarks/bench_throughput.py
+    python benchmarks/bench_throughput.py --rates 500 1000 --steps 0.5 --save capacity.json
+    python benchmarks/bench_throughput.py --engine filterbank
+
+A configuration is sustainable when the host keeps up (utilization < 1) and
+p95 latency stays under Config.TARGET_LATENCY_MS. The knee is the largest
+sustainable stream count for each (sample rate, step).
+"""
+import contextlib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from src.preprocessing.filters import RealtimePreprocessor
+from src.features.band_power import BandPowerExtractor
+from src.features.normalizer import FeatureNormalizer
+from src.models.classifier import MotorImageryClassifier
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+from config.settings import Config, SessionConfig, FEATURE_ENGINES
+
+RATES = [500, 1000, 2000, 4000, 8000]
+STREAMS = [1, 2, 4, 8, 16, 32, 64]
+STEPS = [0.5, 0.25, 0.1]
+
+def train_model(fs, seed=0):
+    """
+    LDA + normalizer fitted on synthetic rest/imagery windows at fs
+
+    Returns:
+        tuple: (classifier, normalizer)
+    """
+    generator = SyntheticEEGGenerator(fs=fs, seed=seed)
+    preprocessor = RealtimePreprocessor(fs=fs)
+    extractor = BandPowerExtractor(fs=fs)
+    window_samples = int(Config.WINDOW_LENGTH * fs)
+
+    X, y = [], []
+    for _ in range(20):
+        signal, labels = generator.generate(window_samples, return_labels=True)
+        preprocessed, _ = preprocessor.preprocess(signal)
+        X.append(extractor.extract(preprocessed))
+        y.append(int(labels[-1]))
+    X = np.array(X)
+    y = np.array(y)
+    if len(np.unique(y)) < 2:
+        y[::2] = 1 - y[::2]
+
+    normalizer = FeatureNormalizer()
+    normalizer.fit(X)
+    classifier = MotorImageryClassifier(model_type='LDA')
+    with contextlib.redirect_stdout(io.StringIO()):
+        classifier.train(normalizer.normalize(X), y)
+    return classifier, normalizer
+
+def stream_config(fs, step, engine=Config.FEATURE_ENGINE):
+    """SessionConfig for a stream at fs with a step of step seconds"""
+    return SessionConfig(SAMPLING_RATE=fs, WINDOW_OVERLAP=1 - step / Config.WINDOW_LENGTH,
+                         FEATURE_ENGINE=engine)
+
+def build_stream(config, classifier, normalizer, preprocessor):
+    """One session's pipeline for a stream_config()"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return RealtimeBCIPipeline(model_path=None, classifier=classifier,
+                                   normalizer=normalizer, preprocessor=preprocessor,
+                                   config=config)
+
+def run_config(fs, n_streams, step, duration=6.0, chunk_ms=10, model=None,
+               max_backlog=2.0, seed=0, engine=Config.FEATURE_ENGINE):
+    """
+    Simulate n_streams sessions at fs for duration seconds of signal
+
+    Args:
+        fs: sampling rate (Hz)
+        n_streams: concurrent sessions
+        step: window step (seconds)
+        duration: signal seconds per stream (must exceed Config.WINDOW_LENGTH)
+        chunk_ms: arrival granularity
+        model: (classifier, normalizer) to share (default: trained for fs)
+        max_backlog: abort once the replayed queue falls this many seconds
+            behind real time (clearly saturated, no need to finish)
+        engine: FEATURE_ENGINE of every stream
+
+    Returns:
+        dict: demand/capacity windows per second, utilization, cpu per
+              stream, latency quantiles (ms) and whether it is sustainable
+    """
+    if duration <= Config.WINDOW_LENGTH:
+        raise ValueError("duration must be longer than one window")
+    classifier, normalizer = model or train_model(fs, seed)
+    config = stream_config(fs, step, engine)
+    preprocessor = RealtimePreprocessor(config=config)
+    streams = [build_stream(config, classifier, normalizer, preprocessor)
+               for _ in range(n_streams)]
+
+    chunk = max(1, int(fs * chunk_ms / 1000))
+    n_chunks = int(duration * fs) // chunk
+    signals = [SyntheticEEGGenerator(fs=fs, seed=seed + i).generate(n_chunks * chunk)
+               for i in range(n_streams)]
+
+    latencies = []
+    n_windows = 0
+    busy = 0.0
+    server_free = 0.0  # replayed queue: when the host is next idle
+    aborted = False
+    # Rates are measured from the first full window on; the initial buffer
+    # fill does no DSP and would flatter utilization
+    steady_start = None
+    cpu_start = None
+
+    for k in range(n_chunks):
+        arrival = (k + 1) * chunk / fs
+        if steady_start is None and (k + 1) * chunk >= streams[0].buffer.window_size:
+            steady_start = arrival - chunk / fs
+            busy = 0.0
+            cpu_start = time.process_time()
+        for pipeline, signal in zip(streams, signals):
+            t0 = time.perf_counter()
+            windows, _ = pipeline.feed(signal[k * chunk:(k + 1) * chunk])
+            for window, rejection, spectrum in windows:
+                pipeline.process_window(window, rejection, spectrum)
+            service = time.perf_counter() - t0
+
+            busy += service
+            server_free = max(server_free, arrival) + service
+            if windows:
+                n_windows += len(windows)
+                latencies.append((server_free - arrival) * 1000)
+
+        if server_free - arrival > max_backlog:
+            aborted = True
+            break
+
+    sim_seconds = (k + 1) * chunk / fs - steady_start
+    cpu = time.process_time() - cpu_start
+    demand = n_streams / step
+    latencies = np.array(latencies) if latencies else np.zeros(1)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    utilization = busy / sim_seconds
+
+    return {
+        'fs': fs,
+        'engine': engine,
+        'streams': n_streams,
+        'step_s': step,
+        'windows': n_windows,
+        'demand_wps': demand,
+        'capacity_wps': n_windows / busy if busy > 0 and n_windows else 0.0,
+        'utilization': utilization,
+        'cpu_per_stream': cpu / n_streams / sim_seconds,
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'sustainable': (not aborted and utilization < 1.0
+                        and p95 < Config.TARGET_LATENCY_MS)
+    }
+
+def find_knees(rows):
+    """
+    Returns:
+        dict: (fs, step) -> largest sustainable stream count (0 if none)
+    """
+    knees = {}
+    for row in rows:
+        key = (row['fs'], row['step_s'])
+        knees.setdefault(key, 0)
+        if row['sustainable']:
+            knees[key] = max(knees[key], row['streams'])
+    return knees
+
+def sweep(rates=RATES, streams=STREAMS, steps=STEPS, duration=6.0, verbose=True,
+          engine=Config.FEATURE_ENGINE):
+    """
+    Run the grid, stopping each (fs, step) series at its first unsustainable
+    stream count
+
+    Returns:
+        list of dict: run_config() rows
+    """
+    rows = []
+    for fs in rates:
+        model = train_model(fs)
+        for step in steps:
+            for n in streams:
+                row = run_config(fs, n, step, duration=duration, model=model, engine=engine)
+                rows.append(row)
+                if verbose:
+                    print_row(row)
+                if not row['sustainable']:
+                    break
+    return rows
+
+def print_header():
+    print(f"{'fs':>6s} {'step':>5s} {'streams':>7s} {'demand':>8s} {'capacity':>9s} "
+          f"{'util':>6s} {'cpu/str':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s}")
+
+def print_row(row):
+    flag = '' if row['sustainable'] else '  SATURATED'
+    print(f"{row['fs']:6d} {row['step_s']:5.2f} {row['streams']:7d} "
+          f"{row['demand_wps']:8.1f} {row['capacity_wps']:9.1f} "
+          f"{row['utilization']:6.1%} {row['cpu_per_stream']:8.2%} "
+          f"{row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['p99_ms']:8.1f}{flag}")
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Find the host saturation knee')
+    parser.add_argument('--rates', type=int, nargs='*', default=RATES, help='Sampling rates (Hz)')
+    parser.add_argument('--streams', type=int, nargs='*', default=STREAMS,
+                       help='Concurrent stream counts (ascending)')
+    parser.add_argument('--steps', type=float, nargs='*', default=STEPS,
+                       help='Window steps (seconds)')
+    parser.add_argument('--duration', type=float, default=6.0,
+                       help='Signal seconds per configuration')
+    parser.add_argument('--engine', choices=FEATURE_ENGINES, default=Config.FEATURE_ENGINE,
+                       help='Feature engine of every stream')
+    parser.add_argument('--save', help='Write the capacity table as JSON')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("NEUROSENSE AI - THROUGHPUT SATURATION")
+    print(f"Engine: {args.engine}, target: p95 < {Config.TARGET_LATENCY_MS} ms "
+          f"(windows/sec demand vs capacity, cpu as fraction of one core)")
+    print("="*80)
+    print_header()
+    rows = sweep(args.rates, args.streams, args.steps, args.duration, engine=args.engine)
+
+    knees = find_knees(rows)
+    print("\nSaturation knee (max sustainable streams):")
+    for (fs, step), n in knees.items():
+        print(f"  {fs:6d} Hz  step {step:4.2f} s: {n}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'engine': args.engine,
+                'target_latency_ms': Config.TARGET_LATENCY_MS,
+                'rows': rows,
+                'knees': [{'fs': fs, 'step_s': step, 'max_streams': n}
+                          for (fs, step), n in knees.items()]
+            }, f, indent=2)
+        print(f"Capacity table saved to {args.save}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
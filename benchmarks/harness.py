@@ -0,0 +1,135 @@
+"""
+Micro-benchmark harness: warmup, repeated timing, percentiles, baselines
+"""
+import gc
+import json
+import platform
+import time
+import numpy as np
+
+def measure(fn, warmup=20, repeat=100, min_sample_time=0.002):
+    """
+    Time a zero-argument callable
+
+    Each of the repeat samples runs fn enough times (number) to last at least
+    min_sample_time, so timer resolution does not dominate fast stages.
+
+    Returns:
+        dict: per-call microseconds (mean, p50, p95, p99, min, max) plus
+              repeat and number
+    """
+    for _ in range(warmup):
+        fn()
+
+    t0 = time.perf_counter()
+    fn()
+    single = max(time.perf_counter() - t0, 1e-7)
+    number = max(1, int(min_sample_time / single))
+
+    samples = np.empty(repeat)
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(repeat):
+            t0 = time.perf_counter_ns()
+            for _ in range(number):
+                fn()
+            samples[i] = (time.perf_counter_ns() - t0) / number / 1000.0
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        'mean_us': float(np.mean(samples)),
+        'p50_us': float(np.percentile(samples, 50)),
+        'p95_us': float(np.percentile(samples, 95)),
+        'p99_us': float(np.percentile(samples, 99)),
+        'min_us': float(np.min(samples)),
+        'max_us': float(np.max(samples)),
+        'repeat': repeat,
+        'number': number
+    }
+
+def run_suite(benchmarks, warmup=20, repeat=100, rounds=3, verbose=True):
+    """
+    Run every benchmark in interleaved rounds, keeping each one's best round
+
+    Interleaving spreads transient machine noise (frequency scaling, other
+    tenants) over all stages; keeping the round with the lowest median
+    makes baselines and comparisons far more repeatable.
+
+    Args:
+        benchmarks: dict name -> zero-argument callable
+        rounds: passes over the whole suite
+
+    Returns:
+        dict: name -> measure() result
+    """
+    results = {}
+    for _ in range(rounds):
+        for name, fn in benchmarks.items():
+            result = measure(fn, warmup=warmup, repeat=repeat)
+            if name not in results or result['p50_us'] < results[name]['p50_us']:
+                results[name] = result
+
+    if verbose:
+        for name, r in results.items():
+            print(f"  {name:32s} p50 {r['p50_us']:10.1f} us   p99 {r['p99_us']:10.1f} us")
+    return results
+
+def save_results(results, filepath, **metadata):
+    """Write results plus machine metadata as a JSON baseline"""
+    payload = {
+        'metadata': dict({
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'created': time.strftime("%Y-%m-%d %H:%M:%S")
+        }, **metadata),
+        'results': results
+    }
+    with open(filepath, 'w') as f:
+        json.dump(payload, f, indent=2)
+    print(f"Baseline saved to {filepath}")
+
+def load_results(filepath):
+    with open(filepath) as f:
+        return json.load(f)['results']
+
+def compare(current, baseline, tolerance=0.25, metric='p50_us'):
+    """
+    Compare a run against a baseline
+
+    Args:
+        current, baseline: dict name -> measure() result
+        tolerance: allowed fractional slowdown (0.25 = 25%)
+        metric: statistic to compare
+
+    Returns:
+        list of dict: one row per benchmark present in both, with
+            'name', 'baseline', 'current', 'ratio', 'regressed'
+    """
+    rows = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        base = baseline[name][metric]
+        cur = result[metric]
+        ratio = cur / base if base > 0 else float('inf')
+        rows.append({
+            'name': name,
+            'baseline': base,
+            'current': cur,
+            'ratio': ratio,
+            'regressed': ratio > 1.0 + tolerance
+        })
+    return rows
+
+def print_comparison(rows, metric='p50_us'):
+    print(f"\n{'stage':32s} {'baseline':>12s} {'current':>12s} {'ratio':>7s}")
+    for row in rows:
+        flag = '  REGRESSED' if row['regressed'] else ''
+        print(f"{row['name']:32s} {row['baseline']:12.1f} {row['current']:12.1f} "
+              f"{row['ratio']:7.2f}{flag}")
+    print(f"({metric}, microseconds per call)")
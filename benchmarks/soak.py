@@ -0,0 +1,287 @@
+"""
+Accelerated soak test: a day of signal through one pipeline, watching for drift
+
+Synthesizes (or loops a recorded .npy of microvolt samples) hours of signal
+and pushes it through a RealtimeBCIPipeline as fast as possible, the way
+the live loop does: each chunk goes through feed() (buffer, raw artifact
+check, spectrogram ring, filter bank, quality monitor) and every completed
+window through process_window(). Every --sample-every minutes of signal it
+records RSS, tracemalloc traced memory and top growing allocators, GC
+collections and the p50/p95 of every span the pipeline's StageTracer
+recorded. The run fails if memory grows monotonically or a stage's latency
+creeps upwards.
+
+Usage:
+    python benchmarks/soak.py --hours 24
+    python benchmarks/soak.py --hours 8 --engine filterbank
+    python benchmarks/soak.py --hours 8 --replay session.npy --save soak.json
+
+Stage latencies are measured with tracemalloc active, so absolute values
+are inflated; only their trend matters here.
+"""
+import contextlib
+import gc
+import io
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from src.monitoring.latency import LatencyHistogram
+from src.monitoring.tracing import StageTracer
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+from benchmarks.bench_throughput import train_model
+from config.settings import Config, SessionConfig, FEATURE_ENGINES
+
+def current_rss():
+    """Resident set size in bytes (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def make_source(fs, replay=None, seed=0):
+    """
+    Args:
+        replay: optional .npy file of microvolt samples, looped forever
+
+    Returns:
+        callable: n -> next n samples
+    """
+    if replay is None:
+        return SyntheticEEGGenerator(fs=fs, seed=seed).generate
+
+    recording = np.load(replay).astype(float).ravel()
+    position = [0]
+
+    def read(n):
+        idx = (position[0] + np.arange(n)) % len(recording)
+        position[0] = (position[0] + n) % len(recording)
+        return recording[idx]
+    return read
+
+def build_pipeline(fs=Config.SAMPLING_RATE, seed=0, engine=None):
+    """
+    LDA pipeline with tracing on (spans are the soak's stage timings)
+
+    Args:
+        engine: FEATURE_ENGINE (default: Config.FEATURE_ENGINE)
+    """
+    classifier, normalizer = train_model(fs, seed)
+    config = SessionConfig(SAMPLING_RATE=fs, FEATURE_ENGINE=engine or Config.FEATURE_ENGINE)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return RealtimeBCIPipeline(model_path=None, classifier=classifier,
+                                   normalizer=normalizer, tracer=StageTracer(enabled=True),
+                                   config=config)
+
+def drain_spans(tracer, seen, stage_latency):
+    """
+    Move spans recorded since the tracer's count was seen into histograms
+
+    Call often enough that fewer than tracer.capacity spans arrive in
+    between (older ones are overwritten and skipped).
+
+    Returns:
+        int: the tracer count to pass next time
+    """
+    first = max(seen, tracer.count - tracer.capacity)
+    index = np.arange(first, tracer.count) % tracer.capacity
+    durations = (tracer.ends[index] - tracer.starts[index]) / 1e6
+    name_ids = tracer.name_ids[index]
+    for name_id in np.unique(name_ids):
+        name = tracer.names[name_id]
+        if name not in stage_latency:
+            stage_latency[name] = LatencyHistogram()
+        stage_latency[name].record_many(durations[name_ids == name_id])
+    return tracer.count
+
+def run_soak(hours=24.0, fs=Config.SAMPLING_RATE, sample_every=15.0, chunk_s=0.1,
+             replay=None, pipeline=None, trace=True, top=5, seed=0, verbose=True,
+             engine=None):
+    """
+    Push hours of signal through a pipeline at accelerated time
+
+    Args:
+        hours: signal duration (hours)
+        sample_every: minutes of signal between metric samples
+        chunk_s: samples handed to the buffer per step (seconds)
+        replay: optional .npy recording to loop instead of synthetic EEG
+        pipeline: RealtimeBCIPipeline to soak (default: LDA on synthetic
+            data); its tracer is enabled for the run
+        trace: run tracemalloc (traced memory and top allocators)
+        top: growing allocators reported per sample
+        engine: FEATURE_ENGINE of the default pipeline
+
+    Returns:
+        list of dict: one sample per interval (sim_hours, wall_s, windows,
+            rss_bytes, traced_bytes, gc_collections, top_allocators and
+            per-span p50/p95 in 'stages')
+    """
+    pipeline = pipeline or build_pipeline(fs, seed, engine)
+    tracer = pipeline.tracer
+    tracer.enable()
+    seen = tracer.count
+    source = make_source(fs, replay, seed)
+    chunk = max(1, int(chunk_s * fs))
+    total_chunks = int(hours * 3600 * fs) // chunk
+    chunks_per_sample = max(1, int(sample_every * 60 * fs) // chunk)
+    stage_latency = {}  # span name -> LatencyHistogram, this interval
+
+    if trace:
+        tracemalloc.start()
+        reference = tracemalloc.take_snapshot()
+    gc_before = [s['collections'] for s in gc.get_stats()]
+    wall_start = time.perf_counter()
+    samples = []
+    windows = 0
+
+    for k in range(1, total_chunks + 1):
+        data = source(chunk)
+        ready, _ = pipeline.feed(data)
+        for window, rejection, spectrum in ready:
+            command, confidence, latency = pipeline.process_window(window, rejection, spectrum)
+            # Same bookkeeping as run(), so its logs are soaked too
+            pipeline.latency.record(latency)
+            pipeline.predictions_log.append({
+                'timestamp': k * chunk / fs,
+                'command': command,
+                'confidence': confidence,
+                'latency_ms': latency
+            })
+            windows += 1
+        seen = drain_spans(tracer, seen, stage_latency)
+
+        if k % chunks_per_sample and k != total_chunks:
+            continue
+
+        gc_now = [s['collections'] for s in gc.get_stats()]
+        sample = {
+            'sim_hours': k * chunk / fs / 3600,
+            'wall_s': time.perf_counter() - wall_start,
+            'windows': windows,
+            'rss_bytes': current_rss(),
+            'traced_bytes': None,
+            'gc_collections': [now - before for now, before in zip(gc_now, gc_before)],
+            'top_allocators': [],
+            'stages': {stage: {'p50': h.percentile(50), 'p95': h.percentile(95)}
+                       for stage, h in stage_latency.items() if h.count}
+        }
+        if trace:
+            sample['traced_bytes'] = tracemalloc.get_traced_memory()[0]
+            stats = tracemalloc.take_snapshot().compare_to(reference, 'lineno')
+            sample['top_allocators'] = [(str(s.traceback), s.size_diff) for s in stats[:top]]
+        samples.append(sample)
+
+        gc_before = gc_now
+        for h in stage_latency.values():
+            h.reset()
+        if verbose:
+            print_sample(sample)
+
+    if trace:
+        tracemalloc.stop()
+    return samples
+
+def _is_monotonic_growth(values, tolerance):
+    """Mostly non-decreasing and risen by more than tolerance overall"""
+    values = np.asarray(values, dtype=float)
+    if len(values) < 4:
+        return False
+    rising = np.mean(np.diff(values) >= 0)
+    return rising >= 0.9 and values[-1] - values[0] > tolerance
+
+def check_drift(samples, warmup=0.1, traced_tolerance=256 * 1024,
+                rss_tolerance=16 * 1024 * 1024, latency_tolerance=0.5, min_creep_ms=0.05):
+    """
+    Args:
+        samples: run_soak() output
+        warmup: leading fraction of samples ignored (caches, allocator pools)
+        traced_tolerance, rss_tolerance: allowed monotonic growth (bytes)
+        latency_tolerance: allowed relative rise of a stage's p95 between the
+            first and last quarter of the run
+        min_creep_ms: absolute rise below which latency changes are ignored
+
+    Returns:
+        list of str: failure descriptions (empty if the run stayed flat)
+    """
+    samples = samples[int(len(samples) * warmup):]
+    failures = []
+
+    traced = [s['traced_bytes'] for s in samples if s['traced_bytes'] is not None]
+    if _is_monotonic_growth(traced, traced_tolerance):
+        failures.append(f"traced memory grew monotonically by "
+                        f"{(traced[-1] - traced[0]) / 1024:.0f} KB")
+    rss = [s['rss_bytes'] for s in samples]
+    if _is_monotonic_growth(rss, rss_tolerance):
+        failures.append(f"RSS grew monotonically by {(rss[-1] - rss[0]) / 2**20:.1f} MB")
+
+    for stage in sorted({stage for s in samples for stage in s['stages']}):
+        # A stage may have no spans in some intervals (e.g. all windows rejected)
+        p95 = [s['stages'][stage]['p95'] for s in samples if stage in s['stages']]
+        quarter = len(p95) // 4
+        if not quarter:
+            continue
+        early = float(np.median(p95[:quarter]))
+        late = float(np.median(p95[-quarter:]))
+        if late - early > max(min_creep_ms, early * latency_tolerance):
+            failures.append(f"{stage} p95 crept from {early:.3f} to {late:.3f} ms")
+    return failures
+
+def print_sample(sample):
+    traced = sample['traced_bytes']
+    traced = f"{traced / 1024:9.0f} KB" if traced is not None else f"{'-':>12s}"
+    stages = '  '.join(f"{name} {s['p95']:.2f}" for name, s in sample['stages'].items())
+    print(f"[{sample['sim_hours']:6.2f} h | {sample['wall_s']:7.1f} s] "
+          f"rss {sample['rss_bytes'] / 2**20:7.1f} MB  traced {traced}  "
+          f"gc {sample['gc_collections']}  p95 ms: {stages}")
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Accelerated soak test for drift')
+    parser.add_argument('--hours', type=float, default=24.0, help='Hours of signal')
+    parser.add_argument('--fs', type=int, default=Config.SAMPLING_RATE, help='Sampling rate (Hz)')
+    parser.add_argument('--sample-every', type=float, default=15.0,
+                       help='Minutes of signal between samples')
+    parser.add_argument('--replay', help='.npy of microvolt samples to loop')
+    parser.add_argument('--engine', choices=FEATURE_ENGINES,
+                       help='Feature engine (default: Config.FEATURE_ENGINE)')
+    parser.add_argument('--no-trace', action='store_true', help='Skip tracemalloc')
+    parser.add_argument('--save', help='Write samples and verdict as JSON')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("NEUROSENSE AI - SOAK TEST")
+    print(f"{args.hours} h of {'replayed' if args.replay else 'synthetic'} signal at {args.fs} Hz")
+    print("="*60)
+    samples = run_soak(args.hours, args.fs, args.sample_every, replay=args.replay,
+                       trace=not args.no_trace, engine=args.engine)
+    failures = check_drift(samples)
+
+    if samples and samples[-1]['top_allocators']:
+        print("\nTop growing allocators:")
+        for where, size_diff in samples[-1]['top_allocators']:
+            print(f"  {size_diff / 1024:+9.1f} KB  {where}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'samples': samples, 'failures': failures}, f, indent=2)
+        print(f"Soak samples saved to {args.save}")
+
+    if failures:
+        for failure in failures:
+            print(f"✗ {failure}")
+        return 1
+    print("\n✓ Memory and latency stayed flat")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
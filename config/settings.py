@@ -1,20 +1,26 @@
 """
 NEUROSENSE AI - BioAmp EXG Pill Configuration
 Single-channel EEG system
+
+Config holds the global defaults. SessionConfig is an immutable snapshot of
+them with per-session overrides (file, environment, keyword arguments) that
+every component accepts as config=...
 """
+import copy
+import json
 import os
 from pathlib import Path
 
+FEATURE_ENGINES = ('welch', 'stft', 'filterbank')  # FEATURE_ENGINE choices
+
 class Config:
-    # Project paths
+    # Project paths (created on first write, see ensure_dirs)
     PROJECT_ROOT = Path(__file__).parent.parent
     DATA_DIR = PROJECT_ROOT / 'data'
     CALIBRATION_DIR = DATA_DIR / 'calibration'
     MODEL_DIR = DATA_DIR / 'models'
-    
-    # Create directories
-    for dir_path in [DATA_DIR, CALIBRATION_DIR, MODEL_DIR]:
-        dir_path.mkdir(exist_ok=True, parents=True)
+    DATASET_DIR = DATA_DIR / 'dataset'  # Consolidated calibration store (see src/dataset)
+    FEATURE_CACHE_DIR = DATA_DIR / 'feature_cache'  # Re-featurized epochs per feature-config hash
     
     # Hardware settings - BioAmp EXG Pill + Arduino Uno
     ARDUINO_PORT = '/dev/ttyUSB0'  # Linux: /dev/ttyUSB0, Windows: COM3, Mac: /dev/cu.usbserial
@@ -42,6 +48,28 @@ class Config:
     FILTER_ORDER = 5
     NOTCH_FREQ = 50.0  # Hz (India: 50 Hz, US: 60 Hz)
     
+    # Raw-stream artifact rejection before any filtering (StreamingArtifactDetector)
+    STREAM_ARTIFACT_CHECK = True
+    ARTIFACT_MAX_UV = 200.0  # Max |x| per window (blinks, movement)
+    ARTIFACT_MAX_STD_UV = 50.0  # Window standard deviation
+    ARTIFACT_MAX_LINE_LENGTH_UV = 25.0  # Mean |x[i] - x[i-1]| (EMG bursts)
+    ARTIFACT_FLAT_SECONDS = 0.1  # Identical samples this long = lead off
+    
+    # Per-second signal quality (SignalQualityMonitor)
+    QUALITY_HISTORY_SECONDS = 60  # One-second reports kept for the summary
+    QUALITY_MIN_RMS_UV = 1.0  # Below: flat signal, lead off
+    QUALITY_MAX_RMS_UV = 50.0  # Above: noisy contact or movement
+    QUALITY_MAX_MAINS_UV = 10.0  # Amplitude at NOTCH_FREQ: poor ground/reference
+    QUALITY_MAX_DRIFT_UV_S = 20.0  # Change of the mean per second: drying gel
+    QUALITY_MAX_CLIP_RATIO = 0.001  # Samples on the ADC rails
+    
+    # Live scope (scripts/1_test_bioamp.py --live)
+    SCOPE_SECONDS = 10.0  # Visible span at start (+/- keys zoom)
+    SCOPE_FPS = 30  # Max redraws per second
+    SCOPE_RAW_SECONDS = 60.0  # Raw samples kept; every pyramid level holds as many bins
+    SCOPE_PYRAMID_FACTOR = 4  # Bins merged per level
+    SCOPE_PYRAMID_LEVELS = 8  # Coarsest level spans 60 s * 4**7 (~270 h)
+    
     # Windowing
     WINDOW_LENGTH = 2.0   # seconds (longer for single channel)
     WINDOW_SAMPLES = int(WINDOW_LENGTH * SAMPLING_RATE)  # 1000 samples
@@ -51,11 +79,30 @@ class Config:
     # Feature extraction
     MU_BAND = (8, 13)    # Hz - Motor imagery primary band
     BETA_BAND = (13, 30)  # Hz - Motor imagery secondary band
-    N_FEATURES = 2  # mu + beta power (single channel)
+    # Feature vector, names registered in src/features/feature_set.py
+    # (mu_power, beta_power, log_*, rel_*, spectral_entropy, peak_alpha_freq,
+    # hjorth_*); all computed from one spectrum per window
+    FEATURES = ('mu_power', 'beta_power')
+    N_FEATURES = len(FEATURES)
+    WELCH_SEGMENT = 0.512  # seconds per Welch segment (256 samples at 500 Hz)
+    # Band power engine: 'welch' (preprocess + Welch per window), 'stft'
+    # (frames of the streaming SpectrogramRing, preprocessing applied as a
+    # spectral gain) or 'filterbank' (causal band filters on the stream with
+    # sliding mean-square envelopes). Without 'welch', artifacts are left to
+    # the raw-stream check.
+    FEATURE_ENGINE = 'welch'
+    STFT_RING_SECONDS = 60.0  # Spectrogram frames kept
+    FILTERBANK_ORDER = 4  # Butterworth order per band filter ('filterbank')
     
     # Model settings - Binary classifier for 1-channel
     MODEL_TYPE = 'LDA'  # LDA, SVM, LogisticRegression
     N_CLASSES = 2  # LEFT vs REST (or RIGHT vs REST)
+    MODEL_CACHE_SIZE = 16  # Loaded models/normalizers shared across sessions (LRU)
+    TRAIN_CHUNK_ROWS = 65536  # Rows per chunk for out-of-core training (bounded RAM)
+    SHARED_RING_SECONDS = 10.0  # Shared-memory ring per session (max worker lag)
+    INFERENCE_MAX_BATCH = 64  # Feature vectors per micro-batch
+    INFERENCE_BATCH_DELAY_MS = 2.0  # Max wait for a micro-batch to fill
+    INFERENCE_TIMEOUT_MS = 100.0  # Wait for a batched result before classifying in place
     
     # Command mapping (simplified for 1-channel)
     COMMAND_MAP = {
@@ -87,10 +134,14 @@ class Config:
     # ERD/ERS Detection (Event-Related Desynchronization/Synchronization)
     ERD_THRESHOLD = -0.3  # 30% power decrease = motor imagery
     ERS_THRESHOLD = 0.2   # 20% power increase = rest
+    THRESHOLD_TARGET_FPR = 0.05  # REST windows a tuned ERD threshold may flag as imagery
     
     # Robot interface
     ROBOT_PORT = '/dev/ttyUSB1'  # Separate port for robot
     ROBOT_BAUD = 9600
+    ROBOT_ACK = False          # Sequence-numbered acks (robot must echo "A<seq>")
+    ROBOT_ACK_TIMEOUT = 0.2    # seconds before a command is retransmitted
+    ROBOT_MAX_RETRIES = 2      # retransmissions before a command counts as lost
     
     # Calibration
     TRIALS_PER_CLASS = 15  # More trials for single channel
@@ -100,9 +151,20 @@ class Config:
     
     # Performance targets (lower for single channel)
     TARGET_LATENCY_MS = 400  # milliseconds (allow more time)
+    PREDICTION_LOG_SIZE = 1000  # Most recent decisions kept per session
+    TRACE_CAPACITY = 65536  # Stage spans kept by a StageTracer (ring)
+    TRACE_PROFILE_EVERY = 10  # One window in N runs under cProfile when profiling slow windows
+    WARMUP_WINDOWS = 5  # Synthetic windows run through every stage before a session starts
+    IMPORT_BUDGET_MS = 2000  # Cold import of src.pipeline.realtime_bci (benchmarks/bench_import.py)
     TARGET_ACCURACY = 0.65   # 65% (realistic for 1-channel)
     MIN_USER_ACCURACY = 0.60  # 60% minimum
     
+    @classmethod
+    def ensure_dirs(cls):
+        """Create the data directories (importing the config never touches disk)"""
+        for dir_path in [cls.DATA_DIR, cls.CALIBRATION_DIR, cls.MODEL_DIR, cls.DATASET_DIR]:
+            dir_path.mkdir(exist_ok=True, parents=True)
+    
     # Voltage conversion
     @staticmethod
     def adc_to_voltage(adc_value):
@@ -113,3 +175,181 @@ class Config:
     def voltage_to_uv(voltage):
         """Convert voltage to microvolts (accounting for BioAmp gain)"""
         return (voltage - 2.5) * 1000000 / Config.BIOAMP_GAIN
+    
+    @staticmethod
+    def uv_to_adc(microvolts):
+        """Convert microvolts back to Arduino ADC counts (inverse of the above, clipped to 0-1023)"""
+        import numpy as np
+        voltage = np.asarray(microvolts) * Config.BIOAMP_GAIN / 1000000 + 2.5
+        adc = np.round(voltage / Config.ADC_VREF * 1024.0)
+        return np.clip(adc, 0, 2 ** Config.ADC_RESOLUTION - 1).astype(int)
+
+
+class SessionConfig:
+    """
+    Immutable per-session settings with the same attribute names as Config
+    
+    Derived fields (WINDOW_SAMPLES, STEP_SAMPLES from WINDOW_LENGTH,
+    WINDOW_OVERLAP and SAMPLING_RATE; N_FEATURES from FEATURES) are
+    recomputed and cannot be set.
+    Overriding DATA_DIR moves the directories below it (calibration, models,
+    dataset, feature cache) unless they are overridden too.
+    
+    Usage:
+        config = SessionConfig.load('session.json', SAMPLING_RATE=1000)
+        pipeline = RealtimeBCIPipeline(model_path, config=config)
+    """
+    DERIVED = ('WINDOW_SAMPLES', 'STEP_SAMPLES', 'N_FEATURES')
+    ENV_PREFIX = 'NEUROSENSE_'
+    
+    def __init__(self, **overrides):
+        values = {key: copy.deepcopy(value) for key, value in vars(Config).items()
+                  if key.isupper()}
+        
+        unknown = sorted(set(overrides) - set(values))
+        if unknown:
+            raise ValueError(f"Unknown config keys: {', '.join(unknown)}")
+        derived = sorted(set(overrides) & set(self.DERIVED))
+        if derived:
+            raise ValueError(f"{', '.join(derived)} are derived from WINDOW_LENGTH, "
+                             "WINDOW_OVERLAP, SAMPLING_RATE and FEATURES")
+        
+        for key, value in overrides.items():
+            values[key] = self._coerce(key, value, values[key])
+        if 'DATA_DIR' in overrides:
+            for key, name in [('CALIBRATION_DIR', 'calibration'), ('MODEL_DIR', 'models'),
+                              ('DATASET_DIR', 'dataset'),
+                              ('FEATURE_CACHE_DIR', 'feature_cache')]:
+                if key not in overrides:
+                    values[key] = values['DATA_DIR'] / name
+        
+        values['WINDOW_SAMPLES'] = int(values['WINDOW_LENGTH'] * values['SAMPLING_RATE'])
+        values['STEP_SAMPLES'] = int(values['WINDOW_SAMPLES'] * (1 - values['WINDOW_OVERLAP']))
+        if values['STEP_SAMPLES'] < 1:
+            raise ValueError("WINDOW_OVERLAP leaves no step between windows")
+        values['N_FEATURES'] = len(values['FEATURES'])
+        if not values['FEATURES'] or len(set(values['FEATURES'])) != len(values['FEATURES']):
+            raise ValueError("FEATURES must name at least one feature, each once")
+        if values['FEATURE_ENGINE'] not in FEATURE_ENGINES:
+            raise ValueError(f"FEATURE_ENGINE must be one of {', '.join(FEATURE_ENGINES)}")
+        
+        self.__dict__.update(values)
+        self.__dict__['_overrides'] = frozenset(overrides)
+    
+    @staticmethod
+    def _coerce(key, value, default):
+        """Cast a file/environment value to the type of the default"""
+        if isinstance(default, Path):
+            return Path(value)
+        if isinstance(default, bool):
+            if isinstance(value, str):
+                return value.strip().lower() in ('1', 'true', 'yes', 'on')
+            return bool(value)
+        if isinstance(default, (int, float)) and not isinstance(value, (int, float)):
+            value = json.loads(value)
+        if isinstance(default, float) and isinstance(value, int):
+            return float(value)
+        if isinstance(default, tuple):
+            return tuple(json.loads(value) if isinstance(value, str) else value)
+        if isinstance(default, dict):
+            value = json.loads(value) if isinstance(value, str) else value
+            # JSON object keys are strings; restore the default's key type
+            key_type = type(next(iter(default))) if default else str
+            return {key_type(k): v for k, v in value.items()}
+        return value
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("SessionConfig is immutable, use replace()")
+    
+    def __delattr__(self, name):
+        raise AttributeError("SessionConfig is immutable")
+    
+    def replace(self, **overrides):
+        """New config with these overrides on top of this one's"""
+        current = {key: getattr(self, key) for key in self._overrides}
+        current.update(overrides)
+        return SessionConfig(**current)
+    
+    @classmethod
+    def from_file(cls, filepath, **overrides):
+        """
+        Args:
+            filepath: JSON object of overrides, e.g. {"SAMPLING_RATE": 1000}
+        """
+        with open(filepath) as f:
+            values = json.load(f)
+        values.update(overrides)
+        return cls(**values)
+    
+    @classmethod
+    def _env_values(cls, environ):
+        return {name[len(cls.ENV_PREFIX):]: value for name, value in environ.items()
+                if name.startswith(cls.ENV_PREFIX) and name != cls.ENV_PREFIX + 'CONFIG'}
+    
+    @classmethod
+    def from_env(cls, environ=None, **overrides):
+        """Overrides from NEUROSENSE_<KEY> environment variables"""
+        values = cls._env_values(os.environ if environ is None else environ)
+        values.update(overrides)
+        return cls(**values)
+    
+    @classmethod
+    def load(cls, filepath=None, environ=None, **overrides):
+        """
+        Layered config: defaults < file < environment < keyword overrides
+        
+        Args:
+            filepath: JSON overrides (default: $NEUROSENSE_CONFIG if set)
+            environ: mapping to read NEUROSENSE_* variables from (default: os.environ)
+        """
+        environ = os.environ if environ is None else environ
+        filepath = filepath or environ.get(cls.ENV_PREFIX + 'CONFIG')
+        values = {}
+        if filepath:
+            with open(filepath) as f:
+                values.update(json.load(f))
+        values.update(cls._env_values(environ))
+        values.update(overrides)
+        return cls(**values)
+    
+    def to_dict(self, overrides_only=False):
+        """JSON-serializable values (paths as strings, tuples as lists)"""
+        keys = sorted(self._overrides) if overrides_only else sorted(
+            key for key in self.__dict__ if key.isupper())
+        values = {}
+        for key in keys:
+            value = getattr(self, key)
+            if isinstance(value, Path):
+                value = str(value)
+            elif isinstance(value, tuple):
+                value = list(value)
+            values[key] = value
+        return values
+    
+    def ensure_dirs(self):
+        """Create this session's data directories"""
+        for dir_path in [self.DATA_DIR, self.CALIBRATION_DIR, self.MODEL_DIR, self.DATASET_DIR]:
+            dir_path.mkdir(exist_ok=True, parents=True)
+    
+    def __eq__(self, other):
+        return isinstance(other, SessionConfig) and self.to_dict() == other.to_dict()
+    
+    def __hash__(self):
+        return hash(json.dumps(self.to_dict(), sort_keys=True))
+    
+    def __repr__(self):
+        overrides = ', '.join(f"{k}={v!r}" for k, v in self.to_dict(True).items())
+        return f"SessionConfig({overrides})"
+    
+    # Voltage conversion with this session's ADC settings
+    def adc_to_voltage(self, adc_value):
+        return (adc_value / 1024.0) * self.ADC_VREF
+    
+    def voltage_to_uv(self, voltage):
+        return (voltage - 2.5) * 1000000 / self.BIOAMP_GAIN
+    
+    def uv_to_adc(self, microvolts):
+        import numpy as np
+        voltage = np.asarray(microvolts) * self.BIOAMP_GAIN / 1000000 + 2.5
+        adc = np.round(voltage / self.ADC_VREF * 1024.0)
+        return np.clip(adc, 0, 2 ** self.ADC_RESOLUTION - 1).astype(int)
@@ -1,16 +1,23 @@
 """
 Real-time EEG data acquisition from BioAmp EXG Pill via Arduino
 """
-import serial
 import numpy as np
 import time
 from config.settings import Config
 
 class BioAmpReader:
-    def __init__(self, port=Config.ARDUINO_PORT, baudrate=Config.BAUD_RATE):
-        self.port = port
-        self.baudrate = baudrate
-        self.fs = Config.SAMPLING_RATE
+    def __init__(self, port=None, baudrate=None, reset_delay=2, fs=None, config=None):
+        """
+        Args:
+            port, baudrate, fs: override config.ARDUINO_PORT / BAUD_RATE / SAMPLING_RATE
+            reset_delay: seconds to wait for the Arduino to reset on connect
+            config: SessionConfig (default: global Config)
+        """
+        self.config = config or Config
+        self.port = port or self.config.ARDUINO_PORT
+        self.baudrate = baudrate or self.config.BAUD_RATE
+        self.fs = fs or self.config.SAMPLING_RATE
+        self.reset_delay = reset_delay
         self.ser = None
         self.connected = False
         
@@ -18,11 +25,16 @@ class BioAmpReader:
         self.baseline = None
         self.baseline_samples = []
         
+        # Incomplete trailing line kept between read_available() calls
+        self._partial = b''
+        
     def connect(self):
         """Connect to Arduino via Serial"""
+        import serial  # Deferred: offline processing never needs pyserial
+        
         try:
             self.ser = serial.Serial(self.port, self.baudrate, timeout=1)
-            time.sleep(2)  # Wait for Arduino reset
+            time.sleep(self.reset_delay)  # Wait for Arduino reset
             
             # Flush initial garbage
             self.ser.flushInput()
@@ -90,8 +102,8 @@ class BioAmpReader:
             adc_value = int(line)
             
             # ADC → Voltage → Microvolts
-            voltage = Config.adc_to_voltage(adc_value)
-            microvolts = Config.voltage_to_uv(voltage)
+            voltage = self.config.adc_to_voltage(adc_value)
+            microvolts = self.config.voltage_to_uv(voltage)
             
             # Remove baseline if calibrated
             if self.baseline is not None:
@@ -102,6 +114,36 @@ class BioAmpReader:
         except (ValueError, UnicodeDecodeError):
             return None  # Corrupted sample
     
+    def read_available(self):
+        """
+        Non-blocking read of every complete sample already received
+        
+        Meant for selector-driven loops (ser.fileno() readable); do not mix
+        with read_sample() on the same connection.
+        
+        Returns:
+            np.array: (n,) microvolts, possibly empty
+        """
+        if not self.connected:
+            raise ConnectionError("BioAmp not connected!")
+        
+        n_waiting = self.ser.in_waiting
+        if not n_waiting:
+            return np.empty(0)
+        
+        lines = (self._partial + self.ser.read(n_waiting)).split(b'\n')
+        self._partial = lines.pop()
+        
+        # Skip header/empty/corrupted lines
+        adc = [int(line) for line in lines if line.strip().isdigit()]
+        microvolts = self.config.voltage_to_uv(
+            self.config.adc_to_voltage(np.array(adc, dtype=float)))
+        
+        if self.baseline is not None:
+            microvolts -= self.baseline
+        
+        return microvolts
+    
     def stream_continuous(self):
         """
         Generator: yields EEG samples continuously
@@ -1,24 +1,69 @@
 """
 Robot Controller Interface
+
+Plain mode writes one command character per decision (e.g. 'F').
+
+Acknowledged mode (use_ack=True) frames every command with a sequence number
+and expects the robot to echo it back:
+
+    host  -> robot:  <cmd_char><seq>\\n     e.g. "F17\\n"
+    robot -> host:   A<seq>\\n              e.g. "A17\\n"
+
+A background reader matches acks to pending commands, records the
+decision-to-ack round trip and retransmits commands whose ack times out.
 """
-import serial
 import time
+import threading
 from config.settings import Config
+from src.monitoring.latency import LatencyHistogram
 
 class RobotController:
-    def __init__(self, port=Config.ROBOT_PORT, baudrate=Config.ROBOT_BAUD):
-        self.port = port
-        self.baudrate = baudrate
+    SEQ_MODULO = 65536
+
+    def __init__(self, port=None, baudrate=None, use_ack=None, ack_timeout=None,
+                 max_retries=None, reset_delay=2, config=None):
+        """
+        Args:
+            port, baudrate, use_ack, ack_timeout, max_retries: override the
+                config's ROBOT_* values
+            config: SessionConfig (default: global Config)
+        """
+        config = config or Config
+        self.port = port or config.ROBOT_PORT
+        self.baudrate = baudrate or config.ROBOT_BAUD
         self.ser = None
         self.connected = False
-        self.commands = Config.ROBOT_COMMANDS
+        self.commands = config.ROBOT_COMMANDS
+        self.reset_delay = reset_delay
+
+        # Acknowledgement protocol
+        self.use_ack = use_ack if use_ack is not None else config.ROBOT_ACK
+        self.ack_timeout = ack_timeout if ack_timeout is not None else config.ROBOT_ACK_TIMEOUT
+        self.max_retries = max_retries if max_retries is not None else config.ROBOT_MAX_RETRIES
+        self.ack_latency = LatencyHistogram()
+        self.stats = {'sent': 0, 'acked': 0, 'retries': 0, 'timeouts': 0}
+        self._seq = 0
+        self._pending = {}  # seq -> [frame, decision_time, last_send_time, retries]
+        # Outcome per seq once it leaves _pending: 1 acked, 0 dropped (or unsent)
+        self._acked_seqs = bytearray(self.SEQ_MODULO)
+        self._lock = threading.Lock()
+        self._acked = threading.Condition(self._lock)
+        self._reader = None
+        self._stop = threading.Event()
 
     def connect(self):
         """Connect to robot via Serial"""
+        import serial  # Deferred: offline processing never needs pyserial
+        
         try:
-            self.ser = serial.Serial(self.port, self.baudrate, timeout=1)
-            time.sleep(2)  # Wait for Arduino reset
+            self.ser = serial.Serial(self.port, self.baudrate, timeout=0.05)
+            time.sleep(self.reset_delay)  # Wait for Arduino reset
             self.connected = True
+            if self.use_ack:
+                self.ser.reset_input_buffer()
+                self._stop.clear()
+                self._reader = threading.Thread(target=self._read_acks, daemon=True)
+                self._reader.start()
             print(f"Robot controller connected on {self.port}")
             return True
         except Exception as e:
@@ -26,26 +71,147 @@ class RobotController:
             # print(f"Available ports: {self._list_ports()}")
             return False
 
-    def send_command(self, command_name):
+    def send_command(self, command_name, decision_time=None):
         """
         Send command to robot
-        
+
         Args:
             command_name: str (e.g. 'STOP', 'FORWARD')
+            decision_time: time.perf_counter() value when the command was
+                decided (ack mode only, defaults to now)
+
+        Returns:
+            int or None: sequence number in ack mode, else None
         """
         if not self.connected:
-            return
-        
-        if command_name in self.commands:
-            cmd_char = self.commands[command_name]
+            return None
+
+        if command_name not in self.commands:
+            return None
+
+        cmd_char = self.commands[command_name]
+        if not self.use_ack:
             try:
                 self.ser.write(cmd_char.encode())
                 # print(f"Sent command: {command_name} ({cmd_char})")
             except Exception as e:
                 print(f"Error sending command: {e}")
-    
+            return None
+
+        now = time.perf_counter()
+        if decision_time is None:
+            decision_time = now
+
+        with self._lock:
+            seq = self._seq
+            self._seq = (self._seq + 1) % self.SEQ_MODULO
+            frame = f"{cmd_char}{seq}\n".encode()
+            self._pending[seq] = [frame, decision_time, now, 0]
+            self._acked_seqs[seq] = 0  # Forget the last command with this seq
+            self.stats['sent'] += 1
+            try:
+                self.ser.write(frame)
+            except Exception as e:
+                print(f"Error sending command: {e}")
+        return seq
+
+    def wait_for_ack(self, seq, timeout=None):
+        """
+        Block until a command is acknowledged or given up on
+
+        Args:
+            seq: sequence number returned by send_command
+            timeout: seconds to wait (None = until acked or retries exhausted)
+
+        Returns:
+            bool: True if the robot acknowledged the command, False if it
+                was dropped after max_retries or is still pending at timeout
+        """
+        if seq is None:
+            return False
+        with self._acked:
+            if not self._acked.wait_for(lambda: seq not in self._pending, timeout):
+                return False
+            return bool(self._acked_seqs[seq])
+
+    def pending_count(self):
+        """Number of commands still waiting for an ack"""
+        with self._lock:
+            return len(self._pending)
+
+    def _read_acks(self):
+        """Background reader: match acks, time out and retransmit"""
+        partial = b''
+        while not self._stop.is_set():
+            try:
+                chunk = self.ser.read(max(1, self.ser.in_waiting))
+            except Exception:
+                if self._stop.is_set():
+                    break
+                chunk = b''
+                time.sleep(self.ack_timeout)
+
+            if chunk:
+                partial += chunk
+                *lines, partial = partial.split(b'\n')
+                for line in lines:
+                    self._handle_ack(line.strip(), time.perf_counter())
+
+            self._check_timeouts(time.perf_counter())
+
+    def _handle_ack(self, line, now):
+        if not line.startswith(b'A'):
+            return
+        try:
+            seq = int(line[1:])
+        except ValueError:
+            return  # Corrupted ack
+
+        with self._acked:
+            entry = self._pending.pop(seq, None)
+            if entry is None:
+                return  # Duplicate ack for a retransmitted command
+            self.ack_latency.record((now - entry[1]) * 1000)
+            self.stats['acked'] += 1
+            self._acked_seqs[seq] = 1
+            self._acked.notify_all()
+
+    def _check_timeouts(self, now):
+        with self._acked:
+            for seq in list(self._pending):
+                entry = self._pending[seq]
+                if now - entry[2] < self.ack_timeout:
+                    continue
+                if entry[3] < self.max_retries:
+                    entry[2] = now
+                    entry[3] += 1
+                    self.stats['retries'] += 1
+                    try:
+                        self.ser.write(entry[0])
+                    except Exception as e:
+                        print(f"Error resending command: {e}")
+                else:
+                    del self._pending[seq]
+                    self.stats['timeouts'] += 1
+                    self._acked.notify_all()
+
+    def ack_report(self):
+        """
+        Returns:
+            dict: counters plus round-trip latency summary (ms)
+        """
+        with self._lock:
+            report = dict(self.stats)
+            report['pending'] = len(self._pending)
+            report['latency_ms'] = self.ack_latency.summary()
+        return report
+
     def disconnect(self):
         """Close serial connection"""
+        self._stop.set()
+        if self._reader is not None:
+            self._reader.join(timeout=1)
+            self._reader = None
         if self.ser and self.ser.is_open:
             self.ser.close()
             self.connected = False
@@ -0,0 +1,129 @@
+"""
+Pseudo-terminal BioAmp/Arduino stand-in streaming synthetic EEG
+
+The default LineProtocol reproduces arduino/bioamp_stream.ino byte for byte
+(two header lines, then one ADC count per line terminated by "\\r\\n"), so
+BioAmpReader can be pointed at SimulatedBioAmp.port unchanged. Other wire
+formats plug in as objects with header() and encode(adc_chunk) methods.
+"""
+import os
+import pty
+import select
+import threading
+import time
+import tty
+from config.settings import Config
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+
+class LineProtocol:
+    """ASCII framing used by arduino/bioamp_stream.ino (Serial.println)"""
+
+    def __init__(self, fs=Config.SAMPLING_RATE, channel=Config.CHANNEL_NAME):
+        self.fs = fs
+        self.channel = channel
+
+    def header(self):
+        return (f"BioAmp EXG Pill streaming at {self.fs} Hz, 1 channel\r\n"
+                f"Channel: {self.channel} (Left Motor Cortex)\r\n").encode()
+
+    def encode(self, adc_chunk):
+        """
+        Args:
+            adc_chunk: (n,) int ADC counts
+
+        Returns:
+            bytes
+        """
+        if len(adc_chunk) == 0:
+            return b''
+        return ('\r\n'.join(map(str, adc_chunk.tolist())) + '\r\n').encode()
+
+class SimulatedBioAmp:
+    def __init__(self, fs=Config.SAMPLING_RATE, generator=None, protocol=None,
+                 chunk_ms=10, realtime=True):
+        """
+        Args:
+            fs: output sampling rate (Hz), several kHz is fine
+            generator: SyntheticEEGGenerator (default: one at fs)
+            protocol: wire format (default: LineProtocol)
+            chunk_ms: samples are generated and written in chunks of this length
+            realtime: pace output at fs; False streams as fast as the reader consumes
+        """
+        self.fs = fs
+        self.generator = generator or SyntheticEEGGenerator(fs=fs)
+        self.protocol = protocol or LineProtocol(fs=fs)
+        self.chunk_samples = max(1, int(fs * chunk_ms / 1000))
+        self.realtime = realtime
+
+        self.samples_sent = 0
+        self.start_time = None
+
+        self.master_fd, self.slave_fd = pty.openpty()
+        tty.setraw(self.master_fd)
+        tty.setraw(self.slave_fd)
+        self.port = os.ttyname(self.slave_fd)
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._stream, daemon=True)
+        self._thread.start()
+        return self
+
+    def _write_all(self, data):
+        """Write to the pty, waiting while the reader is behind (returns False on stop)"""
+        view = memoryview(data)
+        while len(view) and not self._stop.is_set():
+            _, writable, _ = select.select([], [self.master_fd], [], 0.05)
+            if not writable:
+                continue
+            try:
+                written = os.write(self.master_fd, view)
+            except OSError:
+                return False
+            view = view[written:]
+        return not len(view)
+
+    def _stream(self):
+        if not self._write_all(self.protocol.header()):
+            return
+
+        self.start_time = time.perf_counter()
+        while not self._stop.is_set():
+            if self.realtime:
+                due = int((time.perf_counter() - self.start_time) * self.fs) - self.samples_sent
+                if due < self.chunk_samples:
+                    time.sleep((self.chunk_samples - due) / self.fs)
+                    continue
+            else:
+                due = self.chunk_samples
+
+            adc = self.generator.generate_adc(due)
+            if not self._write_all(self.protocol.encode(adc)):
+                return
+            self.samples_sent += due
+
+    def achieved_rate(self):
+        """Samples per second actually delivered since start()"""
+        if self.start_time is None:
+            return 0.0
+        return self.samples_sent / (time.perf_counter() - self.start_time)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        for fd in (self.master_fd, self.slave_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,86 @@
+"""
+Pseudo-terminal robot stand-in for testing RobotController without hardware
+"""
+import os
+import pty
+import select
+import threading
+import time
+import tty
+
+class SimulatedRobot:
+    def __init__(self, ack=True, ack_delay=0.0, drop_first=0):
+        """
+        Args:
+            ack: reply "A<seq>" to framed commands (False = plain char mode)
+            ack_delay: seconds to wait before acknowledging (actuation time)
+            drop_first: number of incoming frames to ignore (exercises retries)
+        """
+        self.ack = ack
+        self.ack_delay = ack_delay
+        self.drop_first = drop_first
+        self.received = []  # (cmd_char, seq or None)
+
+        self.master_fd, self.slave_fd = pty.openpty()
+        tty.setraw(self.master_fd)
+        tty.setraw(self.slave_fd)
+        self.port = os.ttyname(self.slave_fd)
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def _serve(self):
+        partial = b''
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self.master_fd], [], [], 0.05)
+            if not ready:
+                continue
+            try:
+                chunk = os.read(self.master_fd, 1024)
+            except OSError:
+                break
+
+            if not self.ack:
+                self.received.extend((chr(c), None) for c in chunk)
+                continue
+
+            partial += chunk
+            *lines, partial = partial.split(b'\n')
+            for line in lines:
+                self._handle_frame(line.strip())
+
+    def _handle_frame(self, line):
+        if not line:
+            return
+        if self.drop_first > 0:
+            self.drop_first -= 1
+            return
+
+        cmd_char, seq = chr(line[0]), line[1:].decode()
+        self.received.append((cmd_char, int(seq)))
+        if self.ack_delay:
+            time.sleep(self.ack_delay)
+        os.write(self.master_fd, f"A{seq}\n".encode())
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        for fd in (self.master_fd, self.slave_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -10,11 +10,18 @@ import time
 import numpy as np
 import matplotlib.pyplot as plt
 from hardware.bioamp_reader import BioAmpReader
+from src.monitoring.signal_quality import SignalQualityMonitor
+from src.features.stft import SpectrogramRing
+from src.visualization.scope import LiveScope, LiveSpectrogram, SummaryPyramid
 from config.settings import Config
 
-def test_bioamp(duration=10):
+def test_bioamp(duration=10, live=False):
     """
     Test BioAmp sensor connection and data quality
+    
+    Args:
+        duration: seconds to record (0 = until Ctrl+C)
+        live: show a live scope while recording
     """
     print("="*60)
     print("NEUROSENSE AI - BioAmp EXG Pill Test")
@@ -37,31 +44,53 @@ def test_bioamp(duration=10):
     # Calibrate baseline
     print("\nCalibrating baseline...")
     bioamp.calibrate_baseline(duration=5)
+    stft = SpectrogramRing()
+    monitor = SignalQualityMonitor(baseline=bioamp.baseline, stft=stft)
     
-    # Collect samples
-    print(f"\nRecording EEG data for {duration} seconds...")
+    # Collect samples. Only running statistics and the bounded summary
+    # pyramid are kept, so the recording can run for hours.
+    print(f"\nRecording EEG data for {duration or 'unlimited'} seconds...")
     print("Channel: C3 (Left Motor Cortex)")
     
-    samples = []
-    timestamps = []
-    sample_count = 0
+    pyramid = SummaryPyramid()
+    plots = []
+    if live:
+        plots = [LiveScope(pyramid), LiveSpectrogram(stft)]
+        for plot in plots:
+            plot.start()
+        print("Live scope open (+/- to zoom, close the window or Ctrl+C to stop)")
+    
+    total = total_sq = 0.0
+    low, high = np.inf, -np.inf
     start_time = time.time()
     
-    for sample, timestamp in bioamp.stream_continuous():
-        if sample is None:
-            continue
-        
-        samples.append(sample)
-        timestamps.append(timestamp)
-        sample_count += 1
-        
-        # Print every 100 samples
-        if sample_count % 100 == 0:
-            print(f"[{timestamp:5.2f}s] Sample {sample_count}: {sample:7.2f} μV")
-        
-        # Stop after duration
-        if timestamp >= duration:
-            break
+    try:
+        while not duration or time.time() - start_time < duration:
+            data = bioamp.read_available()
+            if len(data) == 0:
+                for plot in plots:
+                    plot.update()
+                time.sleep(0.005)
+                continue
+            
+            pyramid.add_samples(data)
+            stft.add_samples(data)
+            total += float(np.sum(data))
+            total_sq += float(np.dot(data, data))
+            low, high = min(low, np.min(data)), max(high, np.max(data))
+            
+            # Print signal quality every second
+            for quality in monitor.add_samples(data):
+                elapsed = pyramid.sample_count / Config.SAMPLING_RATE
+                print(f"[{elapsed:5.1f}s] {SignalQualityMonitor.format_report(quality)}")
+            
+            if any(plot.closed for plot in plots):
+                break
+            for plot in plots:
+                plot.update()
+    except KeyboardInterrupt:
+        print("\nStopped by user")
+    elapsed = time.time() - start_time
     
     bioamp.disconnect()
     
@@ -70,27 +99,39 @@ def test_bioamp(duration=10):
     print("DATA QUALITY REPORT")
     print("="*60)
     
-    data = np.array(samples)
-    timestamps = np.array(timestamps)
+    n = pyramid.sample_count
+    if n == 0:
+        print("No samples received!")
+        return
+    mean = total / n
     
-    print(f"Total samples: {len(samples)}")
-    print(f"Duration: {timestamps[-1]:.2f} seconds")
-    print(f"Sampling rate: {len(samples) / timestamps[-1]:.1f} Hz")
+    print(f"Total samples: {n}")
+    print(f"Duration: {elapsed:.2f} seconds")
+    print(f"Sampling rate: {n / elapsed:.1f} Hz")
     print(f"Expected: {Config.SAMPLING_RATE} Hz")
     
     print(f"\nSignal Statistics (μV):")
-    print(f"  Mean:   {np.mean(data):7.2f}")
-    print(f"  Std:    {np.std(data):7.2f}")
-    print(f"  Min:    {np.min(data):7.2f}")
-    print(f"  Max:    {np.max(data):7.2f}")
-    print(f"  Range:  {np.max(data) - np.min(data):7.2f}")
+    print(f"  Mean:   {mean:7.2f}")
+    print(f"  Std:    {max(total_sq / n - mean * mean, 0.0) ** 0.5:7.2f}")
+    print(f"  Min:    {low:7.2f}")
+    print(f"  Max:    {high:7.2f}")
+    print(f"  Range:  {high - low:7.2f}")
     
     # Check for artifacts
-    max_amplitude = np.max(np.abs(data))
+    max_amplitude = max(abs(low), abs(high))
     print(f"\nMax amplitude: {max_amplitude:.2f} μV")
     
+    quality = monitor.summary()
+    if quality['seconds']:
+        print(f"Mains ({monitor.mains_freq:.0f} Hz): {quality['mains_uv']:.2f} μV")
+        print(f"Max DC drift: {quality['max_drift_uv_s']:.2f} μV/s")
+        print(f"Clipped samples: {quality['clip_ratio']:.2%}")
+    
     if max_amplitude > 150:
         print("⚠ High amplitude detected - check electrode contact!")
+    elif quality['issues']:
+        flagged = ', '.join(f"{issue} ({count}s)" for issue, count in quality['issues'].items())
+        print(f"⚠ Signal quality issues: {flagged}")
     else:
         print("✓ Signal quality looks good")
     
@@ -99,23 +140,25 @@ def test_bioamp(duration=10):
     
     plt.figure(figsize=(12, 8))
     
-    # Time series
+    # Time series: min/max envelope of the whole recording
     plt.subplot(2, 1, 1)
-    plt.plot(timestamps, data)
+    t, mins, maxs = pyramid.query(n / Config.SAMPLING_RATE, 2000)
+    plt.fill_between(t, mins, maxs, linewidth=0.5)
     plt.xlabel('Time (s)')
     plt.ylabel('Amplitude (μV)')
     plt.title('EEG Signal (C3 - Left Motor Cortex)')
     plt.grid(True)
     
-    # Power spectrum
+    # Power spectrum of the raw samples still held (last SCOPE_RAW_SECONDS)
     from scipy.signal import welch
-    freqs, psd = welch(data, fs=Config.SAMPLING_RATE, nperseg=512)
+    recent = pyramid.recent(n)
+    freqs, psd = welch(recent, fs=Config.SAMPLING_RATE, nperseg=min(512, len(recent)))
     
     plt.subplot(2, 1, 2)
     plt.semilogy(freqs, psd)
     plt.xlabel('Frequency (Hz)')
     plt.ylabel('Power (μV²/Hz)')
-    plt.title('Power Spectral Density')
+    plt.title(f'Power Spectral Density (last {len(recent) / Config.SAMPLING_RATE:.0f} s)')
     plt.xlim([0, 50])
     plt.grid(True)
     
@@ -128,8 +171,20 @@ def test_bioamp(duration=10):
     plt.savefig('bioamp_test.png')
     print("✓ Plot saved to bioamp_test.png")
     
+    stft.save('bioamp_test_spectrogram.npz', channel=Config.CHANNEL_NAME,
+              timestamp=time.strftime("%Y-%m-%d %H:%M:%S"))
+    print(f"✓ Spectrogram ({min(stft.frame_count, stft.capacity)} frames) saved to "
+          f"bioamp_test_spectrogram.npz")
+    
     print("\n✓ Test complete!")
 
 if __name__ == "__main__":
-    duration = int(sys.argv[1]) if len(sys.argv) > 1 else 10
-    test_bioamp(duration)
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Test BioAmp connection and data quality')
+    parser.add_argument('duration', nargs='?', type=float, default=10,
+                        help='Seconds to record (0 = until Ctrl+C)')
+    parser.add_argument('--live', action='store_true',
+                        help='Live scope with min/max decimation while recording')
+    args = parser.parse_args()
+    test_bioamp(args.duration, live=args.live)
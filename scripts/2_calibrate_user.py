@@ -9,8 +9,7 @@ sys.path.insert(0, str(project_root))
 import time
 import numpy as np
 from hardware.bioamp_reader import BioAmpReader
-from src.preprocessing.filters import RealtimePreprocessor
-from src.features.band_power import BandPowerExtractor
+from src.dataset.epochs import featurize_epochs, pack_epochs
 from config.settings import Config
 
 def calibrate_user(user_name):
@@ -33,10 +32,6 @@ def calibrate_user(user_name):
     print("=== Baseline Calibration ===")
     bioamp.calibrate_baseline(duration=5)
     
-    # Processing components
-    preprocessor = RealtimePreprocessor()
-    feature_extractor = BandPowerExtractor()
-    
     # Task instructions
     tasks = [
         (0, 'REST', 'Relax, clear your mind, no specific thought'),
@@ -46,6 +41,13 @@ def calibrate_user(user_name):
     all_features = []
     all_labels = []
     
+    # Raw trials (clean or not) so features can be recomputed later
+    raw_epochs = []
+    epoch_labels = []
+    epoch_onsets = []
+    epoch_clean = []
+    session_start = time.time()
+    
     print("\nInstructions:")
     print("- Each trial: 2s preparation + 4s task")
     print("- IMAGERY: Imagine moving your LEFT hand")
@@ -91,8 +93,14 @@ def calibrate_user(user_name):
             print(f"RELAX (3s) - Collected {len(trial_samples)} samples")
             time.sleep(Config.REST_DURATION)
             
-            # Process trial
-            preprocessed, is_clean = preprocessor.preprocess(trial_data)
+            # Process trial (with the configured FEATURE_ENGINE)
+            trial_features, kept = featurize_epochs([trial_data])
+            is_clean = bool(kept[0])
+            
+            raw_epochs.append(trial_data)
+            epoch_labels.append(task_id)
+            epoch_onsets.append(trial_start - session_start)
+            epoch_clean.append(is_clean)
             
             if not is_clean:
                 print("⚠ Artifact detected - retrying trial")
@@ -100,7 +108,7 @@ def calibrate_user(user_name):
                 continue
             
             # Extract features
-            features = feature_extractor.extract(preprocessed)
+            features = trial_features[0]
             
             all_features.append(features)
             all_labels.append(task_id)
@@ -108,26 +116,31 @@ def calibrate_user(user_name):
             print(f"✓ Trial {trial+1} complete - Features: {features}")
     
     # Save calibration data
-    X = np.array(all_features)  # (30, 2)
+    X = np.array(all_features)  # (30, N_FEATURES)
     y = np.array(all_labels)    # (30,)
     
+    Config.ensure_dirs()
     save_path = Config.CALIBRATION_DIR / f"{user_name}_calibration.npz"
     np.savez(save_path,
              features=X,
              labels=y,
              user_name=user_name,
              channel=Config.CHANNEL_NAME,
-             timestamp=time.strftime("%Y-%m-%d %H:%M:%S"))
+             timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
+             feature_names=np.array(Config.FEATURES),
+             **pack_epochs(raw_epochs, epoch_labels, epoch_onsets, epoch_clean,
+                           baseline=bioamp.baseline or 0.0))
     
     print(f"\n{'='*60}")
     print("CALIBRATION COMPLETE!")
     print(f"{'='*60}")
     print(f"Saved to: {save_path}")
     print(f"Total samples: {len(y)}")
+    print(f"Raw epochs stored: {len(raw_epochs)} ({sum(len(e) for e in raw_epochs)} samples)")
     print(f"Label distribution: REST={np.sum(y==0)}, IMAGERY={np.sum(y==1)}")
     print(f"\nFeature statistics:")
-    print(f"  REST:    Mu={np.mean(X[y==0, 0]):.2f}, Beta={np.mean(X[y==0, 1]):.2f}")
-    print(f"  IMAGERY: Mu={np.mean(X[y==1, 0]):.2f}, Beta={np.mean(X[y==1, 1]):.2f}")
+    for j, name in enumerate(Config.FEATURES):
+        print(f"  {name:18s} REST={np.mean(X[y==0, j]):.2f}  IMAGERY={np.mean(X[y==1, j]):.2f}")
     
     bioamp.disconnect()
 
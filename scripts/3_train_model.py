@@ -7,43 +7,80 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.model_selection import (train_test_split, cross_val_score, GroupKFold,
+                                     GroupShuffleSplit)
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 from src.models.classifier import MotorImageryClassifier
 from src.features.normalizer import FeatureNormalizer
+from src.features.band_power import BandPowerExtractor
+from src.models.artifact import export_artifact
+from src.models.registry import ModelRegistry
+from src.dataset.store import DatasetStore
+from src.dataset.epochs import refeaturize as refeaturize_epochs
+from src.models.streaming import OutOfCoreTrainer
+from src.models.threshold_tuning import ThresholdTuner
 from config.settings import Config
 
-def train_model():
-    """Train binary classifier on calibration data"""
+def train_model(user=None, streaming=False, jobs=1, refeaturize=False, windows=False,
+                threshold=False, target_fpr=None):
+    """
+    Train binary classifier on calibration data
+    
+    Args:
+        user: train on this user's calibration only and register the model
+            as the user's next version in the ModelRegistry
+        streaming: train out of core (chunked, mergeable statistics) instead
+            of loading the dataset, e.g. for population models
+        jobs: worker processes for streaming training and re-featurization
+        refeaturize: recompute features from the stored raw epochs with the
+            current filter/band settings (cached per settings hash)
+        windows: train on live-sized sliding windows of the raw epochs (one row
+            per window, like process_window sees); implies refeaturize
+        threshold: also tune a ThresholdClassifier (threshold_model.json)
+        target_fpr: false-activation rate the threshold is tuned for
+            (default: Config.THRESHOLD_TARGET_FPR)
+    """
     
     print("="*60)
     print("NEUROSENSE AI - BINARY MODEL TRAINING")
     print("="*60)
     
-    # Load calibration files
-    cal_files = list(Config.CALIBRATION_DIR.glob("*_calibration.npz"))
+    # Fold new calibration files into the consolidated store, then map it
+    if refeaturize or windows:
+        feature_dir, computed = refeaturize_epochs(n_jobs=jobs, windows=windows)
+        print(f"\nRe-featurized {len(computed)} calibration files "
+              f"(settings {feature_dir.name}, cached in {feature_dir})")
+        store = DatasetStore(root=feature_dir / 'dataset')
+        added = store.ingest_dir(feature_dir)
+    else:
+        store = DatasetStore()
+        added = store.ingest_dir()
+    sessions = store.sessions(users=user)
+    stale = [s['source'] for s in store.skipped if user is None or s['user'] == user]
+    stale += [s['source'] for s in sessions
+              if tuple(s.get('feature_names', BandPowerExtractor.FEATURE_NAMES)) != Config.FEATURES]
+    if stale:
+        print(f"\n{len(stale)} calibration files hold other features than FEATURES "
+              f"({', '.join(Config.FEATURES)}), e.g. {stale[0]}")
+        print("Run with --refeaturize (or --windows) to recompute them from the raw epochs")
+        return
     
-    if not cal_files:
+    if not sessions:
         print("No calibration files found!")
         print(f"Run: python scripts/2_calibrate_user.py")
         return
     
-    print(f"\nFound {len(cal_files)} calibration files:")
-    for f in cal_files:
-        print(f"  - {f.name}")
+    print(f"\nIngested {len(added)} new calibration files into {store.root}")
+    print(f"Training on {len(sessions)} sessions:")
+    for session in sessions:
+        print(f"  - {session['user']} ({session['channel']}, {session['timestamp']}): "
+              f"{session['stop'] - session['start']} {'windows' if windows else 'trials'}")
+    channel = sessions[-1]['channel']
     
-    # Load all data
-    all_features = []
-    all_labels = []
+    if streaming:
+        return train_streaming(store, sessions, user, channel, jobs)
     
-    for cal_file in cal_files:
-        data = np.load(cal_file)
-        all_features.append(data['features'])
-        all_labels.append(data['labels'])
-        print(f"  Loaded: {data['user_name']} ({data['channel']})")
-    
-    X = np.vstack(all_features)
-    y = np.concatenate(all_labels)
+    X, y = store.select(users=user)
     
     print(f"\nDataset:")
     print(f"  Total samples: {len(y)}")
@@ -52,8 +89,11 @@ def train_model():
     print(f"  Distribution: REST={np.sum(y==0)}, IMAGERY={np.sum(y==1)}")
     
     print(f"\nFeature ranges:")
-    print(f"  Mu power:   [{np.min(X[:, 0]):.2f}, {np.max(X[:, 0]):.2f}]")
-    print(f"  Beta power: [{np.min(X[:, 1]):.2f}, {np.max(X[:, 1]):.2f}]")
+    for j, name in enumerate(Config.FEATURES):
+        print(f"  {name:18s} [{np.min(X[:, j]):.2f}, {np.max(X[:, j]):.2f}]")
+    
+    if threshold:
+        tune_threshold(X, y, target_fpr)
     
     # Fit normalizer
     print("\nFitting normalizer...")
@@ -63,13 +103,23 @@ def train_model():
     # Normalize
     X_norm = normalizer.normalize(X)
     
-    # Train/test split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X_norm, y,
-        test_size=0.2,
-        random_state=42,
-        stratify=y
-    )
+    # Train/test split (windows of one trial stay on the same side)
+    if windows:
+        groups = np.asarray(store.groups(users=user))
+        train_idx, test_idx = next(GroupShuffleSplit(test_size=0.2, random_state=42)
+                                   .split(X_norm, y, groups))
+        X_train, X_test = X_norm[train_idx], X_norm[test_idx]
+        y_train, y_test = y[train_idx], y[test_idx]
+        cv = GroupKFold(n_splits=5)
+    else:
+        groups = None
+        X_train, X_test, y_train, y_test = train_test_split(
+            X_norm, y,
+            test_size=0.2,
+            random_state=42,
+            stratify=y
+        )
+        cv = 5
     
     print(f"\nTrain set: {len(y_train)} samples")
     print(f"Test set:  {len(y_test)} samples")
@@ -81,7 +131,7 @@ def train_model():
     
     # Cross-validation
     print("\nCross-validation (5-fold)...")
-    cv_scores = cross_val_score(classifier.model, X_norm, y, cv=5)
+    cv_scores = cross_val_score(classifier.model, X_norm, y, cv=cv, groups=groups)
     print(f"CV Accuracy: {np.mean(cv_scores):.2%} (±{np.std(cv_scores):.2%})")
     
     # Evaluate
@@ -111,18 +161,102 @@ def train_model():
     print(f"\n  [[TN={cm[0,0]}  FP={cm[0,1]}]")
     print(f"   [FN={cm[1,0]}  TP={cm[1,1]}]]")
     
-    # Save model
+    save_model(classifier, normalizer, user, channel, test_accuracy=float(acc),
+               cv_accuracy=float(np.mean(cv_scores)))
+    
+    return classifier, normalizer, acc
+
+def tune_threshold(X, y, target_fpr=None):
+    """Tune and save the ERD threshold classifier on raw band powers"""
+    if not set(BandPowerExtractor.FEATURE_NAMES) <= set(Config.FEATURES):
+        print("\nThreshold tuning skipped: FEATURES has no mu_power/beta_power")
+        return None
+    columns = [Config.FEATURES.index(name) for name in BandPowerExtractor.FEATURE_NAMES]
+    tuner = ThresholdTuner(target_fpr)
+    threshold = tuner.fit(np.asarray(X)[:, columns], np.asarray(y))
+    report = tuner.report_
+    
+    print(f"\nThreshold tuning (false activations <= {report['target_fpr']:.1%}):")
+    for c in report['candidates']:
+        print(f"  {c['feature']:>4} ERD {'>' if c['above'] else '<'} t: AUC {c['auc']:.3f}, "
+              f"hits {c['tpr']:.1%} at {c['fpr']:.1%} false activations")
+    print(f"  Chosen: {report['feature']} ERD {'>' if report['above'] else '<'} "
+          f"{report['threshold']:.3f}")
+    
+    Config.ensure_dirs()
+    threshold.save(Config.MODEL_DIR / 'threshold_model.json', **{
+        key: report[key] for key in ('target_fpr', 'tpr', 'fpr', 'auc')})
+    return threshold
+
+def train_streaming(store, sessions, user, channel, jobs=1):
+    """
+    Out-of-core training: every 5th session is held out for a streaming
+    accuracy estimate (when there are at least 5)
+    """
+    held_out = sessions[4::5] if len(sessions) >= 5 else []
+    train_sessions = [s for s in sessions if s not in held_out]
+    n_rows = sum(s['stop'] - s['start'] for s in train_sessions)
+    
+    print(f"\nStreaming {Config.MODEL_TYPE} training: {n_rows} samples, "
+          f"{len(train_sessions)} sessions, {jobs} worker(s)")
+    trainer = OutOfCoreTrainer(n_jobs=jobs)
+    classifier, normalizer = trainer.fit(store, sessions=train_sessions)
+    
+    acc = None
+    if held_out:
+        acc = trainer.score(store, classifier, normalizer, held_out)
+        print(f"Held-out accuracy ({len(held_out)} sessions): {acc:.2%}")
+    
+    save_model(classifier, normalizer, user, channel, test_accuracy=acc,
+               training_sessions=len(train_sessions), training_samples=n_rows)
+    return classifier, normalizer, acc
+
+def save_model(classifier, normalizer, user, channel, **metrics):
+    """Save pickles and the artifact, and register a version when user is set"""
+    Config.ensure_dirs()
     model_path = Config.MODEL_DIR / 'neurosense_binary_model.pkl'
-    classifier.save(model_path)
+    classifier.save(model_path, feature_names=Config.FEATURES)
     
     # Save normalizer
     norm_path = Config.MODEL_DIR / 'normalizer.pkl'
     normalizer.save(norm_path)
     
+    # Pickle-free bundle (model + normalizer + training config + feature
+    # schema), NumPy-only to load
+    artifact_path = Config.MODEL_DIR / 'neurosense_model.npz'
+    export_artifact(artifact_path, classifier, normalizer, config=Config, **metrics)
+    
     print(f"\n✓ Model saved to: {model_path}")
     print(f"✓ Normalizer saved to: {norm_path}")
+    print(f"✓ Artifact saved to: {artifact_path}")
     
-    return classifier, normalizer, acc
+    # Versioned copy; running sessions following this user pick it up
+    if user:
+        version = ModelRegistry().register(user, classifier, normalizer, channel=channel,
+                                           **metrics)
+        print(f"✓ Registered as {user}/{channel} v{version}")
 
 if __name__ == "__main__":
-    train_model()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Train binary classifier')
+    parser.add_argument('--user', help="Train on one user's calibration and register it "
+                                       "in the model registry")
+    parser.add_argument('--streaming', action='store_true',
+                       help='Train out of core in chunks (LDA/LogisticRegression)')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='Worker processes for --streaming and --refeaturize')
+    parser.add_argument('--refeaturize', action='store_true',
+                       help='Recompute features from raw epochs with the current settings')
+    parser.add_argument('--windows', action='store_true',
+                       help='Train on live-sized sliding windows of the raw epochs')
+    parser.add_argument('--threshold', action='store_true',
+                       help='Also tune the ERD threshold classifier (threshold_model.json)')
+    parser.add_argument('--target-fpr', type=float,
+                       help='False-activation rate for --threshold (default: '
+                            'THRESHOLD_TARGET_FPR)')
+    args = parser.parse_args()
+    
+    train_model(user=args.user, streaming=args.streaming, jobs=args.jobs,
+                refeaturize=args.refeaturize, windows=args.windows,
+                threshold=args.threshold, target_fpr=args.target_fpr)
@@ -35,6 +35,14 @@ def test_robot():
         # Stop at the end
         robot.send_command('STOP')
         
+        if robot.use_ack:
+            time.sleep(robot.ack_timeout * (robot.max_retries + 1))
+            report = robot.ack_report()
+            print(f"\nAcked: {report['acked']}/{report['sent']} "
+                  f"(retries: {report['retries']}, timeouts: {report['timeouts']})")
+            print(f"Round trip: P50 {report['latency_ms']['p50']:.1f} ms, "
+                  f"max {report['latency_ms']['max']:.1f} ms")
+        
     except KeyboardInterrupt:
         print("Interrupted")
     finally:
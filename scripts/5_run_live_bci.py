@@ -7,23 +7,60 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.pipeline.realtime_bci import RealtimeBCIPipeline
-from config.settings import Config
+from src.monitoring.tracing import StageTracer
+from src.models.registry import ModelRegistry
+from hardware.bioamp_reader import BioAmpReader
+from hardware.simulated_bioamp import SimulatedBioAmp
+from config.settings import SessionConfig
 
-def run_live_bci(duration=60, use_duration=False):
+def run_live_bci(duration=60, use_duration=False, simulate=False, trace_path=None,
+                 profile_slow_ms=None, config=None, user=None, threshold=False):
     """
     Run live BCI session
     
     Args:
         duration: Session duration in seconds
         use_duration: Use duration-based commands (LEFT/FORWARD/RIGHT)
+        simulate: Stream synthetic EEG from a simulated BioAmp instead of the Arduino
+        trace_path: write per-stage spans as Chrome trace JSON here
+        profile_slow_ms: cProfile sampled windows slower than this (saved
+            next to trace_path, or in the current directory)
+        config: SessionConfig (default: defaults plus NEUROSENSE_* environment)
+        user: serve this user's active registry model and hot-swap newly
+            registered versions while running
+        threshold: serve the tuned ERD threshold classifier
+            (3_train_model.py --threshold) instead of the trained model
     """
     print("="*60)
     print("NEUROSENSE AI - LIVE BCI CONTROL (BioAmp Edition)")
     print("="*60)
     
+    config = config or SessionConfig.load()
+    
     # Check if model exists
-    model_path = Config.MODEL_DIR / 'neurosense_binary_model.pkl'
-    norm_path = Config.MODEL_DIR / 'normalizer.pkl'
+    # Prefer the user's registry model, then the pickle-free artifact
+    # (both bundle the normalizer)
+    registry = ModelRegistry(config=config)
+    norm_path = None
+    if threshold:
+        model_path = config.MODEL_DIR / 'threshold_model.json'
+        if not model_path.exists():
+            print("No tuned threshold found!")
+            print("Tune one first: python scripts/3_train_model.py --threshold")
+            return
+        user = None  # The registry only holds trained models
+    elif user:
+        try:
+            model_path = registry.path(user)
+        except KeyError:
+            print(f"No registered model for {user}!")
+            print(f"Train one first: python scripts/3_train_model.py --user {user}")
+            return
+    else:
+        model_path = config.MODEL_DIR / 'neurosense_model.npz'
+    if not threshold and not model_path.exists():
+        model_path = config.MODEL_DIR / 'neurosense_binary_model.pkl'
+        norm_path = config.MODEL_DIR / 'normalizer.pkl'
     
     if not model_path.exists():
         print("No trained model found!")
@@ -32,11 +69,27 @@ def run_live_bci(duration=60, use_duration=False):
     
     print(f"\nControl mode: {'Duration-based (LEFT/FORWARD/RIGHT)' if use_duration else 'Binary (ACTIVE/STOP)'}")
     
+    # Simulated BioAmp on a pseudo-terminal
+    sim = None
+    bioamp = None
+    if simulate:
+        sim = SimulatedBioAmp(fs=config.SAMPLING_RATE).start()
+        bioamp = BioAmpReader(port=sim.port, reset_delay=0, config=config)
+        print(f"Simulated BioAmp on {sim.port}")
+    
+    # Optional stage tracing
+    tracer = None
+    if trace_path or profile_slow_ms is not None:
+        tracer = StageTracer(enabled=True, profile_threshold_ms=profile_slow_ms)
+    
     # Initialize pipeline
     pipeline = RealtimeBCIPipeline(
         model_path=str(model_path),
-        normalizer_path=str(norm_path),
-        use_duration=use_duration
+        normalizer_path=str(norm_path) if norm_path else None,
+        use_duration=use_duration,
+        bioamp=bioamp,
+        tracer=tracer,
+        config=config
     )
     
     # Connect hardware
@@ -46,6 +99,11 @@ def run_live_bci(duration=60, use_duration=False):
         print(f"Hardware connection failed: {e}")
         return
     
+    if user:
+        pipeline.model_version = registry.active_version(user)
+        stop_watch = registry.watch(pipeline, user)
+        print(f"Serving {user} v{pipeline.model_version}; retrained versions swap in live")
+    
     input("\nPress ENTER to start BCI control...")
     
     # Run BCI loop
@@ -56,7 +114,17 @@ def run_live_bci(duration=60, use_duration=False):
         import traceback
         traceback.print_exc()
     finally:
+        if user:
+            stop_watch.set()
         pipeline.disconnect_hardware()
+        if sim is not None:
+            sim.stop()
+        if trace_path:
+            pipeline.tracer.export_chrome(trace_path)
+        if pipeline.tracer.profiles:
+            profile_dir = Path(trace_path).parent if trace_path else Path('.')
+            for path in pipeline.tracer.dump_profiles(profile_dir):
+                print(f"Slow window profile: {path}")
 
 if __name__ == "__main__":
     import argparse
@@ -66,8 +134,21 @@ if __name__ == "__main__":
                        help='Session duration in seconds')
     parser.add_argument('--duration-mode', action='store_true',
                        help='Use duration-based commands (LEFT/FORWARD/RIGHT)')
+    parser.add_argument('--simulate', action='store_true',
+                       help='Use a simulated BioAmp (synthetic EEG, no hardware)')
+    parser.add_argument('--trace', metavar='PATH',
+                       help='Write per-stage spans as Chrome trace JSON (chrome://tracing)')
+    parser.add_argument('--profile-slow', type=float, metavar='MS',
+                       help='cProfile sampled windows slower than MS milliseconds')
+    parser.add_argument('--config', help='JSON file of settings overrides')
+    parser.add_argument('--user', help="Serve the user's registry model (hot-swaps retrains)")
+    parser.add_argument('--threshold', action='store_true',
+                       help='Serve the tuned ERD threshold classifier')
     
     args = parser.parse_args()
     
     print(f"\nSession duration: {args.duration} seconds")
-    run_live_bci(args.duration, use_duration=args.duration_mode)
+    run_live_bci(args.duration, use_duration=args.duration_mode, simulate=args.simulate,
+                 trace_path=args.trace, profile_slow_ms=args.profile_slow,
+                 config=SessionConfig.load(args.config), user=args.user,
+                 threshold=args.threshold)
@@ -0,0 +1,56 @@
+"""
+Pseudo-online evaluation: replay recorded sessions through the live pipeline
+with leave-one-session-out models and report command-level metrics per user
+"""
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.evaluation.pseudo_online import PseudoOnlineEvaluator, detection_tolerance
+from config.settings import SessionConfig
+
+def evaluate(model_type=None, use_duration=False, jobs=None, pool_users=False, config=None):
+    """
+    Args:
+        model_type: 'LDA', 'SVM' or 'LogisticRegression' (default: config.MODEL_TYPE)
+        use_duration: replay with duration-based commands
+        jobs: worker processes (default: CPU count)
+        pool_users: train on every other session, not only the same user's
+        config: SessionConfig (default: defaults plus NEUROSENSE_* environment)
+
+    Returns:
+        dict: PseudoOnlineEvaluator.run() report
+    """
+    config = config or SessionConfig.load()
+    evaluator = PseudoOnlineEvaluator(model_type, use_duration=use_duration, n_jobs=jobs,
+                                      pool_users=pool_users, config=config)
+    print("=" * 60)
+    print("PSEUDO-ONLINE EVALUATION")
+    print("=" * 60)
+    print(f"Model: {evaluator.model_type}, commands: "
+          f"{'duration' if use_duration else 'binary'}, "
+          f"training: {'all other sessions' if pool_users else 'same user, other sessions'}")
+    print(f"Activations within {detection_tolerance(config):.2f}s of an IMAGERY trial count "
+          "as detections")
+
+    report = evaluator.run()
+    print()
+    print(evaluator.format_report(report))
+    return report
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Pseudo-online evaluation of stored sessions')
+    parser.add_argument('--model', choices=['LDA', 'SVM', 'LogisticRegression'],
+                        help='Classifier (default: MODEL_TYPE)')
+    parser.add_argument('--duration', action='store_true', help='Duration-based commands')
+    parser.add_argument('--jobs', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--pool-users', action='store_true',
+                        help='Train each fold on all other sessions (cross-user)')
+    parser.add_argument('--config', help='JSON file of settings overrides')
+    args = parser.parse_args()
+
+    evaluate(args.model, use_duration=args.duration, jobs=args.jobs,
+             pool_users=args.pool_users, config=SessionConfig.load(args.config))
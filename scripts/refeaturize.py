@@ -0,0 +1,56 @@
+"""
+Recompute calibration features from stored raw epochs with the current settings
+"""
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.dataset.epochs import feature_config_hash, refeaturize
+from src.dataset.store import DatasetStore
+from config.settings import SessionConfig
+
+def run_refeaturize(jobs=None, config=None, windows=False):
+    """
+    Featurize every user's stored epochs and fold them into the dataset store
+    for these settings
+
+    Args:
+        jobs: worker processes (default: CPU count)
+        config: SessionConfig with the filter/band settings to apply
+            (default: defaults plus NEUROSENSE_* environment)
+        windows: one row per live-sized sliding window instead of per trial
+
+    Returns:
+        DatasetStore: features computed with these settings
+    """
+    config = config or SessionConfig.load()
+    print(f"Feature settings {feature_config_hash(config, windows)}: "
+          f"bandpass {config.BANDPASS_LOW}-{config.BANDPASS_HIGH} Hz, "
+          f"mu {config.MU_BAND}, beta {config.BETA_BAND}, notch {config.NOTCH_FREQ} Hz")
+
+    if windows:
+        print(f"Epoching into {config.WINDOW_LENGTH}s windows, {config.STEP_SAMPLES} sample step")
+    directory, computed = refeaturize(config=config, n_jobs=jobs, windows=windows)
+    for result in computed:
+        print(f"  {result['source']}: {result['kept']}/{result['trials']} trials, "
+              f"{result['rows']} rows")
+    print(f"{len(computed)} files featurized, cached in {directory}")
+
+    store = DatasetStore(root=directory / 'dataset', config=config)
+    store.ingest_dir(directory)
+    print(f"Dataset: {len(store)} rows from {len(store.users())} users")
+    return store
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Re-featurize stored calibration epochs')
+    parser.add_argument('--jobs', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--config', help='JSON file of settings overrides')
+    parser.add_argument('--windows', action='store_true',
+                        help='One row per live-sized sliding window instead of per trial')
+    args = parser.parse_args()
+
+    run_refeaturize(jobs=args.jobs, config=SessionConfig.load(args.config),
+                    windows=args.windows)
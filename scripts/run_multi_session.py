@@ -0,0 +1,79 @@
+"""
+Run several BCI sessions (one per headset) in a single process
+"""
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from hardware.bioamp_reader import BioAmpReader
+from hardware.simulated_bioamp import SimulatedBioAmp
+from src.pipeline.multi_session import MultiSessionRuntime
+from src.pipeline.process_pool import SessionSupervisor
+from src.models.inference_service import BatchInferenceService
+from config.settings import SessionConfig
+
+def run_multi_session(ports, duration=60, simulate=0, use_duration=False, workers=0,
+                      batch=False, config=None):
+    """
+    Args:
+        ports: BioAmp serial ports, one session each
+        duration: seconds
+        simulate: number of additional simulated headsets
+        use_duration: duration-based commands
+        workers: shard sessions over this many worker processes (0 = in-process)
+        batch: micro-batch classification across sessions (single process only)
+        config: SessionConfig shared by every session (default: defaults plus
+            NEUROSENSE_* environment)
+    """
+    config = config or SessionConfig.load()
+    model_path = config.MODEL_DIR / 'neurosense_model.npz'
+    norm_path = config.MODEL_DIR / 'normalizer.pkl'
+    if not model_path.exists():
+        model_path = config.MODEL_DIR / 'neurosense_binary_model.pkl'
+
+    sims = [SimulatedBioAmp(fs=config.SAMPLING_RATE).start() for _ in range(simulate)]
+    service = BatchInferenceService().start() if batch and not workers else None
+    if workers:
+        runtime = SessionSupervisor(n_workers=workers, use_duration=use_duration)
+    else:
+        runtime = MultiSessionRuntime(use_duration=use_duration, inference_service=service)
+
+    for i, port in enumerate(list(ports) + [sim.port for sim in sims]):
+        reset_delay = 0 if i >= len(ports) else 2
+        runtime.add_session(f"session{i}",
+                            BioAmpReader(port=port, reset_delay=reset_delay, config=config),
+                            model_path, norm_path if norm_path.exists() else None,
+                            config=config)
+
+    try:
+        runtime.connect_all()
+        runtime.run(duration=duration)
+    finally:
+        runtime.close()
+        for sim in sims:
+            sim.stop()
+        if service is not None:
+            print("\nMicro-batch inference:")
+            service.print_report()
+            service.stop()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run many BCI sessions in one process')
+    parser.add_argument('ports', nargs='*', help='BioAmp serial ports')
+    parser.add_argument('--duration', type=int, default=60, help='Seconds')
+    parser.add_argument('--simulate', type=int, default=0,
+                       help='Number of simulated headsets to add')
+    parser.add_argument('--duration-mode', action='store_true',
+                       help='Use duration-based commands (LEFT/FORWARD/RIGHT)')
+    parser.add_argument('--workers', type=int, default=0,
+                       help='Worker processes (0 = single process)')
+    parser.add_argument('--batch', action='store_true',
+                       help='Micro-batch classification across sessions')
+    parser.add_argument('--config', help='JSON file of settings overrides')
+
+    args = parser.parse_args()
+    run_multi_session(args.ports, args.duration, args.simulate, args.duration_mode,
+                      args.workers, args.batch, SessionConfig.load(args.config))
@@ -0,0 +1,57 @@
+"""
+Run one or more simulated BioAmp devices on pseudo-terminals
+"""
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import time
+from hardware.simulated_bioamp import SimulatedBioAmp
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from config.settings import Config
+
+def simulate(n_devices=1, fs=Config.SAMPLING_RATE, mains_amp=0.0,
+             artifact_rate=0.0, drift_amp=0.0):
+    """
+    Stream synthetic EEG until Ctrl+C
+
+    Point BioAmpReader(port=...) at the printed device paths.
+    """
+    sims = []
+    for i in range(n_devices):
+        generator = SyntheticEEGGenerator(fs=fs, mains_amp=mains_amp,
+                                          artifact_rate=artifact_rate,
+                                          drift_amp=drift_amp, seed=i)
+        sims.append(SimulatedBioAmp(fs=fs, generator=generator).start())
+        print(f"Device {i}: {sims[-1].port} ({fs} Hz)")
+
+    print("\nPress Ctrl+C to stop\n")
+    try:
+        while True:
+            time.sleep(5)
+            rates = ', '.join(f"{sim.achieved_rate():.0f}" for sim in sims)
+            print(f"Delivered rate (Hz): {rates}")
+    except KeyboardInterrupt:
+        print("\nStopping simulators")
+    finally:
+        for sim in sims:
+            sim.stop()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Simulate BioAmp EXG Pill devices')
+    parser.add_argument('-n', '--devices', type=int, default=1,
+                       help='Number of parallel devices')
+    parser.add_argument('--fs', type=int, default=Config.SAMPLING_RATE,
+                       help='Sampling rate (Hz)')
+    parser.add_argument('--mains', type=float, default=0.0,
+                       help='Mains interference amplitude (μV)')
+    parser.add_argument('--artifacts', type=float, default=0.0,
+                       help='Artifacts per second')
+    parser.add_argument('--drift', type=float, default=0.0,
+                       help='Electrode drift amplitude (μV)')
+
+    args = parser.parse_args()
+    simulate(args.devices, args.fs, args.mains, args.artifacts, args.drift)
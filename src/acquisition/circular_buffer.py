@@ -2,55 +2,153 @@
 Circular buffer for sliding window segmentation (single channel)
 """
 import numpy as np
-from collections import deque
 from config.settings import Config
 
 class CircularBuffer:
-    def __init__(self, 
-                 window_size=Config.WINDOW_SAMPLES,
-                 step_size=Config.STEP_SAMPLES):
-        
-        self.window_size = window_size  # 1000 samples (2 seconds)
-        self.step_size = step_size      # 250 samples (0.5 seconds)
-        
-        # Buffer holds 3 seconds of data
-        self.buffer = deque(maxlen=window_size + step_size)
+    def __init__(self,
+                 window_size=None,
+                 step_size=None,
+                 capacity=None,
+                 config=None):
+        """
+        Args:
+            window_size, step_size: samples (default: config.WINDOW_SAMPLES / STEP_SAMPLES)
+            capacity: samples held (default: one window plus one step)
+            config: SessionConfig (default: global Config)
+        """
+        config = config or Config
+        self.window_size = window_size or config.WINDOW_SAMPLES  # 1000 samples (2 seconds)
+        self.step_size = step_size or config.STEP_SAMPLES        # 250 samples (0.5 seconds)
+
+        # Buffer holds 3 seconds of data by default. Every sample is written
+        # twice, capacity apart, so any window is one contiguous slice.
+        self.capacity = capacity or self.window_size + self.step_size
+        if self.capacity < self.window_size:
+            raise ValueError("capacity must hold at least one window")
+        self.buffer = self._allocate(2 * self.capacity)
         self.sample_count = 0
-        
+
+    def _allocate(self, n_samples):
+        """Backing storage (overridden by shared-memory variants)"""
+        return np.zeros(n_samples)
+
     def add_sample(self, sample):
         """
         Add new sample to buffer
-        
+
         Args:
             sample: float (single channel value)
         """
-        self.buffer.append(sample)
+        pos = self.sample_count % self.capacity
+        self.buffer[pos] = sample
+        self.buffer[pos + self.capacity] = sample
         self.sample_count += 1
-    
+
+    def add_samples(self, samples):
+        """
+        Add a chunk of samples, collecting every window completed on the way
+
+        Args:
+            samples: (n,) single channel values
+
+        Returns:
+            list of np.array: (window_size,) windows, oldest first
+        """
+        samples = np.asarray(samples, dtype=float)
+        windows = []
+        i = 0
+
+        while i < len(samples):
+            # Write up to the next step boundary
+            k = min(self.step_size - self.sample_count % self.step_size, len(samples) - i)
+            self._write(samples[i:i + k])
+            i += k
+
+            if self.sample_count % self.step_size == 0 and self.is_ready():
+                windows.append(self.latest_window())
+
+        return windows
+
+    def extend(self, samples):
+        """
+        Add a chunk of samples without extracting windows (producer side)
+
+        Args:
+            samples: (n,) single channel values
+        """
+        samples = np.asarray(samples, dtype=float)
+        for i in range(0, len(samples), self.capacity):
+            self._write(samples[i:i + self.capacity])
+
+    def _write(self, chunk):
+        """Write at most capacity samples, then publish the new count"""
+        idx = (self.sample_count + np.arange(len(chunk))) % self.capacity
+        self.buffer[idx] = chunk
+        self.buffer[idx + self.capacity] = chunk
+        self.sample_count += len(chunk)
+
+    def _write_horizon(self):
+        """Highest sample count the producer may currently be writing"""
+        return self.sample_count
+
     def is_ready(self):
         """Check if we have enough samples for a window"""
-        return len(self.buffer) >= self.window_size
-    
+        return self.sample_count >= self.window_size
+
+    def latest_window(self, copy=True):
+        """
+        Last window_size samples, regardless of step alignment
+
+        Args:
+            copy: False returns a view that is overwritten by later samples
+        """
+        end = (self.sample_count - 1) % self.capacity + self.capacity + 1
+        window = self.buffer[end - self.window_size:end]
+        return window.copy() if copy else window
+
+    def window_at(self, end_count, copy=True):
+        """
+        Window ending at an absolute sample count (consumer side)
+
+        Args:
+            end_count: window covers samples [end_count - window_size, end_count)
+            copy: False returns a view that is overwritten by later samples
+
+        Returns:
+            np.array or None: None if not yet written or already overwritten
+        """
+        lag_limit = self.capacity - self.window_size
+        if end_count < self.window_size or end_count > self.sample_count:
+            return None
+        if self.sample_count - end_count > lag_limit:
+            return None
+
+        end = (end_count - 1) % self.capacity + self.capacity + 1
+        window = self.buffer[end - self.window_size:end]
+        if copy:
+            window = window.copy()
+            # The producer may have lapped us while copying
+            if self._write_horizon() - end_count > lag_limit:
+                return None
+        return window
+
     def get_window(self):
         """
         Extract latest window if step condition met
-        
+
         Returns:
             np.array or None: (window_size,) or None
         """
         if not self.is_ready():
             return None
-        
+
         # Check if we've stepped forward enough
         if self.sample_count % self.step_size == 0:
-            # Extract last window_size samples
-            window_list = list(self.buffer)[-self.window_size:]
-            window = np.array(window_list)  # Shape: (1000,)
-            return window
-        
+            return self.latest_window()  # Shape: (1000,)
+
         return None
-    
+
     def reset(self):
         """Clear buffer"""
-        self.buffer.clear()
+        self.buffer[:] = 0.0
         self.sample_count = 0
@@ -0,0 +1,85 @@
+"""
+CircularBuffer backed by multiprocessing.shared_memory
+
+The acquisition process owns and writes the ring; DSP worker processes
+attach by name and read windows in place, so samples never get pickled.
+
+Shared block layout: [sample_count, write_horizon] int64 header followed by
+the 2 * capacity float64 double-written ring. The producer raises
+write_horizon before touching the ring and sample_count afterwards, so
+readers can detect a window that was overwritten while they copied it.
+"""
+import numpy as np
+from multiprocessing import shared_memory
+from src.acquisition.circular_buffer import CircularBuffer
+
+HEADER_BYTES = 16
+
+class SharedCircularBuffer(CircularBuffer):
+    def __init__(self,
+                 window_size=None,
+                 step_size=None,
+                 capacity=None,
+                 config=None):
+        self.owner = True
+        super().__init__(window_size, step_size, capacity, config)
+
+    @classmethod
+    def attach(cls, name, window_size, step_size, capacity):
+        """
+        Map an existing ring created by another process (read side)
+
+        Args:
+            name, window_size, step_size, capacity: as returned by spec()
+        """
+        self = cls.__new__(cls)
+        self.owner = False
+        self.window_size = window_size
+        self.step_size = step_size
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(name=name)
+        self._map(2 * capacity)
+        return self
+
+    def _allocate(self, n_samples):
+        self.shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + 8 * n_samples)
+        return self._map(n_samples)
+
+    def _map(self, n_samples):
+        self._header = np.ndarray((2,), dtype=np.int64, buffer=self.shm.buf)
+        self.buffer = np.ndarray((n_samples,), dtype=np.float64,
+                                 buffer=self.shm.buf, offset=HEADER_BYTES)
+        return self.buffer
+
+    def spec(self):
+        """Picklable description for attach() in another process"""
+        return (self.shm.name, self.window_size, self.step_size, self.capacity)
+
+    @property
+    def sample_count(self):
+        return int(self._header[0])
+
+    @sample_count.setter
+    def sample_count(self, value):
+        self._header[0] = value
+        self._header[1] = value
+
+    def _write(self, chunk):
+        count = int(self._header[0])
+        self._header[1] = count + len(chunk)
+        idx = (count + np.arange(len(chunk))) % self.capacity
+        self.buffer[idx] = chunk
+        self.buffer[idx + self.capacity] = chunk
+        self._header[0] = count + len(chunk)
+
+    def _write_horizon(self):
+        return int(self._header[1])
+
+    def close(self):
+        """Unmap (and free, if this process created the ring)"""
+        # Views must go before the mapping can be closed
+        self.buffer = None
+        self._header = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
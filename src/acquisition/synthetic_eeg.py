@@ -0,0 +1,162 @@
+"""
+Synthetic single-channel EEG generator (mu/beta rhythms with ERD events)
+"""
+import numpy as np
+from scipy.signal import lfilter
+from config.settings import Config
+
+class SyntheticEEGGenerator:
+    def __init__(self,
+                 fs=None,
+                 mu_freq=10.0, mu_amp=8.0,
+                 beta_freq=20.0, beta_amp=4.0,
+                 noise_amp=5.0,
+                 erd_depth=0.6,
+                 rest_duration=6.0, imagery_duration=4.0,
+                 events=None,
+                 mains_freq=None, mains_amp=0.0,
+                 artifact_rate=0.0, artifact_amp=300.0,
+                 drift_amp=0.0, drift_freq=0.05,
+                 seed=None,
+                 config=None):
+        """
+        Args:
+            fs: sampling rate (Hz, default: config.SAMPLING_RATE)
+            mu_freq, mu_amp: mu rhythm frequency (Hz) and amplitude (μV)
+            beta_freq, beta_amp: beta rhythm frequency (Hz) and amplitude (μV)
+            noise_amp: background 1/f noise amplitude (μV)
+            erd_depth: fractional mu power drop during imagery (beta drops half as much)
+            rest_duration, imagery_duration: cyclic REST/IMAGERY schedule (seconds)
+            events: optional list of (start_s, duration_s) imagery events
+                (overrides the cyclic schedule)
+            mains_freq, mains_amp: powerline interference (Hz, default
+                config.NOTCH_FREQ; μV)
+            artifact_rate: blink-like artifacts per second (Poisson)
+            artifact_amp: artifact peak amplitude (μV)
+            drift_amp, drift_freq: slow electrode drift (μV, Hz)
+            seed: random seed
+            config: SessionConfig (default: global Config)
+        """
+        self.config = config or Config
+        fs = fs or self.config.SAMPLING_RATE
+        mains_freq = mains_freq or self.config.NOTCH_FREQ
+        self.fs = fs
+        self.mu_freq = mu_freq
+        self.mu_amp = mu_amp
+        self.beta_freq = beta_freq
+        self.beta_amp = beta_amp
+        self.noise_amp = noise_amp
+        self.erd_depth = erd_depth
+        self.rest_duration = rest_duration
+        self.imagery_duration = imagery_duration
+        self.events = events
+        self.mains_freq = mains_freq
+        self.mains_amp = mains_amp
+        self.artifact_rate = artifact_rate
+        self.artifact_amp = artifact_amp
+        self.drift_amp = drift_amp
+        self.drift_freq = drift_freq
+
+        self.rng = np.random.default_rng(seed)
+        self.sample_index = 0
+
+        # Pink-ish background: leaky integrator on white noise (state carried across chunks)
+        self._noise_b = [np.sqrt(1 - 0.95 ** 2)]
+        self._noise_a = [1.0, -0.95]
+        self._noise_zi = np.zeros(1)
+        self._drift_phase = self.rng.uniform(0, 2 * np.pi)
+
+        # Artifact template (300 ms half-sine), spill-over carried to the next chunk
+        self._artifact = np.sin(np.linspace(0, np.pi, max(int(0.3 * fs), 2)))
+        self._carry = np.zeros(0)
+
+    def is_imagery(self, sample_indices):
+        """
+        Ground-truth labels for absolute sample indices
+
+        Returns:
+            np.array: bool, True during imagery events
+        """
+        t = np.asarray(sample_indices) / self.fs
+        if self.events is not None:
+            mask = np.zeros(t.shape, dtype=bool)
+            for start, duration in self.events:
+                mask |= (t >= start) & (t < start + duration)
+            return mask
+        period = self.rest_duration + self.imagery_duration
+        return (t % period) >= self.rest_duration
+
+    def generate(self, n_samples, return_labels=False):
+        """
+        Generate the next chunk of signal
+
+        Args:
+            n_samples: number of samples
+            return_labels: also return per-sample labels (0=REST, 1=IMAGERY)
+
+        Returns:
+            np.array: (n_samples,) microvolts, or (signal, labels)
+        """
+        idx = np.arange(self.sample_index, self.sample_index + n_samples)
+        t = idx / self.fs
+        imagery = self.is_imagery(idx)
+        self.sample_index += n_samples
+
+        # Rhythms with ERD during imagery
+        mu_env = 1.0 - self.erd_depth * imagery
+        beta_env = 1.0 - 0.5 * self.erd_depth * imagery
+        signal = self.mu_amp * mu_env * np.sin(2 * np.pi * self.mu_freq * t)
+        signal += self.beta_amp * beta_env * np.sin(2 * np.pi * self.beta_freq * t)
+
+        # Background noise
+        if self.noise_amp:
+            white = self.rng.standard_normal(n_samples)
+            noise, self._noise_zi = lfilter(self._noise_b, self._noise_a, white,
+                                            zi=self._noise_zi)
+            signal += self.noise_amp * (0.7 * noise + 0.3 * white)
+
+        # Mains interference
+        if self.mains_amp:
+            signal += self.mains_amp * np.sin(2 * np.pi * self.mains_freq * t)
+
+        # Electrode drift
+        if self.drift_amp:
+            signal += self.drift_amp * np.sin(2 * np.pi * self.drift_freq * t + self._drift_phase)
+
+        self._add_artifacts(signal)
+
+        if return_labels:
+            return signal, imagery.astype(int)
+        return signal
+
+    def _add_artifacts(self, signal):
+        n = len(signal)
+
+        # Finish artifacts started in the previous chunk
+        if len(self._carry):
+            k = min(n, len(self._carry))
+            signal[:k] += self._carry[:k]
+            self._carry = self._carry[k:]
+
+        if not self.artifact_rate:
+            return
+
+        n_artifacts = self.rng.poisson(self.artifact_rate * n / self.fs)
+        template = self.artifact_amp * self._artifact
+        for start in self.rng.integers(0, n, size=n_artifacts):
+            k = min(len(template), n - start)
+            signal[start:start + k] += template[:k]
+            spill = template[k:]
+            if len(spill):
+                if len(self._carry) < len(spill):
+                    self._carry = np.pad(self._carry, (0, len(spill) - len(self._carry)))
+                self._carry[:len(spill)] += spill
+
+    def generate_adc(self, n_samples):
+        """
+        Generate the next chunk as Arduino ADC counts (0-1023)
+
+        Returns:
+            np.array: (n_samples,) int
+        """
+        return self.config.uv_to_adc(self.generate(n_samples))
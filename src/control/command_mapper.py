@@ -8,13 +8,24 @@ import time
 
 class CommandMapper:
     def __init__(self, 
-                 smoothing_window=Config.SMOOTHING_WINDOW,
-                 confidence_threshold=Config.CONFIDENCE_THRESHOLD):
-        
-        self.smoothing_window = smoothing_window
-        self.confidence_threshold = confidence_threshold
-        self.recent_predictions = deque(maxlen=smoothing_window)
-        self.command_map = Config.COMMAND_MAP
+                 smoothing_window=None,
+                 confidence_threshold=None,
+                 config=None,
+                 clock=None):
+        """
+        Args:
+            smoothing_window, confidence_threshold: override the config values
+            config: SessionConfig (default: global Config)
+            clock: seconds source for duration mode (default: time.time;
+                replays pass the stream time instead)
+        """
+        config = config or Config
+        self.clock = clock or time.time
+        self.smoothing_window = smoothing_window or config.SMOOTHING_WINDOW
+        self.confidence_threshold = (confidence_threshold if confidence_threshold is not None
+                                     else config.CONFIDENCE_THRESHOLD)
+        self.recent_predictions = deque(maxlen=self.smoothing_window)
+        self.command_map = config.COMMAND_MAP
         
         # For duration-based commands
         self.imagery_start_time = None
@@ -58,7 +69,7 @@ class CommandMapper:
         Returns:
             str: Command ('STOP', 'LEFT', 'FORWARD', 'RIGHT')
         """
-        current_time = time.time()
+        current_time = self.clock()
         
         # Safety check
         if confidence < self.confidence_threshold:
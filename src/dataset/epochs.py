@@ -0,0 +1,310 @@
+"""
+Raw calibration epochs and cached re-featurization
+
+Calibration files keep every trial's raw signal next to its features, as
+ADC counts (int16, lossless for the 10-bit BioAmp stream) concatenated into
+one array with per-trial offsets, labels, onsets and clean flags. When the
+filters or bands change, refeaturize() recomputes features for all stored
+epochs with the current RealtimePreprocessor and BandPowerExtractor in a
+process pool. Results are cached per calibration file under a hash of the
+feature settings, so unchanged settings never recompute and switching back
+and forth between settings is free. Cached files use the calibration
+format, so a DatasetStore can ingest them directly.
+
+With windows=True every trial is instead cut into live-sized overlapping
+windows (WINDOW_LENGTH, WINDOW_OVERLAP) through zero-copy strided views and
+featurized in batches, giving one training row per window exactly as
+RealtimeBCIPipeline.process_window() would compute it.
+
+With FEATURE_ENGINE = 'stft' band powers come from the STFT frames of the
+raw signal with the filter gain applied (see SpectrogramRing), as the live
+pipeline computes them. With 'filterbank' they come from the band filters
+of FilterBankBandPower run over each whole trial and read at every window
+end, as the stream does. Neither runs time-domain preprocessing, so
+segments whose raw amplitude exceeds ARTIFACT_MAX_UV are dropped instead.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from config.settings import Config
+
+# Settings that change the features computed from an epoch
+FEATURE_KEYS = ('SAMPLING_RATE', 'BANDPASS_LOW', 'BANDPASS_HIGH', 'NOTCH_FREQ',
+                'FILTER_ORDER', 'MU_BAND', 'BETA_BAND', 'WELCH_SEGMENT')
+WINDOW_KEYS = ('WINDOW_LENGTH', 'WINDOW_OVERLAP')  # Hashed too when epoching into windows
+# Hashed too with the 'stft' engine (hop follows the window step)
+STFT_KEYS = ('FEATURE_ENGINE', 'ARTIFACT_MAX_UV') + WINDOW_KEYS
+FILTERBANK_KEYS = ('FILTERBANK_ORDER',)  # Hashed too with the 'filterbank' engine
+DEFAULT_FEATURES = ('mu_power', 'beta_power')  # FEATURES hashed only when different
+FEATURIZER_VERSION = 1  # Bump when the featurization code changes
+
+def pack_epochs(epochs, labels, onsets, clean, baseline=0.0, config=None):
+    """
+    Encode trials for np.savez
+
+    Args:
+        epochs: list of (n_samples_i,) microvolt arrays (baseline removed)
+        labels: (n_trials,) task id per trial
+        onsets: (n_trials,) trial start (seconds since calibration start)
+        clean: (n_trials,) trial passed the artifact check
+        baseline: microvolt baseline subtracted by BioAmpReader
+        config: SessionConfig (default: global Config)
+
+    Returns:
+        dict: arrays prefixed 'epoch_'
+    """
+    config = config or Config
+    lengths = [len(e) for e in epochs]
+    samples = np.concatenate(epochs) if epochs else np.zeros(0)
+    adc = config.uv_to_adc(samples + baseline).astype(np.int16)
+    return {
+        'epoch_adc': adc,
+        'epoch_offsets': np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+        'epoch_labels': np.asarray(labels, dtype=np.int64),
+        'epoch_onsets': np.asarray(onsets, dtype=np.float64),
+        'epoch_clean': np.asarray(clean, dtype=bool),
+        'epoch_baseline': np.float64(baseline),
+        'epoch_fs': np.float64(config.SAMPLING_RATE)
+    }
+
+def load_epochs(filepath, config=None):
+    """
+    Decode the trials stored in a calibration file
+
+    Returns:
+        dict or None: 'epochs' (list of microvolt arrays), 'labels', 'onsets',
+            'clean', 'fs'; None if the file has no raw epochs
+    """
+    config = config or Config
+    with np.load(filepath, allow_pickle=False) as data:
+        if 'epoch_adc' not in data.files:
+            return None
+        microvolts = (config.voltage_to_uv(config.adc_to_voltage(data['epoch_adc'].astype(float)))
+                      - float(data['epoch_baseline']))
+        offsets = data['epoch_offsets']
+        return {
+            'epochs': [microvolts[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)],
+            'labels': data['epoch_labels'],
+            'onsets': data['epoch_onsets'],
+            'clean': data['epoch_clean'],
+            'fs': float(data['epoch_fs'])
+        }
+
+def feature_settings(config=None, windows=False):
+    config = config or Config
+    keys = FEATURE_KEYS + (WINDOW_KEYS if windows else ())
+    if config.FEATURE_ENGINE != 'welch':  # Welch hashes stay as they were
+        keys += tuple(key for key in STFT_KEYS if key not in keys)
+    if config.FEATURE_ENGINE == 'filterbank':
+        keys += FILTERBANK_KEYS
+    if tuple(config.FEATURES) != DEFAULT_FEATURES:  # Band power hashes stay as they were
+        keys += ('FEATURES',)
+    settings = {key: getattr(config, key) for key in keys}
+    settings = {key: list(v) if isinstance(v, tuple) else v for key, v in settings.items()}
+    settings['featurizer_version'] = FEATURIZER_VERSION
+    if windows:
+        settings['epoching'] = 'window'
+    return settings
+
+def feature_config_hash(config=None, windows=False):
+    """Short stable hash of the settings the features depend on"""
+    blob = json.dumps(feature_settings(config, windows), sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+def sliding_windows(signal, window_samples, step_samples):
+    """
+    Overlapping windows of a recording as a read-only strided view (no copy)
+
+    Windows start at 0, step, 2*step, ... like CircularBuffer emits them.
+
+    Args:
+        signal: (..., n_samples)
+
+    Returns:
+        (..., n_windows, window_samples) view; n_windows is 0 if the signal
+        is shorter than one window
+    """
+    if signal.shape[-1] < window_samples:
+        return np.zeros(signal.shape[:-1] + (0, window_samples))
+    return sliding_window_view(signal, window_samples, axis=-1)[..., ::step_samples, :]
+
+def _band_powers_batch(segments, config):
+    """
+    Features and artifact flags of equal-length segments, engine as configured
+
+    Args:
+        segments: (..., n_samples) microvolts
+
+    Returns:
+        tuple: (features (..., n_features), is_clean (...) bool)
+    """
+    from src.features.band_power import BandPowerExtractor
+    from src.preprocessing.filters import RealtimePreprocessor
+
+    if config.FEATURE_ENGINE == 'filterbank':
+        from src.features.filter_bank import FilterBankBandPower
+
+        features = FilterBankBandPower(config=config).extract(segments)
+        return features, np.max(np.abs(segments), axis=-1) <= config.ARTIFACT_MAX_UV
+    preprocessor = RealtimePreprocessor(config=config)
+    extractor = BandPowerExtractor(config=config)
+    if config.FEATURE_ENGINE == 'stft':
+        from src.features.stft import stft_frames, stft_params
+
+        nperseg, hop, freqs = stft_params(config)
+        frames = stft_frames(segments, nperseg, hop, config.SAMPLING_RATE)
+        features = extractor.extract_frames(frames, preprocessor.power_response(freqs))
+        return features, np.max(np.abs(segments), axis=-1) <= config.ARTIFACT_MAX_UV
+    preprocessed, is_clean = preprocessor.preprocess_batch(segments)
+    return extractor.extract_batch(preprocessed), is_clean
+
+def window_features(epochs, config=None):
+    """
+    Live-sized window features of every trial
+
+    Trials of equal length are stacked and windowed together, so the whole
+    set goes through preprocess_batch/extract_batch in a few calls.
+
+    Args:
+        epochs: list of (n_samples_i,) microvolt arrays
+
+    Returns:
+        tuple: (features (n_windows, n_features), trial (n_windows,) index of
+            the source epoch), windows failing the artifact check dropped
+    """
+    config = config or Config
+    n_features = config.N_FEATURES
+
+    lengths = np.array([len(e) for e in epochs])
+    features = np.zeros((0, n_features))
+    trials = np.zeros(0, dtype=np.int64)
+    for length in np.unique(lengths):
+        index = np.flatnonzero(lengths == length)
+        windows = sliding_windows(np.stack([epochs[i] for i in index]),
+                                  config.WINDOW_SAMPLES, config.STEP_SAMPLES)
+        if windows.shape[1] == 0:
+            continue
+        if config.FEATURE_ENGINE == 'filterbank':
+            # Filters run through the whole trial, as on the live stream
+            from src.features.filter_bank import FilterBankBandPower
+
+            bank = FilterBankBandPower(config=config)
+            batch = bank.window_powers(np.stack([epochs[i] for i in index]),
+                                       config.STEP_SAMPLES)
+            is_clean = np.max(np.abs(windows), axis=-1) <= config.ARTIFACT_MAX_UV
+        else:
+            batch, is_clean = _band_powers_batch(windows, config)  # (n_trials, n_windows, ...)
+        owner = np.broadcast_to(index[:, None], is_clean.shape)
+        features = np.vstack([features, batch[is_clean]])
+        trials = np.concatenate([trials, owner[is_clean]])
+
+    order = np.argsort(trials, kind='stable')  # Back to recording order
+    return features[order], trials[order]
+
+def featurize_epochs(epochs, config=None):
+    """
+    Preprocess and extract band powers like calibration does
+
+    Returns:
+        tuple: (features (n_kept, n_features), kept (n_epochs,) bool) where
+            epochs failing the artifact check are dropped
+    """
+    from src.features.band_power import BandPowerExtractor
+    from src.preprocessing.filters import RealtimePreprocessor
+
+    config = config or Config
+    preprocessor = RealtimePreprocessor(config=config)
+    extractor = BandPowerExtractor(config=config)
+    features = []
+    kept = np.zeros(len(epochs), dtype=bool)
+    for i, epoch in enumerate(epochs):
+        if config.FEATURE_ENGINE != 'welch':
+            epoch_features, is_clean = _band_powers_batch(np.asarray(epoch, dtype=float), config)
+        else:
+            preprocessed, is_clean = preprocessor.preprocess(epoch)
+            epoch_features = extractor.extract(preprocessed) if is_clean else None
+        if is_clean:
+            features.append(epoch_features)
+            kept[i] = True
+    return np.array(features).reshape(-1, config.N_FEATURES), kept
+
+def _featurize_file(filepath, out_path, config, windows=False):
+    """Worker: featurize one calibration file into out_path (atomic)"""
+    stored = load_epochs(filepath, config)
+    fs = config.SAMPLING_RATE
+    if stored['fs'] != fs:
+        raise ValueError(f"{Path(filepath).name} was recorded at {stored['fs']:g} Hz, "
+                         f"settings use {fs:g} Hz")
+    if windows:
+        features, trials = window_features(stored['epochs'], config)
+    else:
+        features, kept = featurize_epochs(stored['epochs'], config)
+        trials = np.flatnonzero(kept)
+    with np.load(filepath, allow_pickle=False) as data:
+        meta = {key: data[key] for key in ('user_name', 'channel', 'timestamp')
+                if key in data.files}
+
+    tmp = out_path.with_name(f".{out_path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        np.savez(f, features=features, labels=stored['labels'][trials], trials=trials,
+                 feature_names=np.array(config.FEATURES),
+                 feature_config=feature_config_hash(config, windows),
+                 source=Path(filepath).name, **meta)
+    os.replace(tmp, out_path)
+    return {'source': Path(filepath).name, 'trials': len(stored['epochs']),
+            'kept': len(np.unique(trials)), 'rows': len(trials)}
+
+def refeaturize(calibration_dir=None, cache_dir=None, config=None, n_jobs=None,
+                pattern="*_calibration.npz", windows=False):
+    """
+    Recompute features of every stored epoch with the current settings
+
+    Args:
+        calibration_dir: calibration files (default: config.CALIBRATION_DIR)
+        cache_dir: cache root (default: config.FEATURE_CACHE_DIR)
+        config: SessionConfig whose filters/bands are used (default: Config)
+        n_jobs: worker processes (default: CPU count, 1 = in this process)
+        pattern: calibration file glob
+        windows: one row per live-sized window instead of per trial
+
+    Returns:
+        tuple: (directory of featurized calibration files for these settings,
+            list of per-file summaries for files computed now)
+    """
+    from src.dataset.store import file_hash
+
+    config = config or Config
+    calibration_dir = Path(calibration_dir or config.CALIBRATION_DIR)
+    directory = (Path(cache_dir or config.FEATURE_CACHE_DIR)
+                 / feature_config_hash(config, windows))
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / 'feature_config.json', 'w') as f:
+        json.dump(feature_settings(config, windows), f, indent=2)
+
+    jobs = []
+    skipped = []
+    for filepath in sorted(calibration_dir.glob(pattern)):
+        with np.load(filepath, allow_pickle=False) as data:
+            if 'epoch_adc' not in data.files:
+                skipped.append(filepath.name)
+                continue
+        out_path = directory / f"{file_hash(filepath)[:16]}_calibration.npz"
+        if not out_path.exists():
+            jobs.append((filepath, out_path, config, windows))
+    if skipped:
+        print(f"Skipped {len(skipped)} calibration files without raw epochs")
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(jobs) <= 1:
+        results = [_featurize_file(*job) for job in jobs]
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(min(n_jobs, len(jobs)),
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = list(executor.map(_featurize_file, *zip(*jobs)))
+    return directory, results
@@ -0,0 +1,317 @@
+"""
+Consolidated, memory-mapped store of calibration data
+
+Every ingested *_calibration.npz is appended to one set of .npy columns:
+
+    features.npy    (n_rows, n_features) float64
+    labels.npy      (n_rows,) int64
+    session.npy     (n_rows,) int32   row -> session number
+    trial.npy       (n_rows,) int64   row -> store-wide trial id (rows cut
+                                      from one trial share it; see groups())
+    index.json      sessions (user, channel, source hash, row range) and
+                    the feature names every row holds
+
+Columns grow in place: rows are appended and the .npy header (which NumPy
+pads for a growing first axis) is rewritten with the new shape. index.json
+is replaced atomically last and is the commit point; rows past its count
+are ignored and truncated on the next ingest. Files are identified by a
+content hash, so re-ingesting a directory only adds new calibrations.
+Readers get read-only memmaps: opening is instant and selecting one user's
+sessions returns views, not copies. One writer at a time.
+
+A store holds one feature schema. The default store for non-default
+FEATURES lives in its own DATASET_DIR/features-<hash>, and files computed
+with other features are not appended but listed in DatasetStore.skipped.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+import numpy as np
+from config.settings import Config
+from src.dataset.epochs import DEFAULT_FEATURES
+
+INDEX_NAME = 'index.json'
+COLUMNS = {'features': np.float64, 'labels': np.int64, 'session': np.int32, 'trial': np.int64}
+
+def file_hash(filepath, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def default_root(config=None):
+    """
+    Store directory for config.FEATURES: DATASET_DIR for the default band
+    powers (where existing stores are), DATASET_DIR/features-<hash> otherwise
+    """
+    config = config or Config
+    names = tuple(config.FEATURES)
+    if names == DEFAULT_FEATURES:
+        return Path(config.DATASET_DIR)
+    digest = hashlib.sha256(json.dumps(list(names)).encode()).hexdigest()[:16]
+    return Path(config.DATASET_DIR) / f"features-{digest}"
+
+def _append_rows(path, rows, committed):
+    """
+    Append rows to a C-order .npy file after its first committed rows
+
+    Creates the file on first use. Bytes beyond committed rows (left by an
+    interrupted ingest) are dropped first.
+    """
+    rows = np.ascontiguousarray(rows)
+    if not path.exists():
+        np.save(path, rows)
+        return
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        data_offset = f.tell()
+        if fortran_order or dtype != rows.dtype or shape[1:] != rows.shape[1:]:
+            raise ValueError(f"{path.name}: stored {dtype}{shape[1:]} does not match "
+                             f"{rows.dtype}{rows.shape[1:]}")
+
+        row_bytes = dtype.itemsize * int(np.prod(shape[1:], dtype=np.int64))
+        f.truncate(data_offset + committed * row_bytes)
+        f.seek(0, os.SEEK_END)
+        f.write(rows.tobytes())
+        f.flush()
+
+        new_shape = (committed + len(rows),) + tuple(shape[1:])
+        header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False,
+                  'shape': new_shape}
+        f.seek(0)
+        if version == (1, 0):
+            np.lib.format.write_array_header_1_0(f, header)
+        else:
+            np.lib.format.write_array_header_2_0(f, header)
+        if f.tell() != data_offset:
+            raise ValueError(f"{path.name}: header no longer fits its padding")
+
+class DatasetStore:
+    def __init__(self, root=None, config=None):
+        """
+        Args:
+            root: store directory (default: default_root(config))
+            config: SessionConfig (default: global Config); its FEATURES is
+                the schema of a new store
+        """
+        self.config = config or Config
+        self.root = Path(root or default_root(self.config))
+        self._index = None
+        self._columns = None
+        self.skipped = []  # Session entries not ingested: other feature names
+
+    @property
+    def feature_names(self):
+        """Feature schema of the stored rows (config.FEATURES while empty)"""
+        index = self.index
+        if index['n_rows']:
+            # Stores built before the schema was recorded hold band powers
+            return tuple(index.get('feature_names', DEFAULT_FEATURES))
+        return tuple(self.config.FEATURES)
+
+    @property
+    def index(self):
+        if self._index is None:
+            try:
+                with open(self.root / INDEX_NAME) as f:
+                    self._index = json.load(f)
+            except FileNotFoundError:
+                self._index = {'n_rows': 0, 'sessions': []}
+        return self._index
+
+    def __len__(self):
+        return self.index['n_rows']
+
+    def _write_index(self, index):
+        tmp = self.root / f".{INDEX_NAME}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp, self.root / INDEX_NAME)
+        self._index = index
+        self._columns = None
+
+    def refresh(self):
+        """Re-read the index (after another process ingested)"""
+        self._index = None
+        self._columns = None
+
+    def ingest(self, filepath):
+        """
+        Append one calibration file unless its content is already stored
+
+        Args:
+            filepath: .npz with features, labels, user_name, channel (and
+                optionally timestamp, per-row trials and feature_names), as
+                written by 2_calibrate_user.py or refeaturize()
+
+        Returns:
+            dict or None: the new session entry, None if already ingested or
+                computed with other features than the store holds (then
+                the entry is added to self.skipped)
+        """
+        filepath = Path(filepath)
+        digest = file_hash(filepath)
+        index = self.index
+        if any(s['hash'] == digest for s in index['sessions']):
+            return None
+
+        with np.load(filepath, allow_pickle=False) as data:
+            features = np.asarray(data['features'], dtype=COLUMNS['features'])
+            labels = np.asarray(data['labels'], dtype=COLUMNS['labels'])
+            # Window-level files say which trial each row came from
+            trials = data['trials'] if 'trials' in data.files else np.arange(len(labels))
+            entry = {
+                'session': len(index['sessions']),
+                'hash': digest,
+                'user': str(data['user_name']),
+                'channel': str(data['channel']),
+                'timestamp': str(data['timestamp']) if 'timestamp' in data.files else None,
+                # Older files hold the default mu/beta band powers
+                'feature_names': ([str(name) for name in data['feature_names']]
+                                  if 'feature_names' in data.files
+                                  else ['mu_power', 'beta_power']),
+                'source': filepath.name,
+                'ingested': time.strftime("%Y-%m-%d %H:%M:%S")
+            }
+        if features.ndim != 2 or len(features) != len(labels):
+            raise ValueError(f"{filepath.name}: expected (n, n_features) features and "
+                             f"(n,) labels, got {features.shape} and {labels.shape}")
+        schema = self.feature_names
+        if tuple(entry['feature_names']) != schema:
+            self.skipped.append(entry)
+            return None
+        if features.shape[1] != len(schema):
+            raise ValueError(f"{filepath.name}: {features.shape[1]} feature columns, "
+                             f"but names {', '.join(schema)}")
+
+        start = index['n_rows']
+        self._columns = None  # Drop our maps before the files change
+        entry['start'], entry['stop'] = start, start + len(labels)
+        self.root.mkdir(parents=True, exist_ok=True)
+        new_rows = {
+            'features': features,
+            'labels': labels,
+            'session': np.full(len(labels), entry['session'], dtype=COLUMNS['session']),
+            'trial': start + np.unique(trials, return_inverse=True)[1].astype(COLUMNS['trial'])
+        }
+        if start and not (self.root / 'trial.npy').exists():
+            # Store created before the trial column: one trial per row
+            np.save(self.root / 'trial.npy', np.arange(start, dtype=COLUMNS['trial']))
+        for name, rows in new_rows.items():
+            _append_rows(self.root / f"{name}.npy", rows, start)
+
+        self._write_index({'n_rows': entry['stop'], 'feature_names': list(schema),
+                           'sessions': index['sessions'] + [entry]})
+        return entry
+
+    def ingest_dir(self, directory=None, pattern="*_calibration.npz"):
+        """
+        Ingest every new calibration file in a directory
+
+        Returns:
+            list of dict: sessions added (oldest file first); files with
+                other features are in self.skipped
+        """
+        self.skipped = []
+        directory = Path(directory or self.config.CALIBRATION_DIR)
+        files = sorted(directory.glob(pattern), key=lambda p: (p.stat().st_mtime, p.name))
+        added = []
+        for filepath in files:
+            entry = self.ingest(filepath)
+            if entry is not None:
+                added.append(entry)
+        return added
+
+    def column(self, name):
+        """Read-only memmap of a column, limited to committed rows"""
+        if self._columns is None:
+            n = len(self)
+            self._columns = {}
+            for key in COLUMNS:
+                path = self.root / f"{key}.npy"
+                if not n:
+                    self._columns[key] = np.zeros((0,), dtype=COLUMNS[key])
+                elif path.exists():
+                    self._columns[key] = np.load(path, mmap_mode='r')[:n]
+                else:  # Column added after this store was built
+                    self._columns[key] = np.arange(n, dtype=COLUMNS[key])
+        return self._columns[name]
+
+    @property
+    def features(self):
+        return self.column('features')
+
+    @property
+    def labels(self):
+        return self.column('labels')
+
+    def sessions(self, users=None, channel=None):
+        """
+        Session entries, optionally filtered
+
+        Args:
+            users: user name or list of names (None = all)
+            channel: electrode (None = all)
+        """
+        if isinstance(users, str):
+            users = [users]
+        return [s for s in self.index['sessions']
+                if (users is None or s['user'] in users)
+                and (channel is None or s['channel'] == channel)]
+
+    def users(self):
+        return sorted({s['user'] for s in self.index['sessions']})
+
+    def iter_sessions(self, users=None, channel=None):
+        """
+        Yields:
+            tuple: (entry, features, labels) as memmap views, no copies
+        """
+        features, labels = self.features, self.labels
+        for entry in self.sessions(users, channel):
+            rows = slice(entry['start'], entry['stop'])
+            yield entry, features[rows], labels[rows]
+
+    def _rows(self, sessions):
+        """Row selector: a slice when the sessions are back to back, else indices"""
+        ranges = [(s['start'], s['stop']) for s in sessions]
+        if all(ranges[i][1] == ranges[i + 1][0] for i in range(len(ranges) - 1)):
+            return slice(ranges[0][0], ranges[-1][1])
+        return np.concatenate([np.arange(start, stop) for start, stop in ranges])
+
+    def select(self, users=None, channel=None):
+        """
+        Features and labels of the selected sessions
+
+        Contiguous selections (everything, or one user's back-to-back
+        sessions) are memmap views; others are gathered into new arrays.
+
+        Returns:
+            tuple: (X (n, n_features), y (n,))
+        """
+        sessions = self.sessions(users, channel)
+        if not sessions:
+            n_features = self.features.shape[1] if len(self) else self.config.N_FEATURES
+            return np.zeros((0, n_features)), np.zeros(0, dtype=COLUMNS['labels'])
+        rows = self._rows(sessions)
+        return self.features[rows], self.labels[rows]
+
+    def groups(self, users=None, channel=None):
+        """
+        Trial id of every row select() returns
+
+        Rows cut from the same trial (window-level features) share an id;
+        use it for grouped splits so windows of one trial never land on both
+        sides of a train/test split.
+        """
+        sessions = self.sessions(users, channel)
+        if not sessions:
+            return np.zeros(0, dtype=COLUMNS['trial'])
+        return self.column('trial')[self._rows(sessions)]
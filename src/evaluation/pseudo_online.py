@@ -0,0 +1,349 @@
+"""
+Pseudo-online evaluation of recorded calibration sessions
+
+Each session's stored raw epochs are replayed back to back, in recording
+order, through the live RealtimeBCIPipeline stages: windows every
+STEP_SAMPLES, raw-stream and filtered artifact rejection, normalization,
+classification and CommandMapper smoothing or duration mode. The model of a held-out session
+is trained on that user's other sessions (leave-one-session-out), so no
+window is ever scored by a model that saw it. Folds run in a process pool.
+
+Command-level scoring, per session:
+    activation          a non-STOP command following a STOP
+    true activation     an IMAGERY trial overlaps the detection_tolerance()
+                        seconds before it (window length plus smoothing)
+    false activation    any other activation; reported per minute of REST
+    detection latency   trial onset to its first true activation
+    trial accuracy      IMAGERY trials detected plus REST trials without a
+                        false activation, over all trials; gives the ITR
+
+Window accuracy counts clean windows lying entirely inside one trial, the
+same windows the window-level training set (--windows) is built from.
+"""
+import os
+import time
+import numpy as np
+from config.settings import Config
+
+def information_transfer_rate(accuracy, n_classes=2, trial_seconds=None, config=None):
+    """
+    Wolpaw information transfer rate
+
+    Args:
+        accuracy: probability of a correct selection
+        n_classes: number of possible selections
+        trial_seconds: time per selection (default: config.TRIAL_DURATION)
+
+    Returns:
+        float: bits per minute (0 at or below chance)
+    """
+    config = config or Config
+    trial_seconds = trial_seconds or config.TRIAL_DURATION
+    p = float(accuracy)
+    if p <= 1.0 / n_classes:
+        return 0.0
+    bits = np.log2(n_classes) + p * np.log2(p)
+    if p < 1.0:
+        bits += (1 - p) * np.log2((1 - p) / (n_classes - 1))
+    return bits * 60.0 / trial_seconds
+
+def detection_tolerance(config=None):
+    """Seconds an activation may trail the IMAGERY trial it answers"""
+    config = config or Config
+    return (config.WINDOW_LENGTH
+            + config.SMOOTHING_WINDOW * config.STEP_SAMPLES / config.SAMPLING_RATE)
+
+class ReplayClock:
+    """Stream time of the window being replayed (CommandMapper clock)"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def train_fold(paths, model_type=None, config=None):
+    """
+    Fit a classifier on the window-level features of stored sessions
+
+    Returns:
+        tuple: (MotorImageryClassifier, FeatureNormalizer)
+    """
+    from src.dataset.epochs import load_epochs, window_features
+    from src.features.normalizer import FeatureNormalizer
+    from src.models.classifier import MotorImageryClassifier
+
+    config = config or Config
+    features, labels = [], []
+    for path in paths:
+        stored = load_epochs(path, config)
+        X, trials = window_features(stored['epochs'], config)
+        features.append(X)
+        labels.append(stored['labels'][trials])
+    X = np.vstack(features)
+    y = np.concatenate(labels)
+
+    normalizer = FeatureNormalizer()
+    normalizer.fit(X)
+    classifier = MotorImageryClassifier(model_type, config=config)
+    classifier.model.fit(normalizer.normalize(X), y)  # Quiet train() for worker processes
+    return classifier, normalizer
+
+def replay_session(pipeline, epochs, config=None):
+    """
+    Stream a session's trials through the pipeline window by window
+    
+    Each step goes through pipeline.feed() (buffer, raw artifact check,
+    spectrogram ring, filter bank) and the window it completes through
+    process_window(), the calls the live loop makes.
+
+    Args:
+        pipeline: fresh RealtimeBCIPipeline with its model installed
+        epochs: list of (n_samples_i,) microvolt arrays in recording order
+
+    Returns:
+        dict: per-window arrays 'end' (stream sample index after the window),
+            'prediction' (-1 = rejected as artifact, on the raw stream or
+            after filtering), 'command', 'latency_ms' (feed and processing)
+    """
+    from src.control.command_mapper import CommandMapper
+
+    config = config or Config
+    clock = ReplayClock()
+    pipeline.command_mapper = CommandMapper(config=config, clock=clock)
+    stream = np.concatenate(epochs) if epochs else np.zeros(0)
+    n_windows = max(0, (len(stream) - config.WINDOW_SAMPLES) // config.STEP_SAMPLES + 1)
+
+    ends = config.WINDOW_SAMPLES + config.STEP_SAMPLES * np.arange(n_windows)
+    predictions = np.full(n_windows, -1)
+    commands = []
+    latencies = np.zeros(n_windows)
+    fed = 0
+    for i in range(n_windows):
+        clock.now = ends[i] / config.SAMPLING_RATE
+        start = time.perf_counter()
+        # Every step completes exactly one window
+        (window, rejection, spectrum), = pipeline.feed(stream[fed:ends[i]])[0]
+        fed = ends[i]
+        command, _, _ = pipeline.process_window(window, rejection, spectrum)
+        if pipeline.last_prediction is not None:
+            predictions[i] = pipeline.last_prediction
+        latencies[i] = (time.perf_counter() - start) * 1000
+        commands.append(command)
+    return {'end': ends, 'prediction': predictions, 'command': np.array(commands),
+            'latency_ms': latencies}
+
+def score_replay(replay, lengths, labels, config=None):
+    """
+    Command- and window-level counts of one replayed session
+
+    Args:
+        replay: replay_session() output
+        lengths: (n_trials,) samples per trial, in replay order
+        labels: (n_trials,) task id per trial
+
+    Returns:
+        dict of counts (summed over sessions by merge_scores())
+    """
+    config = config or Config
+    fs = config.SAMPLING_RATE
+    labels = np.asarray(labels)
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    ends = replay['end']
+    tolerance = int(round(detection_tolerance(config) * fs))
+
+    # Window accuracy over clean windows inside a single trial
+    first = np.searchsorted(bounds, ends - config.WINDOW_SAMPLES, side='right') - 1
+    last = np.searchsorted(bounds, ends - 1, side='right') - 1
+    scored = (first == last) & (replay['prediction'] >= 0)
+    correct_windows = int(np.sum(replay['prediction'][scored] == labels[last[scored]]))
+
+    # Command activations: rising edges out of STOP
+    active = replay['command'] != 'STOP'
+    rising = np.flatnonzero(active & ~np.r_[False, active[:-1]])
+    imagery = np.flatnonzero(labels == 1)
+    detected = {}
+    false_trials = set()
+    false_activations = 0
+    for i in rising:
+        # Latest IMAGERY trial starting before the activation and ending
+        # within the tolerance before it
+        candidates = imagery[(bounds[imagery] < ends[i])
+                             & (bounds[imagery + 1] > ends[i] - tolerance)]
+        if len(candidates):
+            detected.setdefault(int(candidates[-1]), ends[i] - bounds[candidates[-1]])
+        else:
+            false_activations += 1
+            false_trials.add(int(last[i]))
+
+    rest = labels == 0
+    correct_trials = len(detected) + int(np.sum(rest)) - len(false_trials)
+    return {
+        'sessions': 1,
+        'windows': len(ends),
+        'scored_windows': int(np.sum(scored)),
+        'correct_windows': correct_windows,
+        'rejected_windows': int(np.sum(replay['prediction'] < 0)),
+        'trials': len(labels),
+        'correct_trials': correct_trials,
+        'imagery_trials': len(imagery),
+        'detected_trials': len(detected),
+        'detection_s': [latency / fs for latency in detected.values()],
+        'activations': len(rising),
+        'false_activations': false_activations,
+        'rest_seconds': float(np.sum(np.diff(bounds)[rest])) / fs,
+        'latency_ms': replay['latency_ms']
+    }
+
+def merge_scores(scores):
+    """Sum the counts of several score_replay() results"""
+    merged = {}
+    for score in scores:
+        for key, value in score.items():
+            if isinstance(value, (list, np.ndarray)):
+                merged[key] = np.concatenate([merged.get(key, []), value])
+            else:
+                merged[key] = merged.get(key, 0) + value
+    return merged
+
+def summarize(counts, config=None):
+    """
+    Rates from merged counts
+
+    Returns:
+        dict: window_accuracy, trial_accuracy, itr_bits_min,
+            false_activations_min, detection_rate, detection_s (median),
+            latency_ms (median, p95), sessions, trials
+    """
+    from src.monitoring.latency import LatencyHistogram
+
+    def ratio(a, b):
+        return a / b if b else float('nan')
+
+    trial_accuracy = ratio(counts['correct_trials'], counts['trials'])
+    latency = LatencyHistogram()
+    latency.record_many(counts['latency_ms'])
+    return {
+        'sessions': counts['sessions'],
+        'trials': counts['trials'],
+        'window_accuracy': ratio(counts['correct_windows'], counts['scored_windows']),
+        'trial_accuracy': trial_accuracy,
+        'itr_bits_min': (information_transfer_rate(trial_accuracy, config=config)
+                         if counts['trials'] else float('nan')),
+        'false_activations_min': ratio(counts['false_activations'],
+                                       counts['rest_seconds'] / 60.0),
+        'detection_rate': ratio(counts['detected_trials'], counts['imagery_trials']),
+        'detection_s': (float(np.median(counts['detection_s']))
+                        if len(counts['detection_s']) else float('nan')),
+        'latency_ms': {'p50': latency.percentile(50), 'p95': latency.percentile(95)}
+    }
+
+def _evaluate_fold(test_path, train_paths, model_type, use_duration, config):
+    """Worker: train without the held-out session, replay and score it"""
+    from src.dataset.epochs import load_epochs
+    from src.pipeline.realtime_bci import RealtimeBCIPipeline
+
+    classifier, normalizer = train_fold(train_paths, model_type, config)
+    stored = load_epochs(test_path, config)
+    order = np.argsort(stored['onsets'], kind='stable')
+    epochs = [stored['epochs'][i] for i in order]
+
+    pipeline = RealtimeBCIPipeline(None, use_duration=use_duration, classifier=classifier,
+                                   normalizer=normalizer, config=config)
+    replay = replay_session(pipeline, epochs, config)
+    return score_replay(replay, [len(e) for e in epochs], stored['labels'][order], config)
+
+class PseudoOnlineEvaluator:
+    def __init__(self, model_type=None, use_duration=False, n_jobs=None, pool_users=False,
+                 config=None):
+        """
+        Args:
+            model_type: 'LDA', 'SVM' or 'LogisticRegression' (default: config.MODEL_TYPE)
+            use_duration: replay with duration-based commands
+            n_jobs: worker processes (default: CPU count, 1 = in this process)
+            pool_users: train each fold on every other session, not only the
+                same user's (lets single-session users be evaluated)
+            config: SessionConfig (default: global Config)
+        """
+        self.config = config or Config
+        self.model_type = model_type or self.config.MODEL_TYPE
+        self.use_duration = use_duration
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.pool_users = pool_users
+
+    def folds(self, calibration_dir=None, pattern="*_calibration.npz"):
+        """
+        Leave-one-session-out folds of calibration files with raw epochs
+
+        Returns:
+            tuple: (list of (user, test_path, train_paths), list of users
+                skipped for having no other session to train on)
+        """
+        from pathlib import Path
+
+        calibration_dir = Path(calibration_dir or self.config.CALIBRATION_DIR)
+        sessions = []
+        for path in sorted(calibration_dir.glob(pattern)):
+            with np.load(path, allow_pickle=False) as data:
+                if 'epoch_adc' in data.files:
+                    sessions.append((str(data['user_name']), path))
+
+        folds = []
+        skipped = set()
+        for user, path in sessions:
+            train = [p for u, p in sessions
+                     if p != path and (self.pool_users or u == user)]
+            if train:
+                folds.append((user, path, train))
+            else:
+                skipped.add(user)
+        return folds, sorted(skipped)
+
+    def run(self, calibration_dir=None, pattern="*_calibration.npz"):
+        """
+        Evaluate every fold and aggregate per user
+
+        Returns:
+            dict: 'users' (user -> summarize() dict), 'overall', 'skipped'
+        """
+        folds, skipped = self.folds(calibration_dir, pattern)
+        if not folds:
+            raise ValueError("No session has another session to train on "
+                             "(record more sessions or use pool_users)")
+        jobs = [(path, train, self.model_type, self.use_duration, self.config)
+                for _, path, train in folds]
+        if self.n_jobs == 1 or len(jobs) == 1:
+            scores = [_evaluate_fold(*job) for job in jobs]
+        else:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(min(self.n_jobs, len(jobs)),
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                scores = list(executor.map(_evaluate_fold, *zip(*jobs)))
+
+        users = {}
+        for (user, _, _), score in zip(folds, scores):
+            users.setdefault(user, []).append(score)
+        return {
+            'users': {user: summarize(merge_scores(s), self.config)
+                      for user, s in sorted(users.items())},
+            'overall': summarize(merge_scores(scores), self.config),
+            'skipped': skipped
+        }
+
+    @staticmethod
+    def format_report(report):
+        """Report as a fixed-width table"""
+        header = (f"{'User':<16}{'Sess':>5}{'Win acc':>9}{'Trial acc':>11}{'ITR':>8}"
+                  f"{'FA/min':>8}{'Detect':>8}{'TTD s':>7}{'p50 ms':>8}{'p95 ms':>8}")
+        lines = [header, '-' * len(header)]
+        rows = list(report['users'].items()) + [('ALL', report['overall'])]
+        for user, s in rows:
+            lines.append(f"{user:<16}{s['sessions']:>5}{s['window_accuracy']:>9.1%}"
+                         f"{s['trial_accuracy']:>11.1%}{s['itr_bits_min']:>8.2f}"
+                         f"{s['false_activations_min']:>8.2f}{s['detection_rate']:>8.1%}"
+                         f"{s['detection_s']:>7.2f}{s['latency_ms']['p50']:>8.2f}"
+                         f"{s['latency_ms']['p95']:>8.2f}")
+        if report['skipped']:
+            lines.append(f"Skipped (single session): {', '.join(report['skipped'])}")
+        return '\n'.join(lines)
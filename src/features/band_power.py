@@ -1,44 +1,100 @@
 """
-Band power feature extraction (Mu + Beta) for single channel
+Spectral feature extraction for single channel
+
+One Welch PSD per window feeds every configured feature (config.FEATURES,
+see feature_set.py). The default set is mu and beta band power.
 """
 import numpy as np
 from scipy.signal import welch
+from src.features.feature_set import FeatureSet
 from config.settings import Config
 
 class BandPowerExtractor:
-    def __init__(self, fs=Config.SAMPLING_RATE):
-        self.fs = fs
-        self.mu_band = Config.MU_BAND
-        self.beta_band = Config.BETA_BAND
+    FEATURE_NAMES = ('mu_power', 'beta_power')  # Default set, the band powers ERD uses
+
+    def __init__(self, fs=None, config=None, feature_names=None):
+        """
+        Args:
+            fs: sampling rate (default: config.SAMPLING_RATE)
+            config: SessionConfig (default: global Config)
+            feature_names: features to extract, in order (default:
+                config.FEATURES), e.g. a trained model's schema
+        """
+        config = config or Config
+        self.fs = fs or config.SAMPLING_RATE
+        self.feature_set = FeatureSet(feature_names, fs=self.fs, config=config)
+        self.feature_names = self.feature_set.names
+        # Where mu and beta power sit in the vector (ERD); None if not extracted
+        self._band_index = (self.feature_set.index('mu_power'),
+                            self.feature_set.index('beta_power'))
+        # Welch segment length fixed in seconds so band resolution does not
+        # depend on the sampling rate (256 samples at 500 Hz)
+        self.nperseg = int(config.WELCH_SEGMENT * self.fs)
+        self.mu_band = config.MU_BAND
+        self.beta_band = config.BETA_BAND
         
         # Baseline power (for ERD calculation)
         self.baseline_mu = None
         self.baseline_beta = None
         
+    @property
+    def n_features(self):
+        return len(self.feature_names)
+        
     def extract(self, window):
         """
-        Extract mu and beta band power
+        Extract the configured features (default: mu and beta band power)
         
         Args:
             window: (n_samples,) single channel
             
         Returns:
-            features: (2,) [mu_power, beta_power]
+            features: (n_features,) in feature_names order
         """
-        # Power spectral density
+        # Power spectral density, shared by every feature
         freqs, psd = welch(window, 
                           fs=self.fs,
-                          nperseg=min(256, len(window)))
+                          nperseg=min(self.nperseg, len(window)))
         
-        # Mu band (8-13 Hz) - Primary motor imagery band
-        mu_idx = (freqs >= self.mu_band[0]) & (freqs <= self.mu_band[1])
-        mu_power = np.mean(psd[mu_idx])
+        return self.feature_set.compute(freqs, psd, window)
+    
+    def extract_batch(self, windows):
+        """
+        extract() for many windows at once (one Welch call)
+        
+        Args:
+            windows: (..., n_samples)
+            
+        Returns:
+            features: (..., n_features)
+        """
+        freqs, psd = welch(windows,
+                          fs=self.fs,
+                          nperseg=min(self.nperseg, windows.shape[-1]),
+                          axis=-1)
+        return self.feature_set.compute(freqs, psd, windows)
+    
+    def extract_frames(self, frames, gain=None):
+        """
+        Features from STFT frames (SpectrogramRing) instead of a new Welch
         
-        # Beta band (13-30 Hz) - Secondary motor imagery band
-        beta_idx = (freqs >= self.beta_band[0]) & (freqs <= self.beta_band[1])
-        beta_power = np.mean(psd[beta_idx])
+        There is no filtered signal, so 'time' features (Hjorth) come from
+        the spectrum.
         
-        return np.array([mu_power, beta_power])
+        Args:
+            frames: (..., n_frames, n_freqs) frames inside the window
+            gain: (n_freqs,) power response to apply, e.g.
+                RealtimePreprocessor.power_response() so the features
+                match extract() on the preprocessed window
+            
+        Returns:
+            features: (..., n_features)
+        """
+        psd = np.mean(frames, axis=-2)
+        if gain is not None:
+            psd = psd * gain
+        freqs = np.fft.rfftfreq(2 * (psd.shape[-1] - 1), 1.0 / self.fs)
+        return self.feature_set.compute(freqs, psd)
     
     def set_baseline(self, baseline_windows):
         """
@@ -53,12 +109,15 @@ class BandPowerExtractor:
             baseline_features.append(features)
         
         baseline_features = np.array(baseline_features)
-        self.baseline_mu = np.mean(baseline_features[:, 0])
-        self.baseline_beta = np.mean(baseline_features[:, 1])
+        mu, beta = self._band_index
+        if mu is None or beta is None:
+            raise ValueError("ERD baseline needs mu_power and beta_power in the features")
+        self.baseline_mu = np.mean(baseline_features[:, mu])
+        self.baseline_beta = np.mean(baseline_features[:, beta])
         
         print(f"Baseline set: Mu={self.baseline_mu:.2f}, Beta={self.baseline_beta:.2f}")
     
-    def calculate_erd(self, features):
+    def calculate_erd(self, features, baseline=None):
         """
         Calculate Event-Related Desynchronization
         
@@ -66,15 +125,20 @@ class BandPowerExtractor:
         Negative ERD = power decrease = motor imagery
         
         Args:
-            features: (2,) [mu_power, beta_power]
+            features: (n_features,) from extract()
+            baseline: (mu, beta) REST powers to use instead of set_baseline()'s
             
         Returns:
-            erd: (2,) [mu_erd, beta_erd]
+            erd: (2,) [mu_erd, beta_erd], zeros without a baseline or
+                without mu_power/beta_power among the features
         """
-        if self.baseline_mu is None or self.baseline_beta is None:
+        mu, beta = self._band_index
+        baseline_mu, baseline_beta = (baseline if baseline is not None
+                                      else (self.baseline_mu, self.baseline_beta))
+        if baseline_mu is None or baseline_beta is None or mu is None or beta is None:
             return np.array([0.0, 0.0])
         
-        mu_erd = (self.baseline_mu - features[0]) / self.baseline_mu
-        beta_erd = (self.baseline_beta - features[1]) / self.baseline_beta
+        mu_erd = (baseline_mu - features[mu]) / baseline_mu
+        beta_erd = (baseline_beta - features[beta]) / baseline_beta
         
         return np.array([mu_erd, beta_erd])
@@ -0,0 +1,248 @@
+"""
+Pluggable feature registry computed from one shared spectrum per window
+
+Every feature is registered with the intermediate results it needs:
+
+    psd    the window's one-sided PSD (Welch, or the mean of STFT frames)
+    time   variances of the signal and its first and second differences,
+           from the filtered window when there is one, otherwise from the
+           PSD (Parseval, with the exact gain of a sample difference)
+
+FeatureSet computes the PSD once (BandPowerExtractor does the Welch call),
+builds only the dependencies its features declare, and shares band sums
+between features, so adding features costs a few vectorized reductions and
+never another FFT. All functions work on any leading batch shape.
+
+    config = SessionConfig(FEATURES=('log_mu_power', 'log_beta_power',
+                                     'rel_mu_power', 'spectral_entropy'))
+
+The names in use are stored with trained models as the feature schema
+(see export_artifact) and the live pipeline computes that schema.
+"""
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+import numpy as np
+from config.settings import Config
+
+Feature = namedtuple('Feature', ['name', 'needs', 'compute', 'description'])
+DEPENDENCIES = ('psd', 'time')
+FEATURES = {}  # name -> Feature, in registration order
+
+def register_feature(name, needs=('psd',), description=''):
+    """
+    Decorator adding compute(ctx) -> (...,) array to the registry
+
+    Args:
+        name: feature name used in config.FEATURES and model schemas
+        needs: dependencies from DEPENDENCIES read through ctx
+    """
+    unknown = set(needs) - set(DEPENDENCIES)
+    if unknown:
+        raise ValueError(f"Unknown dependencies for {name}: {', '.join(sorted(unknown))}")
+
+    def decorator(compute):
+        FEATURES[name] = Feature(name, tuple(needs), compute, description)
+        return compute
+    return decorator
+
+class _Context:
+    """Shared intermediate results of one batch, each built at most once"""
+    def __init__(self, feature_set, freqs, psd, signal):
+        self.feature_set = feature_set
+        self.freqs = freqs
+        self.psd = psd
+        self.signal = signal
+        self._cache = {}
+
+    def _cached(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def mask(self, band):
+        """Bins inside band (edges inclusive)"""
+        return self._cached(('mask', band),
+                            lambda: (self.freqs >= band[0]) & (self.freqs <= band[1]))
+
+    def band_sum(self, band):
+        return self._cached(('sum', band),
+                            lambda: np.sum(self.psd[..., self.mask(band)], axis=-1))
+
+    def band_mean(self, band):
+        return self.band_sum(band) / max(np.count_nonzero(self.mask(band)), 1)
+
+    @property
+    def passband(self):
+        config = self.feature_set.config
+        return (config.BANDPASS_LOW, config.BANDPASS_HIGH)
+
+    def time_stats(self):
+        """
+        Returns:
+            tuple: variances of x, diff(x) and diff(diff(x)), (...,) each
+        """
+        return self._cached('time', self._build_time_stats)
+
+    def _build_time_stats(self):
+        if self.signal is not None:
+            x = self.signal
+            dx = np.diff(x, axis=-1)
+            return np.var(x, axis=-1), np.var(dx, axis=-1), np.var(np.diff(dx, axis=-1), axis=-1)
+        # A first difference has power gain (2 sin(pi f / fs))^2
+        df = self.freqs[1] - self.freqs[0]
+        gain = (2 * np.sin(np.pi * self.freqs / self.feature_set.fs)) ** 2
+        psd = self.psd
+        return (np.sum(psd, axis=-1) * df, np.sum(psd * gain, axis=-1) * df,
+                np.sum(psd * gain * gain, axis=-1) * df)
+
+_TINY = 1e-12  # Floor for logs and ratios of empty spectra
+
+@register_feature('mu_power', description='mean PSD in MU_BAND (µV²/Hz)')
+def _mu_power(ctx):
+    return ctx.band_mean(ctx.feature_set.config.MU_BAND)
+
+@register_feature('beta_power', description='mean PSD in BETA_BAND (µV²/Hz)')
+def _beta_power(ctx):
+    return ctx.band_mean(ctx.feature_set.config.BETA_BAND)
+
+@register_feature('log_mu_power', description='log10 of mu_power')
+def _log_mu_power(ctx):
+    return np.log10(np.maximum(_mu_power(ctx), _TINY))
+
+@register_feature('log_beta_power', description='log10 of beta_power')
+def _log_beta_power(ctx):
+    return np.log10(np.maximum(_beta_power(ctx), _TINY))
+
+@register_feature('rel_mu_power', description='MU_BAND share of the passband power')
+def _rel_mu_power(ctx):
+    total = np.maximum(ctx.band_sum(ctx.passband), _TINY)
+    return ctx.band_sum(ctx.feature_set.config.MU_BAND) / total
+
+@register_feature('rel_beta_power', description='BETA_BAND share of the passband power')
+def _rel_beta_power(ctx):
+    total = np.maximum(ctx.band_sum(ctx.passband), _TINY)
+    return ctx.band_sum(ctx.feature_set.config.BETA_BAND) / total
+
+@register_feature('spectral_entropy',
+                  description='Shannon entropy of the passband PSD, 0 (one bin) to 1 (flat)')
+def _spectral_entropy(ctx):
+    mask = ctx.mask(ctx.passband)
+    psd = ctx.psd[..., mask]
+    p = psd / np.maximum(np.sum(psd, axis=-1, keepdims=True), _TINY)
+    entropy = -np.sum(p * np.log(np.maximum(p, _TINY)), axis=-1)
+    return entropy / np.log(max(np.count_nonzero(mask), 2))
+
+@register_feature('peak_alpha_freq',
+                  description='frequency of the largest PSD bin in MU_BAND (Hz, '
+                              'parabolic interpolation)')
+def _peak_alpha_freq(ctx):
+    mask = ctx.mask(ctx.feature_set.config.MU_BAND)
+    index = np.flatnonzero(mask)
+    if len(index) == 0:
+        return np.full(ctx.psd.shape[:-1], np.nan)
+    psd = ctx.psd
+    peak = index[np.argmax(psd[..., index], axis=-1)]
+    # Fit a parabola through the peak bin and its neighbours (log power)
+    left = np.clip(peak - 1, 0, psd.shape[-1] - 1)
+    right = np.clip(peak + 1, 0, psd.shape[-1] - 1)
+    take = lambda i: np.log(np.maximum(np.take_along_axis(psd, i[..., None], axis=-1)[..., 0],
+                                       _TINY))
+    a, b, c = take(left), take(peak), take(right)
+    curvature = a - 2 * b + c
+    offset = np.where(curvature < 0, 0.5 * (a - c) / np.where(curvature < 0, curvature, -1.0),
+                      0.0)
+    df = ctx.freqs[1] - ctx.freqs[0]
+    return ctx.freqs[peak] + np.clip(offset, -0.5, 0.5) * df
+
+@register_feature('hjorth_activity', needs=('time',), description='variance (µV²)')
+def _hjorth_activity(ctx):
+    return ctx.time_stats()[0]
+
+@register_feature('hjorth_mobility', needs=('time',),
+                  description='sqrt(var(dx) / var(x)), mean frequency per sample')
+def _hjorth_mobility(ctx):
+    var_x, var_dx, _ = ctx.time_stats()
+    return np.sqrt(var_dx / np.maximum(var_x, _TINY))
+
+@register_feature('hjorth_complexity', needs=('time',),
+                  description='mobility of dx / mobility of x (1 for a sine)')
+def _hjorth_complexity(ctx):
+    var_x, var_dx, var_ddx = ctx.time_stats()
+    var_dx = np.maximum(var_dx, _TINY)
+    return np.sqrt(var_ddx / var_dx) / np.sqrt(var_dx / np.maximum(var_x, _TINY))
+
+class FeatureSet:
+    def __init__(self, names=None, fs=None, config=None):
+        """
+        Args:
+            names: registered feature names, in vector order
+                (default: config.FEATURES)
+            fs: sampling rate (default: config.SAMPLING_RATE)
+            config: SessionConfig (default: global Config)
+
+        Raises:
+            ValueError: unknown or repeated names
+        """
+        config = config or Config
+        self.config = config
+        self.fs = fs or config.SAMPLING_RATE
+        self.names = tuple(names or config.FEATURES)
+        unknown = [name for name in self.names if name not in FEATURES]
+        if unknown:
+            raise ValueError(f"Unknown features: {', '.join(unknown)} "
+                             f"(registered: {', '.join(FEATURES)})")
+        if len(set(self.names)) != len(self.names):
+            raise ValueError(f"Repeated features in {self.names}")
+        self.features = [FEATURES[name] for name in self.names]
+        self.needs = {need for feature in self.features for need in feature.needs}
+
+    def __len__(self):
+        return len(self.names)
+
+    def index(self, name):
+        """Position of a feature in the vector, None if not in the set"""
+        return self.names.index(name) if name in self.names else None
+
+    def compute(self, freqs, psd, signal=None):
+        """
+        All features of the set from one spectrum
+
+        Args:
+            freqs: (n_freqs,) Hz
+            psd: (..., n_freqs) one-sided PSD of each window
+            signal: (..., n_samples) the filtered windows the PSD came from,
+                for 'time' features (None = derive them from the PSD)
+
+        Returns:
+            (..., n_features)
+        """
+        ctx = _Context(self, np.asarray(freqs), np.asarray(psd),
+                       None if signal is None else np.asarray(signal, dtype=float))
+        return np.stack([feature.compute(ctx) for feature in self.features], axis=-1)
+
+def schema_path(model_path):
+    """Sidecar holding the feature schema of a pickled model"""
+    model_path = Path(model_path)
+    return model_path.with_name(model_path.name + '.features.json')
+
+def save_schema(model_path, names):
+    """Write the feature names a model was trained on next to it (atomic)"""
+    path = schema_path(model_path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump({'feature_schema': list(names)}, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+def load_schema(model_path):
+    """
+    Returns:
+        tuple or None: feature names saved next to a model, None if absent
+    """
+    path = schema_path(model_path)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return tuple(json.load(f)['feature_schema'])
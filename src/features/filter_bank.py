@@ -0,0 +1,215 @@
+"""
+Filter-bank band power engine (FEATURE_ENGINE = 'filterbank')
+
+Each band (MU_BAND, BETA_BAND) gets a causal Butterworth band-pass run on
+the raw stream with carried filter state. The squared outputs go into a
+window-long ring with a running sum, so the mean-square envelope over the
+last window is updated in O(1) per sample. Band power is therefore
+available at every sample, not only when a window completes. There is no
+Welch PSD and no per-window filtering.
+
+Powers are divided by each filter's equivalent noise bandwidth, so they are
+mean PSD in µV²/Hz like BandPowerExtractor's Welch features, and they track
+them closely (see benchmarks/bench_filter_bank.py). They are not
+identical, so a model must be trained with the engine it runs with.
+"""
+from functools import lru_cache
+import numpy as np
+from scipy.signal import butter, sosfilt, sosfilt_zi, sosfreqz
+from config.settings import Config
+
+@lru_cache(maxsize=32)
+def design_band(low, high, fs, order):
+    """
+    Band-pass design shared by every session with these parameters
+
+    Returns:
+        tuple: (sos, enbw) where enbw is the equivalent noise bandwidth in
+            Hz (integral of |H|² over 0..fs/2), so mean square / enbw is
+            the mean PSD inside the band
+    """
+    sos = butter(order, [low, high], btype='band', output='sos', fs=fs)
+    freqs, response = sosfreqz(sos, worN=8192, fs=fs)
+    enbw = float(np.sum(np.abs(response) ** 2) * (freqs[1] - freqs[0]))
+    return sos, enbw
+
+class FilterBankBandPower:
+    FEATURE_NAMES = ('mu_power', 'beta_power')
+
+    def __init__(self, window_size=None, config=None):
+        """
+        Args:
+            window_size: samples averaged (default: config.WINDOW_SAMPLES)
+            config: SessionConfig (default: global Config)
+
+        Raises:
+            ValueError: if config.FEATURES is not (mu_power, beta_power)
+        """
+        config = config or Config
+        if tuple(config.FEATURES) != self.FEATURE_NAMES:
+            raise ValueError("The 'filterbank' engine computes mu_power and beta_power "
+                             f"only, not FEATURES={config.FEATURES}")
+        self.fs = config.SAMPLING_RATE
+        self.window_size = window_size or config.WINDOW_SAMPLES
+        # Per-sample powers kept for power_at(), as long as the spectrogram ring
+        self.history_size = max(int(config.STFT_RING_SECONDS * self.fs), self.window_size)
+        designs = [design_band(float(low), float(high), float(self.fs), config.FILTERBANK_ORDER)
+                   for low, high in (config.MU_BAND, config.BETA_BAND)]
+        self.sos = [sos for sos, _ in designs]
+        # (b0, b1, b2, a1, a2) per section for the per-sample path
+        self._sections = [[(b0, b1, b2, a1, a2) for b0, b1, b2, _, a1, a2 in sos.tolist()]
+                          for sos in self.sos]
+        self.enbw = np.array([enbw for _, enbw in designs])
+        self._inverse_enbw = (1.0 / self.enbw).tolist()
+        self.reset()
+
+    def reset(self):
+        """Forget the stream (filter state, window and power history)"""
+        n_bands = len(self.sos)
+        self.sample_count = 0
+        # Plain lists so add_sample() runs on Python floats
+        self._zi = [[(0.0, 0.0)] * len(sos) for sos in self.sos]
+        self._ring = [[0.0] * self.window_size for _ in range(n_bands)]  # Squared outputs
+        self._sum = [0.0] * n_bands
+        # Band power after each of the last history_size samples
+        self._history = np.zeros((self.history_size, n_bands))
+
+    def _resum(self):
+        """Recompute the running sums once per window (no float drift over days)"""
+        self._sum = [sum(ring) for ring in self._ring]
+
+    def add_sample(self, x):
+        """Add one raw sample, O(1); returns the band powers after it, (n_bands,)"""
+        x = float(x)
+        i = self.sample_count
+        size = self.window_size
+        pos = i % size
+        scale = 1.0 / min(i + 1, size)
+        ring, sums, powers = self._ring, self._sum, []
+        for band, sections in enumerate(self._sections):
+            # Same transposed direct-form II cascade as sosfilt, on plain floats
+            zi = self._zi[band]
+            y = x
+            for k, (b0, b1, b2, a1, a2) in enumerate(sections):
+                z0, z1 = zi[k]
+                out = b0 * y + z0
+                zi[k] = (b1 * y - a1 * out + z1, b2 * y - a2 * out)
+                y = out
+            square = y * y
+            total = sums[band] + square - ring[band][pos]
+            sums[band] = total
+            ring[band][pos] = square
+            powers.append(max(total, 0.0) * scale * self._inverse_enbw[band])
+        self.sample_count = i + 1
+        if pos == size - 1:
+            self._resum()
+        self._history[i % self.history_size] = powers
+        return np.array(powers)
+
+    def add_samples(self, samples):
+        """
+        Add a chunk of raw samples
+
+        Returns:
+            (n, n_bands) band power (µV²/Hz) after every sample
+        """
+        samples = np.asarray(samples, dtype=float)
+        n = len(samples)
+        squared = np.empty((len(self.sos), n))
+        for band, sos in enumerate(self.sos):
+            filtered, zi = sosfilt(sos, samples, zi=np.array(self._zi[band]))
+            self._zi[band] = [tuple(z) for z in zi.tolist()]
+            squared[band] = filtered * filtered
+
+        powers = np.empty((n, len(self.sos)))
+        size = self.window_size
+        sum_ = np.array(self._sum)
+        for start in range(0, n, size):
+            piece = squared[:, start:start + size]
+            k = piece.shape[1]
+            pos = self.sample_count % size
+            # Ring positions pos.. wrap at most once
+            first = min(k, size - pos)
+            leaving = np.array([ring[pos:pos + first] + ring[:k - first] for ring in self._ring])
+            for ring, new in zip(self._ring, piece.tolist()):
+                ring[pos:pos + first] = new[:first]
+                ring[:k - first] = new[first:]
+            # Sliding sum: add the new squares, drop the ones leaving the window
+            sums = sum_[:, None] + np.cumsum(piece - leaving, axis=1)
+            filled = np.minimum(self.sample_count + np.arange(1, k + 1), size)
+            powers[start:start + k] = (np.maximum(sums, 0.0) / filled / self.enbw[:, None]).T
+            self._history[(self.sample_count + np.arange(k)) % self.history_size] = \
+                powers[start:start + k]
+            wrapped = pos + k >= size
+            self.sample_count += k
+            if wrapped:
+                self._resum()
+                sum_ = np.array(self._sum)
+            else:
+                sum_ = sums[:, -1]
+        self._sum = sum_.tolist()
+        return powers
+
+    def power(self):
+        """Band powers after the newest sample, (n_bands,)"""
+        return self.power_at(self.sample_count)
+
+    def power_at(self, end):
+        """
+        Band powers of the window ending just before stream sample end
+
+        Raises:
+            IndexError: if end is older than the last history_size samples
+        """
+        oldest = max(self.sample_count - self.history_size, 0) + 1
+        if not oldest <= end <= self.sample_count:
+            raise IndexError(f"No band power for sample {end} (have {oldest}..{self.sample_count})")
+        return self._history[(end - 1) % self.history_size].copy()
+
+    def _filter_offline(self, signals):
+        """Squared band outputs (n_bands, ..., n_samples), filters in steady state at the start"""
+        signals = np.asarray(signals, dtype=float)
+        squared = []
+        for sos in self.sos:
+            zi = sosfilt_zi(sos).reshape((len(sos),) + (1,) * (signals.ndim - 1) + (2,))
+            filtered, _ = sosfilt(sos, signals, axis=-1, zi=zi * signals[..., :1][None])
+            squared.append(filtered * filtered)
+        return np.stack(squared)
+
+    def extract(self, windows):
+        """
+        Band powers of stand-alone windows (no stream history)
+
+        Filters start in steady state for each window's first sample, then
+        the mean square over the whole window is taken.
+
+        Args:
+            windows: (..., n_samples)
+
+        Returns:
+            (..., n_bands) µV²/Hz
+        """
+        squared = self._filter_offline(windows)
+        return np.moveaxis(squared.mean(axis=-1), 0, -1) / self.enbw
+
+    def window_powers(self, signals, step):
+        """
+        Band powers at every window end of whole recordings, as the stream
+        gives them (filters run through each signal, not per window)
+
+        Args:
+            signals: (..., n_samples), e.g. stacked trials
+            step: samples between window ends; the first ends at window_size
+
+        Returns:
+            (..., n_windows, n_bands) µV²/Hz, windows as sliding_windows() cuts them
+        """
+        signals = np.asarray(signals, dtype=float)
+        size = self.window_size
+        n_windows = max((signals.shape[-1] - size) // step + 1, 0)
+        squared = self._filter_offline(signals)
+        sums = np.concatenate([np.zeros(squared.shape[:-1] + (1,)),
+                               np.cumsum(squared, axis=-1)], axis=-1)
+        ends = size + step * np.arange(n_windows)
+        powers = (sums[..., ends] - sums[..., ends - size]) / size
+        return np.moveaxis(powers, 0, -1) / self.enbw
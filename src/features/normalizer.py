@@ -1,13 +1,11 @@
 """
 Feature Normalizer for EEG features
 """
-import joblib
-from sklearn.preprocessing import StandardScaler
 import numpy as np
 
 class FeatureNormalizer:
     def __init__(self):
-        self.scaler = StandardScaler()
+        self.scaler = None  # StandardScaler, created on fit (sklearn imported lazily)
         self.is_fitted = False
 
     def fit(self, X):
@@ -17,6 +15,8 @@ class FeatureNormalizer:
         Args:
             X: (n_samples, n_features)
         """
+        from sklearn.preprocessing import StandardScaler
+        self.scaler = StandardScaler()
         self.scaler.fit(X)
         self.is_fitted = True
 
@@ -48,11 +48,13 @@ class FeatureNormalizer:
 
     def save(self, filepath):
         """Save normalizer state"""
+        import joblib
         joblib.dump(self.scaler, filepath)
         print(f"Normalizer saved to {filepath}")
 
     def load(self, filepath):
         """Load normalizer state"""
+        import joblib
         self.scaler = joblib.load(filepath)
         self.is_fitted = True
         print(f"Normalizer loaded from {filepath}")
@@ -0,0 +1,197 @@
+"""
+Streaming short-time Fourier transform of the raw stream
+
+SpectrogramRing emits one power-spectrum frame per hop into a fixed-size
+time-frequency ring. Frames are Welch segments (Hann window, mean removed,
+one-sided density, WELCH_SEGMENT long). The hop divides STEP_SAMPLES, so
+every window CircularBuffer emits starts on a frame boundary. The mean of
+the frames inside a window is then exactly scipy's Welch PSD of that window
+with the same hop. Consumers read the ring instead of running FFTs:
+- band power features (FEATURE_ENGINE = 'stft'), with the preprocessing
+  filters applied as a gain on the spectrum;
+- SignalQualityMonitor, for the share of power at the mains frequency;
+- LiveSpectrogram.
+
+Frame k covers stream samples [k * hop, k * hop + nperseg).
+"""
+import os
+from pathlib import Path
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import get_window
+from config.settings import Config
+
+def stft_hop(nperseg, step):
+    """Largest divisor of step that is at most half a segment (Welch-like overlap)"""
+    for hop in range(max(min(nperseg // 2, step), 1), 0, -1):
+        if step % hop == 0:
+            return hop
+    return 1
+
+def stft_params(config=None):
+    """
+    Returns:
+        tuple: (nperseg, hop, freqs) for the configured segment and step
+    """
+    config = config or Config
+    fs = config.SAMPLING_RATE
+    nperseg = int(config.WELCH_SEGMENT * fs)
+    return nperseg, stft_hop(nperseg, config.STEP_SAMPLES), np.fft.rfftfreq(nperseg, 1.0 / fs)
+
+def stft_frames(signal, nperseg, hop, fs):
+    """
+    Power-spectrum frames of every full segment of a signal
+
+    Args:
+        signal: (..., n_samples), e.g. one window or a batch of windows
+        nperseg: samples per frame
+        hop: samples between frame starts
+        fs: sampling rate
+
+    Returns:
+        (..., n_frames, nperseg // 2 + 1) one-sided PSD (units²/Hz), scaled
+        like scipy.signal.welch(scaling='density'); n_frames is 0 if the
+        signal is shorter than one segment
+    """
+    signal = np.asarray(signal, dtype=float)
+    n_freqs = nperseg // 2 + 1
+    if signal.shape[-1] < nperseg:
+        return np.zeros(signal.shape[:-1] + (0, n_freqs))
+    segments = sliding_window_view(signal, nperseg, axis=-1)[..., ::hop, :]
+    taper = get_window('hann', nperseg)
+    spectrum = np.fft.rfft((segments - segments.mean(axis=-1, keepdims=True)) * taper, axis=-1)
+    power = spectrum.real ** 2 + spectrum.imag ** 2
+    power *= 1.0 / (fs * np.sum(taper ** 2))
+    # One-sided: double everything but DC (and Nyquist for even nperseg)
+    power[..., 1:n_freqs - (nperseg % 2 == 0)] *= 2
+    return power
+
+class SpectrogramRing:
+    def __init__(self, seconds=None, config=None):
+        """
+        Args:
+            seconds: history kept (default: config.STFT_RING_SECONDS; at
+                least one window's frames)
+            config: SessionConfig (default: global Config)
+        """
+        config = config or Config
+        self.config = config
+        self.fs = config.SAMPLING_RATE
+        self.nperseg, self.hop, self.freqs = stft_params(config)
+        seconds = seconds or config.STFT_RING_SECONDS
+        self.capacity = max(int(seconds * self.fs / self.hop),
+                            self.frames_per_window(config.WINDOW_SAMPLES))
+        self.frames = np.zeros((self.capacity, len(self.freqs)))
+        self.reset()
+
+    def frames_per_window(self, window_samples):
+        return max((window_samples - self.nperseg) // self.hop + 1, 0)
+
+    def reset(self):
+        """Forget the stream (frame 0 starts at the next sample)"""
+        self.sample_count = 0
+        self.frame_count = 0
+        self._tail = np.zeros(0)  # Samples from the next frame start onwards
+
+    def add_sample(self, x):
+        """Add one raw sample; returns the number of frames completed (0 or 1)"""
+        return self.add_samples(np.array([x], dtype=float))
+
+    def add_samples(self, samples):
+        """
+        Add a chunk of raw samples, transforming every segment it completes
+
+        Returns:
+            int: frames completed
+        """
+        samples = np.asarray(samples, dtype=float)
+        self.sample_count += len(samples)
+        tail = np.concatenate([self._tail, samples]) if len(self._tail) else samples
+        n_new = (len(tail) - self.nperseg) // self.hop + 1 if len(tail) >= self.nperseg else 0
+        if n_new:
+            self._write(stft_frames(tail[:(n_new - 1) * self.hop + self.nperseg],
+                                    self.nperseg, self.hop, self.fs))
+            tail = tail[n_new * self.hop:]
+        self._tail = tail.copy()
+        return n_new
+
+    def _write(self, frames):
+        if len(frames) > self.capacity:
+            self.frame_count += len(frames) - self.capacity
+            frames = frames[-self.capacity:]
+        index = (self.frame_count + np.arange(len(frames))) % self.capacity
+        self.frames[index] = frames
+        self.frame_count += len(frames)
+
+    def read(self, first, last):
+        """
+        Frames first..last-1 (absolute indices), oldest first
+
+        Raises:
+            IndexError: if part of the range is no longer (or not yet) held
+        """
+        if first < max(self.frame_count - self.capacity, 0) or last > self.frame_count:
+            raise IndexError(f"Frames {first}..{last} not in ring "
+                             f"({max(self.frame_count - self.capacity, 0)}..{self.frame_count})")
+        return self.frames[np.arange(first, last) % self.capacity]
+
+    def latest(self, n_frames):
+        """Newest frames (as many as held), oldest first"""
+        last = self.frame_count
+        return self.read(max(last - n_frames, last - self.capacity, 0), last)
+
+    def window_frames(self, window_samples=None, end=None):
+        """
+        Frames lying inside a window, i.e. the segments Welch would average
+
+        Args:
+            window_samples: window length (default: config.WINDOW_SAMPLES)
+            end: stream sample index just after the window (default: now)
+
+        Returns:
+            (n_frames, n_freqs)
+        """
+        window_samples = window_samples or self.config.WINDOW_SAMPLES
+        end = self.sample_count if end is None else end
+        first = -(-(end - window_samples) // self.hop)
+        last = (end - self.nperseg) // self.hop + 1
+        return self.read(max(first, 0), max(last, 0))
+
+    def frame_times(self, first, last):
+        """Centre of each frame in seconds since the first sample"""
+        return (np.arange(first, last) * self.hop + self.nperseg / 2) / self.fs
+
+    def save(self, filepath, **metadata):
+        """
+        Write the frames held (oldest first) to .npz, atomically
+
+        Args:
+            filepath: destination, e.g. next to the raw recording
+            metadata: extra arrays/strings stored alongside
+        """
+        filepath = Path(filepath)
+        first = max(self.frame_count - self.capacity, 0)
+        tmp = filepath.with_name(f".{filepath.name}.{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            np.savez(f, frames=self.read(first, self.frame_count), first_frame=first,
+                     freqs=self.freqs, fs=self.fs, nperseg=self.nperseg, hop=self.hop,
+                     sample_count=self.sample_count, **metadata)
+        os.replace(tmp, filepath)
+
+    @staticmethod
+    def load(filepath):
+        """
+        Read frames saved by save()
+
+        Returns:
+            dict: 'frames', 'times' (frame centres, seconds), 'freqs', 'fs',
+                'nperseg', 'hop' and any metadata
+        """
+        with np.load(filepath, allow_pickle=False) as data:
+            saved = {key: data[key] for key in data.files}
+        for key in ('fs', 'nperseg', 'hop', 'first_frame', 'sample_count'):
+            saved[key] = saved[key].item()
+        first = saved['first_frame']
+        saved['times'] = ((np.arange(first, first + len(saved['frames'])) * saved['hop']
+                           + saved['nperseg'] / 2) / saved['fs'])
+        return saved
@@ -0,0 +1,280 @@
+"""
+Pickle-free model artifacts: one .npz holding arrays plus a JSON header
+
+The header records the format version, model type, training config and
+feature schema; the arrays hold normalizer statistics and model parameters.
+Loading needs NumPy only (no sklearn, no unpickling) and takes milliseconds.
+Archives are written uncompressed so every array can be memory-mapped,
+letting many sessions/processes share one copy through the page cache.
+
+Supported models: LDA and LogisticRegression (binary or multiclass) and
+binary RBF SVM with probability outputs.
+"""
+import json
+import struct
+import sys
+import time
+import zipfile
+import numpy as np
+
+FORMAT = 'neurosense-model'
+VERSION = 1
+HEADER_KEY = '__header__'
+
+# Settings that change what the features mean; stored with every artifact
+TRAINING_KEYS = ('SAMPLING_RATE', 'WINDOW_LENGTH', 'WINDOW_OVERLAP', 'BANDPASS_LOW',
+                 'BANDPASS_HIGH', 'NOTCH_FREQ', 'FILTER_ORDER', 'MU_BAND', 'BETA_BAND',
+                 'WELCH_SEGMENT', 'FEATURE_ENGINE', 'MODEL_TYPE')
+
+def _sigmoid(x):
+    out = np.empty_like(x, dtype=float)
+    positive = x >= 0
+    out[positive] = 1.0 / (1.0 + np.exp(-x[positive]))
+    e = np.exp(x[~positive])
+    out[~positive] = e / (1.0 + e)
+    return out
+
+def _softmax(x):
+    e = np.exp(x - np.max(x, axis=1, keepdims=True))
+    return e / np.sum(e, axis=1, keepdims=True)
+
+def _couple_pairwise(r):
+    """
+    libsvm's pairwise coupling (multiclass_probability) for two classes
+
+    libsvm runs its iterative solver even for k=2 and stops at a 0.0025
+    tolerance, so this reproduces its iterations rather than returning r.
+
+    Args:
+        r: (n,) P(first class) from the sigmoid
+
+    Returns:
+        (n, 2) probabilities
+    """
+    n, k = len(r), 2
+    q = np.empty((n, 2, 2))
+    q[:, 0, 0] = (1 - r) ** 2
+    q[:, 1, 1] = r ** 2
+    q[:, 0, 1] = q[:, 1, 0] = -(1 - r) * r
+    p = np.full((n, 2), 1.0 / k)
+    active = np.ones(n, dtype=bool)
+    for _ in range(100):
+        qp = np.einsum('nij,nj->ni', q, p)
+        pqp = np.sum(p * qp, axis=1)
+        active &= np.max(np.abs(qp - pqp[:, None]), axis=1) >= 0.005 / k
+        if not active.any():
+            break
+        for t in range(k):
+            diff = np.where(active, (pqp - qp[:, t]) / q[:, t, t], 0.0)
+            p[:, t] += diff
+            pqp = (pqp + diff * (diff * q[:, t, t] + 2 * qp[:, t])) / (1 + diff) ** 2
+            qp = (qp + diff[:, None] * q[:, t, :]) / (1 + diff)[:, None]
+            p /= (1 + diff)[:, None]
+    return p
+
+class ArtifactNormalizer:
+    """Drop-in for a fitted FeatureNormalizer: (X - mean) / scale"""
+    def __init__(self, mean, scale):
+        self.mean = mean
+        self.scale = scale
+        self.is_fitted = True
+
+    def normalize(self, X):
+        return (np.asarray(X, dtype=float) - self.mean) / self.scale
+
+class ArtifactClassifier:
+    """Drop-in for a trained MotorImageryClassifier, evaluated with NumPy"""
+    def __init__(self, model_type, kind, classes, params, feature_schema=None):
+        """
+        Args:
+            model_type: 'LDA', 'SVM' or 'LogisticRegression'
+            kind: 'linear' or 'rbf_svm'
+            classes: (n_classes,) labels
+            params: dict of parameter arrays (see export_artifact)
+            feature_schema: feature names the model was trained on
+        """
+        self.model_type = model_type
+        self.feature_schema = tuple(feature_schema) if feature_schema else None
+        self.kind = kind
+        self.classes = np.asarray(classes)
+        self.n_classes = len(self.classes)
+        self.params = params
+
+    def decision_function(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        p = self.params
+        if self.kind == 'linear':
+            scores = X @ p['coef'].T + p['intercept']
+            return scores.ravel() if scores.shape[1] == 1 else scores
+        sq_dist = (np.sum(X ** 2, axis=1)[:, None] + p['sv_norms'][None, :]
+                   - 2 * X @ p['support_vectors'].T)
+        kernel = np.exp(-float(p['gamma']) * np.maximum(sq_dist, 0))
+        return kernel @ p['dual_coef'] + float(p['intercept'])
+
+    def predict(self, X):
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            return self.classes[(scores > 0).astype(int)]
+        return self.classes[np.argmax(scores, axis=1)]
+
+    def predict_proba(self, X):
+        scores = self.decision_function(X)
+        if self.kind == 'rbf_svm':
+            # libsvm's Platt scaling works on the negated binary decision value
+            f = -scores * float(self.params['prob_a']) + float(self.params['prob_b'])
+            r = np.clip(_sigmoid(-f), 1e-7, 1 - 1e-7)
+            return _couple_pairwise(r)
+        if scores.ndim == 1:
+            p = _sigmoid(scores)
+            return np.column_stack([1 - p, p])
+        return _softmax(scores)
+
+def _model_params(model):
+    """
+    Returns:
+        tuple: (model_type, kind, classes, params)
+    """
+    name = type(model).__name__
+    classes = np.asarray(model.classes_)
+    if name in ('LinearDiscriminantAnalysis', 'LogisticRegression'):
+        model_type = 'LDA' if name == 'LinearDiscriminantAnalysis' else 'LogisticRegression'
+        return model_type, 'linear', classes, {
+            'coef': np.asarray(model.coef_, dtype=float),
+            'intercept': np.asarray(model.intercept_, dtype=float)
+        }
+    if name == 'SVC':
+        if model.kernel != 'rbf' or len(classes) != 2 or len(model.probA_) == 0:
+            raise ValueError("Only binary RBF SVMs fitted with probability=True are supported")
+        support_vectors = np.asarray(model.support_vectors_, dtype=float)
+        return 'SVM', 'rbf_svm', classes, {
+            'support_vectors': support_vectors,
+            'sv_norms': np.sum(support_vectors ** 2, axis=1),
+            'dual_coef': np.asarray(model.dual_coef_[0], dtype=float),
+            'intercept': np.asarray(model.intercept_[0], dtype=float),
+            'gamma': np.asarray(model._gamma, dtype=float),
+            'prob_a': np.asarray(model.probA_[0], dtype=float),
+            'prob_b': np.asarray(model.probB_[0], dtype=float)
+        }
+    raise ValueError(f"Unsupported model for artifacts: {name}")
+
+def export_artifact(filepath, classifier, normalizer=None, config=None, feature_names=None,
+                    **metadata):
+    """
+    Write a trained classifier (and normalizer) as a pickle-free artifact
+
+    Args:
+        filepath: destination .npz
+        classifier: trained MotorImageryClassifier (or bare sklearn estimator)
+        normalizer: fitted FeatureNormalizer (None = features used as is)
+        config: SessionConfig/Config the model was trained with
+        feature_names: feature schema (default: config.FEATURES)
+        **metadata: extra JSON-serializable header fields (user, accuracy, ...)
+
+    Returns:
+        dict: the header
+    """
+    from config.settings import Config
+
+    config = config or Config
+    model = getattr(classifier, 'model', classifier)
+    model_type, kind, classes, params = _model_params(model)
+
+    arrays = {'model.' + key: value for key, value in params.items()}
+    arrays['classes'] = classes
+    if normalizer is not None and normalizer.is_fitted:
+        scaler = normalizer.scaler
+        n_features = len(scaler.mean_)
+        arrays['normalizer.mean'] = np.asarray(scaler.mean_, dtype=float)
+        arrays['normalizer.scale'] = (np.asarray(scaler.scale_, dtype=float)
+                                      if scaler.scale_ is not None else np.ones(n_features))
+
+    training_config = {}
+    for key in TRAINING_KEYS:
+        value = getattr(config, key)
+        training_config[key] = list(value) if isinstance(value, tuple) else value
+
+    header = {
+        'format': FORMAT,
+        'version': VERSION,
+        'model_type': model_type,
+        'kind': kind,
+        'feature_schema': list(feature_names or config.FEATURES),
+        'training_config': training_config,
+        'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'arrays': {name: [list(a.shape), a.dtype.str] for name, a in arrays.items()}
+    }
+    if 'sklearn' in sys.modules:
+        header['sklearn_version'] = sys.modules['sklearn'].__version__
+    reserved = set(metadata) & set(header)
+    if reserved:
+        raise ValueError(f"Reserved header fields: {sorted(reserved)}")
+    header.update(metadata)
+
+    arrays[HEADER_KEY] = np.frombuffer(json.dumps(header).encode(), dtype=np.uint8)
+    with open(filepath, 'wb') as f:
+        np.savez(f, **arrays)
+    print(f"Model artifact saved to {filepath}")
+    return header
+
+def _mmap_members(filepath):
+    """Memory-map every array stored (uncompressed) in an .npz"""
+    arrays = {}
+    with zipfile.ZipFile(filepath) as archive, open(filepath, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError("Compressed artifacts cannot be memory-mapped")
+            f.seek(info.header_offset)
+            name_length, extra_length = struct.unpack('<HH', f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if np.prod(shape) == 0:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+                continue
+            arrays[name] = np.memmap(filepath, dtype=dtype, mode='r', offset=f.tell(),
+                                     shape=shape, order='F' if fortran_order else 'C')
+    return arrays
+
+def read_header(filepath):
+    """Header of an artifact without loading its arrays"""
+    with np.load(filepath, allow_pickle=False) as data:
+        return json.loads(data[HEADER_KEY].tobytes())
+
+def load_artifact(filepath, mmap=False):
+    """
+    Load an artifact with NumPy only
+
+    Args:
+        filepath: .npz written by export_artifact
+        mmap: memory-map the arrays instead of reading them
+
+    Returns:
+        tuple: (ArtifactClassifier, ArtifactNormalizer or None, header)
+    """
+    if mmap:
+        arrays = _mmap_members(filepath)
+    else:
+        with np.load(filepath, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+
+    header = json.loads(np.asarray(arrays.pop(HEADER_KEY)).tobytes())
+    if header.get('format') != FORMAT:
+        raise ValueError(f"Not a model artifact: {filepath}")
+    if header['version'] > VERSION:
+        raise ValueError(f"Artifact version {header['version']} is newer than "
+                         f"supported ({VERSION})")
+
+    params = {name[len('model.'):]: a for name, a in arrays.items() if name.startswith('model.')}
+    classifier = ArtifactClassifier(header['model_type'], header['kind'],
+                                    arrays['classes'], params, header.get('feature_schema'))
+    normalizer = None
+    if 'normalizer.mean' in arrays:
+        normalizer = ArtifactNormalizer(arrays['normalizer.mean'], arrays['normalizer.scale'])
+    return classifier, normalizer, header
+
+def is_artifact(filepath):
+    return str(filepath).endswith('.npz')
@@ -2,25 +2,57 @@
 Binary classifier for single-channel motor imagery (LEFT/RIGHT vs REST)
 """
 import numpy as np
-import joblib
-from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
-from sklearn.svm import SVC
-from sklearn.linear_model import LogisticRegression
 from config.settings import Config
 
+# sklearn and joblib are imported lazily: each estimator module pulls in a
+# large part of scipy, and a session only ever needs the one it loads.
+_MODEL_TYPES = {
+    'LinearDiscriminantAnalysis': 'LDA',
+    'SVC': 'SVM',
+    'LogisticRegression': 'LogisticRegression'
+}
+
 class MotorImageryClassifier:
-    def __init__(self, model_type=Config.MODEL_TYPE):
-        self.model_type = model_type
-        self.model = self._create_model()
-        self.n_classes = Config.N_CLASSES
+    def __init__(self, model_type=None, model=None, config=None):
+        """
+        Args:
+            model_type: 'LDA', 'SVM' or 'LogisticRegression' (default: config.MODEL_TYPE)
+            model: already fitted sklearn estimator (skips creating a new one)
+            config: SessionConfig (default: global Config)
+        """
+        config = config or Config
+        self.model_type = model_type or config.MODEL_TYPE
+        self.model = model if model is not None else self._create_model()
+        self.n_classes = config.N_CLASSES
+        self.feature_schema = None  # Feature names of a loaded model, if saved with it
+        
+    @classmethod
+    def from_file(cls, filepath, model_type=None, config=None):
+        """
+        Load a saved model without instantiating a default estimator first
+        
+        Args:
+            model_type: used if the estimator class is not one of ours
+        """
+        import joblib
+        from src.features.feature_set import load_schema
+        model = joblib.load(filepath)
+        print(f"Model loaded from {filepath}")
+        classifier = cls(_MODEL_TYPES.get(type(model).__name__, model_type), model=model,
+                         config=config)
+        classifier.feature_schema = load_schema(filepath)
+        return classifier
         
     def _create_model(self):
         """Initialize classifier"""
         if self.model_type == 'LDA':
+            from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
             return LinearDiscriminantAnalysis()
         elif self.model_type == 'SVM':
+            from sklearn.svm import SVC
             return SVC(kernel='rbf', C=1.0, gamma='scale', probability=True)
         elif self.model_type == 'LogisticRegression':
+            from sklearn.linear_model import LogisticRegression
             return LogisticRegression(max_iter=1000)
         else:
             raise ValueError(f"Unknown model type: {self.model_type}")
@@ -30,7 +62,7 @@ class MotorImageryClassifier:
         Train binary classifier
         
         Args:
-            X_train: (n_samples, 2) features [mu_power, beta_power]
+            X_train: (n_samples, n_features) features (config.FEATURES)
             y_train: (n_samples,) labels 0=REST, 1=IMAGERY
         """
         print(f"Training {self.model_type} for binary classification...")
@@ -45,7 +77,7 @@ class MotorImageryClassifier:
         Predict class
         
         Args:
-            X: (n_samples, 2) or (2,)
+            X: (n_samples, n_features) or (n_features,)
             
         Returns:
             predictions: (n_samples,) or int
@@ -67,23 +99,65 @@ class MotorImageryClassifier:
             proba[np.arange(len(pred)), pred] = 1.0
             return proba
     
-    def save(self, filepath):
-        """Save trained model"""
+    def save(self, filepath, feature_names=None):
+        """
+        Save trained model
+        
+        Args:
+            feature_names: feature schema written next to it
+                (<file>.features.json), e.g. config.FEATURES
+        """
+        import joblib
+        from src.features.feature_set import save_schema
         joblib.dump(self.model, filepath)
+        if feature_names is not None:
+            save_schema(filepath, feature_names)
+            self.feature_schema = tuple(feature_names)
         print(f"Model saved to {filepath}")
         
     def load(self, filepath):
         """Load trained model"""
+        import joblib
+        from src.features.feature_set import load_schema
         self.model = joblib.load(filepath)
+        self.model_type = _MODEL_TYPES.get(type(self.model).__name__, self.model_type)
+        self.feature_schema = load_schema(filepath)
         print(f"Model loaded from {filepath}")
 
 class ThresholdClassifier:
     """
     Simple threshold-based classifier using ERD
     (Alternative to ML models for very limited data)
+    
+    Untuned it flags IMAGERY when mu ERD < Config.ERD_THRESHOLD with a
+    heuristic confidence. ThresholdTuner fits the feature, direction and
+    threshold per user from calibration data, along with the REST baseline
+    the ERD is computed against and a calibrated confidence mapping.
     """
-    def __init__(self, mu_threshold=Config.ERD_THRESHOLD):
-        self.mu_threshold = mu_threshold
+    def __init__(self, mu_threshold=None, config=None, feature=0, above=False,
+                 baseline=None, calibration=None):
+        """
+        Args:
+            mu_threshold: ERD threshold (default: config.ERD_THRESHOLD)
+            config: SessionConfig (default: global Config)
+            feature: ERD thresholded, 0 = mu, 1 = beta
+            above: IMAGERY when ERD > threshold (default: ERD < threshold)
+            baseline: (mu_power, beta_power) REST baseline the pipeline
+                computes ERD against (None = the pipeline's own baseline)
+            calibration: (slope, intercept) mapping the margin past the
+                threshold to P(IMAGERY) (None = heuristic confidence)
+        """
+        self.mu_threshold = (mu_threshold if mu_threshold is not None
+                             else (config or Config).ERD_THRESHOLD)
+        self.feature = feature
+        self.above = above
+        self.baseline = None if baseline is None else tuple(float(b) for b in baseline)
+        self.calibration = None if calibration is None else tuple(float(c) for c in calibration)
+        
+    def margin(self, erd):
+        """Signed distance past the threshold (> 0 = IMAGERY)"""
+        value = erd[self.feature] if isinstance(erd, np.ndarray) else erd
+        return value - self.mu_threshold if self.above else self.mu_threshold - value
         
     def predict(self, erd):
         """
@@ -95,21 +169,49 @@ class ThresholdClassifier:
         Returns:
             int: 0=REST, 1=IMAGERY
         """
-        mu_erd = erd[0] if isinstance(erd, np.ndarray) else erd
-        
-        # Negative ERD (power decrease) = motor imagery
-        if mu_erd < self.mu_threshold:
+        # Negative ERD (power decrease) = motor imagery, unless tuned otherwise
+        if self.margin(erd) > 0:
             return 1  # IMAGERY detected
         else:
             return 0  # REST
     
     def predict_proba(self, erd):
-        """Simulate probabilities"""
+        """Calibrated probabilities when tuned, simulated otherwise"""
+        if self.calibration is not None:
+            slope, intercept = self.calibration
+            p = 1.0 / (1.0 + np.exp(-(slope * self.margin(erd) + intercept)))
+            return np.array([[1 - p, p]])
+        
         pred = self.predict(erd)
-        confidence = abs(erd[0]) / abs(self.mu_threshold)
+        value = erd[self.feature] if isinstance(erd, np.ndarray) else erd
+        confidence = abs(value) / abs(self.mu_threshold)
         confidence = min(max(confidence, 0.5), 0.95)
         
         if pred == 1:
             return np.array([[1-confidence, confidence]])
         else:
             return np.array([[confidence, 1-confidence]])
+    
+    def save(self, filepath, **metadata):
+        """Save as JSON (a handful of numbers, no pickle)"""
+        import json
+        state = {'threshold': self.mu_threshold, 'feature': self.feature,
+                 'above': self.above, 'baseline': self.baseline,
+                 'calibration': self.calibration, **metadata}
+        with open(filepath, 'w') as f:
+            json.dump(state, f, indent=2)
+        print(f"Threshold model saved to {filepath}")
+    
+    @classmethod
+    def from_file(cls, filepath, config=None):
+        import json
+        with open(filepath) as f:
+            state = json.load(f)
+        print(f"Threshold model loaded from {filepath}")
+        return cls(state['threshold'], config=config, feature=state['feature'],
+                   above=state['above'], baseline=state['baseline'],
+                   calibration=state['calibration'])
+
+def is_threshold_model(filepath):
+    """Threshold models are saved as .json"""
+    return str(filepath).endswith('.json')
@@ -0,0 +1,287 @@
+"""
+Micro-batching inference service for many concurrent sessions
+
+Sessions submit single feature vectors; a background thread gathers them for
+up to max_delay_ms (or max_batch rows), then runs one vectorized
+normalize + predict + predict_proba per model. Usable in-process (submit()
+returns a Future) or from other processes through InferenceServer /
+InferenceClient on a Unix socket.
+"""
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+import numpy as np
+from src.monitoring.latency import LatencyHistogram
+from config.settings import Config
+
+class BatchInferenceService:
+    def __init__(self, max_batch=Config.INFERENCE_MAX_BATCH,
+                 max_delay_ms=Config.INFERENCE_BATCH_DELAY_MS):
+        """
+        Args:
+            max_batch: rows per batch before it is flushed early
+            max_delay_ms: how long the first request of a batch may wait
+        """
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self.models = {}       # model_key -> (classifier, normalizer)
+        self.batch_stats = {}  # batch size -> {'batches', 'compute', 'latency'}
+        self._stats_lock = threading.Lock()  # batch_stats is written by the worker thread
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._submit_lock = threading.Lock()  # No request queued behind stop()'s drain
+        self._thread = None
+
+    def register_model(self, model_key, classifier, normalizer=None):
+        """
+        Args:
+            model_key: hashable key used by submit()
+            classifier: object with vectorized predict/predict_proba
+            normalizer: FeatureNormalizer (None = features used as is)
+        """
+        self.models[model_key] = (classifier, normalizer)
+
+    def unregister_model(self, model_key):
+        """Forget a model; requests still queued for it fail with KeyError"""
+        self.models.pop(model_key, None)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the worker thread; requests still queued fail with RuntimeError"""
+        with self._submit_lock:
+            self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[2].set_running_or_notify_cancel():
+                item[2].set_exception(RuntimeError("Inference service stopped"))
+
+    def submit(self, model_key, features):
+        """
+        Queue one feature vector
+
+        Returns:
+            Future: resolves to (prediction, confidence); fails with
+                RuntimeError if the service is stopped
+        """
+        future = Future()
+        with self._submit_lock:
+            if self._stop.is_set():
+                future.set_exception(RuntimeError("Inference service stopped"))
+                return future
+            self._queue.put((model_key, np.asarray(features, dtype=float), future,
+                             time.perf_counter()))
+        return future
+
+    def predict(self, model_key, features, timeout=None):
+        """
+        Blocking convenience wrapper around submit()
+
+        Raises:
+            TimeoutError: no result within timeout seconds (the request is
+                cancelled)
+        """
+        future = self.submit(model_key, features)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def predict_batch(self, model_key, X):
+        """
+        Run one vectorized inference (no queueing)
+
+        Args:
+            X: (n_samples, n_features) raw features
+
+        Returns:
+            tuple: (predictions (n,), confidences (n,))
+        """
+        classifier, normalizer = self.models[model_key]
+        if normalizer is not None:
+            X = normalizer.normalize(X)
+        predictions = np.asarray(classifier.predict(X))
+        proba = classifier.predict_proba(X)
+        confidences = proba[np.arange(len(predictions)), predictions]
+        return predictions, confidences
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = first[3] + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        groups = {}
+        for item in batch:
+            # Requests cancelled after a timeout are skipped
+            if item[2].set_running_or_notify_cancel():
+                groups.setdefault(item[0], []).append(item)
+
+        for model_key, items in groups.items():
+            t0 = time.perf_counter()
+            try:
+                predictions, confidences = self.predict_batch(
+                    model_key, np.vstack([item[1] for item in items]))
+            except Exception as e:
+                for item in items:
+                    item[2].set_exception(e)
+                continue
+            done = time.perf_counter()
+
+            with self._stats_lock:
+                stats = self.batch_stats.setdefault(len(items), {
+                    'batches': 0, 'compute': LatencyHistogram(), 'latency': LatencyHistogram()
+                })
+                stats['batches'] += 1
+                stats['compute'].record((done - t0) * 1000)
+                stats['latency'].record_many([(done - item[3]) * 1000 for item in items])
+
+            for item, prediction, confidence in zip(items, predictions, confidences):
+                item[2].set_result((int(prediction), float(confidence)))
+
+    def report(self):
+        """
+        Per-batch-size throughput and request latency
+
+        Returns:
+            dict: batch size -> {'batches', 'requests', 'throughput_per_s',
+                  'compute_ms_mean', 'latency_ms_p50', 'latency_ms_p99'}
+        """
+        report = {}
+        # Snapshot under the lock: the worker thread adds sizes and records
+        with self._stats_lock:
+            for size, stats in sorted(self.batch_stats.items()):
+                compute_s = stats['compute'].total / 1000.0
+                requests = stats['latency'].count
+                report[size] = {
+                    'batches': stats['batches'],
+                    'requests': requests,
+                    'throughput_per_s': requests / compute_s if compute_s else 0.0,
+                    'compute_ms_mean': stats['compute'].mean(),
+                    'latency_ms_p50': stats['latency'].percentile(50),
+                    'latency_ms_p99': stats['latency'].percentile(99)
+                }
+        return report
+
+    def print_report(self):
+        print(f"{'batch':>6s} {'batches':>8s} {'req/s':>10s} {'P50 ms':>8s} {'P99 ms':>8s}")
+        for size, row in self.report().items():
+            print(f"{size:6d} {row['batches']:8d} {row['throughput_per_s']:10.0f} "
+                  f"{row['latency_ms_p50']:8.2f} {row['latency_ms_p99']:8.2f}")
+
+# Wire format (little-endian):
+#   request:  uint16 key length, key (utf-8), uint16 n_features, n_features float64
+#   response: int32 prediction, float64 confidence  (prediction -1 on error)
+_LEN = struct.Struct('<H')
+_RESPONSE = struct.Struct('<id')
+
+def _recv_exact(sock, n):
+    data = b''
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        data += chunk
+    return data
+
+class _InferenceHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        service = self.server.service
+        while True:
+            try:
+                key_len, = _LEN.unpack(_recv_exact(self.request, _LEN.size))
+                model_key = _recv_exact(self.request, key_len).decode()
+                n_features, = _LEN.unpack(_recv_exact(self.request, _LEN.size))
+                features = np.frombuffer(_recv_exact(self.request, 8 * n_features), dtype='<f8')
+            except ConnectionError:
+                return
+
+            try:
+                prediction, confidence = service.predict(model_key, features,
+                                                         self.server.request_timeout)
+            except Exception:
+                prediction, confidence = -1, 0.0
+            self.request.sendall(_RESPONSE.pack(prediction, confidence))
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serve a BatchInferenceService on a Unix socket (one thread per client)"""
+    daemon_threads = True
+
+    def __init__(self, service, socket_path, timeout_ms=Config.INFERENCE_TIMEOUT_MS):
+        """
+        Args:
+            service: BatchInferenceService (started)
+            socket_path: Unix socket to listen on
+            timeout_ms: longest wait for a result; after it the client gets
+                the error response
+        """
+        self.service = service
+        self.request_timeout = timeout_ms / 1000.0
+        self.socket_path = str(socket_path)
+        super().__init__(self.socket_path, _InferenceHandler)
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+class InferenceClient:
+    def __init__(self, socket_path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(str(socket_path))
+
+    def predict(self, model_key, features):
+        """
+        Returns:
+            tuple: (prediction, confidence)
+        """
+        key = model_key.encode()
+        features = np.ascontiguousarray(features, dtype='<f8')
+        self.sock.sendall(_LEN.pack(len(key)) + key + _LEN.pack(len(features))
+                          + features.tobytes())
+        prediction, confidence = _RESPONSE.unpack(_recv_exact(self.sock, _RESPONSE.size))
+        if prediction < 0:
+            raise RuntimeError(f"Inference failed for model {model_key!r}")
+        return prediction, confidence
+
+    def close(self):
+        self.sock.close()
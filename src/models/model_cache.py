@@ -0,0 +1,103 @@
+"""
+Keyed LRU cache for loaded, read-only model artifacts shared across sessions
+"""
+import os
+import threading
+from collections import OrderedDict
+from config.settings import Config
+
+class ModelCache:
+    def __init__(self, max_entries=Config.MODEL_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, loader):
+        """
+        Return the cached value for key, loading it on a miss
+
+        Args:
+            key: hashable cache key
+            loader: zero-argument callable producing the value
+
+        Returns:
+            cached (shared) value - callers must not mutate it
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = loader()
+
+        with self._lock:
+            # Another thread may have loaded the same key meanwhile
+            value = self._entries.setdefault(key, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def _file_key(self, kind, filepath):
+        # Modification time in the key picks up retrained files automatically
+        filepath = os.path.abspath(filepath)
+        return (kind, filepath, os.path.getmtime(filepath))
+
+    def load_classifier(self, filepath, model_type=Config.MODEL_TYPE):
+        """Shared MotorImageryClassifier (or tuned ThresholdClassifier, .json) from filepath"""
+        from src.models.classifier import (MotorImageryClassifier, ThresholdClassifier,
+                                           is_threshold_model)
+
+        if is_threshold_model(filepath):
+            return self.get(self._file_key('threshold', filepath),
+                            lambda: ThresholdClassifier.from_file(filepath))
+        return self.get(self._file_key('classifier', filepath),
+                        lambda: MotorImageryClassifier.from_file(filepath, model_type))
+
+    def load_normalizer(self, filepath):
+        """Shared FeatureNormalizer loaded from filepath"""
+        from src.features.normalizer import FeatureNormalizer
+
+        def loader():
+            normalizer = FeatureNormalizer()
+            normalizer.load(filepath)
+            return normalizer
+
+        return self.get(self._file_key('normalizer', filepath), loader)
+
+    def load_artifact(self, filepath, mmap=True):
+        """
+        Shared (classifier, normalizer) from a pickle-free .npz artifact
+
+        Arrays are memory-mapped by default so every cache (and process)
+        mapping the same file shares its pages.
+        """
+        from src.models.artifact import load_artifact
+
+        return self.get(self._file_key('artifact', filepath),
+                        lambda: load_artifact(filepath, mmap=mmap)[:2])
+
+    def invalidate(self, key=None):
+        """Drop one key (or everything)"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
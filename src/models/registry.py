@@ -0,0 +1,226 @@
+"""
+Versioned per-user model registry
+
+Layout under the root (default: MODEL_DIR/registry):
+
+    index.json                      user/channel -> versions and active version
+    <user>/<channel>/v0001.npz      pickle-free artifacts (see artifact.py)
+
+The index is rewritten atomically (temp file + os.replace) so readers never
+see a partial file; version numbers are claimed by exclusive file creation,
+so concurrent trainers cannot overwrite each other. Read-modify-write of the
+index holds an flock on index.lock, so trainers in different processes
+cannot drop each other's entries (where fcntl is missing, only threads of
+one process are serialized). Loaded models go
+through a ModelCache (LRU), and swap_into()/watch() hot-swap a version into
+a running RealtimeBCIPipeline.
+"""
+import json
+import os
+import re
+import threading
+from pathlib import Path
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
+from config.settings import Config
+from src.models.artifact import export_artifact
+from src.models.model_cache import ModelCache
+
+INDEX_NAME = 'index.json'
+LOCK_NAME = 'index.lock'
+
+def _slug(name):
+    return re.sub(r'[^\w.-]', '_', str(name))
+
+class ModelRegistry:
+    def __init__(self, root=None, cache=None, config=None):
+        """
+        Args:
+            root: registry directory (default: config.MODEL_DIR / 'registry')
+            cache: ModelCache for loaded artifacts (default: a private one of
+                config.MODEL_CACHE_SIZE entries)
+            config: SessionConfig (default: global Config)
+        """
+        self.config = config or Config
+        self.root = Path(root or self.config.MODEL_DIR / 'registry')
+        self.cache = cache or ModelCache(self.config.MODEL_CACHE_SIZE)
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self):
+        return self.root / INDEX_NAME
+
+    def _key(self, user, channel):
+        return f"{user}/{channel or self.config.CHANNEL_NAME}"
+
+    def read_index(self):
+        """
+        Returns:
+            dict: 'models' -> {'<user>/<channel>': {'active': int, 'versions': [entry, ...]}}
+        """
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'models': {}}
+
+    def _write_index(self, index):
+        tmp = self.index_path.with_name(f".{INDEX_NAME}.{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp, self.index_path)
+
+    def _update_index(self, update):
+        """Read, update and rewrite the index, exclusive across threads and processes"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.root / LOCK_NAME, 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)  # Released when the file closes
+            index = self.read_index()
+            update(index)
+            self._write_index(index)
+
+    def register(self, user, classifier, normalizer=None, channel=None, config=None,
+                 activate=True, **metadata):
+        """
+        Store a trained model as the next version for user/channel
+
+        Args:
+            user: user name
+            classifier, normalizer: trained model and its fitted normalizer
+            channel: electrode (default: config.CHANNEL_NAME)
+            config: settings the model was trained with (default: registry config)
+            activate: make it the active version
+            **metadata: extra fields for the artifact header and index entry
+
+        Returns:
+            int: the new version number
+        """
+        channel = channel or self.config.CHANNEL_NAME
+        directory = self.root / _slug(user) / _slug(channel)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        version = max(self._disk_versions(directory), default=0) + 1
+        while True:
+            path = directory / f"v{version:04d}.npz"
+            try:
+                open(path, 'x').close()  # Claim the version number
+                break
+            except FileExistsError:
+                version += 1
+
+        header = export_artifact(path, classifier, normalizer, config=config or self.config,
+                                 user=user, channel=channel, model_version=version,
+                                 **metadata)
+        entry = {
+            'version': version,
+            'path': str(path.relative_to(self.root)),
+            'model_type': header['model_type'],
+            'created': header['created']
+        }
+        entry.update(metadata)
+
+        def update(index):
+            record = index['models'].setdefault(self._key(user, channel),
+                                                {'active': None, 'versions': []})
+            record['versions'].append(entry)
+            record['versions'].sort(key=lambda e: e['version'])
+            if activate:
+                record['active'] = version
+
+        self._update_index(update)
+        print(f"Registered {user}/{channel} v{version}")
+        return version
+
+    @staticmethod
+    def _disk_versions(directory):
+        return [int(p.stem[1:]) for p in directory.glob('v*.npz') if p.stem[1:].isdigit()]
+
+    def users(self):
+        return sorted({key.split('/')[0] for key in self.read_index()['models']})
+
+    def versions(self, user, channel=None):
+        """Index entries for user/channel, oldest first"""
+        record = self.read_index()['models'].get(self._key(user, channel))
+        return record['versions'] if record else []
+
+    def active_version(self, user, channel=None):
+        record = self.read_index()['models'].get(self._key(user, channel))
+        return record['active'] if record else None
+
+    def activate(self, user, version, channel=None):
+        """Make an existing version active (e.g. roll back)"""
+        key = self._key(user, channel)
+
+        def update(index):
+            record = index['models'].get(key)
+            if record is None or all(e['version'] != version for e in record['versions']):
+                raise KeyError(f"No version {version} for {key}")
+            record['active'] = version
+
+        self._update_index(update)
+
+    def path(self, user, channel=None, version=None):
+        """
+        Artifact path of a version (default: the active one)
+
+        Raises:
+            KeyError: unknown user/channel/version
+        """
+        key = self._key(user, channel)
+        record = self.read_index()['models'].get(key)
+        if record is None:
+            raise KeyError(f"No models registered for {key}")
+        version = version or record['active']
+        for entry in record['versions']:
+            if entry['version'] == version:
+                return self.root / entry['path']
+        raise KeyError(f"No version {version} for {key}")
+
+    def load(self, user, channel=None, version=None):
+        """
+        Returns:
+            tuple: (classifier, normalizer, version), shared through the cache
+        """
+        path = self.path(user, channel, version)
+        classifier, normalizer = self.cache.load_artifact(path)
+        return classifier, normalizer, int(path.stem[1:])
+
+    def swap_into(self, pipeline, user, channel=None, version=None, warmup_windows=None):
+        """
+        Load a version (default: active) and hot-swap it into a pipeline
+
+        Returns:
+            int: the version now serving
+        """
+        classifier, normalizer, version = self.load(user, channel, version)
+        pipeline.swap_model(classifier, normalizer, version=version,
+                            warmup_windows=warmup_windows)
+        print(f"Swapped in {self._key(user, channel)} v{version}")
+        return version
+
+    def watch(self, pipeline, user, channel=None, interval=2.0):
+        """
+        Follow the active version in a background thread
+
+        Polls the index every interval seconds and swaps newly activated
+        versions (including rollbacks) into the pipeline.
+
+        Returns:
+            threading.Event: set it to stop watching
+        """
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                try:
+                    active = self.active_version(user, channel)
+                    if active is not None and active != pipeline.model_version:
+                        self.swap_into(pipeline, user, channel, active)
+                except Exception as e:
+                    print(f"Warning: model swap failed: {e}")
+
+        threading.Thread(target=loop, name=f"registry-watch-{user}", daemon=True).start()
+        return stop
@@ -0,0 +1,320 @@
+"""
+Out-of-core training from a DatasetStore with bounded memory
+
+Training reads the store in chunks of rows and only keeps small, mergeable
+statistics, so thousands of sessions can be fitted with O(chunk) RAM and
+split over worker processes whose results are merged exactly:
+
+    ClassMoments        per-class count, mean and scatter (Chan et al. merge).
+                        One pass gives the StandardScaler and LDA.
+    LogisticNewtonStep  gradient and Hessian sums of the L2-regularized log
+                        loss; one pass per Newton iteration converges to
+                        sklearn's LogisticRegression solution.
+
+The fitted sklearn estimators are assembled from these statistics, so the
+result saves, exports and predicts like any MotorImageryClassifier.
+SVM has no incremental form and is rejected.
+"""
+import numpy as np
+from config.settings import Config
+
+STREAMING_MODELS = ('LDA', 'LogisticRegression')
+
+class ClassMoments:
+    """Mergeable per-class count, mean and scatter matrix"""
+    def __init__(self):
+        self.stats = {}  # label -> [n, mean (d,), scatter (d, d)]
+
+    def _add(self, label, n, mean, scatter):
+        if label not in self.stats:
+            self.stats[label] = [n, mean, scatter]
+            return
+        n_a, mean_a, scatter_a = self.stats[label]
+        total = n_a + n
+        delta = mean - mean_a
+        self.stats[label] = [total, mean_a + delta * (n / total),
+                             scatter_a + scatter + np.outer(delta, delta) * (n_a * n / total)]
+
+    def update(self, X, y):
+        """Add a chunk: X (n, d), y (n,)"""
+        for label in np.unique(y):
+            Xc = X[y == label]
+            mean = Xc.mean(axis=0)
+            centered = Xc - mean
+            self._add(int(label), len(Xc), mean, centered.T @ centered)
+
+    def merge(self, other):
+        for label, (n, mean, scatter) in other.stats.items():
+            self._add(label, n, mean, scatter)
+        return self
+
+    @property
+    def classes(self):
+        return np.array(sorted(self.stats))
+
+    @property
+    def n_samples(self):
+        return sum(n for n, _, _ in self.stats.values())
+
+    def pooled(self):
+        """
+        Returns:
+            tuple: (n, mean (d,), scatter (d, d)) over all classes
+        """
+        total = ClassMoments()
+        for n, mean, scatter in self.stats.values():
+            total._add(0, n, mean, scatter)
+        return tuple(total.stats[0])
+
+    def to_normalizer(self):
+        """FeatureNormalizer with a StandardScaler fitted from the pooled moments"""
+        from sklearn.preprocessing import StandardScaler
+        from src.features.normalizer import FeatureNormalizer
+
+        n, mean, scatter = self.pooled()
+        var = np.diag(scatter) / n
+        scaler = StandardScaler()
+        scaler.mean_ = mean
+        scaler.var_ = var
+        scaler.scale_ = np.where(var > np.finfo(float).eps, np.sqrt(var), 1.0)
+        scaler.n_samples_seen_ = n
+        scaler.n_features_in_ = len(mean)
+
+        normalizer = FeatureNormalizer()
+        normalizer.scaler = scaler
+        normalizer.is_fitted = True
+        return normalizer
+
+    def to_lda(self, mean=None, scale=None):
+        """
+        LinearDiscriminantAnalysis (lsqr solver, no shrinkage) from the moments
+
+        Args:
+            mean, scale: standardization to fold in (the model then expects
+                (X - mean) / scale, i.e. normalized features)
+        """
+        from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
+
+        classes = self.classes
+        d = len(next(iter(self.stats.values()))[1])
+        mean = np.zeros(d) if mean is None else mean
+        scale = np.ones(d) if scale is None else scale
+
+        counts = np.array([self.stats[c][0] for c in classes], dtype=float)
+        means = np.array([(self.stats[c][1] - mean) / scale for c in classes])
+        scatter = sum(self.stats[c][2] for c in classes) / np.outer(scale, scale)
+        priors = counts / counts.sum()
+        covariance = scatter / counts.sum()
+
+        coef = np.linalg.lstsq(covariance, means.T, rcond=None)[0].T
+        intercept = -0.5 * np.sum(means * coef, axis=1) + np.log(priors)
+        if len(classes) == 2:
+            coef = coef[1:] - coef[:1]
+            intercept = intercept[1:] - intercept[:1]
+
+        lda = LinearDiscriminantAnalysis(solver='lsqr')
+        lda.classes_ = classes
+        lda.priors_ = priors
+        lda.means_ = means
+        lda.covariance_ = covariance
+        lda.coef_ = coef
+        lda.intercept_ = intercept
+        lda.n_features_in_ = d
+        return lda
+
+class LogisticNewtonStep:
+    """Gradient and Hessian sums of the binary log loss at fixed parameters"""
+    def __init__(self, theta):
+        """
+        Args:
+            theta: (d + 1,) coefficients followed by the intercept
+        """
+        self.theta = theta
+        self.gradient = np.zeros(len(theta))
+        self.hessian = np.zeros((len(theta), len(theta)))
+        self.loss = 0.0
+
+    def update(self, X, y):
+        """Add a chunk: X (n, d) normalized, y (n,) in {0, 1}"""
+        Xb = np.column_stack([X, np.ones(len(X))])
+        z = Xb @ self.theta
+        p = 1.0 / (1.0 + np.exp(-z))
+        self.gradient += Xb.T @ (p - y)
+        self.hessian += (Xb * (p * (1 - p))[:, None]).T @ Xb
+        self.loss += np.sum(np.logaddexp(0, z) - y * z)
+
+    def merge(self, other):
+        self.gradient += other.gradient
+        self.hessian += other.hessian
+        self.loss += other.loss
+        return self
+
+def _row_ranges(sessions):
+    """Coalesce session row ranges into sorted contiguous (start, stop) runs"""
+    ranges = []
+    for start, stop in sorted((s['start'], s['stop']) for s in sessions):
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], stop)
+        else:
+            ranges.append((start, stop))
+    return ranges
+
+def _chunks(ranges, chunk_rows):
+    for start, stop in ranges:
+        for chunk_start in range(start, stop, chunk_rows):
+            yield slice(chunk_start, min(chunk_start + chunk_rows, stop))
+
+def shard_sessions(sessions, n_shards):
+    """
+    Split sessions into up to n_shards groups of similar row counts
+
+    Returns:
+        list of list of dict
+    """
+    sessions = sorted(sessions, key=lambda s: s['start'])
+    total = sum(s['stop'] - s['start'] for s in sessions)
+    shards = [[] for _ in range(max(1, min(n_shards, len(sessions))))]
+    seen = 0
+    for session in sessions:
+        shards[min(len(shards) - 1, seen * len(shards) // max(total, 1))].append(session)
+        seen += session['stop'] - session['start']
+    return [shard for shard in shards if shard]
+
+def _shard_pass(root, ranges, chunk_rows, mean=None, scale=None, theta=None):
+    """
+    One pass over a shard's rows (module level so worker processes can run it)
+
+    Returns:
+        ClassMoments, or LogisticNewtonStep when theta is given
+    """
+    from src.dataset.store import DatasetStore
+
+    store = DatasetStore(root=root)
+    features, labels = store.features, store.labels
+    accumulator = ClassMoments() if theta is None else LogisticNewtonStep(theta)
+    for rows in _chunks(ranges, chunk_rows):
+        X = np.asarray(features[rows], dtype=float)
+        if mean is not None:
+            X = (X - mean) / scale
+        accumulator.update(X, np.asarray(labels[rows]))
+    return accumulator
+
+class OutOfCoreTrainer:
+    def __init__(self, model_type=None, chunk_rows=None, n_jobs=1, C=1.0, max_iter=25,
+                 tol=1e-8, config=None):
+        """
+        Args:
+            model_type: 'LDA' or 'LogisticRegression' (default: config.MODEL_TYPE)
+            chunk_rows: rows held in memory per chunk (default: config.TRAIN_CHUNK_ROWS)
+            n_jobs: worker processes, one shard each (1 = in this process)
+            C: inverse L2 strength for LogisticRegression (as in sklearn)
+            max_iter, tol: Newton iterations / step-size tolerance
+            config: SessionConfig (default: global Config)
+        """
+        self.config = config or Config
+        self.model_type = model_type or self.config.MODEL_TYPE
+        if self.model_type not in STREAMING_MODELS:
+            raise ValueError(f"{self.model_type} cannot be trained out of core; "
+                             f"use one of {', '.join(STREAMING_MODELS)}")
+        self.chunk_rows = chunk_rows or self.config.TRAIN_CHUNK_ROWS
+        self.n_jobs = n_jobs
+        self.C = C
+        self.max_iter = max_iter
+        self.tol = tol
+        self.n_iter = 0
+
+    def _map(self, executor, root, shards, **kwargs):
+        """Run _shard_pass on every shard and merge the results"""
+        args = [(root, _row_ranges(shard), self.chunk_rows) for shard in shards]
+        if executor is None:
+            results = [_shard_pass(*a, **kwargs) for a in args]
+        else:
+            futures = [executor.submit(_shard_pass, *a, **kwargs) for a in args]
+            results = [f.result() for f in futures]
+        merged = results[0]
+        for result in results[1:]:
+            merged.merge(result)
+        return merged
+
+    def fit(self, store, users=None, sessions=None):
+        """
+        Train on a DatasetStore without loading it
+
+        Args:
+            store: DatasetStore
+            users: user name(s) to train on (None = everyone)
+            sessions: explicit session entries (overrides users)
+
+        Returns:
+            tuple: (MotorImageryClassifier, FeatureNormalizer)
+        """
+        from src.models.classifier import MotorImageryClassifier
+
+        sessions = store.sessions(users) if sessions is None else sessions
+        if not sessions:
+            raise ValueError("No sessions selected for training")
+        shards = shard_sessions(sessions, self.n_jobs)
+
+        executor = None
+        if len(shards) > 1:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(len(shards),
+                                           mp_context=multiprocessing.get_context('spawn'))
+        try:
+            moments = self._map(executor, store.root, shards)
+            normalizer = moments.to_normalizer()
+            mean, scale = normalizer.scaler.mean_, normalizer.scaler.scale_
+            if self.model_type == 'LDA':
+                model = moments.to_lda(mean, scale)
+            else:
+                model = self._fit_logistic(executor, store.root, shards, moments, mean, scale)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        print(f"Trained {self.model_type} out of core on {moments.n_samples} samples "
+              f"({len(sessions)} sessions, {len(shards)} shards)")
+        return MotorImageryClassifier(self.model_type, model=model, config=self.config), normalizer
+
+    def _fit_logistic(self, executor, root, shards, moments, mean, scale):
+        from sklearn.linear_model import LogisticRegression
+
+        classes = moments.classes
+        if len(classes) != 2 or set(classes) != {0, 1}:
+            raise ValueError("Out-of-core LogisticRegression needs binary 0/1 labels")
+        d = len(mean)
+        theta = np.zeros(d + 1)
+        penalty = np.diag(np.r_[np.ones(d), 0.0])  # Intercept is not penalized
+
+        for self.n_iter in range(1, self.max_iter + 1):
+            step = self._map(executor, root, shards, mean=mean, scale=scale, theta=theta)
+            gradient = self.C * step.gradient + penalty @ theta
+            hessian = self.C * step.hessian + penalty
+            delta = np.linalg.solve(hessian, gradient)
+            theta = theta - delta
+            if np.max(np.abs(delta)) < self.tol:
+                break
+
+        model = LogisticRegression(C=self.C)
+        model.classes_ = classes
+        model.coef_ = theta[None, :d]
+        model.intercept_ = theta[d:]
+        model.n_features_in_ = d
+        model.n_iter_ = np.array([self.n_iter])
+        return model
+
+    def score(self, store, classifier, normalizer, sessions):
+        """
+        Streaming accuracy over held-out sessions
+
+        Returns:
+            float: accuracy (nan when no rows)
+        """
+        features, labels = store.features, store.labels
+        correct = total = 0
+        for rows in _chunks(_row_ranges(sessions), self.chunk_rows):
+            X = normalizer.normalize(np.asarray(features[rows], dtype=float))
+            correct += int(np.sum(classifier.predict(X) == labels[rows]))
+            total += rows.stop - rows.start
+        return correct / total if total else float('nan')
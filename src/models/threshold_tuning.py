@@ -0,0 +1,180 @@
+"""
+Per-user ThresholdClassifier tuning from calibration features
+
+ERD is computed for every calibration sample against the user's mean REST
+band power (what BandPowerExtractor.set_baseline() would hold). Each
+candidate rule (mu or beta ERD, IMAGERY above or below the threshold)
+becomes a score column. One sort per column gives the ROC at every
+distinct threshold at once. The operating point with the highest hit rate
+whose false-activation rate stays within the target is kept. A logistic
+(Platt) fit of the margin past that threshold then gives calibrated
+confidences for CommandMapper's confidence gate.
+"""
+import numpy as np
+from config.settings import Config
+
+# (ERD feature, IMAGERY when ERD above the threshold)
+CANDIDATES = ((0, False), (0, True), (1, False), (1, True))
+FEATURE_NAMES = ('mu', 'beta')
+
+def erd_from_features(features, baseline):
+    """
+    BandPowerExtractor.calculate_erd() for many samples
+
+    Args:
+        features: (n, 2) [mu_power, beta_power]
+        baseline: (2,) REST band powers
+
+    Returns:
+        (n, 2) [mu_erd, beta_erd]
+    """
+    baseline = np.asarray(baseline, dtype=float)
+    return (baseline - np.asarray(features, dtype=float)) / baseline
+
+def roc_curves(scores, labels):
+    """
+    ROC of every score column at every distinct threshold
+
+    Row 0 predicts nothing; row i + 1 predicts IMAGERY for the i + 1 highest
+    scores, i.e. for scores above cuts[i + 1].
+
+    Args:
+        scores: (n, k) higher = more IMAGERY-like
+        labels: (n,) 0 = REST, 1 = IMAGERY
+
+    Returns:
+        tuple: (fpr, tpr, cuts, valid), each (n + 1, k); valid is False where
+            tied scores cannot be split by any threshold
+    """
+    scores = np.asarray(scores, dtype=float)
+    labels = np.asarray(labels)
+    k = scores.shape[1]
+    order = np.argsort(-scores, axis=0, kind='stable')
+    ranked = np.take_along_axis(scores, order, axis=0)
+    hits = (labels[order] == 1).astype(float)
+
+    zeros = np.zeros((1, k))
+    tp = np.vstack([zeros, np.cumsum(hits, axis=0)])
+    fp = np.vstack([zeros, np.cumsum(1 - hits, axis=0)])
+    tpr = tp / max(tp[-1, 0], 1)
+    fpr = fp / max(fp[-1, 0], 1)
+
+    above = np.vstack([ranked[:1] + 1.0, ranked])  # Score just inside the cut
+    below = np.vstack([ranked, ranked[-1:] - 1.0])  # Score just outside
+    cuts = (above + below) / 2
+    valid = above > below
+    valid[0] = True
+    return fpr, tpr, cuts, valid
+
+def roc_auc(scores, labels):
+    """
+    Area under the ROC of every score column (Mann-Whitney, ties averaged)
+
+    Returns:
+        (k,) AUC
+    """
+    from scipy.stats import rankdata
+
+    labels = np.asarray(labels)
+    positive = labels == 1
+    n_pos, n_neg = np.sum(positive), np.sum(~positive)
+    if n_pos == 0 or n_neg == 0:
+        return np.full(np.shape(scores)[1], np.nan)
+    ranks = rankdata(scores, axis=0)
+    return (ranks[positive].sum(axis=0) - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+def fit_platt(margin, labels, C=1.0, max_iter=50, tol=1e-10):
+    """
+    Logistic fit P(IMAGERY) = sigmoid(slope * margin + intercept)
+
+    Args:
+        margin: (n,) signed distance past the threshold
+        labels: (n,) 0/1
+        C: inverse L2 strength on the slope (keeps separable data finite)
+
+    Returns:
+        tuple: (slope, intercept)
+    """
+    from src.models.streaming import LogisticNewtonStep
+
+    margin = np.asarray(margin, dtype=float)[:, None]
+    labels = np.asarray(labels, dtype=float)
+    theta = np.zeros(2)
+    penalty = np.diag([1.0, 0.0])
+    for _ in range(max_iter):
+        step = LogisticNewtonStep(theta)
+        step.update(margin, labels)
+        delta = np.linalg.solve(C * step.hessian + penalty, C * step.gradient + penalty @ theta)
+        theta = theta - delta
+        if np.max(np.abs(delta)) < tol:
+            break
+    return float(theta[0]), float(theta[1])
+
+class ThresholdTuner:
+    def __init__(self, target_fpr=None, C=1.0, config=None):
+        """
+        Args:
+            target_fpr: largest fraction of REST samples classified as
+                IMAGERY (default: config.THRESHOLD_TARGET_FPR)
+            C: inverse L2 strength of the confidence calibration
+            config: SessionConfig (default: global Config)
+        """
+        self.config = config or Config
+        self.target_fpr = (target_fpr if target_fpr is not None
+                           else self.config.THRESHOLD_TARGET_FPR)
+        self.C = C
+        self.report_ = None
+
+    def fit(self, features, labels):
+        """
+        Pick the rule and operating point from calibration features
+
+        Args:
+            features: (n, 2) [mu_power, beta_power] (raw, not normalized)
+            labels: (n,) 0 = REST, 1 = IMAGERY
+
+        Returns:
+            ThresholdClassifier: tuned, with baseline and calibration set
+        """
+        from src.models.classifier import ThresholdClassifier
+
+        features = np.asarray(features, dtype=float)
+        labels = np.asarray(labels)
+        if not (np.any(labels == 0) and np.any(labels == 1)):
+            raise ValueError("Threshold tuning needs REST and IMAGERY samples")
+
+        baseline = features[labels == 0].mean(axis=0)
+        erd = erd_from_features(features, baseline)
+        # Score = ERD when IMAGERY is above the threshold, -ERD when below
+        scores = np.column_stack([erd[:, f] if above else -erd[:, f]
+                                  for f, above in CANDIDATES])
+        fpr, tpr, cuts, valid = roc_curves(scores, labels)
+        auc = roc_auc(scores, labels)
+
+        # Best hit rate within the false-activation budget, per candidate,
+        # then across candidates (AUC breaks ties)
+        allowed = valid & (fpr <= self.target_fpr + 1e-12)
+        masked = np.where(allowed, tpr, -1.0) - 1e-9 * fpr  # Fewer false hits first
+        rows = np.argmax(masked, axis=0)
+        columns = np.arange(scores.shape[1])
+        best = max(columns, key=lambda c: (tpr[rows[c], c], -fpr[rows[c], c], auc[c]))
+
+        feature, above = CANDIDATES[best]
+        cut = cuts[rows[best], best]
+        threshold = cut if above else -cut
+        calibration = fit_platt(scores[:, best] - cut, labels, C=self.C)
+
+        self.report_ = {
+            'target_fpr': self.target_fpr,
+            'candidates': [{'feature': FEATURE_NAMES[f], 'above': a, 'auc': float(auc[c]),
+                            'tpr': float(tpr[rows[c], c]), 'fpr': float(fpr[rows[c], c])}
+                           for c, (f, a) in enumerate(CANDIDATES)],
+            'feature': FEATURE_NAMES[feature],
+            'above': above,
+            'threshold': float(threshold),
+            'tpr': float(tpr[rows[best], best]),
+            'fpr': float(fpr[rows[best], best]),
+            'auc': float(auc[best])
+        }
+        return ThresholdClassifier(threshold, config=self.config, feature=feature,
+                                   above=above, baseline=baseline, calibration=calibration)
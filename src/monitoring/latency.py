@@ -0,0 +1,87 @@
+"""
+Fixed-memory latency histogram with log-spaced bins
+"""
+import numpy as np
+
+class LatencyHistogram:
+    def __init__(self, min_ms=0.01, max_ms=60000.0, n_bins=400):
+        """
+        Args:
+            min_ms: lower edge of the first bin (milliseconds)
+            max_ms: upper edge of the last bin (milliseconds)
+            n_bins: number of log-spaced bins (~3.6% resolution at 400)
+        """
+        self.edges = np.geomspace(min_ms, max_ms, n_bins + 1)
+        self.counts = np.zeros(n_bins + 2, dtype=np.int64)  # + underflow/overflow
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, latency_ms):
+        """Add one latency value (milliseconds)"""
+        self.counts[np.searchsorted(self.edges, latency_ms, side='right')] += 1
+        self.count += 1
+        self.total += latency_ms
+        if latency_ms > self.max:
+            self.max = latency_ms
+
+    def record_many(self, latencies_ms):
+        """Add an array of latency values (milliseconds)"""
+        latencies_ms = np.asarray(latencies_ms, dtype=float).ravel()
+        if len(latencies_ms) == 0:
+            return
+        idx = np.searchsorted(self.edges, latencies_ms, side='right')
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+        self.count += len(latencies_ms)
+        self.total += float(np.sum(latencies_ms))
+        self.max = max(self.max, float(np.max(latencies_ms)))
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """
+        Approximate percentile (upper edge of the bin holding the q-th value)
+
+        Args:
+            q: percentile in [0, 100]
+
+        Returns:
+            float: latency in milliseconds (0.0 if empty)
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(int(np.ceil(q / 100.0 * self.count)), 1)
+        idx = int(np.searchsorted(np.cumsum(self.counts), rank))
+        if idx == 0:
+            return float(self.edges[0])
+        if idx > len(self.edges) - 1:
+            return self.max
+        return min(float(self.edges[idx]), self.max)
+
+    def merge(self, other):
+        """Add the counts of another histogram with identical bins"""
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def reset(self):
+        self.counts[:] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def summary(self):
+        """
+        Returns:
+            dict: count, mean, p50, p95, p99, max (milliseconds)
+        """
+        return {
+            'count': self.count,
+            'mean': self.mean(),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max
+        }
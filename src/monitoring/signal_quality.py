@@ -0,0 +1,194 @@
+"""
+Incremental signal-quality and mains-noise monitor
+
+Summarizes each second of the raw stream (microvolts, baseline removed) so
+the operator can see electrode problems while the session runs:
+
+    rms_uv       RMS about the second's mean (flat lead or noisy contact)
+    mains_uv     amplitude at NOTCH_FREQ, one Goertzel bin over the second
+    dc_uv        mean of the second
+    drift_uv_s   change of the mean since the previous second (drying gel,
+                 movement of the cable)
+    clip_ratio   fraction of samples on the ADC rails
+    mains_ratio  share of 1 Hz+ power near NOTCH_FREQ, read from a
+                 SpectrogramRing's frames of the second (only when given one)
+
+Only running sums and the two Goertzel state values are kept, so each
+sample costs a few float operations and chunks are one lfilter call.
+"""
+import math
+from collections import deque
+import numpy as np
+from scipy.signal import lfilter
+from src.preprocessing.artifact_detector import adc_rails
+from config.settings import Config
+
+ISSUES = ('flat', 'noisy', 'mains', 'drift', 'clipping')
+
+class SignalQualityMonitor:
+    def __init__(self, mains_freq=None, baseline=0.0, stft=None, config=None):
+        """
+        Args:
+            mains_freq: Hz (default: config.NOTCH_FREQ)
+            baseline: microvolts BioAmpReader subtracts from every sample
+                (moves the ADC rails, see set_baseline)
+            stft: SpectrogramRing fed with the same stream before this
+                monitor (adds mains_ratio without another FFT)
+            config: SessionConfig (default: global Config)
+        """
+        config = config or Config
+        self.config = config
+        self.fs = config.SAMPLING_RATE
+        self.block_size = int(self.fs)  # One report per second
+        self.mains_freq = mains_freq or config.NOTCH_FREQ
+        self.coeff = 2 * math.cos(2 * math.pi * self.mains_freq / self.fs)
+        self.history = deque(maxlen=config.QUALITY_HISTORY_SECONDS)
+        self.stft = stft
+        if stft is not None:
+            resolution = stft.freqs[1]
+            self._mains_bins = np.abs(stft.freqs - self.mains_freq) <= 2 * resolution
+            self._signal_bins = stft.freqs >= 1.0
+        self.set_baseline(baseline)
+        self.reset()
+
+    def set_baseline(self, baseline):
+        """Rails in microvolts for samples with baseline already removed"""
+        self.rail_low, self.rail_high = adc_rails(self.config, baseline)
+
+    def reset(self):
+        """Forget the stream and the history (e.g. after reconnecting)"""
+        self.history.clear()
+        self._previous_dc = None
+        self._start_block()
+
+    def _start_block(self):
+        self._n = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._clipped = 0
+        self._s1 = 0.0  # Goertzel state s[n-1], s[n-2]
+        self._s2 = 0.0
+
+    def add_sample(self, x):
+        """
+        Add one raw sample (microvolts), O(1)
+
+        Returns:
+            dict or None: the second's report when this sample completes it
+        """
+        self._sum += x
+        self._sum_sq += x * x
+        if x <= self.rail_low or x >= self.rail_high:
+            self._clipped += 1
+        self._s1, self._s2 = x + self.coeff * self._s1 - self._s2, self._s1
+        self._n += 1
+        if self._n == self.block_size:
+            return self._finish_block()
+        return None
+
+    def add_samples(self, samples):
+        """
+        Add a chunk of raw samples (microvolts)
+
+        Returns:
+            list: reports of the seconds completed by this chunk, oldest first
+        """
+        samples = np.asarray(samples, dtype=float)
+        reports = []
+        while len(samples):
+            part = samples[:self.block_size - self._n]
+            samples = samples[len(part):]
+            self._sum += float(np.sum(part))
+            self._sum_sq += float(np.dot(part, part))
+            self._clipped += int(np.count_nonzero((part <= self.rail_low) |
+                                                  (part >= self.rail_high)))
+            # Goertzel recurrence s[n] = x[n] + coeff * s[n-1] - s[n-2],
+            # resumed from (s1, s2) via the transposed direct-form state
+            zi = [self.coeff * self._s1 - self._s2, -self._s1]
+            s, _ = lfilter([1.0], [1.0, -self.coeff, 1.0], part, zi=zi)
+            self._s2 = float(s[-2]) if len(s) > 1 else self._s1
+            self._s1 = float(s[-1])
+            self._n += len(part)
+            if self._n == self.block_size:
+                reports.append(self._finish_block())
+        return reports
+
+    def _finish_block(self):
+        n = self._n
+        mean = self._sum / n
+        power = self._s1 ** 2 + self._s2 ** 2 - self.coeff * self._s1 * self._s2
+        report = {
+            'rms_uv': max(self._sum_sq / n - mean * mean, 0.0) ** 0.5,
+            'mains_uv': 2 * max(power, 0.0) ** 0.5 / n,  # Sine amplitude at the bin
+            'dc_uv': mean,
+            'drift_uv_s': 0.0 if self._previous_dc is None else mean - self._previous_dc,
+            'clip_ratio': self._clipped / n
+        }
+        if self.stft is not None and self.stft.frame_count:
+            psd = self.stft.latest(max(self.block_size // self.stft.hop, 1)).mean(axis=0)
+            total = np.sum(psd[self._signal_bins])
+            report['mains_ratio'] = float(np.sum(psd[self._mains_bins]) / total) if total else 0.0
+        report['issues'] = self.issues(report)
+        self._previous_dc = mean
+        self.history.append(report)
+        self._start_block()
+        return report
+
+    def issues(self, report):
+        """
+        Thresholds (config.QUALITY_*) a one-second report exceeds
+
+        Returns:
+            list: names from ISSUES, empty if the signal looks usable
+        """
+        config = self.config
+        found = []
+        if report['rms_uv'] < config.QUALITY_MIN_RMS_UV:
+            found.append('flat')
+        if report['rms_uv'] > config.QUALITY_MAX_RMS_UV:
+            found.append('noisy')
+        if report['mains_uv'] > config.QUALITY_MAX_MAINS_UV:
+            found.append('mains')
+        if abs(report['drift_uv_s']) > config.QUALITY_MAX_DRIFT_UV_S:
+            found.append('drift')
+        if report['clip_ratio'] > config.QUALITY_MAX_CLIP_RATIO:
+            found.append('clipping')
+        return found
+
+    def latest(self):
+        """Most recent one-second report (None before the first second)"""
+        return self.history[-1] if self.history else None
+
+    def summary(self):
+        """
+        Quality over the kept history (config.QUALITY_HISTORY_SECONDS)
+
+        Returns:
+            dict: seconds, latest report, mean rms/mains/clip_ratio, max
+                |drift| and how many seconds raised each issue
+        """
+        if not self.history:
+            return {'seconds': 0, 'latest': None, 'issues': {}}
+        history = self.history
+        issues = {}
+        for report in history:
+            for issue in report['issues']:
+                issues[issue] = issues.get(issue, 0) + 1
+        return {
+            'seconds': len(history),
+            'latest': history[-1],
+            'rms_uv': sum(r['rms_uv'] for r in history) / len(history),
+            'mains_uv': sum(r['mains_uv'] for r in history) / len(history),
+            'max_drift_uv_s': max(abs(r['drift_uv_s']) for r in history),
+            'clip_ratio': sum(r['clip_ratio'] for r in history) / len(history),
+            'issues': issues
+        }
+
+    @staticmethod
+    def format_report(report):
+        """One status line for a one-second report"""
+        status = ', '.join(report['issues']) or 'ok'
+        share = f" ({report['mains_ratio']:4.0%})" if 'mains_ratio' in report else ''
+        return (f"RMS {report['rms_uv']:6.1f} µV  mains {report['mains_uv']:5.1f} µV{share}  "
+                f"DC {report['dc_uv']:7.1f} µV ({report['drift_uv_s']:+6.1f}/s)  "
+                f"clipped {report['clip_ratio']:6.1%}  [{status}]")
@@ -0,0 +1,226 @@
+"""
+Opt-in per-stage tracing with Chrome trace-event export
+
+Spans are perf_counter_ns pairs written into preallocated arrays used as a
+ring, so tracing a long session costs no allocations and bounded memory.
+Disabled tracers hand out a shared no-op span. Slow windows can also be
+captured with cProfile: every profile_every-th window runs under the
+profiler and its stats are kept if the window exceeded the threshold.
+"""
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from pathlib import Path
+import numpy as np
+from config.settings import Config
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+def null_span(name):
+    """span() stand-in when no tracer is attached"""
+    return NULL_SPAN
+
+class _Span:
+    __slots__ = ('tracer', 'name_id', 'start')
+
+    def __init__(self, tracer, name_id):
+        self.tracer = tracer
+        self.name_id = name_id
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name_id, self.start, time.perf_counter_ns())
+        return False
+
+class StageTracer:
+    def __init__(self, capacity=Config.TRACE_CAPACITY, enabled=False,
+                 profile_threshold_ms=None, profile_every=Config.TRACE_PROFILE_EVERY,
+                 max_profiles=10):
+        """
+        Args:
+            capacity: spans kept (oldest are overwritten)
+            enabled: start recording immediately (toggle with enable/disable)
+            profile_threshold_ms: keep cProfile stats of sampled windows slower
+                than this (None = no profiling)
+            profile_every: profile one window in this many
+            max_profiles: slow-window profiles kept (most recent)
+
+        One tracer per pipeline/thread; spans of a name must not nest.
+        """
+        self.capacity = capacity
+        self.enabled = enabled
+        self.profile_threshold_ms = profile_threshold_ms
+        self.profile_every = max(1, profile_every)
+
+        self.names = []
+        self._name_ids = {}
+        self._spans = {}
+        self.name_ids = np.zeros(capacity, dtype=np.int32)
+        self.starts = np.zeros(capacity, dtype=np.int64)
+        self.ends = np.zeros(capacity, dtype=np.int64)
+        self.windows = np.zeros(capacity, dtype=np.int64)
+        self.count = 0
+        self.window = 0
+
+        self.profiles = deque(maxlen=max_profiles)  # (window, latency_ms, pstats.Stats)
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name):
+        """
+        Context manager timing one stage (no-op while disabled)
+
+        Usage:
+            with tracer.span('welch'):
+                ...
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        span = self._spans.get(name)
+        if span is None:
+            span = self._spans[name] = _Span(self, self._name_id(name))
+        return span
+
+    def _name_id(self, name):
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def record(self, name, start_ns, end_ns):
+        """
+        Store a span measured elsewhere
+
+        Args:
+            name: stage name or id returned for it
+            start_ns, end_ns: time.perf_counter_ns() values
+        """
+        if not self.enabled:
+            return
+        if isinstance(name, str):
+            name = self._name_id(name)
+        i = self.count % self.capacity
+        self.name_ids[i] = name
+        self.starts[i] = start_ns
+        self.ends[i] = end_ns
+        self.windows[i] = self.window
+        self.count += 1
+
+    def begin_window(self):
+        """
+        Mark the start of a window; starts cProfile on sampled windows
+
+        Returns:
+            cProfile.Profile or None: pass to end_window()
+        """
+        self.window += 1
+        if (not self.enabled or self.profile_threshold_ms is None
+                or self.window % self.profile_every):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # Another profiler is already active
+            return None
+        return profiler
+
+    def end_window(self, profiler, latency_ms):
+        """Stop a sampled profile and keep it if the window was slow"""
+        if profiler is None:
+            return
+        profiler.disable()
+        if latency_ms > self.profile_threshold_ms:
+            self.profiles.append((self.window, latency_ms, pstats.Stats(profiler)))
+
+    def spans(self):
+        """
+        Recorded spans, oldest first
+
+        Returns:
+            list of tuple: (name, start_ns, duration_ns, window)
+        """
+        n = min(self.count, self.capacity)
+        order = (np.arange(n) + self.count - n) % self.capacity
+        return [(self.names[self.name_ids[i]], int(self.starts[i]),
+                 int(self.ends[i] - self.starts[i]), int(self.windows[i]))
+                for i in order]
+
+    def stage_summary(self):
+        """
+        Returns:
+            dict: stage -> {'count', 'mean_ms', 'max_ms'} over recorded spans
+        """
+        n = min(self.count, self.capacity)
+        durations = (self.ends[:n] - self.starts[:n]) / 1e6
+        summary = {}
+        for name_id, name in enumerate(self.names):
+            d = durations[self.name_ids[:n] == name_id]
+            if len(d):
+                summary[name] = {'count': len(d), 'mean_ms': float(np.mean(d)),
+                                 'max_ms': float(np.max(d))}
+        return summary
+
+    def export_chrome(self, filepath, process_name='neurosense'):
+        """
+        Write spans as Chrome trace-event JSON (chrome://tracing, Perfetto)
+
+        Returns:
+            int: number of events written
+        """
+        pid = os.getpid()
+        tid = threading.get_ident() % 2**31
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                   'args': {'name': process_name}}]
+        for name, start_ns, duration_ns, window in self.spans():
+            events.append({
+                'name': name,
+                'cat': 'pipeline',
+                'ph': 'X',
+                'ts': start_ns / 1000.0,
+                'dur': duration_ns / 1000.0,
+                'pid': pid,
+                'tid': tid,
+                'args': {'window': window}
+            })
+        with open(filepath, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        print(f"Trace ({len(events) - 1} spans) saved to {filepath}")
+        return len(events) - 1
+
+    def dump_profiles(self, directory):
+        """Write kept slow-window profiles as .prof files (snakeviz, pstats)"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for window, latency_ms, stats in self.profiles:
+            path = directory / f"window_{window}_{latency_ms:.0f}ms.prof"
+            stats.dump_stats(path)
+            paths.append(path)
+        return paths
+
+    def reset(self):
+        self.count = 0
+        self.window = 0
+        self.profiles.clear()
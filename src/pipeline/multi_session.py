@@ -0,0 +1,259 @@
+"""
+Many concurrent BCI sessions in one process
+
+One selector loop multiplexes every BioAmp stream. Filter designs, loaded
+classifiers and normalizers are shared through a ModelCache; each session
+only owns its ring buffer, feature baseline, command mapper and counters.
+"""
+import selectors
+import time
+from hardware.robot_controller import RobotController
+from src.models.classifier import ThresholdClassifier
+from src.models.artifact import is_artifact
+from src.models.model_cache import ModelCache
+from src.monitoring.latency import LatencyHistogram
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+from src.preprocessing.filters import RealtimePreprocessor
+from config.settings import Config, SessionConfig
+
+class BCISession:
+    __slots__ = ('session_id', 'pipeline', 'model', 'model_key', 'window_count',
+                 'last_command', 'latency')
+
+    def __init__(self, session_id, pipeline, model_key=None):
+        self.session_id = session_id
+        self.pipeline = pipeline
+        # The pipeline._model that model_key serves in the inference service
+        self.model = pipeline._model
+        self.model_key = model_key
+        self.window_count = 0
+        self.last_command = 'STOP'
+        self.latency = LatencyHistogram()
+
+    def metrics(self):
+        detector = self.pipeline.artifact_detector
+        return {
+            'windows': self.window_count,
+            'last_command': self.last_command,
+            'latency_ms': self.latency.summary(),
+            'rejections': dict(detector.rejections) if detector is not None else {},
+            'signal_quality': self.pipeline.quality_monitor.summary()
+        }
+
+class MultiSessionRuntime:
+    def __init__(self, model_cache=None, use_duration=False, inference_service=None,
+                 inference_timeout_ms=Config.INFERENCE_TIMEOUT_MS):
+        """
+        Args:
+            model_cache: ModelCache shared with other runtimes (default: new one)
+            use_duration: duration-based commands
+            inference_service: BatchInferenceService; when given, windows that
+                complete in the same poll are classified in one batch per model
+            inference_timeout_ms: longest wait for a batched result; after it
+                (or if the service fails) the window is classified in place
+        """
+        self.model_cache = model_cache or ModelCache()
+        self.use_duration = use_duration
+        self.inference_service = inference_service
+        self.inference_timeout = inference_timeout_ms / 1000.0
+        self.inference_fallbacks = 0
+        self.selector = selectors.DefaultSelector()
+        self.sessions = {}
+
+    def _shared_preprocessor(self, config):
+        preprocessor = RealtimePreprocessor(config=config)
+        return self.model_cache.get(('preprocessor',) + preprocessor.design_key(),
+                                    lambda: preprocessor)
+
+    def add_session(self, session_id, bioamp, model_path, normalizer_path=None, robot=None,
+                    config=None):
+        """
+        Register a session (connect its hardware with connect_all or beforehand)
+
+        Args:
+            session_id: unique key
+            bioamp: BioAmpReader for this headset
+            model_path, normalizer_path: trained artifacts (shared via the cache);
+                an .npz model_path bundles its normalizer
+            robot: RobotController (default: unconnected, simulation mode)
+            config: SessionConfig for this session (default: global settings
+                at the headset's sampling rate)
+
+        Returns:
+            BCISession
+        """
+        if session_id in self.sessions:
+            raise ValueError(f"Session already exists: {session_id}")
+        config = config or SessionConfig(SAMPLING_RATE=bioamp.fs)
+
+        normalizer = None
+        try:
+            if is_artifact(model_path):
+                classifier, normalizer = self.model_cache.load_artifact(model_path)
+            else:
+                classifier = self.model_cache.load_classifier(model_path)
+        except Exception:
+            print(f"Warning: Could not load model for {session_id}, using threshold classifier")
+            classifier = ThresholdClassifier(config=config)
+
+        if normalizer is None and normalizer_path:
+            try:
+                normalizer = self.model_cache.load_normalizer(normalizer_path)
+            except Exception:
+                print(f"Warning: Could not load normalizer for {session_id}")
+
+        pipeline = RealtimeBCIPipeline(
+            model_path, normalizer_path, use_duration=self.use_duration,
+            bioamp=bioamp, robot=robot or RobotController(config=config),
+            classifier=classifier, normalizer=normalizer,
+            preprocessor=self._shared_preprocessor(config), config=config
+        )
+
+        model_key = None
+        if self.inference_service is not None and not isinstance(classifier, ThresholdClassifier):
+            model_key = f"{model_path}|{normalizer_path}"
+            self.inference_service.register_model(model_key, classifier, normalizer)
+
+        session = BCISession(session_id, pipeline, model_key)
+        self.sessions[session_id] = session
+        if bioamp.connected:
+            self.selector.register(bioamp.ser, selectors.EVENT_READ, session)
+        return session
+
+    def connect_all(self, calibrate=True, baseline_duration=5):
+        """Connect (and optionally baseline-calibrate) every unconnected session"""
+        for session in self.sessions.values():
+            bioamp = session.pipeline.bioamp
+            if bioamp.connected:
+                continue
+            if not bioamp.connect():
+                print(f"Warning: session {session.session_id} failed to connect")
+                continue
+            session.pipeline.robot.connect()
+            if calibrate:
+                bioamp.calibrate_baseline(duration=baseline_duration)
+                if session.pipeline.artifact_detector is not None:
+                    session.pipeline.artifact_detector.set_baseline(bioamp.baseline)
+                session.pipeline.quality_monitor.set_baseline(bioamp.baseline)
+            session.pipeline.warmup()
+            self.selector.register(bioamp.ser, selectors.EVENT_READ, session)
+
+    def remove_session(self, session_id):
+        session = self.sessions.pop(session_id)
+        if isinstance(session.model_key, tuple):
+            self.inference_service.unregister_model(session.model_key)
+        bioamp = session.pipeline.bioamp
+        if bioamp.connected:
+            self.selector.unregister(bioamp.ser)
+        return session
+
+    def poll(self, timeout=0.1):
+        """
+        Process everything that arrived on any stream
+
+        Returns:
+            list of tuple: (session_id, command, confidence, latency_ms)
+        """
+        results = []
+        batched = []  # (session, start_time, future, window, spectrum)
+        for key, _ in self.selector.select(timeout):
+            session = key.data
+            pipeline = session.pipeline
+            if pipeline._model is not session.model:
+                self._register_swapped(session)
+
+            ready, _ = pipeline.feed(pipeline.bioamp.read_available())
+            for window, rejection, spectrum in ready:
+                if session.model_key is None or rejection is not None:
+                    command, confidence, latency = pipeline.process_window(window, rejection,
+                                                                           spectrum)
+                    results.append(self._dispatch(session, command, confidence, latency))
+                    continue
+
+                start_time = time.time()
+                features, _ = pipeline.extract_features(window, spectrum)
+                if features is None:
+                    latency = (time.time() - start_time) * 1000
+                    results.append(self._dispatch(session, 'STOP', 0.0, latency))
+                else:
+                    future = self.inference_service.submit(session.model_key, features)
+                    batched.append((session, start_time, future, window, spectrum))
+
+        # Windows from all sessions in this poll share micro-batches
+        for session, start_time, future, window, spectrum in batched:
+            try:
+                prediction, confidence = future.result(timeout=self.inference_timeout)
+            except Exception:
+                # Stopped, stalled or failed service: this session's own model
+                future.cancel()
+                self.inference_fallbacks += 1
+                command, confidence, _ = session.pipeline.process_window(window, None, spectrum)
+            else:
+                command = session.pipeline.map_command(prediction, confidence)
+            latency = (time.time() - start_time) * 1000
+            results.append(self._dispatch(session, command, confidence, latency))
+
+        return results
+
+    def _register_swapped(self, session):
+        """
+        Serve a hot-swapped model (swap_model, ModelRegistry.swap_into/watch)
+        from the inference service under a key of its own
+        """
+        model = session.model = session.pipeline._model
+        classifier, normalizer, _ = model
+        if isinstance(session.model_key, tuple):
+            self.inference_service.unregister_model(session.model_key)
+        session.model_key = None
+        if self.inference_service is not None and not isinstance(classifier, ThresholdClassifier):
+            session.model_key = (session.session_id, session.pipeline.model_swaps)
+            self.inference_service.register_model(session.model_key, classifier, normalizer)
+
+    def _dispatch(self, session, command, confidence, latency):
+        session.pipeline.robot.send_command(command, decision_time=time.perf_counter())
+        session.window_count += 1
+        session.last_command = command
+        session.latency.record(latency)
+        return (session.session_id, command, confidence, latency)
+
+    def run(self, duration=None):
+        """
+        Run every session until duration (seconds) or Ctrl+C
+        """
+        print(f"\n=== Running {len(self.sessions)} sessions ===")
+        start_time = time.time()
+
+        try:
+            while duration is None or time.time() - start_time < duration:
+                self.poll()
+        except KeyboardInterrupt:
+            print("\n\nStopped by user")
+
+        self.report_performance()
+
+    def metrics(self):
+        """Per-session metrics plus model cache statistics"""
+        return {
+            'sessions': {sid: s.metrics() for sid, s in self.sessions.items()},
+            'model_cache': self.model_cache.stats(),
+            'inference_fallbacks': self.inference_fallbacks
+        }
+
+    def report_performance(self):
+        print("\n" + "="*60)
+        print("MULTI-SESSION PERFORMANCE REPORT")
+        print("="*60)
+        for session_id, session in self.sessions.items():
+            lat = session.latency.summary()
+            print(f"{str(session_id):12s} windows: {session.window_count:6d}  "
+                  f"P50: {lat['p50']:6.1f} ms  P95: {lat['p95']:6.1f} ms  "
+                  f"last: {session.last_command}")
+        print(f"\nModel cache: {self.model_cache.stats()}")
+        print("="*60)
+
+    def close(self):
+        """Disconnect every session"""
+        for session_id in list(self.sessions):
+            session = self.remove_session(session_id)
+            session.pipeline.disconnect_hardware()
+        self.selector.close()
@@ -0,0 +1,488 @@
+"""
+Process-pool session sharding for hosts where one interpreter saturates
+
+The supervisor process reads every BioAmp stream and writes samples into
+per-session SharedCircularBuffer rings. Worker processes attach to the rings
+of the sessions assigned to them, run the DSP/classification pipeline on each
+step-aligned window and send back commands and metrics over a queue. The
+supervisor forwards commands to the robots, restarts crashed workers and
+moves sessions off overloaded workers. Signal quality is tracked by the
+supervisor as samples arrive, so it needs no round trip through a worker.
+
+Smoothing and ERD baseline state live in the worker, so a session that is
+moved or whose worker is restarted starts those from scratch.
+"""
+import multiprocessing
+import os
+import queue
+import selectors
+import time
+from hardware.robot_controller import RobotController
+from src.acquisition.shared_buffer import SharedCircularBuffer
+from src.monitoring.latency import LatencyHistogram
+from src.monitoring.signal_quality import SignalQualityMonitor
+from config.settings import Config, SessionConfig
+
+class _WorkerSession:
+    """A session's state inside a worker process"""
+    __slots__ = ('ring', 'pipeline', 'next_end', 'latencies', 'windows', 'overruns',
+                 'fed_end')
+
+    def __init__(self, ring, pipeline, next_end):
+        self.ring = ring
+        self.pipeline = pipeline
+        self.next_end = next_end  # Stream index the next window ends at
+        self.latencies = []       # Since the last metrics report
+        self.windows = 0
+        self.overruns = 0
+        self.fed_end = None       # Stream index the stream stages were fed up to
+
+def _rejections(pipeline):
+    detector = pipeline.artifact_detector
+    return dict(detector.rejections) if detector is not None else {}
+
+def _worker_main(worker_id, inbox, outbox, use_duration, report_interval):
+    """Worker process loop (module level so it can be spawned)"""
+    from hardware.bioamp_reader import BioAmpReader
+    from src.features.normalizer import FeatureNormalizer
+    from src.models.artifact import is_artifact
+    from src.models.classifier import ThresholdClassifier
+    from src.models.model_cache import ModelCache
+    from src.pipeline.realtime_bci import RealtimeBCIPipeline
+    from src.preprocessing.filters import RealtimePreprocessor
+
+    cache = ModelCache()
+    sessions = {}  # session_id -> _WorkerSession
+
+    def assign(session_id, ring_spec, model_path, normalizer_path, config):
+        """
+        Returns:
+            list of str: model files that failed to load (fallbacks in use)
+        """
+        ring = SharedCircularBuffer.attach(*ring_spec)
+        normalizer = None
+        errors = []
+        try:
+            if is_artifact(model_path):
+                classifier, normalizer = cache.load_artifact(model_path)
+            else:
+                classifier = cache.load_classifier(model_path)
+        except Exception as e:
+            errors.append(f"model {model_path}: {e!r}")
+            classifier = ThresholdClassifier(config=config)
+        if normalizer is None and normalizer_path:
+            try:
+                normalizer = cache.load_normalizer(normalizer_path)
+            except Exception as e:
+                errors.append(f"normalizer {normalizer_path}: {e!r}")
+                normalizer = FeatureNormalizer()  # Unfitted: features used as is
+        preprocessor = RealtimePreprocessor(config=config)
+        preprocessor = cache.get(('preprocessor',) + preprocessor.design_key(),
+                                 lambda: preprocessor)
+        pipeline = RealtimeBCIPipeline(model_path, normalizer_path, use_duration=use_duration,
+                                       bioamp=BioAmpReader(config=config),
+                                       robot=RobotController(config=config),
+                                       classifier=classifier, normalizer=normalizer,
+                                       preprocessor=preprocessor, config=config)
+        pipeline.warmup()
+        # Resume at the next step boundary that holds a full window
+        step = ring.step_size
+        next_end = max(ring.window_size, -(-ring.sample_count // step) * step)
+        sessions[session_id] = _WorkerSession(ring, pipeline, next_end)
+        return errors
+
+    def screen(state, window):
+        """
+        Feed the stream stages the new step, as the single-session loop does
+
+        Returns:
+            tuple: (rejection reason or None, window_spectrum() or None)
+        """
+        pipeline = state.pipeline
+        step = state.ring.step_size
+        # First window or skipped ahead: start over from the whole window
+        if state.fed_end != state.next_end - step:
+            pipeline.reset_stream()
+            new = window
+        else:
+            new = window[-step:]
+        rejections, _ = pipeline.feed_stream(new)
+        state.fed_end = state.next_end
+        return (rejections[-1] if rejections else pipeline.screen(),
+                pipeline.window_spectrum())
+
+    busy = 0.0
+    last_report = time.perf_counter()
+    while True:
+        try:
+            while True:
+                message = inbox.get_nowait()
+                if message[0] == 'stop':
+                    for state in sessions.values():
+                        state.ring.close()
+                    return
+                if message[0] == 'assign':
+                    try:
+                        errors = assign(*message[1:])
+                    except Exception as e:
+                        outbox.put(('assign_failed', worker_id, message[1], repr(e)))
+                    else:
+                        outbox.put(('assigned', worker_id, message[1], errors))
+                elif message[0] == 'unassign':
+                    state = sessions.pop(message[1], None)
+                    if state is not None:
+                        state.ring.close()
+        except queue.Empty:
+            pass
+
+        did_work = False
+        failed = []
+        for session_id, state in sessions.items():
+            ring, pipeline = state.ring, state.pipeline
+            while ring.sample_count >= state.next_end:
+                window = ring.window_at(state.next_end)
+                if window is None:
+                    # Fell more than the ring's slack behind: skip to the newest window
+                    state.overruns += 1
+                    step = ring.step_size
+                    state.next_end = max(state.next_end + step,
+                                         ring.sample_count // step * step)
+                    continue
+
+                t0 = time.perf_counter()
+                try:
+                    rejection, spectrum = screen(state, window)
+                    command, confidence, latency = pipeline.process_window(window, rejection,
+                                                                           spectrum)
+                except Exception as e:
+                    # Drop the session here rather than take the others down with it
+                    failed.append(session_id)
+                    outbox.put(('session_failed', worker_id, session_id, repr(e)))
+                    break
+                busy += time.perf_counter() - t0
+                outbox.put(('command', session_id, command, confidence, latency))
+                state.latencies.append(latency)
+                state.windows += 1
+                state.next_end += ring.step_size
+                did_work = True
+
+        for session_id in failed:
+            sessions.pop(session_id).ring.close()
+
+        now = time.perf_counter()
+        if now - last_report >= report_interval:
+            report = {sid: (state.latencies, state.windows, state.overruns,
+                            _rejections(state.pipeline))
+                      for sid, state in sessions.items()}
+            outbox.put(('metrics', worker_id, busy / (now - last_report), report))
+            for state in sessions.values():
+                state.latencies = []
+            busy = 0.0
+            last_report = now
+
+        if not did_work:
+            time.sleep(0.001)
+
+class SessionSupervisor:
+    def __init__(self, n_workers=None, use_duration=False,
+                 ring_seconds=Config.SHARED_RING_SECONDS,
+                 rebalance_interval=5.0, rebalance_threshold=0.25,
+                 report_interval=1.0, max_session_crashes=3):
+        """
+        Args:
+            n_workers: worker processes (default: CPU count)
+            use_duration: duration-based commands
+            ring_seconds: shared ring length, i.e. how far a worker may lag
+            rebalance_interval: seconds between load checks
+            rebalance_threshold: busy-fraction gap that triggers a session move
+            report_interval: seconds between worker metric reports
+            max_session_crashes: workers a session may kill while being
+                set up before it is no longer assigned
+        """
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.use_duration = use_duration
+        self.ring_seconds = ring_seconds
+        self.rebalance_interval = rebalance_interval
+        self.rebalance_threshold = rebalance_threshold
+        self.report_interval = report_interval
+
+        self.ctx = multiprocessing.get_context('spawn')
+        self.outbox = self.ctx.Queue()
+        self.workers = {}       # worker_id -> (process, inbox)
+        self.worker_load = {}   # worker_id -> busy fraction
+        self.restarts = 0
+        self.max_session_crashes = max_session_crashes
+        self._assign_seq = 0
+        self.sessions = {}      # session_id -> dict
+        self.selector = selectors.DefaultSelector()
+        self._last_rebalance = time.time()
+
+        for worker_id in range(self.n_workers):
+            self._start_worker(worker_id)
+
+    def _start_worker(self, worker_id):
+        inbox = self.ctx.Queue()
+        process = self.ctx.Process(target=_worker_main, daemon=True,
+                                   args=(worker_id, inbox, self.outbox,
+                                         self.use_duration, self.report_interval))
+        process.start()
+        self.workers[worker_id] = (process, inbox)
+        self.worker_load[worker_id] = 0.0
+
+    def _assign(self, session_id, worker_id):
+        session = self.sessions[session_id]
+        session['worker'] = worker_id
+        # Unconfirmed until the worker replies; the inbox is FIFO, so the
+        # oldest pending assign is the one a worker died on
+        self._assign_seq += 1
+        session['pending'] = self._assign_seq
+        self.workers[worker_id][1].put(('assign', session_id, session['ring'].spec(),
+                                        session['model_path'], session['normalizer_path'],
+                                        session['config']))
+
+    def _least_loaded_worker(self):
+        counts = {wid: 0 for wid in self.workers}
+        for session in self.sessions.values():
+            if session['worker'] in counts:
+                counts[session['worker']] += 1
+        return min(self.workers, key=lambda wid: (counts[wid], self.worker_load[wid]))
+
+    def add_session(self, session_id, bioamp, model_path, normalizer_path=None, robot=None,
+                    config=None):
+        """
+        Register a session, create its shared ring and assign it to a worker
+
+        Args:
+            session_id: unique key
+            bioamp: connected (or later connect_all-ed) BioAmpReader
+            model_path, normalizer_path: trained artifacts
+            robot: RobotController (default: unconnected, simulation mode)
+            config: SessionConfig, pickled to the worker (default: global
+                settings at the headset's sampling rate)
+        """
+        if session_id in self.sessions:
+            raise ValueError(f"Session already exists: {session_id}")
+        config = config or SessionConfig(SAMPLING_RATE=bioamp.fs)
+
+        capacity = max(int(self.ring_seconds * config.SAMPLING_RATE),
+                       config.WINDOW_SAMPLES + config.STEP_SAMPLES)
+        ring = SharedCircularBuffer(capacity=capacity, config=config)
+        self.sessions[session_id] = {
+            'bioamp': bioamp,
+            'robot': robot or RobotController(config=config),
+            'config': config,
+            'ring': ring,
+            'model_path': str(model_path),
+            'normalizer_path': str(normalizer_path) if normalizer_path else None,
+            'worker': None,
+            'pending': None,
+            'crashes': 0,
+            'error': None,
+            'load_errors': [],
+            'windows': 0,
+            'overruns': 0,
+            'rejections': {},
+            'quality': SignalQualityMonitor(config=config),
+            'last_command': 'STOP',
+            'latency': LatencyHistogram()
+        }
+        if bioamp.connected:
+            self.selector.register(bioamp.ser, selectors.EVENT_READ, session_id)
+        self._assign(session_id, self._least_loaded_worker())
+
+    def connect_all(self, calibrate=True, baseline_duration=5):
+        """Connect (and optionally baseline-calibrate) every unconnected session"""
+        for session_id, session in self.sessions.items():
+            bioamp = session['bioamp']
+            if bioamp.connected:
+                continue
+            if not bioamp.connect():
+                print(f"Warning: session {session_id} failed to connect")
+                continue
+            session['robot'].connect()
+            if calibrate:
+                bioamp.calibrate_baseline(duration=baseline_duration)
+                session['quality'].set_baseline(bioamp.baseline)
+            self.selector.register(bioamp.ser, selectors.EVENT_READ, session_id)
+
+    def remove_session(self, session_id):
+        session = self.sessions.pop(session_id)
+        if session['worker'] in self.workers:
+            self.workers[session['worker']][1].put(('unassign', session_id))
+        if session['bioamp'].connected:
+            self.selector.unregister(session['bioamp'].ser)
+        return session
+
+    def poll(self, timeout=0.01):
+        """
+        Move new samples into the rings and handle worker messages
+
+        Returns:
+            list of tuple: (session_id, command, confidence, latency_ms)
+        """
+        for key, _ in self.selector.select(timeout):
+            session = self.sessions[key.data]
+            samples = session['bioamp'].read_available()
+            session['ring'].extend(samples)
+            session['quality'].add_samples(samples)
+
+        results = []
+        while True:
+            try:
+                message = self.outbox.get_nowait()
+            except queue.Empty:
+                break
+
+            if message[0] == 'command':
+                _, session_id, command, confidence, latency = message
+                session = self.sessions.get(session_id)
+                if session is None:
+                    continue
+                session['robot'].send_command(command, decision_time=time.perf_counter())
+                session['last_command'] = command
+                results.append((session_id, command, confidence, latency))
+            elif message[0] == 'metrics':
+                self._merge_metrics(*message[1:])
+            elif message[0] == 'assigned':
+                _, worker_id, session_id, errors = message
+                session = self.sessions.get(session_id)
+                if session is not None and session['worker'] == worker_id:
+                    session['pending'] = None
+                    session['crashes'] = 0
+                    session['load_errors'] = errors
+                    for error in errors:
+                        print(f"Warning: session {session_id} could not load {error}")
+            elif message[0] in ('assign_failed', 'session_failed'):
+                kind, worker_id, session_id, error = message
+                session = self.sessions.get(session_id)
+                if session is not None and session['worker'] == worker_id:
+                    self._park(session_id, f"{kind.replace('_', ' ')}: {error}")
+
+        self.check_workers()
+        if time.time() - self._last_rebalance >= self.rebalance_interval:
+            self.rebalance()
+        return results
+
+    def _merge_metrics(self, worker_id, load, report):
+        self.worker_load[worker_id] = load
+        for session_id, (latencies, windows, overruns, rejections) in report.items():
+            session = self.sessions.get(session_id)
+            if session is None or session['worker'] != worker_id:
+                continue  # Stale report from before a move
+            session['latency'].record_many(latencies)
+            session['windows'] += len(latencies)
+            session['overruns'] = overruns
+            session['rejections'] = rejections
+
+    def _park(self, session_id, error):
+        """Stop assigning a session that cannot run; its samples are still read"""
+        session = self.sessions[session_id]
+        print(f"Session {session_id} removed from the workers: {error}")
+        session['worker'] = None
+        session['pending'] = None
+        session['error'] = error
+
+    def check_workers(self):
+        """
+        Restart dead workers and re-assign their sessions
+
+        A worker that dies with assigns unconfirmed counts against the
+        oldest of them, the one it was setting up. After max_session_crashes
+        in a row that session is parked instead of being sent to the fresh
+        worker again.
+        """
+        for worker_id, (process, inbox) in list(self.workers.items()):
+            if process.is_alive():
+                continue
+            print(f"Worker {worker_id} exited (code {process.exitcode}), restarting")
+            self.restarts += 1
+            self._start_worker(worker_id)
+            mine = [sid for sid, s in self.sessions.items() if s['worker'] == worker_id]
+            pending = [sid for sid in mine if self.sessions[sid]['pending'] is not None]
+            if pending:
+                suspect = min(pending, key=lambda sid: self.sessions[sid]['pending'])
+                session = self.sessions[suspect]
+                session['crashes'] += 1
+                if session['crashes'] >= self.max_session_crashes:
+                    self._park(suspect, f"killed its worker {session['crashes']} "
+                                        f"times while being assigned")
+                    mine.remove(suspect)
+            for session_id in mine:
+                self._assign(session_id, worker_id)
+
+    def rebalance(self):
+        """Move one session from the busiest to the idlest worker if the gap is large"""
+        self._last_rebalance = time.time()
+        busiest = max(self.worker_load, key=self.worker_load.get)
+        idlest = min(self.worker_load, key=self.worker_load.get)
+        gap = self.worker_load[busiest] - self.worker_load[idlest]
+        candidates = [sid for sid, s in self.sessions.items() if s['worker'] == busiest]
+        if gap < self.rebalance_threshold or len(candidates) < 2:
+            return None
+
+        session_id = candidates[-1]
+        self.workers[busiest][1].put(('unassign', session_id))
+        self._assign(session_id, idlest)
+        # Assume the moved share of load until the next reports arrive
+        share = self.worker_load[busiest] / len(candidates)
+        self.worker_load[busiest] -= share
+        self.worker_load[idlest] += share
+        return session_id
+
+    def run(self, duration=None):
+        """Run every session until duration (seconds) or Ctrl+C"""
+        print(f"\n=== Running {len(self.sessions)} sessions on {self.n_workers} workers ===")
+        start_time = time.time()
+        try:
+            while duration is None or time.time() - start_time < duration:
+                self.poll()
+        except KeyboardInterrupt:
+            print("\n\nStopped by user")
+        self.report_performance()
+
+    def metrics(self):
+        """Aggregated per-session and per-worker metrics"""
+        return {
+            'sessions': {
+                sid: {
+                    'worker': s['worker'],
+                    'error': s['error'],
+                    'load_errors': s['load_errors'],
+                    'windows': s['windows'],
+                    'overruns': s['overruns'],
+                    'rejections': s['rejections'],
+                    'signal_quality': s['quality'].summary(),
+                    'last_command': s['last_command'],
+                    'latency_ms': s['latency'].summary()
+                } for sid, s in self.sessions.items()
+            },
+            'worker_load': dict(self.worker_load),
+            'restarts': self.restarts
+        }
+
+    def report_performance(self):
+        print("\n" + "="*60)
+        print("PROCESS-POOL PERFORMANCE REPORT")
+        print("="*60)
+        for session_id, s in self.sessions.items():
+            lat = s['latency'].summary()
+            print(f"{str(session_id):12s} worker {s['worker']}  windows: {s['windows']:6d}  "
+                  f"P95: {lat['p95']:6.1f} ms  overruns: {s['overruns']}")
+        loads = ', '.join(f"{wid}: {load:.0%}" for wid, load in sorted(self.worker_load.items()))
+        print(f"\nWorker load: {loads}  (restarts: {self.restarts})")
+        print("="*60)
+
+    def close(self):
+        """Stop workers, disconnect hardware and free the shared rings"""
+        for process, inbox in self.workers.values():
+            inbox.put(('stop',))
+        for process, _ in self.workers.values():
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        for session_id in list(self.sessions):
+            session = self.remove_session(session_id)
+            session['bioamp'].disconnect()
+            session['robot'].disconnect()
+            session['ring'].close()
+        self.selector.close()
@@ -2,53 +2,104 @@
 Complete real-time BCI pipeline for BioAmp EXG Pill
 """
 import time
+from collections import deque
 import numpy as np
 from hardware.bioamp_reader import BioAmpReader
 from hardware.robot_controller import RobotController
 from src.acquisition.circular_buffer import CircularBuffer
 from src.preprocessing.filters import RealtimePreprocessor
+from src.preprocessing.artifact_detector import StreamingArtifactDetector
 from src.features.band_power import BandPowerExtractor
+from src.features.stft import SpectrogramRing, stft_frames
+from src.features.filter_bank import FilterBankBandPower
 from src.features.normalizer import FeatureNormalizer
-from src.models.classifier import MotorImageryClassifier, ThresholdClassifier
+from src.models.classifier import (MotorImageryClassifier, ThresholdClassifier,
+                                   is_threshold_model)
+from src.models.artifact import is_artifact, load_artifact
 from src.control.command_mapper import CommandMapper
+from src.monitoring.latency import LatencyHistogram
+from src.monitoring.signal_quality import SignalQualityMonitor
+from src.monitoring.tracing import StageTracer
 from config.settings import Config
 
 class RealtimeBCIPipeline:
-    def __init__(self, model_path, normalizer_path=None, use_duration=False):
+    def __init__(self, model_path, normalizer_path=None, use_duration=False,
+                 bioamp=None, robot=None,
+                 classifier=None, normalizer=None, preprocessor=None, tracer=None,
+                 config=None):
         print("Initializing NEUROSENSE AI Pipeline (BioAmp Edition)...")
         
-        # Hardware
-        self.bioamp = BioAmpReader()
-        self.robot = RobotController()
+        # Session settings (SessionConfig); every component is built from them
+        self.config = config = config or Config
         
-        # Processing components
-        self.buffer = CircularBuffer()
-        self.preprocessor = RealtimePreprocessor()
-        self.feature_extractor = BandPowerExtractor()
-        self.normalizer = FeatureNormalizer()
-        self.classifier = MotorImageryClassifier()
-        self.command_mapper = CommandMapper()
+        # Hardware (injectable, e.g. SimulatedBioAmp-backed readers)
+        self.bioamp = bioamp or BioAmpReader(config=config)
+        self.robot = robot or RobotController(config=config)
+        
+        # Processing components. Stateless stages and loaded models may be
+        # passed in already shared (see MultiSessionRuntime); per-session
+        # state is the buffer, feature baseline and command mapper.
+        self.buffer = CircularBuffer(config=config)
+        self.preprocessor = preprocessor or RealtimePreprocessor(config=config)
+        self.feature_extractor = BandPowerExtractor(config=config)
+        # (classifier, normalizer, ERD baseline) live in one tuple so
+        # swap_model() replaces all three with a single store while the loop
+        # keeps running
+        self._model = (classifier, normalizer or FeatureNormalizer(),
+                       getattr(classifier, 'baseline', None))
+        self.model_version = None
+        self.model_swaps = 0
+        self.command_mapper = CommandMapper(config=config)
+        
+        # Raw-stream artifact check, fed sample by sample next to the buffer
+        self.artifact_detector = (StreamingArtifactDetector(config=config)
+                                  if config.STREAM_ARTIFACT_CHECK else None)
+        # Streaming spectrogram for the 'stft' feature engine; band powers
+        # read its frames with the preprocessing filters applied as a gain
+        self.stft = SpectrogramRing(config=config) if config.FEATURE_ENGINE == 'stft' else None
+        self.spectral_gain = (self.preprocessor.power_response(self.stft.freqs)
+                              if self.stft is not None else None)
+        # Causal band filters with sliding mean-square envelopes for the
+        # 'filterbank' engine; band power is current after every sample
+        self.filter_bank = (FilterBankBandPower(config=config)
+                            if config.FEATURE_ENGINE == 'filterbank' else None)
+        # Per-second RMS, mains, drift and clipping of the same raw stream
+        self.quality_monitor = SignalQualityMonitor(stft=self.stft, config=config)
         
         # Duration-based commands
         self.use_duration = use_duration
         
-        # Load trained model
-        try:
-            self.classifier.load(model_path)
-        except:
-            print("Warning: Could not load model, using threshold classifier")
-            self.classifier = ThresholdClassifier()
+        # Load trained model (imports only that estimator's sklearn module;
+        # .npz artifacts need NumPy only and carry their own normalizer)
+        if classifier is None:
+            try:
+                if is_artifact(model_path):
+                    self.classifier, bundled, _ = load_artifact(model_path)
+                    if normalizer is None and bundled is not None:
+                        self.normalizer = normalizer = bundled
+                elif is_threshold_model(model_path):
+                    self.classifier = ThresholdClassifier.from_file(model_path, config=config)
+                else:
+                    self.classifier = MotorImageryClassifier.from_file(model_path, config=config)
+            except:
+                print("Warning: Could not load model, using threshold classifier")
+                self.classifier = ThresholdClassifier(config=config)
         
         # Load normalizer if available
-        if normalizer_path:
+        if normalizer is None and normalizer_path:
             try:
                 self.normalizer.load(normalizer_path)
             except:
                 print("Warning: Could not load normalizer")
+        self._install_schema(self.classifier)
+        
+        # Performance tracking (fixed memory, sessions may run for days)
+        self.latency = LatencyHistogram()
+        self.predictions_log = deque(maxlen=config.PREDICTION_LOG_SIZE)
+        self.last_prediction = None  # Class of the last window (None: rejected)
         
-        # Performance tracking
-        self.latencies = []
-        self.predictions_log = []
+        # Per-stage spans (off until tracer.enable(), see StageTracer)
+        self.tracer = tracer or StageTracer()
         
     def connect_hardware(self):
         """Connect to BioAmp and robot"""
@@ -66,55 +117,344 @@ class RealtimeBCIPipeline:
         # Calibrate baseline
         print("\n=== Baseline Calibration ===")
         self.bioamp.calibrate_baseline(duration=5)
+        if self.artifact_detector is not None:
+            self.artifact_detector.set_baseline(self.bioamp.baseline)
+        self.quality_monitor.set_baseline(self.bioamp.baseline)
         
         return bioamp_ok
     
-    def process_window(self, window):
+    def process_window(self, window, rejection=None, spectrum=None):
         """
         Process one window through pipeline
         
         Args:
             window: (n_samples,) single channel
+            rejection: reason the raw-stream artifact check rejected this
+                window (skips all DSP), None if it passed or was not run
+            spectrum: this window's spectral state from the stream (see
+                window_spectrum())
             
         Returns:
             tuple: (command, confidence, latency_ms)
         """
         start_time = time.time()
+        profiler = self.tracer.begin_window()
+        window_start = time.perf_counter_ns()
+        
+        # Stages 1-2: Preprocessing and feature extraction
+        if rejection is not None:
+            features, erd = None, None
+        else:
+            features, erd = self.extract_features(window, spectrum)
+        
+        if features is None:
+            command, confidence = 'STOP', 0.0
+            self.last_prediction = None
+        else:
+            # Stages 3-4: Normalization and classification
+            prediction, confidence = self.classify(features, erd)
+            self.last_prediction = prediction
+            
+            # Stage 5: Command mapping
+            command = self.map_command(prediction, confidence)
+        
+        # Calculate latency
+        latency = (time.time() - start_time) * 1000
+        self.tracer.record('process_window', window_start, time.perf_counter_ns())
+        self.tracer.end_window(profiler, latency)
+        
+        return command, confidence, latency
+    
+    def extract_features(self, window, spectrum=None, tracer=None):
+        """
+        Preprocess a window and extract band power features
+        
+        With the 'stft' engine the spectrum comes from the spectrogram
+        frames instead (the window's own frames if none are given, which
+        are identical) and no time-domain preprocessing runs. With the
+        'filterbank' engine the features are the stream's band powers at
+        the window end (the window filtered on its own if none are given).
+        Neither engine filters the window in the time domain, so without the
+        stream artifact detector they reject windows whose raw amplitude
+        exceeds ARTIFACT_MAX_UV, as window_features() does offline.
+        
+        Args:
+            window: (n_samples,) single channel
+            spectrum: from window_spectrum(): (n_frames, n_freqs) frames
+                ('stft') or (n_features,) band powers ('filterbank')
+            tracer: StageTracer for the spans (default: self.tracer)
+        
+        Returns:
+            tuple: (features, erd), or (None, None) if the window has artifacts
+        """
+        if tracer is None:
+            tracer = self.tracer
+        span = tracer.span
+        
+        stream_engine = self.stft is not None or self.filter_bank is not None
+        if stream_engine and self.artifact_detector is None:
+            with span('artifact_check'):
+                if np.max(np.abs(window)) > self.config.ARTIFACT_MAX_UV:
+                    return None, None
+        
+        if self.stft is not None:
+            with span('stft_bands'):
+                if spectrum is None:
+                    stft = self.stft
+                    spectrum = stft_frames(window, stft.nperseg, stft.hop, stft.fs)
+                features = self.feature_extractor.extract_frames(spectrum, self.spectral_gain)
+            return features, self.feature_extractor.calculate_erd(features)
+        
+        if self.filter_bank is not None:
+            with span('filter_bank'):
+                if spectrum is None:
+                    spectrum = self.filter_bank.extract(window)
+                features = np.asarray(spectrum, dtype=float)
+            return features, self.feature_extractor.calculate_erd(features)
         
         # Stage 1: Preprocessing
-        preprocessed, is_clean = self.preprocessor.preprocess(window)
+        with span('preprocess'):
+            preprocessed, is_clean = self.preprocessor.preprocess(window, tracer)
         
         if not is_clean:
-            latency = (time.time() - start_time) * 1000
-            return 'STOP', 0.0, latency
+            return None, None
         
         # Stage 2: Feature extraction
-        features = self.feature_extractor.extract(preprocessed)
+        with span('welch'):
+            features = self.feature_extractor.extract(preprocessed)
         
         # Optional: Calculate ERD
         erd = self.feature_extractor.calculate_erd(features)
         
+        return features, erd
+    
+    def classify(self, features, erd):
+        """
+        Normalize features and classify
+        
+        A tuned threshold model's ERD is taken against the REST baseline it
+        was tuned with instead of the given one.
+        
+        Returns:
+            tuple: (prediction, confidence)
+        """
+        # One read, so a concurrent swap_model() never mixes two models
+        classifier, normalizer, baseline = self._model
+        if baseline is not None:
+            erd = self.feature_extractor.calculate_erd(features, baseline)
+        
         # Stage 3: Normalization
-        normalized = self.normalizer.normalize(features)
+        with self.tracer.span('normalize'):
+            normalized = normalizer.normalize(features)
         
         # Stage 4: Classification
-        if isinstance(self.classifier, ThresholdClassifier):
-            prediction = self.classifier.predict(erd)
-            confidence = self.classifier.predict_proba(erd)[0][prediction]
-        else:
-            prediction = self.classifier.predict(normalized)[0]
-            confidence = self.classifier.predict_proba(normalized)[0][prediction]
+        with self.tracer.span('classify'):
+            return self._predict(classifier, normalized, erd)
+    
+    @staticmethod
+    def _predict(classifier, normalized, erd):
+        if isinstance(classifier, ThresholdClassifier):
+            prediction = classifier.predict(erd)
+            return prediction, classifier.predict_proba(erd)[0][prediction]
+        prediction = classifier.predict(normalized)[0]
+        return prediction, classifier.predict_proba(normalized)[0][prediction]
+    
+    @property
+    def classifier(self):
+        return self._model[0]
+    
+    @classifier.setter
+    def classifier(self, classifier):
+        self._model = (classifier, self._model[1], getattr(classifier, 'baseline', None))
+    
+    @property
+    def normalizer(self):
+        return self._model[1]
+    
+    @normalizer.setter
+    def normalizer(self, normalizer):
+        self._model = (self._model[0], normalizer, self._model[2])
+    
+    @property
+    def erd_baseline(self):
+        """(mu, beta) REST baseline of a tuned threshold model, else None"""
+        return self._model[2]
+    
+    def swap_model(self, classifier, normalizer=None, version=None, warmup_windows=None):
+        """
+        Atomically replace the model of a (possibly running) pipeline
         
-        # Stage 5: Command mapping
-        if self.use_duration:
-            command = self.command_mapper.map_duration(prediction, confidence)
-        else:
-            command = self.command_mapper.map_binary(prediction, confidence)
+        The new model is warmed up on synthetic windows in the calling thread
+        through the session's feature engine (windows are featurized on their
+        own, the session's buffer, stream state, smoothing and tracer are not
+        touched), then installed with
+        a single attribute store. The processing loop never waits: windows
+        already in classify() finish on the old model, the next ones use the
+        new one. If warmup raises, the old model stays active.
         
-        # Calculate latency
-        latency = (time.time() - start_time) * 1000
+        Args:
+            classifier: trained classifier (MotorImageryClassifier, artifact, ...)
+            normalizer: its fitted normalizer (None = features used as is)
+            version: label kept in self.model_version (e.g. registry version)
+            warmup_windows: synthetic windows (default: config.WARMUP_WINDOWS, 0 = skip)
         
-        return command, confidence, latency
+        Returns:
+            list of float: warmup latency (ms) per window
+        """
+        from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+        
+        schema = getattr(classifier, 'feature_schema', None)
+        if schema is not None and tuple(schema) != self.feature_extractor.feature_names:
+            raise ValueError(f"Model expects features {', '.join(schema)}, this session "
+                             f"computes {', '.join(self.feature_extractor.feature_names)}; "
+                             "start a new session for it")
+        normalizer = normalizer or FeatureNormalizer()
+        if warmup_windows is None:
+            warmup_windows = self.config.WARMUP_WINDOWS
+        generator = SyntheticEEGGenerator(fs=self.preprocessor.fs, seed=0, config=self.config)
+        tracer = StageTracer()  # Keeps warmup spans out of the session's trace
+        latencies = []
+        for _ in range(warmup_windows):
+            start = time.perf_counter()
+            window = generator.generate(self.buffer.window_size)
+            features, erd = self.extract_features(window, tracer=tracer)
+            if features is not None:
+                self._predict(classifier, normalizer.normalize(features), erd)
+            latencies.append((time.perf_counter() - start) * 1000)
+        
+        self._model = (classifier, normalizer, getattr(classifier, 'baseline', None))
+        self.model_version = version
+        self.model_swaps += 1
+        return latencies
+    
+    def window_spectrum(self, end=None):
+        """
+        Spectral state of the window ending at stream sample end (default: now)
+        
+        Returns:
+            (n_frames, n_freqs) spectrogram frames ('stft'), (n_features,)
+            band powers ('filterbank'), or None with the 'welch' engine
+        """
+        if self.stft is not None:
+            return self.stft.window_frames(self.buffer.window_size, end)
+        if self.filter_bank is not None:
+            return self.filter_bank.power_at(self.filter_bank.sample_count if end is None
+                                             else end)
+        return None
+    
+    def feed_stream(self, samples):
+        """
+        Add raw samples to the stream stages in one chunked call each: raw
+        artifact detector, spectrogram ring, filter bank and quality monitor
+        
+        Returns:
+            tuple: (artifact check per window the chunk completes, oldest
+                first (None without a detector), quality reports of the
+                seconds it completes)
+        """
+        span = self.tracer.span
+        rejections = None
+        if self.artifact_detector is not None:
+            with span('stream_artifact'):
+                rejections = self.artifact_detector.add_samples(samples)
+        if self.stft is not None:
+            with span('stream_stft'):
+                self.stft.add_samples(samples)
+        if self.filter_bank is not None:
+            with span('stream_filter_bank'):
+                self.filter_bank.add_samples(samples)
+        with span('stream_quality'):
+            reports = self.quality_monitor.add_samples(samples)
+        return rejections, reports
+    
+    def reset_stream(self):
+        """Forget the stream stages' state, e.g. before feeding from a new position"""
+        for stage in (self.artifact_detector, self.stft, self.filter_bank,
+                      self.quality_monitor):
+            if stage is not None:
+                stage.reset()
+    
+    def feed(self, samples):
+        """
+        Add raw samples to the buffer and every stream stage
+        
+        Returns:
+            tuple: (list of (window, rejection, spectrum) for the windows
+                the chunk completes, oldest first, ready for
+                process_window(); quality reports from feed_stream())
+        """
+        with self.tracer.span('buffer'):
+            windows = self.buffer.add_samples(samples)
+        rejections, reports = self.feed_stream(samples)
+        if rejections is None:
+            rejections = [None] * len(windows)
+        # Stream index after each window (windows end on step boundaries)
+        step = self.buffer.step_size
+        last_end = self.buffer.sample_count // step * step
+        ready = [(window, rejection,
+                  self.window_spectrum(last_end - (len(windows) - 1 - i) * step))
+                 for i, (window, rejection) in enumerate(zip(windows, rejections))]
+        return ready, reports
+    
+    def screen(self):
+        """
+        Raw-stream artifact check of the window just completed (O(1))
+        
+        Returns:
+            str or None: rejection reason (counted in artifact_detector.rejections)
+        """
+        if self.artifact_detector is None:
+            return None
+        return self.artifact_detector.check()
+    
+    def _install_schema(self, classifier):
+        """Compute the features a model was trained on (its saved feature schema)"""
+        schema = getattr(classifier, 'feature_schema', None)
+        if schema is None or tuple(schema) == self.feature_extractor.feature_names:
+            return
+        if self.filter_bank is not None:
+            raise ValueError(f"The 'filterbank' engine cannot compute {', '.join(schema)}")
+        print(f"Using the model's features: {', '.join(schema)}")
+        self.feature_extractor = BandPowerExtractor(config=self.config, feature_names=schema)
+    
+    def map_command(self, prediction, confidence):
+        """Stage 5: smoothed binary or duration-based command"""
+        with self.tracer.span('command'):
+            if self.use_duration:
+                return self.command_mapper.map_duration(prediction, confidence)
+            return self.command_mapper.map_binary(prediction, confidence)
+    
+    def warmup(self, n_windows=None):
+        """
+        Run synthetic windows through every stage before real data arrives
+        
+        The first window otherwise pays one-off costs (scipy/sklearn first
+        calls, input validation caches, allocator growth). Command smoothing
+        is reset afterwards; latency stats and trace spans are not touched.
+        
+        Args:
+            n_windows: synthetic windows (default: config.WARMUP_WINDOWS, 0 = skip)
+        
+        Returns:
+            list of float: per-window latency (ms), first to last
+        """
+        from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+        
+        if n_windows is None:
+            n_windows = self.config.WARMUP_WINDOWS
+        generator = SyntheticEEGGenerator(fs=self.preprocessor.fs, seed=0, config=self.config)
+        tracing = self.tracer.enabled
+        self.tracer.disable()
+        latencies = []
+        try:
+            for _ in range(n_windows):
+                window = generator.generate(self.buffer.window_size)
+                _, _, latency = self.process_window(window)
+                latencies.append(latency)
+        finally:
+            self.tracer.enabled = tracing
+            self.command_mapper.reset()
+        return latencies
     
     def run(self, duration=None):
         """
@@ -124,14 +464,16 @@ class RealtimeBCIPipeline:
             duration: Run duration in seconds (None = infinite)
         """
         print("\n=== Starting Real-Time BCI ===")
-        print(f"Target latency: <{Config.TARGET_LATENCY_MS}ms")
-        print(f"Window: {Config.WINDOW_LENGTH}s, Overlap: {Config.WINDOW_OVERLAP*100}%")
+        print(f"Target latency: <{self.config.TARGET_LATENCY_MS}ms")
+        print(f"Window: {self.config.WINDOW_LENGTH}s, Overlap: {self.config.WINDOW_OVERLAP*100}%")
         print(f"Command mode: {'Duration-based' if self.use_duration else 'Binary'}")
         print("\nPress Ctrl+C to stop\n")
         
-        self.command_mapper.reset()
+        self.warmup()
         start_time = time.time()
         window_count = 0
+        step = self.buffer.step_size
+        pending = []
         
         try:
             for sample, timestamp in self.bioamp.stream_continuous():
@@ -139,34 +481,41 @@ class RealtimeBCIPipeline:
                 if duration and timestamp >= duration:
                     break
                 
-                # Add sample to buffer
-                self.buffer.add_sample(sample)
-                
-                # Get window if ready
-                window = self.buffer.get_window()
-                
-                if window is None:
+                # Collect samples up to the next step boundary, then feed the
+                # buffer and stream stages in one chunk (a window can only
+                # complete on a boundary)
+                pending.append(sample)
+                if (self.buffer.sample_count + len(pending)) % step:
                     continue
+                ready, reports = self.feed(pending)
+                pending = []
+                for quality in reports:
+                    if quality['issues']:
+                        print(f"[{timestamp:6.2f}s] Signal: "
+                              f"{SignalQualityMonitor.format_report(quality)}")
                 
-                # Process window
-                command, confidence, latency = self.process_window(window)
-                
-                # Send to robot (only if not STOP or changed)
-                self.robot.send_command(command)
-                
-                # Log performance
-                self.latencies.append(latency)
-                self.predictions_log.append({
-                    'timestamp': timestamp,
-                    'command': command,
-                    'confidence': confidence,
-                    'latency_ms': latency
-                })
-                
-                window_count += 1
-                
-                # Print status
-                print(f"[{timestamp:6.2f}s] {command:8s} (conf: {confidence:.2f}, latency: {latency:5.1f}ms)")
+                for window, rejection, spectrum in ready:
+                    # Process window (raw-stream artifacts skip the DSP)
+                    command, confidence, latency = self.process_window(window, rejection,
+                                                                       spectrum)
+                    
+                    # Send to robot (only if not STOP or changed)
+                    with self.tracer.span('robot_write'):
+                        self.robot.send_command(command, decision_time=time.perf_counter())
+                    
+                    # Log performance
+                    self.latency.record(latency)
+                    self.predictions_log.append({
+                        'timestamp': timestamp,
+                        'command': command,
+                        'confidence': confidence,
+                        'latency_ms': latency
+                    })
+                    
+                    window_count += 1
+                    
+                    # Print status
+                    print(f"[{timestamp:6.2f}s] {command:8s} (conf: {confidence:.2f}, latency: {latency:5.1f}ms)")
                 
         except KeyboardInterrupt:
             print("\n\nStopped by user")
@@ -180,22 +529,54 @@ class RealtimeBCIPipeline:
         print("PERFORMANCE REPORT")
         print("="*60)
         
-        if len(self.latencies) > 0:
-            latencies = np.array(self.latencies)
+        if self.latency.count > 0:
+            stats = self.latency.summary()
             
             print(f"Windows processed: {window_count}")
             print(f"\nLatency Statistics:")
-            print(f"  Mean:  {np.mean(latencies):6.1f} ms")
-            print(f"  Median: {np.median(latencies):6.1f} ms")
-            print(f"  P95:   {np.percentile(latencies, 95):6.1f} ms")
-            print(f"  Max:   {np.max(latencies):6.1f} ms")
+            print(f"  Mean:  {stats['mean']:6.1f} ms")
+            print(f"  Median: {stats['p50']:6.1f} ms")
+            print(f"  P95:   {stats['p95']:6.1f} ms")
+            print(f"  Max:   {stats['max']:6.1f} ms")
             
             # Check target
-            p95 = np.percentile(latencies, 95)
-            if p95 < Config.TARGET_LATENCY_MS:
-                print(f"\n✓ Target met! P95 latency: {p95:.1f}ms < {Config.TARGET_LATENCY_MS}ms")
+            p95 = stats['p95']
+            target = self.config.TARGET_LATENCY_MS
+            if p95 < target:
+                print(f"\n✓ Target met! P95 latency: {p95:.1f}ms < {target}ms")
             else:
-                print(f"\n✗ Target missed! P95 latency: {p95:.1f}ms > {Config.TARGET_LATENCY_MS}ms")
+                print(f"\n✗ Target missed! P95 latency: {p95:.1f}ms > {target}ms")
+        
+        stages = self.tracer.stage_summary()
+        if stages:
+            print(f"\nStage timings (last {min(self.tracer.count, self.tracer.capacity)} spans):")
+            for name, stage in stages.items():
+                print(f"  {name:16s} mean {stage['mean_ms']:7.2f} ms   max {stage['max_ms']:7.2f} ms")
+            if self.tracer.profiles:
+                print(f"  {len(self.tracer.profiles)} slow-window profiles captured")
+        
+        if self.artifact_detector is not None and self.artifact_detector.rejections:
+            reasons = ', '.join(f"{reason}: {count}" for reason, count
+                                in self.artifact_detector.rejections.most_common())
+            print(f"\nRejected before DSP: {sum(self.artifact_detector.rejections.values())} "
+                  f"windows ({reasons})")
+        
+        quality = self.quality_monitor.summary()
+        if quality['seconds']:
+            flagged = ', '.join(f"{issue}: {count}s" for issue, count
+                                in quality['issues'].items()) or 'none'
+            print(f"\nSignal quality (last {quality['seconds']}s): "
+                  f"RMS {quality['rms_uv']:.1f} µV, mains {quality['mains_uv']:.1f} µV, "
+                  f"max drift {quality['max_drift_uv_s']:.1f} µV/s, "
+                  f"clipped {quality['clip_ratio']:.2%}")
+            print(f"  Flagged seconds: {flagged}")
+        
+        if self.robot.use_ack and self.robot.connected:
+            ack = self.robot.ack_report()
+            print(f"\nRobot acks: {ack['acked']}/{ack['sent']} "
+                  f"(retries: {ack['retries']}, timeouts: {ack['timeouts']})")
+            print(f"  Actuation round trip P50: {ack['latency_ms']['p50']:6.1f} ms, "
+                  f"P95: {ack['latency_ms']['p95']:6.1f} ms")
         
         print("="*60)
     
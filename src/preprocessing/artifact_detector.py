@@ -0,0 +1,180 @@
+"""
+Incremental artifact detection on the raw (unfiltered) stream
+
+RealtimePreprocessor only finds artifacts after detrending and filtering a
+window. StreamingArtifactDetector keeps sliding statistics of the last
+window of raw samples, updated in O(1) per sample, so a contaminated
+window is rejected before any DSP runs. Checks, in reporting order:
+
+    rail         a sample at the ADC rails (0 or 1023): clipping
+    flat         ARTIFACT_FLAT_SECONDS of identical samples: lead off
+    amplitude    max |x| > ARTIFACT_MAX_UV (monotonic deque)
+    variance     std > ARTIFACT_MAX_STD_UV (running sums)
+    line_length  mean |x[i] - x[i-1]| > ARTIFACT_MAX_LINE_LENGTH_UV: EMG bursts
+"""
+from collections import Counter, deque
+from config.settings import Config
+
+REASONS = ('rail', 'flat', 'amplitude', 'variance', 'line_length')
+
+def adc_rails(config=None, baseline=0.0):
+    """
+    Microvolt levels at or beyond which a sample sits on an ADC rail
+
+    Args:
+        baseline: microvolts BioAmpReader subtracts from every sample
+
+    Returns:
+        tuple: (low, high), half an ADC count inside the rails
+    """
+    config = config or Config
+    baseline = baseline or 0.0
+    low = config.voltage_to_uv(config.adc_to_voltage(0))
+    high = config.voltage_to_uv(config.adc_to_voltage(2 ** config.ADC_RESOLUTION - 1))
+    half_count = (config.voltage_to_uv(config.adc_to_voltage(1)) - low) / 2
+    return low - baseline + half_count, high - baseline - half_count
+
+class StreamingArtifactDetector:
+    def __init__(self, window_size=None, step_size=None, baseline=0.0, config=None):
+        """
+        Args:
+            window_size, step_size: samples (default: config.WINDOW_SAMPLES / STEP_SAMPLES)
+            baseline: microvolts BioAmpReader subtracts from every sample
+                (moves the ADC rails, see set_baseline)
+            config: SessionConfig (default: global Config)
+        """
+        config = config or Config
+        self.config = config
+        self.window_size = window_size or config.WINDOW_SAMPLES
+        self.step_size = step_size or config.STEP_SAMPLES
+        self.max_uv = config.ARTIFACT_MAX_UV
+        self.max_std = config.ARTIFACT_MAX_STD_UV
+        self.max_line_length = config.ARTIFACT_MAX_LINE_LENGTH_UV
+        self.flat_samples = max(int(config.ARTIFACT_FLAT_SECONDS * config.SAMPLING_RATE), 2)
+        self.set_baseline(baseline)
+        self.rejections = Counter()
+        self.reset()
+
+    def set_baseline(self, baseline):
+        """Rails in microvolts for samples with baseline already removed"""
+        self.rail_low, self.rail_high = adc_rails(self.config, baseline)
+
+    def reset(self):
+        """Forget the stream (e.g. after a gap in the samples)"""
+        self.sample_count = 0
+        self._ring = [0.0] * self.window_size
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._line = 0.0
+        self._peaks = deque()  # (index, |x|), |x| decreasing
+        self._run = 0
+        self._last_flat = -self.window_size - 1
+        self._last_rail = -self.window_size - 1
+
+    def add_sample(self, x):
+        """Add one raw sample (microvolts), O(1)"""
+        i = self.sample_count
+        ring = self._ring
+        pos = i % self.window_size
+        previous = ring[(i - 1) % self.window_size] if i else x
+        if i >= self.window_size:
+            # Oldest sample and its step to the next one leave the window
+            old = ring[pos]
+            self._sum -= old
+            self._sum_sq -= old * old
+            self._line -= abs(ring[(pos + 1) % self.window_size] - old)
+        ring[pos] = x
+        self._sum += x
+        self._sum_sq += x * x
+        if i:
+            self._line += abs(x - previous)
+
+        magnitude = abs(x)
+        peaks = self._peaks
+        while peaks and peaks[-1][1] <= magnitude:
+            peaks.pop()
+        peaks.append((i, magnitude))
+        if peaks[0][0] <= i - self.window_size:
+            peaks.popleft()
+
+        self._run = self._run + 1 if i and x == previous else 1
+        if self._run >= self.flat_samples:
+            self._last_flat = i
+        if x <= self.rail_low or x >= self.rail_high:
+            self._last_rail = i
+
+        self.sample_count = i + 1
+        if pos == self.window_size - 1:
+            self._resum()
+
+    def _resum(self):
+        """Recompute the running sums once per window (no float drift over days)"""
+        ring = self._ring
+        self._sum = sum(ring)
+        self._sum_sq = sum(x * x for x in ring)
+        # Ring is in stream order right after a wrap
+        self._line = sum(abs(b - a) for a, b in zip(ring, ring[1:]))
+
+    def stats(self):
+        """
+        Statistics of the current window
+
+        Returns:
+            dict: max_abs, std, line_length (mean |step|), flat, rail
+        """
+        n = min(self.sample_count, self.window_size)
+        if n == 0:
+            return {'max_abs': 0.0, 'std': 0.0, 'line_length': 0.0, 'flat': False,
+                    'rail': False}
+        mean = self._sum / n
+        i = self.sample_count - 1
+        return {
+            'max_abs': self._peaks[0][1],
+            'std': max(self._sum_sq / n - mean * mean, 0.0) ** 0.5,
+            'line_length': self._line / max(n - 1, 1),
+            'flat': self._last_flat > i - self.window_size + self.flat_samples - 1,
+            'rail': self._last_rail > i - self.window_size
+        }
+
+    def reason(self):
+        """
+        Why the current window is rejected, O(1)
+
+        Returns:
+            str or None: first failing check in REASONS order, None if clean
+        """
+        if self.sample_count == 0:
+            return None
+        stats = self.stats()
+        if stats['rail']:
+            return 'rail'
+        if stats['flat']:
+            return 'flat'
+        if stats['max_abs'] > self.max_uv:
+            return 'amplitude'
+        if stats['std'] > self.max_std:
+            return 'variance'
+        if stats['line_length'] > self.max_line_length:
+            return 'line_length'
+        return None
+
+    def check(self):
+        """reason(), counted in self.rejections"""
+        reason = self.reason()
+        if reason is not None:
+            self.rejections[reason] += 1
+        return reason
+
+    def add_samples(self, samples):
+        """
+        Add a chunk, checking every window CircularBuffer.add_samples() emits
+
+        Returns:
+            list: check() result per completed window, oldest first
+        """
+        reasons = []
+        for x in samples:
+            self.add_sample(float(x))
+            if self.sample_count % self.step_size == 0 and self.sample_count >= self.window_size:
+                reasons.append(self.check())
+        return reasons
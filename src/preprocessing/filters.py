@@ -2,32 +2,81 @@
 Signal preprocessing for single-channel EEG
 """
 import numpy as np
-from scipy.signal import butter, filtfilt, iirnotch
+from functools import lru_cache
+from scipy.signal import butter, filtfilt, sosfiltfilt, iirnotch, detrend, freqz, sosfreqz
 from config.settings import Config
+from src.monitoring.tracing import null_span
+
+# Max |x| (μV) of a clean window after filtering, live and in batch
+ARTIFACT_THRESHOLD_UV = 150
+
+@lru_cache(maxsize=32)
+def design_filters(lowcut, highcut, notch_freq, fs, order):
+    """
+    Design (and cache) the bandpass and notch filters
+    
+    One design is shared by every preprocessor/session using the same
+    parameters, so callers must not modify the arrays. The bandpass uses
+    second-order sections: in (b, a) form an order-5 8-30 Hz design has
+    poles outside the unit circle from ~2 kHz sampling upwards.
+    
+    Returns:
+        tuple: (bp_sos, notch_b, notch_a)
+    """
+    nyq = 0.5 * fs
+    bp_sos = butter(order, [lowcut / nyq, highcut / nyq], btype='band', output='sos')
+    notch_b, notch_a = iirnotch(notch_freq, Q=30, fs=fs)
+    
+    # scipy's sosfilt kernels need a writable sos array; the notch can be frozen
+    notch_b.setflags(write=False)
+    notch_a.setflags(write=False)
+    return bp_sos, notch_b, notch_a
 
 class RealtimePreprocessor:
     def __init__(self, 
-                 lowcut=Config.BANDPASS_LOW,
-                 highcut=Config.BANDPASS_HIGH,
-                 notch_freq=Config.NOTCH_FREQ,
-                 fs=Config.SAMPLING_RATE,
-                 order=Config.FILTER_ORDER):
-        
-        self.fs = fs
-        self.lowcut = lowcut
-        self.highcut = highcut
-        self.notch_freq = notch_freq
-        self.order = order
-        
-        # Design bandpass filter
-        nyq = 0.5 * fs
-        low = lowcut / nyq
-        high = highcut / nyq
-        self.bp_b, self.bp_a = butter(order, [low, high], btype='band')
-        
-        # Design notch filter (50 Hz / 60 Hz)
-        self.notch_b, self.notch_a = iirnotch(notch_freq, Q=30, fs=fs)
+                 lowcut=None,
+                 highcut=None,
+                 notch_freq=None,
+                 fs=None,
+                 order=None,
+                 config=None):
+        """
+        Args:
+            lowcut, highcut, notch_freq, fs, order: override the config values
+            config: SessionConfig (default: global Config)
+        """
+        config = config or Config
+        self.fs = fs or config.SAMPLING_RATE
+        self.lowcut = lowcut or config.BANDPASS_LOW
+        self.highcut = highcut or config.BANDPASS_HIGH
+        self.notch_freq = notch_freq or config.NOTCH_FREQ
+        self.order = order or config.FILTER_ORDER
         
+        # Bandpass (8-30 Hz) and notch (50 Hz / 60 Hz) designs, shared via cache
+        self.bp_sos, self.notch_b, self.notch_a = design_filters(
+            self.lowcut, self.highcut, self.notch_freq, self.fs, self.order)
+        
+    def design_key(self):
+        """Filter parameters; preprocessors with equal keys are interchangeable"""
+        return (self.lowcut, self.highcut, self.notch_freq, self.fs, self.order)
+        
+    def power_response(self, freqs):
+        """
+        Power gain of notch + bandpass as preprocess() applies them
+        
+        filtfilt runs each filter forwards and backwards, so the magnitude
+        response enters squared and the power response to the fourth power.
+        
+        Args:
+            freqs: (n_freqs,) Hz
+            
+        Returns:
+            (n_freqs,) gain
+        """
+        _, bandpass = sosfreqz(self.bp_sos, worN=freqs, fs=self.fs)
+        _, notch = freqz(self.notch_b, self.notch_a, worN=freqs, fs=self.fs)
+        return np.abs(bandpass * notch) ** 4
+    
     def bandpass_filter(self, data):
         """
         Apply bandpass filter (8-30 Hz)
@@ -38,7 +87,7 @@ class RealtimePreprocessor:
         Returns:
             filtered: (n_samples,)
         """
-        return filtfilt(self.bp_b, self.bp_a, data)
+        return sosfiltfilt(self.bp_sos, data)
     
     def notch_filter(self, data):
         """
@@ -52,43 +101,71 @@ class RealtimePreprocessor:
         """
         return filtfilt(self.notch_b, self.notch_a, data)
     
-    def remove_artifacts(self, data, threshold=150):
+    def remove_artifacts(self, data, threshold=ARTIFACT_THRESHOLD_UV):
         """
         Check for artifacts (amplitude > threshold μV)
         
+        Args:
+            data: (..., n_samples) filtered windows
+        
         Returns:
-            bool: True if clean, False if artifact detected
+            bool (...): True if clean, False if artifact detected
         """
-        max_amp = np.max(np.abs(data))
+        max_amp = np.max(np.abs(data), axis=-1)
         return max_amp < threshold
     
     def detrend(self, data):
         """Remove linear trend"""
-        from scipy.signal import detrend
         return detrend(data)
     
-    def preprocess(self, window):
+    def preprocess(self, window, tracer=None):
         """
         Complete preprocessing pipeline
         
         Args:
             window: (n_samples,) single channel
+            tracer: optional StageTracer timing each step
             
         Returns:
             tuple: (preprocessed, is_clean)
                 preprocessed: (n_samples,)
                 is_clean: bool
         """
+        span = tracer.span if tracer is not None else null_span
+        
         # Detrend
-        detrended = self.detrend(window)
+        with span('detrend'):
+            detrended = self.detrend(window)
         
         # Notch filter (remove powerline noise)
-        notched = self.notch_filter(detrended)
+        with span('notch'):
+            notched = self.notch_filter(detrended)
         
         # Bandpass filter
-        filtered = self.bandpass_filter(notched)
+        with span('bandpass'):
+            filtered = self.bandpass_filter(notched)
         
         # Artifact detection
-        is_clean = self.remove_artifacts(filtered)
+        with span('artifact_check'):
+            is_clean = self.remove_artifacts(filtered)
         
         return filtered, is_clean
+    
+    def preprocess_batch(self, windows):
+        """
+        preprocess() for many windows at once (along the last axis)
+        
+        Each window is detrended and filtered independently, exactly as
+        process_window() does one at a time, so strided views of a longer
+        recording can be passed without copying them first.
+        
+        Args:
+            windows: (..., n_samples), e.g. (n_windows, n_samples)
+            
+        Returns:
+            tuple: (preprocessed (..., n_samples), is_clean (...) bool)
+        """
+        detrended = detrend(windows, axis=-1)
+        notched = filtfilt(self.notch_b, self.notch_a, detrended, axis=-1)
+        filtered = sosfiltfilt(self.bp_sos, notched, axis=-1)
+        return filtered, self.remove_artifacts(filtered)
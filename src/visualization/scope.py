@@ -0,0 +1,328 @@
+"""
+Live oscilloscope for arbitrarily long recordings
+
+SummaryPyramid keeps the stream at several resolutions. Level 0 is the raw
+samples; each level above stores the (min, max) of SCOPE_PYRAMID_FACTOR bins
+of the level below. Every level is a fixed-size ring, so memory is bounded
+and coarse levels reach back hours. A query for the last N seconds at P
+pixels reads from the coarsest level that still has at least P bins in the
+span, then min/max-decimates to exactly P columns. Each redraw therefore
+costs O(P) regardless of how long the recording is, and spikes narrower
+than a pixel still show.
+
+LiveScope draws the query as one line of vertical min-max strokes. It uses
+blitting: the axes background is cached and only the line is redrawn.
+LiveSpectrogram blits the newest frames of a SpectrogramRing the same way,
+so it runs no FFTs of its own.
+"""
+import math
+import time
+import numpy as np
+from config.settings import Config
+
+def minmax_decimate(mins, maxs, n_bins):
+    """
+    Reduce (min, max) pairs to at most n_bins groups of consecutive pairs
+
+    Args:
+        mins, maxs: (n,) per-bin extremes (pass the samples twice for raw data)
+        n_bins: target number of columns
+
+    Returns:
+        tuple: (starts, mins, maxs), starts = index of each group's first bin
+    """
+    mins = np.asarray(mins, dtype=float)
+    maxs = np.asarray(maxs, dtype=float)
+    if len(mins) <= n_bins:
+        return np.arange(len(mins)), mins, maxs
+    starts = np.arange(n_bins) * len(mins) // n_bins
+    return starts, np.minimum.reduceat(mins, starts), np.maximum.reduceat(maxs, starts)
+
+def envelope(t, mins, maxs):
+    """x, y of one polyline stroking min -> max at every column"""
+    return np.repeat(t, 2), np.column_stack([mins, maxs]).ravel()
+
+class SummaryPyramid:
+    def __init__(self, raw_seconds=None, factor=None, levels=None, config=None):
+        """
+        Args:
+            raw_seconds: raw samples kept at level 0; every level holds
+                the same number of bins (default: config.SCOPE_RAW_SECONDS)
+            factor: bins of level k merged into one bin of level k + 1
+                (default: config.SCOPE_PYRAMID_FACTOR)
+            levels: number of levels (default: config.SCOPE_PYRAMID_LEVELS)
+            config: SessionConfig (default: global Config)
+        """
+        config = config or Config
+        self.fs = config.SAMPLING_RATE
+        self.factor = factor or config.SCOPE_PYRAMID_FACTOR
+        self.n_levels = levels or config.SCOPE_PYRAMID_LEVELS
+        self.capacity = int((raw_seconds or config.SCOPE_RAW_SECONDS) * self.fs)
+        self.mins = np.zeros((self.n_levels, self.capacity))
+        self.maxs = np.zeros((self.n_levels, self.capacity))
+        self.counts = [0] * self.n_levels  # Completed bins per level
+        # Bins of level k not yet merged into level k + 1 (< factor of them)
+        self._pending = [(np.empty(0), np.empty(0)) for _ in range(self.n_levels)]
+        self.sample_count = 0
+
+    def bin_size(self, level):
+        """Samples per bin at a level"""
+        return self.factor ** level
+
+    def retained_seconds(self, level):
+        """How far back a level reaches"""
+        return self.capacity * self.bin_size(level) / self.fs
+
+    def _write(self, level, mins, maxs):
+        if len(mins) > self.capacity:
+            self.counts[level] += len(mins) - self.capacity
+            mins, maxs = mins[-self.capacity:], maxs[-self.capacity:]
+        pos = self.counts[level] % self.capacity
+        first = min(len(mins), self.capacity - pos)
+        self.mins[level, pos:pos + first] = mins[:first]
+        self.maxs[level, pos:pos + first] = maxs[:first]
+        self.mins[level, :len(mins) - first] = mins[first:]
+        self.maxs[level, :len(mins) - first] = maxs[first:]
+        self.counts[level] += len(mins)
+
+    def add_samples(self, samples):
+        """Add a chunk of raw samples, amortized O(1) per sample"""
+        mins = maxs = np.asarray(samples, dtype=float)
+        self.sample_count += len(mins)
+        for level in range(self.n_levels):
+            self._write(level, mins, maxs)
+            if level == self.n_levels - 1:
+                break
+            pending_mins, pending_maxs = self._pending[level]
+            if len(pending_mins):
+                mins = np.concatenate([pending_mins, mins])
+                maxs = np.concatenate([pending_maxs, maxs])
+            full = len(mins) // self.factor * self.factor
+            self._pending[level] = (mins[full:].copy(), maxs[full:].copy())
+            if full == 0:
+                break
+            mins = mins[:full].reshape(-1, self.factor).min(axis=1)
+            maxs = maxs[:full].reshape(-1, self.factor).max(axis=1)
+
+    def _read(self, level, first, last):
+        idx = np.arange(first, last) % self.capacity
+        return self.mins[level, idx], self.maxs[level, idx]
+
+    def recent(self, n_samples):
+        """Last raw samples (at most raw_seconds of them)"""
+        last = self.counts[0]
+        first = max(last - n_samples, last - self.capacity, 0)
+        return self._read(0, first, last)[0]
+
+    def level_for(self, seconds, n_pixels):
+        """Coarsest level with at least n_pixels bins in the span that still reaches back"""
+        span = max(seconds * self.fs, 1.0)
+        level = int(math.log(max(span / max(n_pixels, 1), 1.0), self.factor) + 1e-9)
+        level = min(level, self.n_levels - 1)
+        while level < self.n_levels - 1 and seconds > self.retained_seconds(level):
+            level += 1
+        return level
+
+    def query(self, seconds, n_pixels):
+        """
+        Min/max envelope of the last seconds at screen resolution
+
+        The newest partial bin is left out; it is shorter than one column.
+
+        Args:
+            seconds: span to show
+            n_pixels: columns available (e.g. axes width in pixels)
+
+        Returns:
+            tuple: (t, mins, maxs), at most n_pixels each; t is each
+                column's start in seconds since the first sample
+        """
+        level = self.level_for(seconds, n_pixels)
+        size = self.bin_size(level)
+        last = self.counts[level]
+        first = max(last - int(math.ceil(seconds * self.fs / size)),
+                    last - self.capacity, 0)
+        mins, maxs = self._read(level, first, last)
+        starts, mins, maxs = minmax_decimate(mins, maxs, n_pixels)
+        return (first + starts) * size / self.fs, mins, maxs
+
+class _BlittedPlot:
+    """Figure whose static parts are cached; update() only redraws self.artists"""
+
+    def __init__(self, fps=None, figsize=(12, 4), config=None):
+        import matplotlib.pyplot as plt
+
+        config = config or Config
+        self.interval = 1.0 / (fps or config.SCOPE_FPS)
+        self.redraws = 0
+        self.blits = 0
+        self.closed = False
+        self.artists = []
+        self._last_update = 0.0
+        self._background = None
+
+        self.fig, self.ax = plt.subplots(figsize=figsize)
+        canvas = self.fig.canvas
+        canvas.mpl_connect('draw_event', self._on_draw)
+        canvas.mpl_connect('close_event', self._on_close)
+
+    def start(self):
+        """Show the window without blocking the acquisition loop"""
+        import matplotlib.pyplot as plt
+
+        plt.show(block=False)
+        plt.pause(0.05)
+
+    def _on_draw(self, event):
+        # Full redraw (start, resize, zoom, rescale): cache the static background
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+
+    def _on_close(self, event):
+        self.closed = True
+
+    def _due(self, force):
+        now = time.perf_counter()
+        if not force and now - self._last_update < self.interval:
+            return False
+        self._last_update = now
+        return True
+
+    def _present(self, full=False):
+        """Blit the artists over the cached background (full redraw if needed)"""
+        canvas = self.fig.canvas
+        if full or self._background is None:
+            canvas.draw()  # Re-caches the background via _on_draw
+            self.redraws += 1
+        else:
+            canvas.restore_region(self._background)
+            for artist in self.artists:
+                self.ax.draw_artist(artist)
+            canvas.blit(self.ax.bbox)
+            self.blits += 1
+        canvas.flush_events()
+
+class LiveScope(_BlittedPlot):
+    def __init__(self, pyramid, seconds=None, fps=None, title='EEG (C3)', config=None):
+        """
+        Args:
+            pyramid: SummaryPyramid being fed with the stream
+            seconds: visible span (default: config.SCOPE_SECONDS; +/- keys zoom)
+            fps: max redraws per second (default: config.SCOPE_FPS)
+            config: SessionConfig (default: global Config)
+        """
+        config = config or Config
+        super().__init__(fps, config=config)
+        self.pyramid = pyramid
+        self.seconds = seconds or config.SCOPE_SECONDS
+
+        self.ax.set_title(f"{title} - keys: + / - zoom")
+        self.ax.set_xlabel('Time before now (s)')
+        self.ax.set_ylabel('Amplitude (μV)')
+        self.ax.grid(True)
+        self.ax.set_ylim(-100, 100)
+        self._set_span(self.seconds)
+        (self.line,) = self.ax.plot([], [], lw=0.8, animated=True)
+        self.status = self.ax.text(0.01, 0.95, '', transform=self.ax.transAxes,
+                                   va='top', animated=True)
+        self.artists = [self.line, self.status]
+        self.fig.canvas.mpl_connect('key_press_event', self._on_key)
+
+    @property
+    def n_pixels(self):
+        return max(int(self.ax.bbox.width), 1)
+
+    def _set_span(self, seconds):
+        top = self.pyramid.retained_seconds(self.pyramid.n_levels - 1)
+        self.seconds = min(max(seconds, 10.0 / self.pyramid.fs), top)
+        self.ax.set_xlim(-self.seconds, 0)
+
+    def _on_key(self, event):
+        if event.key in ('+', '='):
+            self._set_span(self.seconds / 2)
+        elif event.key in ('-', '_'):
+            self._set_span(self.seconds * 2)
+        else:
+            return
+        self.fig.canvas.draw_idle()
+
+    def update(self, force=False):
+        """
+        Redraw from the pyramid (throttled to fps)
+
+        Returns:
+            bool: True if the plot was redrawn
+        """
+        if not self._due(force):
+            return False
+        pyramid = self.pyramid
+        t, mins, maxs = pyramid.query(self.seconds, self.n_pixels)
+        end = pyramid.sample_count / pyramid.fs
+        self.line.set_data(*envelope(t - end, mins, maxs))
+        self.status.set_text(f"{end:8.1f} s")
+        self._present(len(mins) > 0 and
+                      self._rescale(float(np.min(mins)), float(np.max(maxs))))
+        return True
+
+    def _rescale(self, low, high):
+        """Fit the y axis when the signal leaves it or shrinks to a quarter of it"""
+        bottom, top = self.ax.get_ylim()
+        half = max(abs(low), abs(high), 1.0)
+        if low >= bottom and high <= top and half > (top - bottom) / 8:
+            return False
+        margin = 1.2 * half
+        self.ax.set_ylim(-margin, margin)
+        return True
+
+class LiveSpectrogram(_BlittedPlot):
+    def __init__(self, stft, seconds=None, max_freq=60.0, fps=None, config=None):
+        """
+        Args:
+            stft: SpectrogramRing being fed with the stream (no FFTs here)
+            seconds: visible span (default: config.SCOPE_SECONDS, at most
+                what the ring holds)
+            max_freq: top of the frequency axis (Hz)
+            fps: max redraws per second (default: config.SCOPE_FPS)
+            config: SessionConfig (default: global Config)
+        """
+        config = config or Config
+        super().__init__(fps, figsize=(12, 3), config=config)
+        self.stft = stft
+        seconds = seconds or config.SCOPE_SECONDS
+        self.n_frames = max(min(int(seconds * stft.fs / stft.hop), stft.capacity), 1)
+        self.bins = stft.freqs <= max_freq
+        self._image = np.full((int(np.sum(self.bins)), self.n_frames), np.nan)
+
+        seconds = self.n_frames * stft.hop / stft.fs
+        self.ax.set_title('Spectrogram')
+        self.ax.set_xlabel('Time before now (s)')
+        self.ax.set_ylabel('Frequency (Hz)')
+        self.image = self.ax.imshow(self._image, origin='lower', aspect='auto',
+                                    extent=(-seconds, 0, 0, stft.freqs[self.bins][-1]),
+                                    interpolation='nearest', animated=True)
+        self.fig.colorbar(self.image, ax=self.ax, label='Power (dB μV²/Hz)')
+        self.artists = [self.image]
+        self._scaled = False
+
+    def update(self, force=False):
+        """
+        Show the newest frames of the ring (throttled to fps)
+
+        Returns:
+            bool: True if the plot was redrawn
+        """
+        if not self._due(force) or self.stft.frame_count == 0:
+            return False
+        frames = self.stft.latest(self.n_frames)[:, self.bins]
+        db = 10 * np.log10(frames.T + 1e-12)
+        self._image[:, :self.n_frames - len(frames)] = np.nan
+        self._image[:, self.n_frames - len(frames):] = db
+        self.image.set_data(self._image)
+        full = not self._scaled
+        if full:
+            # Colour range from the first frames (fixed, so updates can blit)
+            self.image.set_clim(np.percentile(db, 5), np.percentile(db, 99.5) + 10)
+            self._scaled = True
+        self._present(full)
+        return True
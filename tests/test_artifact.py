@@ -0,0 +1,110 @@
+import unittest
+import json
+import subprocess
+import tempfile
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.models.artifact import export_artifact, load_artifact, read_header
+from src.models.classifier import MotorImageryClassifier
+from src.models.model_cache import ModelCache
+from src.features.normalizer import FeatureNormalizer
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+from config.settings import SessionConfig
+
+def _training_data(seed=0, n=80):
+    rng = np.random.default_rng(seed)
+    X = np.vstack([rng.normal([10, 5], 2, (n // 2, 2)),
+                   rng.normal([6, 4], 2, (n // 2, 2))])
+    y = np.repeat([0, 1], n // 2)
+    return X, y
+
+class TestModelArtifact(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'model.npz'
+        X, self.y = _training_data()
+        self.normalizer = FeatureNormalizer()
+        self.normalizer.fit(X)
+        self.X = self.normalizer.normalize(X)
+        self.X_raw = X
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _export(self, model_type, **kwargs):
+        classifier = MotorImageryClassifier(model_type=model_type)
+        classifier.train(self.X, self.y)
+        export_artifact(self.path, classifier, self.normalizer, **kwargs)
+        return classifier
+
+    def test_matches_sklearn_outputs(self):
+        X_new = np.random.default_rng(1).normal([8, 4.5], 3, (200, 2))
+        for model_type in ['LDA', 'LogisticRegression', 'SVM']:
+            classifier = self._export(model_type)
+            for mmap in [False, True]:
+                loaded, normalizer, header = load_artifact(self.path, mmap=mmap)
+                self.assertEqual(loaded.model_type, model_type)
+
+                X = normalizer.normalize(X_new)
+                np.testing.assert_allclose(X, self.normalizer.normalize(X_new))
+                np.testing.assert_array_equal(loaded.predict(X), classifier.predict(X))
+                np.testing.assert_allclose(loaded.predict_proba(X),
+                                           classifier.predict_proba(X), atol=1e-9)
+                # Single feature vectors, as the pipeline passes them
+                self.assertEqual(loaded.predict(X[0])[0], classifier.predict(X[0])[0])
+
+    def test_header_records_schema_and_config(self):
+        config = SessionConfig(SAMPLING_RATE=1000, MU_BAND=(8, 12))
+        self._export('LDA', config=config, user='alice')
+        header = read_header(self.path)
+        self.assertEqual(header['feature_schema'], ['mu_power', 'beta_power'])
+        self.assertEqual(header['training_config']['SAMPLING_RATE'], 1000)
+        self.assertEqual(header['training_config']['MU_BAND'], [8, 12])
+        self.assertEqual(header['user'], 'alice')
+
+        # Plain NumPy can read it without unpickling anything
+        with np.load(self.path, allow_pickle=False) as data:
+            self.assertEqual(json.loads(data['__header__'].tobytes())['version'], 1)
+
+    def test_rejects_newer_versions(self):
+        self._export('LDA')
+        with np.load(self.path) as data:
+            arrays = dict(data)
+        header = json.loads(arrays['__header__'].tobytes())
+        header['version'] = 99
+        arrays['__header__'] = np.frombuffer(json.dumps(header).encode(), dtype=np.uint8)
+        np.savez(self.path, **arrays)
+        with self.assertRaises(ValueError):
+            load_artifact(self.path)
+
+    def test_loads_without_sklearn(self):
+        self._export('SVM')
+        code = (f"import sys; sys.path.insert(0, {str(project_root)!r})\n"
+                "from src.models.artifact import load_artifact\n"
+                f"clf, norm, _ = load_artifact({str(self.path)!r}, mmap=True)\n"
+                "clf.predict_proba(norm.normalize([[8.0, 4.0]]))\n"
+                "print(any(m.startswith('sklearn') for m in sys.modules))")
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                             check=True)
+        self.assertEqual(out.stdout.strip(), 'False')
+
+    def test_pipeline_and_cache_use_bundled_normalizer(self):
+        self._export('LDA')
+        pipeline = RealtimeBCIPipeline(model_path=str(self.path))
+        self.assertEqual(pipeline.classifier.model_type, 'LDA')
+        self.assertTrue(pipeline.normalizer.is_fitted)
+        prediction, confidence = pipeline.classify(self.X_raw[0], np.zeros(2))
+        self.assertIn(prediction, [0, 1])
+        self.assertGreaterEqual(confidence, 0.5)
+
+        cache = ModelCache()
+        first = cache.load_artifact(self.path)
+        self.assertIs(cache.load_artifact(self.path), first)
+        self.assertIsInstance(first[0].params['coef'], np.memmap)
+
+if __name__ == '__main__':
+    unittest.main()
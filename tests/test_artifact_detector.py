@@ -0,0 +1,103 @@
+import unittest
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.acquisition.circular_buffer import CircularBuffer
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from src.models.classifier import ThresholdClassifier
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+from src.preprocessing.artifact_detector import StreamingArtifactDetector
+from config.settings import Config
+
+def _stream(n, seed=0, **kwargs):
+    """Synthetic EEG quantized like the BioAmp stream (microvolts)"""
+    adc = SyntheticEEGGenerator(seed=seed, **kwargs).generate_adc(n)
+    return Config.voltage_to_uv(Config.adc_to_voltage(adc))
+
+class TestStreamingArtifactDetector(unittest.TestCase):
+    def test_stats_match_window(self):
+        x = np.random.default_rng(0).normal(0, 20, 3333)
+        detector = StreamingArtifactDetector(window_size=200, step_size=50)
+        for i, sample in enumerate(x):
+            detector.add_sample(sample)
+            if i % 97 == 0 or i == len(x) - 1:
+                window = x[max(0, i - 199):i + 1]
+                stats = detector.stats()
+                self.assertAlmostEqual(stats['max_abs'], np.max(np.abs(window)))
+                self.assertAlmostEqual(stats['std'], np.std(window), places=6)
+                if len(window) > 1:
+                    self.assertAlmostEqual(stats['line_length'],
+                                           np.mean(np.abs(np.diff(window))), places=6)
+
+    def test_clean_eeg_passes(self):
+        detector = StreamingArtifactDetector()
+        reasons = detector.add_samples(_stream(20000, mains_amp=20, drift_amp=30))
+        self.assertEqual(len(reasons), (20000 - Config.WINDOW_SAMPLES) // Config.STEP_SAMPLES + 1)
+        self.assertEqual(detector.rejections, {})
+
+    def test_each_reason(self):
+        n = Config.WINDOW_SAMPLES
+        clean = _stream(2 * n)
+        rng = np.random.default_rng(1)
+        cases = {
+            'rail': np.r_[clean, clean[:10], [Config.voltage_to_uv(Config.adc_to_voltage(1023))]],
+            'flat': np.r_[clean, np.full(100, 3.0)],
+            'amplitude': np.r_[clean, [350.0]],
+            'variance': np.r_[clean, rng.uniform(-95, 95, n)],
+            'line_length': np.r_[clean, np.tile([-15.0, 15.0], n // 2)]
+        }
+        for reason, x in cases.items():
+            detector = StreamingArtifactDetector()
+            for sample in x:
+                detector.add_sample(sample)
+            self.assertEqual(detector.reason(), reason)
+
+            # The artifact leaves with the window
+            for sample in clean[:n]:
+                detector.add_sample(sample)
+            self.assertIsNone(detector.reason(), reason)
+
+    def test_rails_follow_baseline(self):
+        top = Config.voltage_to_uv(Config.adc_to_voltage(1023))
+        detector = StreamingArtifactDetector(baseline=10.0)
+        detector.add_sample(top - 10.0)
+        self.assertEqual(detector.reason(), 'rail')
+        detector.set_baseline(0.0)
+        detector.reset()
+        detector.add_sample(top - 10.0)
+        self.assertFalse(detector.stats()['rail'])
+        self.assertEqual(detector.reason(), 'amplitude')
+
+    def test_checks_align_with_buffer_windows(self):
+        x = _stream(5000, artifact_rate=0.5, seed=3)
+        buffer = CircularBuffer()
+        detector = StreamingArtifactDetector()
+        checked = 0
+        for chunk in np.array_split(x, 37):
+            windows = buffer.add_samples(chunk)
+            reasons = detector.add_samples(chunk)
+            self.assertEqual(len(windows), len(reasons))
+            for window, reason in zip(windows, reasons):
+                self.assertEqual(reason == 'amplitude',
+                                 np.max(np.abs(window)) > Config.ARTIFACT_MAX_UV)
+                checked += 1
+        self.assertGreater(detector.rejections['amplitude'], 0)
+        self.assertEqual(checked, (5000 - Config.WINDOW_SAMPLES) // Config.STEP_SAMPLES + 1)
+
+    def test_rejected_window_skips_dsp(self):
+        pipeline = RealtimeBCIPipeline(model_path=None, classifier=ThresholdClassifier())
+        calls = []
+        pipeline.extract_features = (lambda window, spectrum=None:
+                                     calls.append(window) or (None, None))
+        command, confidence, _ = pipeline.process_window(np.zeros(Config.WINDOW_SAMPLES),
+                                                         'amplitude')
+        self.assertEqual((command, confidence), ('STOP', 0.0))
+        self.assertEqual(calls, [])
+        pipeline.process_window(np.zeros(Config.WINDOW_SAMPLES))
+        self.assertEqual(len(calls), 1)
+
+if __name__ == '__main__':
+    unittest.main()
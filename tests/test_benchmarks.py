@@ -0,0 +1,103 @@
+import unittest
+import json
+import tempfile
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.harness import measure, run_suite, save_results, load_results, compare
+from benchmarks.bench_throughput import run_config, find_knees, stream_config
+from benchmarks.soak import run_soak, check_drift
+from benchmarks.bench_pool import run_pool, add_efficiency
+
+class TestBenchmarkHarness(unittest.TestCase):
+    def test_measure_reports_percentiles(self):
+        result = measure(lambda: sum(range(100)), warmup=2, repeat=10)
+        self.assertEqual(result['repeat'], 10)
+        self.assertGreaterEqual(result['number'], 1)
+        self.assertLessEqual(result['min_us'], result['p50_us'])
+        self.assertLessEqual(result['p50_us'], result['p99_us'])
+
+    def test_baseline_round_trip_and_regression(self):
+        results = run_suite({'fast': lambda: None}, warmup=1, repeat=5, rounds=2,
+                            verbose=False)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'baseline.json'
+            save_results(results, path)
+            self.assertIn('metadata', json.loads(path.read_text()))
+            baseline = load_results(path)
+
+        self.assertEqual(baseline.keys(), results.keys())
+
+        current = {'fast': dict(baseline['fast'], p50_us=baseline['fast']['p50_us'] * 1.2)}
+        self.assertFalse(compare(current, baseline, tolerance=0.25)[0]['regressed'])
+        current['fast']['p50_us'] = baseline['fast']['p50_us'] * 1.5
+        self.assertTrue(compare(current, baseline, tolerance=0.25)[0]['regressed'])
+
+class TestThroughputBenchmark(unittest.TestCase):
+    def test_light_load_is_sustainable(self):
+        row = run_config(fs=500, n_streams=2, step=0.5, duration=3.0)
+        self.assertTrue(row['sustainable'])
+        self.assertEqual(row['demand_wps'], 4.0)
+        self.assertGreater(row['windows'], 0)
+        self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+        self.assertLess(row['utilization'], 1.0)
+
+    def test_streams_use_their_own_rate_step_and_engine(self):
+        config = stream_config(2000, 0.1, 'filterbank')
+        self.assertEqual((config.SAMPLING_RATE, config.STEP_SAMPLES), (2000, 200))
+        row = run_config(fs=500, n_streams=2, step=0.5, duration=3.0, engine='filterbank')
+        self.assertEqual((row['engine'], row['windows']), ('filterbank', 6))
+        self.assertTrue(row['sustainable'])
+
+    def test_knee_is_last_sustainable_stream_count(self):
+        rows = [{'fs': 500, 'step_s': 0.5, 'streams': n, 'sustainable': n < 8}
+                for n in [1, 2, 4, 8]]
+        rows.append({'fs': 1000, 'step_s': 0.5, 'streams': 1, 'sustainable': False})
+        self.assertEqual(find_knees(rows), {(500, 0.5): 4, (1000, 0.5): 0})
+
+class TestPoolBenchmark(unittest.TestCase):
+    def test_single_worker_pool_keeps_up(self):
+        row = run_pool(n_workers=1, sessions_per_worker=2, duration=1.0)
+        self.assertEqual((row['workers'], row['sessions']), (1, 2))
+        self.assertGreater(row['windows'], 0)
+        self.assertEqual((row['overruns'], row['restarts']), (0, 0))
+        rows = add_efficiency([row, dict(row, workers=2, wps=row['wps'] * 1.5)])
+        np.testing.assert_allclose([r['efficiency'] for r in rows], [1.0, 0.75])
+
+class TestSoak(unittest.TestCase):
+    def _samples(self, traced, p95):
+        return [{'rss_bytes': 100 * 2**20, 'traced_bytes': t,
+                 'stages': {'preprocess': {'p50': p, 'p95': p}}}
+                for t, p in zip(traced, p95)]
+
+    def test_short_soak_is_flat(self):
+        samples = run_soak(hours=0.02, sample_every=0.2, verbose=False)
+        self.assertGreaterEqual(len(samples), 5)
+        self.assertGreater(samples[-1]['windows'], 0)
+        self.assertIsNotNone(samples[-1]['traced_bytes'])
+        self.assertLessEqual({'buffer', 'stream_artifact', 'stream_quality', 'preprocess',
+                              'welch', 'classify', 'command', 'process_window'},
+                             set(samples[-1]['stages']))
+
+    def test_soak_runs_stream_engines(self):
+        for engine, stage in [('stft', 'stream_stft'), ('filterbank', 'stream_filter_bank')]:
+            samples = run_soak(hours=0.005, sample_every=0.1, verbose=False, trace=False,
+                               engine=engine)
+            self.assertIn(stage, samples[-1]['stages'])
+            self.assertNotIn('welch', samples[-1]['stages'])
+
+    def test_drift_detection(self):
+        flat = self._samples([1000000] * 20, [1.0] * 20)
+        self.assertEqual(check_drift(flat), [])
+
+        leaking = self._samples([1000000 + i * 100000 for i in range(20)], [1.0] * 20)
+        self.assertIn('traced memory', check_drift(leaking)[0])
+
+        creeping = self._samples([1000000] * 20, [1.0 + i * 0.2 for i in range(20)])
+        self.assertIn('preprocess p95 crept', check_drift(creeping)[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import tempfile
 import numpy as np
 import sys
 from pathlib import Path
@@ -34,5 +35,19 @@ class TestClassifier(unittest.TestCase):
         self.assertEqual(pred0[0], 0)
         self.assertEqual(pred1[0], 1)
 
+    def test_from_file_keeps_saved_estimator(self):
+        X = np.vstack([np.random.randn(20, 2) + 1, np.random.randn(20, 2) + 5])
+        y = np.array([0]*20 + [1]*20)
+        svm = MotorImageryClassifier(model_type='SVM')
+        svm.train(X, y)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'model.pkl'
+            svm.save(path)
+            loaded = MotorImageryClassifier.from_file(path)
+
+        self.assertEqual(loaded.model_type, 'SVM')
+        np.testing.assert_array_equal(loaded.predict(X), svm.predict(X))
+
 if __name__ == '__main__':
     unittest.main()
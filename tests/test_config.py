@@ -0,0 +1,76 @@
+import unittest
+import json
+import pickle
+import tempfile
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.settings import Config, SessionConfig
+from src.models.classifier import ThresholdClassifier
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+
+class TestSessionConfig(unittest.TestCase):
+    def test_defaults_and_derived_fields(self):
+        config = SessionConfig()
+        self.assertEqual(config.SAMPLING_RATE, Config.SAMPLING_RATE)
+        self.assertEqual(config.WINDOW_SAMPLES, Config.WINDOW_SAMPLES)
+
+        fast = SessionConfig(SAMPLING_RATE=1000, WINDOW_LENGTH=1.0)
+        self.assertEqual(fast.WINDOW_SAMPLES, 1000)
+        self.assertEqual(fast.STEP_SAMPLES, 250)
+        self.assertEqual(fast.replace(WINDOW_OVERLAP=0.5).STEP_SAMPLES, 500)
+        self.assertEqual(fast.replace(WINDOW_OVERLAP=0.5).SAMPLING_RATE, 1000)
+
+    def test_immutable_and_validated(self):
+        config = SessionConfig()
+        with self.assertRaises(AttributeError):
+            config.SAMPLING_RATE = 1000
+        with self.assertRaises(ValueError):
+            SessionConfig(SAMPLING_RAET=1000)
+        with self.assertRaises(ValueError):
+            SessionConfig(WINDOW_SAMPLES=10)
+
+    def test_layering_file_env_keywords(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'session.json'
+            path.write_text(json.dumps({'SAMPLING_RATE': 1000, 'MU_BAND': [8, 12],
+                                        'DATA_DIR': tmp}))
+            environ = {'NEUROSENSE_SAMPLING_RATE': '2000', 'NEUROSENSE_ROBOT_ACK': 'true',
+                       'NEUROSENSE_COMMAND_MAP': '{"0": "STOP", "1": "FORWARD"}'}
+            config = SessionConfig.load(path, environ=environ, NOTCH_FREQ=60.0)
+
+            self.assertEqual(config.SAMPLING_RATE, 2000)
+            self.assertEqual(config.MU_BAND, (8, 12))
+            self.assertIs(config.ROBOT_ACK, True)
+            self.assertEqual(config.COMMAND_MAP, {0: 'STOP', 1: 'FORWARD'})
+            self.assertEqual(config.NOTCH_FREQ, 60.0)
+            self.assertEqual(config.MODEL_DIR, Path(tmp) / 'models')
+
+            # Directories are only created on request
+            self.assertFalse(config.MODEL_DIR.exists())
+            config.ensure_dirs()
+            self.assertTrue(config.MODEL_DIR.exists())
+
+        self.assertEqual(pickle.loads(pickle.dumps(config)), config)
+
+    def test_sessions_with_different_rates_in_one_process(self):
+        pipelines = {}
+        for fs in [500, 2000]:
+            config = SessionConfig(SAMPLING_RATE=fs)
+            pipelines[fs] = RealtimeBCIPipeline(model_path=None, config=config,
+                                                classifier=ThresholdClassifier(config=config))
+
+        for fs, pipeline in pipelines.items():
+            self.assertEqual(pipeline.buffer.window_size, 2 * fs)
+            self.assertEqual(pipeline.preprocessor.fs, fs)
+            self.assertEqual(pipeline.feature_extractor.fs, fs)
+            self.assertEqual(pipeline.bioamp.fs, fs)
+            window = np.random.randn(pipeline.buffer.window_size) * 5
+            command, _, _ = pipeline.process_window(window)
+            self.assertIn(command, ['STOP', 'ACTIVE'])
+
+if __name__ == '__main__':
+    unittest.main()
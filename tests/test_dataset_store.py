@@ -0,0 +1,103 @@
+import unittest
+import tempfile
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.dataset.store import DatasetStore, default_root
+from config.settings import Config, SessionConfig
+
+def _calibration(directory, user, n, seed, channel='C3'):
+    rng = np.random.default_rng(seed)
+    path = Path(directory) / f"{user}_calibration.npz"
+    features = rng.normal(10, 2, (n, 2))
+    labels = np.repeat([0, 1], n // 2)
+    np.savez(path, features=features, labels=labels, user_name=user, channel=channel,
+             timestamp="2026-01-01 10:00:00")
+    return path, features, labels
+
+class TestDatasetStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cal_dir = Path(self.tmp.name) / 'calibration'
+        self.cal_dir.mkdir()
+        self.root = Path(self.tmp.name) / 'dataset'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_incremental_ingest_by_hash(self):
+        store = DatasetStore(root=self.root)
+        _, alice_X, alice_y = _calibration(self.cal_dir, 'alice', 30, 0)
+        _, bob_X, _ = _calibration(self.cal_dir, 'bob', 20, 1)
+        self.assertEqual(len(store.ingest_dir(self.cal_dir)), 2)
+        self.assertEqual(store.ingest_dir(self.cal_dir), [])  # Nothing new
+        self.assertEqual(len(store), 50)
+
+        # Re-calibration overwrites the file; the new content is a new session
+        _, alice2_X, _ = _calibration(self.cal_dir, 'alice', 10, 2)
+        self.assertEqual(len(store.ingest_dir(self.cal_dir)), 1)
+
+        reopened = DatasetStore(root=self.root)
+        self.assertEqual(reopened.users(), ['alice', 'bob'])
+        self.assertEqual(len(reopened.sessions('alice')), 2)
+        X, y = reopened.select(users='alice')
+        np.testing.assert_array_equal(X, np.vstack([alice_X, alice2_X]))
+        self.assertEqual(len(y), 40)
+
+        X, y = reopened.select(users='bob')
+        self.assertIsInstance(X, np.memmap)  # Contiguous: a view, no copy
+        np.testing.assert_array_equal(X, bob_X)
+
+        sessions = list(reopened.iter_sessions('alice'))
+        np.testing.assert_array_equal(sessions[0][1], alice_X)
+        np.testing.assert_array_equal(sessions[0][2], alice_y)
+        np.testing.assert_array_equal(np.unique(reopened.column('session')), [0, 1, 2])
+
+    def test_uncommitted_rows_are_ignored_and_replaced(self):
+        store = DatasetStore(root=self.root)
+        store.ingest(_calibration(self.cal_dir, 'alice', 10, 0)[0])
+
+        # Simulate a crash after the columns grew but before the index moved
+        with open(self.root / 'features.npy', 'ab') as f:
+            f.write(np.ones((4, 2)).tobytes())
+        reopened = DatasetStore(root=self.root)
+        self.assertEqual(reopened.features.shape, (10, 2))
+
+        _, bob_X, _ = _calibration(self.cal_dir, 'bob', 6, 1)
+        reopened.ingest(self.cal_dir / 'bob_calibration.npz')
+        self.assertEqual(np.load(self.root / 'features.npy').shape, (16, 2))
+        np.testing.assert_array_equal(reopened.select('bob')[0], bob_X)
+
+    def test_feature_schemas_get_separate_stores(self):
+        _calibration(self.cal_dir, 'alice', 10, 0)
+        names = ('log_mu_power', 'log_beta_power', 'rel_mu_power', 'rel_beta_power',
+                 'spectral_entropy')
+        np.savez(self.cal_dir / 'bob_calibration.npz', features=np.ones((6, 5)),
+                 labels=np.repeat([0, 1], 3), user_name='bob', channel='C3',
+                 feature_names=np.array(names))
+        config = SessionConfig(FEATURES=names, DATASET_DIR=self.root)
+        self.assertEqual(default_root(SessionConfig(DATASET_DIR=self.root)), self.root)
+        self.assertEqual(default_root(config).parent, self.root)
+
+        # Each store takes its own schema and lists the other file as skipped
+        default = DatasetStore(config=SessionConfig(DATASET_DIR=self.root))
+        self.assertEqual([s['user'] for s in default.ingest_dir(self.cal_dir)], ['alice'])
+        self.assertEqual([s['source'] for s in default.skipped], ['bob_calibration.npz'])
+        extended = DatasetStore(config=config)
+        self.assertEqual([s['user'] for s in extended.ingest_dir(self.cal_dir)], ['bob'])
+        self.assertEqual([s['user'] for s in extended.skipped], ['alice'])
+        self.assertEqual(extended.select()[0].shape, (6, 5))
+        self.assertEqual(DatasetStore(root=extended.root).feature_names, names)
+        self.assertEqual(default.feature_names, Config.FEATURES)
+
+    def test_empty_store(self):
+        store = DatasetStore(root=self.root)
+        X, y = store.select()
+        self.assertEqual((X.shape, y.shape), ((0, 2), (0,)))
+        self.assertEqual(store.users(), [])
+
+if __name__ == '__main__':
+    unittest.main()
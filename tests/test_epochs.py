@@ -0,0 +1,143 @@
+import unittest
+import tempfile
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from src.dataset.epochs import (feature_config_hash, featurize_epochs, load_epochs,
+                                pack_epochs, refeaturize, sliding_windows, window_features)
+from src.dataset.store import DatasetStore
+from src.features.band_power import BandPowerExtractor
+from src.preprocessing.filters import RealtimePreprocessor
+from config.settings import Config, SessionConfig
+
+def _record(directory, user, n_trials=6, seed=0):
+    """Calibration file with raw epochs, as 2_calibrate_user.py writes it"""
+    generator = SyntheticEEGGenerator(seed=seed)
+    baseline = 3.7
+    # Quantize like the BioAmp stream: ADC counts -> microvolts - baseline
+    epochs = [Config.voltage_to_uv(Config.adc_to_voltage(
+                  generator.generate_adc(int(Config.TRIAL_DURATION * Config.SAMPLING_RATE))))
+              - baseline for _ in range(n_trials)]
+    labels = np.arange(n_trials) % 2
+    features, kept = featurize_epochs(epochs)
+    path = Path(directory) / f"{user}_calibration.npz"
+    np.savez(path, features=features, labels=labels[kept], user_name=user, channel='C3',
+             timestamp='2026-01-01 10:00:00',
+             **pack_epochs(epochs, labels, np.arange(n_trials) * 9.0, kept, baseline=baseline))
+    return path, epochs, features
+
+class TestEpochStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cal_dir = Path(self.tmp.name) / 'calibration'
+        self.cal_dir.mkdir()
+        self.cache_dir = Path(self.tmp.name) / 'cache'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_is_lossless_and_compact(self):
+        path, epochs, _ = _record(self.cal_dir, 'alice')
+        stored = load_epochs(path)
+        self.assertEqual(len(stored['epochs']), len(epochs))
+        for original, decoded in zip(epochs, stored['epochs']):
+            np.testing.assert_allclose(decoded, original, atol=1e-9)
+        with np.load(path) as data:
+            self.assertEqual(data['epoch_adc'].dtype, np.int16)
+        self.assertEqual(stored['fs'], Config.SAMPLING_RATE)
+
+    def test_refeaturize_is_cached_per_settings(self):
+        _, _, alice_features = _record(self.cal_dir, 'alice', seed=0)
+        self.assertEqual(len(alice_features), 6)
+        _record(self.cal_dir, 'bob', seed=1)
+        np.savez(self.cal_dir / 'old_calibration.npz', features=np.ones((2, 2)),
+                 labels=[0, 1], user_name='old', channel='C3')  # No raw epochs
+
+        directory, computed = refeaturize(self.cal_dir, self.cache_dir, n_jobs=2)
+        self.assertEqual(len(computed), 2)
+        self.assertEqual(directory.name, feature_config_hash())
+        self.assertEqual(refeaturize(self.cal_dir, self.cache_dir, n_jobs=1)[1], [])
+
+        store = DatasetStore(root=directory / 'dataset')
+        store.ingest_dir(directory)
+        self.assertEqual(store.users(), ['alice', 'bob'])
+        np.testing.assert_allclose(store.select('alice')[0], alice_features)
+
+        narrow = SessionConfig(MU_BAND=(9, 11))
+        other, computed = refeaturize(self.cal_dir, self.cache_dir, config=narrow, n_jobs=1)
+        self.assertNotEqual(other, directory)
+        self.assertEqual(len(computed), 2)
+        with np.load(next(other.glob('*_calibration.npz'))) as data:
+            self.assertEqual(str(data['feature_config']), feature_config_hash(narrow))
+
+    def test_rejects_other_sampling_rate(self):
+        _record(self.cal_dir, 'alice')
+        with self.assertRaises(ValueError):
+            refeaturize(self.cal_dir, self.cache_dir, config=SessionConfig(SAMPLING_RATE=250),
+                        n_jobs=1)
+
+class TestWindowEpoching(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cal_dir = Path(self.tmp.name) / 'calibration'
+        self.cal_dir.mkdir()
+        self.cache_dir = Path(self.tmp.name) / 'cache'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sliding_windows_are_views(self):
+        signal = np.arange(20.0)
+        windows = sliding_windows(signal, 8, 4)
+        self.assertTrue(np.shares_memory(windows, signal))
+        self.assertEqual(windows.shape, (4, 8))
+        np.testing.assert_array_equal(windows[:, 0], [0, 4, 8, 12])
+        self.assertEqual(sliding_windows(signal[:5], 8, 4).shape, (0, 8))
+
+        stacked = sliding_windows(np.stack([signal, -signal]), 8, 4)
+        self.assertEqual(stacked.shape, (2, 4, 8))
+        np.testing.assert_array_equal(stacked[1, 2], -signal[8:16])
+
+    def test_window_features_match_live_path(self):
+        _, epochs, _ = _record(self.cal_dir, 'alice', n_trials=3)
+        epochs.append(epochs[0][:Config.WINDOW_SAMPLES + Config.STEP_SAMPLES])  # Shorter trial
+        epochs[1] = epochs[1].copy()
+        epochs[1][100:200] += 2000.0  # Motion artifact
+        features, trials = window_features(epochs)
+
+        preprocessor = RealtimePreprocessor()
+        extractor = BandPowerExtractor()
+        expected, owners = [], []
+        for i, epoch in enumerate(epochs):
+            for window in sliding_windows(epoch, Config.WINDOW_SAMPLES, Config.STEP_SAMPLES):
+                preprocessed, is_clean = preprocessor.preprocess(window)
+                if is_clean:
+                    expected.append(extractor.extract(preprocessed))
+                    owners.append(i)
+        self.assertEqual(trials.tolist(), owners)
+        self.assertEqual(np.sum(trials == 3), 2)
+        self.assertLess(np.sum(trials == 1), np.sum(trials == 0))  # Artifact windows dropped
+        np.testing.assert_allclose(features, expected, rtol=1e-9)
+
+    def test_refeaturize_windows_groups_rows_by_trial(self):
+        _record(self.cal_dir, 'alice', n_trials=4)
+        directory, computed = refeaturize(self.cal_dir, self.cache_dir, n_jobs=1, windows=True)
+        self.assertEqual(directory.name, feature_config_hash(windows=True))
+        self.assertNotEqual(directory.name, feature_config_hash())
+        self.assertGreater(computed[0]['rows'], computed[0]['kept'])
+
+        store = DatasetStore(root=directory / 'dataset')
+        store.ingest_dir(directory)
+        X, y = store.select('alice')
+        groups = store.groups('alice')
+        self.assertEqual(len(groups), len(X))
+        self.assertEqual(len(np.unique(groups)), 4)
+        for trial in np.unique(groups):
+            self.assertEqual(len(np.unique(y[groups == trial])), 1)
+
+if __name__ == '__main__':
+    unittest.main()
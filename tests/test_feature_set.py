@@ -0,0 +1,172 @@
+import unittest
+import tempfile
+from unittest import mock
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scipy.signal import welch
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from src.dataset.epochs import feature_config_hash, window_features
+from src.features import band_power
+from src.features.band_power import BandPowerExtractor
+from src.features.feature_set import FEATURES, FeatureSet, register_feature, load_schema
+from src.features.filter_bank import FilterBankBandPower
+from src.features.normalizer import FeatureNormalizer
+from src.features.stft import stft_frames, stft_params
+from src.models.artifact import export_artifact, load_artifact
+from src.models.classifier import MotorImageryClassifier
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+from src.preprocessing.filters import RealtimePreprocessor
+from config.settings import Config, SessionConfig
+
+ALL = tuple(FEATURES)
+
+class TestFeatureSet(unittest.TestCase):
+    def setUp(self):
+        self.preprocessor = RealtimePreprocessor()
+        generator = SyntheticEEGGenerator(seed=0)
+        self.windows = np.stack([self.preprocessor.preprocess(
+            generator.generate(Config.WINDOW_SAMPLES))[0] for _ in range(6)])
+
+    def test_default_set_is_band_power(self):
+        extractor = BandPowerExtractor()
+        self.assertEqual(extractor.feature_names, Config.FEATURES)
+        freqs, psd = welch(self.windows[0], fs=Config.SAMPLING_RATE, nperseg=extractor.nperseg)
+        features = extractor.extract(self.windows[0])
+        np.testing.assert_array_equal(features,
+                                      FeatureSet().compute(freqs, psd, self.windows[0]))
+        mu = (freqs >= Config.MU_BAND[0]) & (freqs <= Config.MU_BAND[1])
+        self.assertAlmostEqual(features[0], np.mean(psd[mu]))
+
+    def test_all_features_from_one_welch_call(self):
+        extractor = BandPowerExtractor(feature_names=ALL)
+        with mock.patch.object(band_power, 'welch', wraps=welch) as spy:
+            single = extractor.extract(self.windows[0])
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(single.shape, (len(ALL),))
+        self.assertTrue(np.all(np.isfinite(single)))
+        batch = extractor.extract_batch(self.windows)
+        np.testing.assert_allclose(batch[0], single, rtol=1e-10)
+        self.assertEqual(batch.shape, (len(self.windows), len(ALL)))
+
+        named = dict(zip(ALL, batch.T))
+        np.testing.assert_allclose(named['log_mu_power'], np.log10(named['mu_power']))
+        for name in ('rel_mu_power', 'rel_beta_power', 'spectral_entropy'):
+            self.assertTrue(np.all((named[name] >= 0) & (named[name] <= 1)), name)
+
+    def test_spectral_features_on_known_signals(self):
+        fs = Config.SAMPLING_RATE
+        t = np.arange(Config.WINDOW_SAMPLES) / fs
+        rng = np.random.default_rng(1)
+        signals = np.stack([np.sin(2 * np.pi * 10.4 * t) + 1e-4 * rng.standard_normal(len(t)),
+                            rng.standard_normal(len(t))])
+        features = dict(zip(ALL, BandPowerExtractor(feature_names=ALL).extract_batch(signals).T))
+        self.assertAlmostEqual(features['peak_alpha_freq'][0], 10.4, delta=0.3)
+        self.assertLess(features['spectral_entropy'][0], 0.5)
+        self.assertGreater(features['spectral_entropy'][1], 0.9)
+        # A sine has Hjorth complexity 1 and mobility 2 sin(pi f / fs)
+        self.assertAlmostEqual(features['hjorth_complexity'][0], 1.0, delta=0.05)
+        self.assertAlmostEqual(features['hjorth_mobility'][0],
+                               2 * np.sin(np.pi * 10.4 / fs), delta=0.01)
+
+    def test_time_features_from_spectrum_match_signal(self):
+        names = ('hjorth_activity', 'hjorth_mobility', 'hjorth_complexity')
+        feature_set = FeatureSet(names)
+        freqs, psd = welch(self.windows, fs=Config.SAMPLING_RATE, nperseg=256, axis=-1)
+        from_signal = feature_set.compute(freqs, psd, self.windows)
+        from_psd = feature_set.compute(freqs, psd)
+        np.testing.assert_allclose(from_psd, from_signal, rtol=0.2)
+
+    def test_stft_frames_give_same_features_as_welch(self):
+        extractor = BandPowerExtractor(feature_names=ALL)
+        nperseg, hop, _ = stft_params()
+        frames = stft_frames(self.windows, nperseg, hop, Config.SAMPLING_RATE)
+        from_frames = extractor.extract_frames(frames)
+        freqs, psd = welch(self.windows, fs=Config.SAMPLING_RATE, nperseg=nperseg,
+                           noverlap=nperseg - hop, axis=-1)
+        expected = extractor.feature_set.compute(freqs, psd)
+        np.testing.assert_allclose(from_frames, expected, rtol=1e-8)
+
+    def test_registry_and_validation(self):
+        @register_feature('test_total_power', description='sum of the PSD')
+        def _total(ctx):
+            return np.sum(ctx.psd, axis=-1)
+        try:
+            extractor = BandPowerExtractor(feature_names=('test_total_power', 'mu_power'))
+            features = extractor.extract(self.windows[0])
+            self.assertEqual(features.shape, (2,))
+            self.assertEqual(FeatureSet(('test_total_power',)).needs, {'psd'})
+        finally:
+            del FEATURES['test_total_power']
+        self.assertEqual(FeatureSet(('hjorth_mobility', 'mu_power')).needs, {'psd', 'time'})
+        with self.assertRaises(ValueError):
+            FeatureSet(('mu_power', 'theta_power'))
+        with self.assertRaises(ValueError):
+            register_feature('bad', needs=('wavelet',))
+        with self.assertRaises(ValueError):
+            SessionConfig(FEATURES=('mu_power', 'mu_power'))
+        with self.assertRaises(ValueError):
+            SessionConfig(N_FEATURES=3)
+        self.assertEqual(SessionConfig(FEATURES=ALL).N_FEATURES, len(ALL))
+        with self.assertRaises(ValueError):
+            FilterBankBandPower(config=SessionConfig(FEATURES=('log_mu_power',)))
+
+    def test_erd_finds_band_powers(self):
+        extractor = BandPowerExtractor(feature_names=('spectral_entropy', 'beta_power',
+                                                      'mu_power'))
+        extractor.baseline_mu, extractor.baseline_beta = 10.0, 4.0
+        np.testing.assert_allclose(extractor.calculate_erd(np.array([0.5, 2.0, 5.0])),
+                                   [0.5, 0.5])
+        without = BandPowerExtractor(feature_names=('log_mu_power',))
+        without.baseline_mu, without.baseline_beta = 10.0, 4.0
+        np.testing.assert_array_equal(without.calculate_erd(np.array([1.0])), [0.0, 0.0])
+
+class TestFeatureSchema(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.names = ('log_mu_power', 'log_beta_power', 'spectral_entropy', 'hjorth_mobility')
+        self.config = SessionConfig(FEATURES=self.names)
+        generator = SyntheticEEGGenerator(rest_duration=4.0, imagery_duration=4.0, seed=3)
+        trials = [generator.generate(int(4.0 * Config.SAMPLING_RATE)) for _ in range(10)]
+        X, trial = window_features(trials, self.config)
+        y = trial % 2
+        self.normalizer = FeatureNormalizer()
+        self.normalizer.fit(X)
+        self.classifier = MotorImageryClassifier(model_type='LDA')
+        self.classifier.train(self.normalizer.normalize(X), y)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_artifact_schema_drives_live_features(self):
+        path = Path(self.tmp.name) / 'model.npz'
+        header = export_artifact(path, self.classifier, self.normalizer, config=self.config)
+        self.assertEqual(header['feature_schema'], list(self.names))
+        loaded, _, _ = load_artifact(path)
+        self.assertEqual(loaded.feature_schema, self.names)
+
+        # A session with default settings computes the model's features
+        pipeline = RealtimeBCIPipeline(model_path=str(path))
+        self.assertEqual(pipeline.feature_extractor.feature_names, self.names)
+        window = SyntheticEEGGenerator(seed=4).generate(Config.WINDOW_SAMPLES)
+        command, confidence, _ = pipeline.process_window(window)
+        self.assertIn(command, Config.COMMAND_MAP.values())
+
+        default = RealtimeBCIPipeline(model_path=None, classifier=MotorImageryClassifier())
+        with self.assertRaises(ValueError):
+            default.swap_model(loaded, warmup_windows=0)
+        self.assertEqual(default.model_swaps, 0)
+
+    def test_pickle_sidecar_and_cache_key(self):
+        path = Path(self.tmp.name) / 'model.pkl'
+        self.classifier.save(path, feature_names=self.names)
+        self.assertEqual(load_schema(path), self.names)
+        self.assertEqual(MotorImageryClassifier.from_file(path).feature_schema, self.names)
+        self.assertIsNone(load_schema(Path(self.tmp.name) / 'other.pkl'))
+        self.assertNotEqual(feature_config_hash(self.config), feature_config_hash(SessionConfig()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import unittest
+import contextlib
+import io
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scipy.signal import sosfilt
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from src.dataset.epochs import feature_config_hash, featurize_epochs, window_features
+from src.evaluation.pseudo_online import replay_session
+from src.features.band_power import BandPowerExtractor
+from src.features.filter_bank import FilterBankBandPower
+from src.models.classifier import ThresholdClassifier
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+from src.preprocessing.filters import RealtimePreprocessor
+from config.settings import Config, SessionConfig
+
+class TestFilterBankBandPower(unittest.TestCase):
+    def setUp(self):
+        x = SyntheticEEGGenerator(seed=0, mains_amp=10).generate(6000)
+        self.x = x - x[0]  # Zero start: stream and offline filter states agree
+        self.bank = FilterBankBandPower()
+
+    def test_sliding_power_matches_direct_mean_square(self):
+        powers = self.bank.add_samples(self.x)
+        self.assertEqual(powers.shape, (len(self.x), 2))
+        size = Config.WINDOW_SAMPLES
+        for band, (sos, enbw) in enumerate(zip(self.bank.sos, self.bank.enbw)):
+            squared = sosfilt(sos, self.x) ** 2
+            for end in [10, size, 3333, len(self.x)]:
+                expected = np.mean(squared[max(end - size, 0):end]) / enbw
+                self.assertAlmostEqual(powers[end - 1, band] / expected, 1.0, places=10)
+
+    def test_chunks_and_single_samples_agree(self):
+        expected = self.bank.add_samples(self.x)
+        for chunks in [7, 600]:
+            bank = FilterBankBandPower()
+            got = np.vstack([bank.add_samples(c) for c in np.array_split(self.x, chunks)])
+            np.testing.assert_allclose(got, expected, rtol=1e-10)
+        bank = FilterBankBandPower()
+        bank.add_samples(self.x[:1234])
+        got = [bank.add_sample(x) for x in self.x[1234:2600]]
+        got = np.vstack([got, bank.add_samples(self.x[2600:])])
+        np.testing.assert_allclose(got, expected[1234:], rtol=1e-10)
+        np.testing.assert_allclose(bank.power(), expected[-1], rtol=1e-10)
+
+    def test_power_history(self):
+        powers = self.bank.add_samples(self.x)
+        np.testing.assert_array_equal(self.bank.power_at(5500), powers[5499])
+        np.testing.assert_array_equal(self.bank.power_at(1), powers[0])
+        for end in [len(self.x) + 1, 0]:
+            with self.assertRaises(IndexError):
+                self.bank.power_at(end)
+        short = FilterBankBandPower(config=SessionConfig(STFT_RING_SECONDS=1.0))
+        self.assertEqual(short.history_size, Config.WINDOW_SAMPLES)
+        short.add_samples(self.x)
+        with self.assertRaises(IndexError):
+            short.power_at(len(self.x) - Config.WINDOW_SAMPLES)
+        self.bank.reset()
+        with self.assertRaises(IndexError):
+            self.bank.power()
+
+    def test_window_powers_match_stream(self):
+        powers = self.bank.add_samples(self.x)
+        step = Config.STEP_SAMPLES
+        ends = np.arange(Config.WINDOW_SAMPLES, len(self.x) + 1, step)
+        offline = self.bank.window_powers(np.stack([self.x, self.x]), step)
+        self.assertEqual(offline.shape, (2, len(ends), 2))
+        np.testing.assert_allclose(offline[1], powers[ends - 1], rtol=1e-8)
+
+    def test_tracks_welch_band_power(self):
+        preprocessor = RealtimePreprocessor()
+        extractor = BandPowerExtractor()
+        step = Config.STEP_SAMPLES
+        windows = [self.x[start:start + Config.WINDOW_SAMPLES]
+                   for start in range(0, len(self.x) - Config.WINDOW_SAMPLES + 1, step)]
+        welch = np.array([extractor.extract(preprocessor.preprocess(w)[0]) for w in windows])
+        bank = self.bank.window_powers(self.x, step)
+        log_ratio = np.log(bank / welch)
+        self.assertLess(np.max(np.abs(np.median(log_ratio, axis=0))), 0.3)
+        stand_alone = self.bank.extract(np.stack(windows))
+        self.assertLess(np.max(np.abs(np.median(np.log(stand_alone / welch), axis=0))), 0.3)
+
+class TestFilterBankEngine(unittest.TestCase):
+    def setUp(self):
+        x = SyntheticEEGGenerator(seed=1).generate(8000)
+        self.x = x - x[0]
+        self.config = SessionConfig(FEATURE_ENGINE='filterbank')
+
+    def test_pipeline_features_match_offline_windows(self):
+        pipeline = RealtimeBCIPipeline(model_path=None, classifier=ThresholdClassifier(),
+                                       config=self.config)
+        self.assertIsNone(pipeline.stft)
+        self.assertIsNotNone(pipeline.filter_bank)
+        live = []
+        step = Config.STEP_SAMPLES
+        for chunk in np.array_split(self.x, 37):
+            pipeline.filter_bank.add_samples(chunk)
+            windows = pipeline.buffer.add_samples(chunk)
+            last_end = pipeline.buffer.sample_count // step * step
+            for i, window in enumerate(windows):
+                spectrum = pipeline.window_spectrum(last_end - (len(windows) - 1 - i) * step)
+                features, erd = pipeline.extract_features(window, spectrum)
+                self.assertEqual(erd.shape, (2,))
+                live.append(features)
+        offline, trials = window_features([self.x], self.config)
+        np.testing.assert_allclose(offline, live, rtol=1e-8)
+
+        # Without the stream the window is filtered on its own
+        features, _ = pipeline.extract_features(self.x[:Config.WINDOW_SAMPLES])
+        self.assertTrue(np.all(np.isfinite(features)) and np.all(features > 0))
+        command, _, _ = pipeline.process_window(self.x[:Config.WINDOW_SAMPLES])
+        self.assertIn(command, Config.COMMAND_MAP.values())
+
+    def test_run_loop_and_replay_read_stream_powers(self):
+        class Recording:
+            def __init__(self, samples, fs):
+                self.samples, self.fs = samples, fs
+            def stream_continuous(self):
+                for i, x in enumerate(self.samples):
+                    yield x, i / self.fs
+
+        step = Config.STEP_SAMPLES
+        ends = np.arange(Config.WINDOW_SAMPLES, len(self.x) + 1, step)
+        offline, _ = window_features([self.x], self.config)
+
+        pipeline = RealtimeBCIPipeline(model_path=None, classifier=ThresholdClassifier(),
+                                       bioamp=Recording(self.x, Config.SAMPLING_RATE),
+                                       config=self.config)
+        spectra = []
+        process_window = pipeline.process_window
+        pipeline.process_window = lambda window, rejection=None, spectrum=None: (
+            spectra.append(spectrum) or process_window(window, rejection, spectrum))
+        with contextlib.redirect_stdout(io.StringIO()):
+            pipeline.run()
+        self.assertEqual(pipeline.filter_bank.sample_count, ends[-1])
+        streamed = [spectrum for spectrum in spectra if spectrum is not None]  # Not warmup
+        self.assertEqual(len(streamed), len(ends))
+        np.testing.assert_allclose(streamed, offline, rtol=1e-8)
+
+        # Pseudo-online replay feeds the same stream state
+        replayed = RealtimeBCIPipeline(model_path=None, classifier=ThresholdClassifier(),
+                                       config=self.config)
+        features = []
+        extract = replayed.extract_features
+        replayed.extract_features = lambda window, spectrum=None: (
+            features.append(spectrum) or extract(window, spectrum))
+        replay = replay_session(replayed, [self.x], self.config)
+        np.testing.assert_array_equal(replay['end'], ends)
+        np.testing.assert_allclose(features, offline, rtol=1e-8)
+
+    def test_swap_model_warms_up_the_session_engine(self):
+        pipeline = RealtimeBCIPipeline(model_path=None, classifier=ThresholdClassifier(),
+                                       config=self.config)
+        pipeline.tracer.enable()
+        extracted = []
+        extract = pipeline.filter_bank.extract
+        pipeline.filter_bank.extract = lambda window: extracted.append(window) or extract(window)
+        pipeline.preprocessor.preprocess = None  # The Welch path must not run
+        latencies = pipeline.swap_model(ThresholdClassifier(), warmup_windows=3)
+        self.assertEqual((len(latencies), len(extracted), pipeline.model_swaps), (3, 3, 1))
+        self.assertEqual(pipeline.filter_bank.sample_count, 0)
+        self.assertEqual(pipeline.tracer.count, 0)
+
+    def test_epochs_and_cache_key(self):
+        trial = self.x[:int(Config.TRIAL_DURATION * Config.SAMPLING_RATE)]
+        features, kept = featurize_epochs([trial, trial * 100], self.config)
+        self.assertEqual(features.shape, (1, 2))
+        np.testing.assert_array_equal(kept, [True, False])
+        hashes = {feature_config_hash(SessionConfig(FEATURE_ENGINE=engine), windows=True)
+                  for engine in ('welch', 'stft', 'filterbank')}
+        self.assertEqual(len(hashes), 3)
+        self.assertNotEqual(feature_config_hash(self.config),
+                            feature_config_hash(SessionConfig(FEATURE_ENGINE='filterbank',
+                                                              FILTERBANK_ORDER=2)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import tempfile
+import threading
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.features.normalizer import FeatureNormalizer
+from src.models.classifier import MotorImageryClassifier
+from src.models.inference_service import (BatchInferenceService, InferenceServer,
+                                          InferenceClient)
+
+class TestBatchInferenceService(unittest.TestCase):
+    def setUp(self):
+        X = np.vstack([np.random.randn(30, 2), np.random.randn(30, 2) + 3]) * 50 + 100
+        y = np.array([0] * 30 + [1] * 30)
+        self.normalizer = FeatureNormalizer()
+        self.normalizer.fit(X)
+        self.classifier = MotorImageryClassifier(model_type='LogisticRegression')
+        self.classifier.train(self.normalizer.normalize(X), y)
+        self.X = X
+
+        self.service = BatchInferenceService(max_batch=16, max_delay_ms=5)
+        self.service.register_model('m', self.classifier, self.normalizer)
+        self.service.start()
+
+    def tearDown(self):
+        self.service.stop()
+
+    def test_batched_results_match_direct(self):
+        futures = [self.service.submit('m', x) for x in self.X]
+        results = [f.result(timeout=2) for f in futures]
+
+        X_norm = self.normalizer.normalize(self.X)
+        expected = self.classifier.predict(X_norm)
+        proba = self.classifier.predict_proba(X_norm)
+        for i, (prediction, confidence) in enumerate(results):
+            self.assertEqual(prediction, expected[i])
+            self.assertAlmostEqual(confidence, proba[i, expected[i]])
+
+        report = self.service.report()
+        self.assertEqual(sum(r['requests'] for r in report.values()), len(self.X))
+        self.assertGreater(max(report), 1)  # Requests were actually batched
+        self.assertLessEqual(max(report), 16)
+
+    def test_unix_socket_clients(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            server = InferenceServer(self.service, Path(tmp) / 'inference.sock').start()
+            results = {}
+
+            def client_thread(i):
+                client = InferenceClient(server.socket_path)
+                results[i] = client.predict('m', self.X[i])
+                client.close()
+
+            threads = [threading.Thread(target=client_thread, args=(i,)) for i in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(timeout=5)
+            server.stop()
+
+        for i, (prediction, confidence) in results.items():
+            self.assertEqual(prediction, self.service.predict('m', self.X[i])[0])
+        self.assertEqual(len(results), 8)
+
+    def test_stop_fails_pending_requests(self):
+        idle = BatchInferenceService()
+        idle.register_model('m', self.classifier, self.normalizer)
+        pending = idle.submit('m', self.X[0])  # Never started: stays queued
+        idle.stop()
+        with self.assertRaises(RuntimeError):
+            pending.result(timeout=1)
+        with self.assertRaises(RuntimeError):
+            idle.submit('m', self.X[0]).result(timeout=1)
+
+        # report() while the worker thread keeps adding batch sizes
+        futures = [self.service.submit('m', x) for x in self.X]
+        while not all(f.done() for f in futures):
+            self.service.report()
+
+        self.service.stop()
+        with self.assertRaises(RuntimeError):
+            self.service.predict('m', self.X[0], timeout=1)
+        self.service.start()  # Restart after stop() accepts requests again
+        self.assertIn(self.service.predict('m', self.X[0], timeout=2)[0], (0, 1))
+
+    def test_socket_answers_error_when_service_stalls(self):
+        stalled = BatchInferenceService()  # Never started: requests wait forever
+        stalled.register_model('m', self.classifier, self.normalizer)
+        with tempfile.TemporaryDirectory() as tmp:
+            server = InferenceServer(stalled, Path(tmp) / 'inference.sock',
+                                     timeout_ms=50).start()
+            client = InferenceClient(server.socket_path)
+            try:
+                with self.assertRaises(RuntimeError):
+                    client.predict('m', self.X[0])
+            finally:
+                client.close()
+                server.stop()
+        stalled.start()  # The timed-out request was cancelled, not run
+        self.assertIn(stalled.predict('m', self.X[0], timeout=2)[0], (0, 1))
+        stalled.stop()
+
+if __name__ == '__main__':
+    unittest.main()
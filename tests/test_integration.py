@@ -1,10 +1,13 @@
 import unittest
 import sys
+import numpy as np
 from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.pipeline.realtime_bci import RealtimeBCIPipeline
+from src.models.classifier import ThresholdClassifier
+from benchmarks.bench_import import measure_import
 
 class TestIntegration(unittest.TestCase):
     def test_pipeline_instantiation(self):
@@ -15,5 +18,21 @@ class TestIntegration(unittest.TestCase):
         except Exception as e:
             self.fail(f"Pipeline instantiation failed: {e}")
 
+    def test_warmup_runs_every_stage_without_side_effects(self):
+        pipeline = RealtimeBCIPipeline(model_path=None, classifier=ThresholdClassifier())
+        pipeline.tracer.enable()
+        latencies = pipeline.warmup(n_windows=3)
+
+        self.assertEqual(len(latencies), 3)
+        self.assertEqual(pipeline.latency.count, 0)
+        self.assertEqual(pipeline.tracer.count, 0)
+        self.assertTrue(pipeline.tracer.enabled)
+        self.assertEqual(len(pipeline.command_mapper.recent_predictions), 0)
+        self.assertEqual(pipeline.warmup(n_windows=0), [])  # Explicit skip
+
+    def test_import_does_not_load_unused_dependencies(self):
+        result = measure_import(repeat=1)
+        self.assertEqual(result['eager'], [])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import tempfile
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from hardware.bioamp_reader import BioAmpReader
+from hardware.simulated_bioamp import SimulatedBioAmp
+from src.acquisition.circular_buffer import CircularBuffer
+from src.models.classifier import MotorImageryClassifier
+from src.models.inference_service import BatchInferenceService
+from src.models.model_cache import ModelCache
+from src.pipeline.multi_session import MultiSessionRuntime
+
+class TestCircularBuffer(unittest.TestCase):
+    def test_bulk_matches_per_sample(self):
+        data = np.random.randn(3000)
+        single = CircularBuffer(window_size=100, step_size=25)
+        expected = []
+        for x in data:
+            single.add_sample(x)
+            window = single.get_window()
+            if window is not None:
+                expected.append(window)
+
+        bulk = CircularBuffer(window_size=100, step_size=25)
+        windows = []
+        for chunk in np.array_split(data, 37):
+            windows.extend(bulk.add_samples(chunk))
+
+        self.assertEqual(len(windows), len(expected))
+        for a, b in zip(windows, expected):
+            np.testing.assert_array_equal(a, b)
+        np.testing.assert_array_equal(expected[-1], data[-100:])
+
+class TestModelCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = ModelCache(max_entries=2)
+        loads = []
+        for key in ['a', 'b', 'a', 'c', 'b']:
+            cache.get(key, lambda k=key: loads.append(k) or k.upper())
+        # 'b' was evicted by 'c' (least recently used) and reloaded
+        self.assertEqual(loads, ['a', 'b', 'c', 'b'])
+        self.assertEqual(cache.stats()['evictions'], 2)
+        self.assertEqual(cache.hits, 1)
+
+class TestMultiSessionRuntime(unittest.TestCase):
+    def test_sessions_share_model(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = Path(tmp) / 'model.pkl'
+            classifier = MotorImageryClassifier(model_type='LDA')
+            X = np.vstack([np.random.randn(20, 2), np.random.randn(20, 2) + 3])
+            classifier.train(X, np.array([0] * 20 + [1] * 20))
+            classifier.save(model_path)
+
+            sims = [SimulatedBioAmp(realtime=False).start() for _ in range(3)]
+            runtime = MultiSessionRuntime()
+            try:
+                for i, sim in enumerate(sims):
+                    runtime.add_session(f"user{i}", BioAmpReader(port=sim.port, reset_delay=0),
+                                        model_path)
+                runtime.connect_all(calibrate=False)
+                runtime.run(duration=1.5)
+
+                metrics = runtime.metrics()
+                for session_metrics in metrics['sessions'].values():
+                    self.assertGreater(session_metrics['windows'], 0)
+                    self.assertGreater(session_metrics['signal_quality']['seconds'], 0)
+
+                pipelines = [s.pipeline for s in runtime.sessions.values()]
+                self.assertIs(pipelines[0].classifier, pipelines[2].classifier)
+                self.assertIs(pipelines[0].preprocessor, pipelines[1].preprocessor)
+                self.assertIsNot(pipelines[0].buffer, pipelines[1].buffer)
+                self.assertEqual(metrics['model_cache']['misses'], 2)
+            finally:
+                runtime.close()
+                for sim in sims:
+                    sim.stop()
+
+    def test_stopped_inference_service_falls_back_to_session_model(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = Path(tmp) / 'model.pkl'
+            classifier = MotorImageryClassifier(model_type='LDA')
+            X = np.vstack([np.random.randn(20, 2), np.random.randn(20, 2) + 3])
+            classifier.train(X, np.array([0] * 20 + [1] * 20))
+            classifier.save(model_path)
+
+            service = BatchInferenceService().start()
+            sim = SimulatedBioAmp(realtime=False).start()
+            runtime = MultiSessionRuntime(inference_service=service, inference_timeout_ms=50)
+            try:
+                runtime.add_session('user0', BioAmpReader(port=sim.port, reset_delay=0),
+                                    model_path)
+                runtime.connect_all(calibrate=False)
+                service.stop()
+                runtime.run(duration=1.0)  # Returns instead of waiting forever
+                metrics = runtime.metrics()
+                self.assertGreater(metrics['sessions']['user0']['windows'], 0)
+                self.assertGreater(metrics['inference_fallbacks'], 0)
+            finally:
+                runtime.close()
+                sim.stop()
+
+    def test_swapped_model_serves_batched_windows(self):
+        class Constant:
+            """Always IMAGERY at 0.97, to tell its predictions apart"""
+            def predict(self, X):
+                return np.ones(len(X), dtype=int)
+
+            def predict_proba(self, X):
+                return np.tile([0.03, 0.97], (len(X), 1))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = Path(tmp) / 'model.pkl'
+            classifier = MotorImageryClassifier(model_type='LDA')
+            X = np.vstack([np.random.randn(20, 2), np.random.randn(20, 2) + 3])
+            classifier.train(X, np.array([0] * 20 + [1] * 20))
+            classifier.save(model_path)
+
+            service = BatchInferenceService().start()
+            sim = SimulatedBioAmp(realtime=False).start()
+            runtime = MultiSessionRuntime(inference_service=service)
+            try:
+                session = runtime.add_session('user0', BioAmpReader(port=sim.port,
+                                                                    reset_delay=0), model_path)
+                runtime.connect_all(calibrate=False)
+                runtime.run(duration=0.5)
+                session.pipeline.swap_model(Constant(), version=2, warmup_windows=0)
+                results = []
+                while len(results) < 5:
+                    results.extend(runtime.poll())
+                self.assertEqual({r[2] for r in results}, {0.97})
+                self.assertEqual(session.model_key, ('user0', 1))
+                self.assertEqual(runtime.metrics()['inference_fallbacks'], 0)
+            finally:
+                runtime.close()
+                service.stop()
+                sim.stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -49,5 +49,13 @@ class TestPreprocessing(unittest.TestCase):
         _, is_clean_noisy = self.preprocessor.preprocess(noisy_sig)
         self.assertFalse(is_clean_noisy)
 
+    def test_batch_shares_the_live_threshold(self):
+        t = np.arange(Config.WINDOW_SAMPLES) / self.fs
+        windows = np.stack([amp * np.sin(2 * np.pi * 10 * t) for amp in (50, 130, 170, 400)])
+        live = [self.preprocessor.preprocess(w)[1] for w in windows]
+        _, batch = self.preprocessor.preprocess_batch(windows)
+        np.testing.assert_array_equal(batch, live)
+        self.assertEqual(list(batch), [True, True, False, False])
+
 if __name__ == '__main__':
     unittest.main()
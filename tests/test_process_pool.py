@@ -0,0 +1,133 @@
+import unittest
+import tempfile
+import time
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from hardware.bioamp_reader import BioAmpReader
+from hardware.simulated_bioamp import SimulatedBioAmp
+from src.acquisition.shared_buffer import SharedCircularBuffer
+from src.pipeline.process_pool import SessionSupervisor
+
+class TestSharedCircularBuffer(unittest.TestCase):
+    def test_attached_reader_sees_writes(self):
+        ring = SharedCircularBuffer(window_size=100, step_size=25, capacity=200)
+        reader = SharedCircularBuffer.attach(*ring.spec())
+        try:
+            data = np.arange(500, dtype=float)
+            ring.extend(data)
+            self.assertEqual(reader.sample_count, 500)
+            np.testing.assert_array_equal(reader.window_at(500), data[400:500])
+            np.testing.assert_array_equal(reader.window_at(425), data[325:425])
+            # Older than capacity allows: already overwritten
+            self.assertIsNone(reader.window_at(350))
+            self.assertIsNone(reader.window_at(525))
+        finally:
+            reader.close()
+            ring.close()
+
+class TestSessionSupervisor(unittest.TestCase):
+    def _poll_until(self, supervisor, condition, timeout=15):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            supervisor.poll()
+            if condition():
+                return True
+        return False
+
+    def test_sharded_sessions_survive_worker_crash(self):
+        fs = 4000
+        sims = [SimulatedBioAmp(fs=fs).start() for _ in range(2)]
+        supervisor = SessionSupervisor(n_workers=2, report_interval=0.2)
+        try:
+            for i, sim in enumerate(sims):
+                reader = BioAmpReader(port=sim.port, reset_delay=0, fs=fs)
+                reader.connect()
+                supervisor.add_session(f"user{i}", reader, 'missing_model.pkl')
+
+            workers = {s['worker'] for s in supervisor.sessions.values()}
+            self.assertEqual(workers, {0, 1})
+
+            windows = lambda: [s['windows'] for s in supervisor.sessions.values()]
+            self.assertTrue(self._poll_until(supervisor, lambda: min(windows()) >= 5))
+
+            before = windows()
+            supervisor.workers[0][0].kill()
+            recovered = lambda: all(a > b + 5 for a, b in zip(windows(), before))
+            self.assertTrue(self._poll_until(supervisor, recovered))
+            self.assertEqual(supervisor.metrics()['restarts'], 1)
+        finally:
+            supervisor.close()
+            for sim in sims:
+                sim.stop()
+
+    def test_rebalance_moves_a_session_that_keeps_running(self):
+        fs = 4000
+        sims = [SimulatedBioAmp(fs=fs).start() for _ in range(3)]
+        supervisor = SessionSupervisor(n_workers=2, report_interval=0.2,
+                                       rebalance_interval=float('inf'))
+        try:
+            for i, sim in enumerate(sims):
+                reader = BioAmpReader(port=sim.port, reset_delay=0, fs=fs)
+                reader.connect()
+                supervisor.add_session(f"user{i}", reader, 'missing_model.pkl')
+            sessions = supervisor.sessions
+            self.assertEqual([s['worker'] for s in sessions.values()], [0, 1, 0])
+            self.assertTrue(self._poll_until(
+                supervisor, lambda: min(s['windows'] for s in sessions.values()) >= 5))
+
+            # Balanced enough: nothing moves
+            supervisor.worker_load.update({0: 0.5, 1: 0.4})
+            self.assertIsNone(supervisor.rebalance())
+
+            supervisor.worker_load.update({0: 0.9, 1: 0.1})
+            self.assertEqual(supervisor.rebalance(), 'user2')
+            moved = sessions['user2']
+            self.assertEqual(moved['worker'], 1)
+            before = moved['windows']
+            # Windows are only counted from reports of the session's current worker
+            self.assertTrue(self._poll_until(
+                supervisor, lambda: moved['pending'] is None and moved['windows'] > before + 5))
+            self.assertEqual(moved['worker'], 1)
+            self.assertIsNone(moved['error'])
+        finally:
+            supervisor.close()
+            for sim in sims:
+                sim.stop()
+
+    def test_bad_model_files_fall_back_and_repeat_crashes_park_the_session(self):
+        fs = 4000
+        sim = SimulatedBioAmp(fs=fs).start()
+        supervisor = SessionSupervisor(n_workers=1, report_interval=0.2)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                corrupt = Path(tmp) / 'normalizer.pkl'
+                corrupt.write_bytes(b'not a pickle')
+                reader = BioAmpReader(port=sim.port, reset_delay=0, fs=fs)
+                reader.connect()
+                supervisor.add_session('user0', reader, 'missing_model.pkl', corrupt)
+                session = supervisor.sessions['user0']
+                self.assertTrue(self._poll_until(supervisor, lambda: session['windows'] >= 5))
+            self.assertEqual(len(supervisor.metrics()['sessions']['user0']['load_errors']), 2)
+            self.assertEqual(supervisor.restarts, 0)
+
+            # A worker dying before confirming the assign counts against it
+            for crash in range(supervisor.max_session_crashes):
+                self.assertEqual(session['worker'], 0)
+                session['pending'] = 1
+                process = supervisor.workers[0][0]
+                process.kill()
+                process.join()
+                supervisor.check_workers()
+            self.assertIsNone(session['worker'])
+            self.assertIn('killed its worker', session['error'])
+            self.assertEqual(supervisor.restarts, supervisor.max_session_crashes)
+        finally:
+            supervisor.close()
+            sim.stop()
+
+if __name__ == '__main__':
+    unittest.main()
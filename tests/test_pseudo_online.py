@@ -0,0 +1,133 @@
+import unittest
+import tempfile
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from src.control.command_mapper import CommandMapper
+from src.dataset.epochs import featurize_epochs, pack_epochs
+from src.evaluation.pseudo_online import (PseudoOnlineEvaluator, ReplayClock,
+                                          information_transfer_rate, replay_session,
+                                          score_replay)
+from src.models.classifier import ThresholdClassifier
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+from config.settings import Config
+
+def _session(directory, name, user, seed):
+    """Alternating REST/IMAGERY trials with a clear ERD"""
+    n = int(Config.TRIAL_DURATION * Config.SAMPLING_RATE)
+    generator = SyntheticEEGGenerator(rest_duration=Config.TRIAL_DURATION,
+                                      imagery_duration=Config.TRIAL_DURATION,
+                                      erd_depth=0.9, noise_amp=1.0, seed=seed)
+    epochs = [generator.generate(n) for _ in range(12)]
+    labels = np.arange(12) % 2
+    features, kept = featurize_epochs(epochs)
+    np.savez(Path(directory) / f"{name}_calibration.npz", features=features,
+             labels=labels[kept], user_name=user, channel='C3',
+             **pack_epochs(epochs, labels, np.arange(12) * Config.TRIAL_DURATION, kept))
+
+class TestScoring(unittest.TestCase):
+    def test_information_transfer_rate(self):
+        # One bit per 4 s selection at perfect binary accuracy
+        self.assertAlmostEqual(information_transfer_rate(1.0), 15.0)
+        self.assertEqual(information_transfer_rate(0.5), 0.0)
+        self.assertAlmostEqual(information_transfer_rate(0.8, trial_seconds=60),
+                               1 + 0.8 * np.log2(0.8) + 0.2 * np.log2(0.2))
+
+    def test_score_replay_counts_activations(self):
+        fs = Config.SAMPLING_RATE
+        step = Config.STEP_SAMPLES
+        n = int(Config.TRIAL_DURATION * fs)
+        ends = Config.WINDOW_SAMPLES + step * np.arange(4 * n // step - 3)
+        commands = np.full(len(ends), 'STOP', dtype=object)
+        # Activation late in REST trial 0 (false), one inside IMAGERY trial 1
+        commands[ends == 3.5 * fs] = 'ACTIVE'
+        commands[(ends >= 5.5 * fs) & (ends <= 6.0 * fs)] = 'ACTIVE'
+        predictions = np.zeros(len(ends), dtype=int)
+        predictions[0] = -1
+        replay = {'end': ends, 'prediction': predictions, 'command': commands.astype(str),
+                  'latency_ms': np.ones(len(ends))}
+
+        score = score_replay(replay, [n] * 4, [0, 1, 0, 1])
+        self.assertEqual(score['activations'], 2)
+        self.assertEqual(score['false_activations'], 1)
+        self.assertEqual(score['detected_trials'], 1)
+        self.assertAlmostEqual(score['detection_s'][0], 1.5)
+        self.assertEqual(score['correct_trials'], 2)  # Trial 1 and REST trial 2
+        self.assertEqual(score['rest_seconds'], 2 * Config.TRIAL_DURATION)
+        self.assertEqual(score['rejected_windows'], 1)
+
+    def test_duration_mode_follows_replay_clock(self):
+        clock = ReplayClock()
+        mapper = CommandMapper(clock=clock)
+        commands = []
+        for t in np.arange(0, 4.0, 0.5):
+            clock.now = t
+            commands.append(mapper.map_duration(1 if t < 3.0 else 0, 1.0))
+        self.assertEqual(commands.count('FORWARD'), 1)
+
+class TestPseudoOnlineEvaluator(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.cal_dir = Path(cls.tmp.name)
+        _session(cls.cal_dir, 'a1', 'alice', 0)
+        _session(cls.cal_dir, 'a2', 'alice', 1)
+        _session(cls.cal_dir, 'b1', 'bob', 2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_leave_one_session_out_folds(self):
+        folds, skipped = PseudoOnlineEvaluator().folds(self.cal_dir)
+        self.assertEqual([(u, p.name, [t.name for t in train]) for u, p, train in folds],
+                         [('alice', 'a1_calibration.npz', ['a2_calibration.npz']),
+                          ('alice', 'a2_calibration.npz', ['a1_calibration.npz'])])
+        self.assertEqual(skipped, ['bob'])
+        folds, skipped = PseudoOnlineEvaluator(pool_users=True).folds(self.cal_dir)
+        self.assertEqual(len(folds), 3)
+        self.assertEqual(skipped, [])
+
+    def test_parallel_run_matches_serial(self):
+        serial = PseudoOnlineEvaluator(n_jobs=1).run(self.cal_dir)
+        parallel = PseudoOnlineEvaluator(n_jobs=2).run(self.cal_dir)
+        alice = serial['users']['alice']
+        self.assertEqual(list(serial['users']), ['alice'])
+        self.assertEqual(alice['sessions'], 2)
+        self.assertGreater(alice['window_accuracy'], 0.8)
+        self.assertGreater(alice['detection_rate'], 0.8)
+        self.assertGreater(alice['itr_bits_min'], 0.0)
+        for key in ['window_accuracy', 'trial_accuracy', 'false_activations_min',
+                    'detection_rate']:
+            self.assertEqual(parallel['users']['alice'][key], alice[key])
+        self.assertIn('ALL', PseudoOnlineEvaluator.format_report(serial))
+
+    def test_replay_runs_the_live_window_path(self):
+        n = int(Config.TRIAL_DURATION * Config.SAMPLING_RATE)
+        epochs = [SyntheticEEGGenerator(seed=i).generate(n) for i in range(3)]
+        epochs[1][n // 2] += 5000.0  # Raw-stream artifact
+        pipeline = RealtimeBCIPipeline(None, classifier=ThresholdClassifier())
+        calls = []
+        process_window = pipeline.process_window
+        pipeline.process_window = lambda window, rejection=None, spectrum=None: (
+            calls.append(rejection) or process_window(window, rejection, spectrum))
+        replay = replay_session(pipeline, epochs)
+
+        self.assertEqual(len(calls), len(replay['end']))
+        rejected = np.array([reason is not None for reason in calls])
+        self.assertTrue(rejected.any())
+        self.assertTrue(np.all(replay['prediction'][rejected] == -1))
+        self.assertTrue(np.all(replay['command'][rejected] == 'STOP'))
+        self.assertTrue(np.all(replay['prediction'][~rejected] >= 0))
+        self.assertEqual(pipeline.buffer.sample_count, replay['end'][-1])
+
+    def test_duration_mode(self):
+        report = PseudoOnlineEvaluator(use_duration=True, n_jobs=1).run(self.cal_dir)
+        self.assertGreater(report['overall']['detection_rate'], 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import subprocess
+import tempfile
+import threading
+import time
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.models.registry import ModelRegistry
+from src.models.classifier import MotorImageryClassifier, ThresholdClassifier
+from src.features.normalizer import FeatureNormalizer
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+from config.settings import Config
+
+def _trained(model_type, seed):
+    rng = np.random.default_rng(seed)
+    X = np.vstack([rng.normal([10, 5], 2, (40, 2)), rng.normal([6, 4], 2, (40, 2))])
+    y = np.repeat([0, 1], 40)
+    normalizer = FeatureNormalizer()
+    normalizer.fit(X)
+    classifier = MotorImageryClassifier(model_type=model_type)
+    classifier.train(normalizer.normalize(X), y)
+    return classifier, normalizer
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(root=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_versions_activation_and_cache(self):
+        v1 = self.registry.register('alice', *_trained('LDA', 0), test_accuracy=0.8)
+        v2 = self.registry.register('alice', *_trained('LogisticRegression', 1))
+        self.registry.register('bob', *_trained('LDA', 2), channel='C4')
+
+        self.assertEqual((v1, v2), (1, 2))
+        self.assertEqual(self.registry.users(), ['alice', 'bob'])
+        self.assertEqual(self.registry.active_version('alice'), 2)
+        self.assertEqual(self.registry.versions('alice')[0]['test_accuracy'], 0.8)
+        self.assertEqual(self.registry.active_version('bob', 'C4'), 1)
+
+        classifier, _, version = self.registry.load('alice')
+        self.assertEqual((classifier.model_type, version), ('LogisticRegression', 2))
+        self.assertIs(self.registry.load('alice')[0], classifier)
+
+        self.registry.activate('alice', 1)
+        self.assertEqual(self.registry.load('alice')[0].model_type, 'LDA')
+        with self.assertRaises(KeyError):
+            self.registry.activate('alice', 7)
+        with self.assertRaises(KeyError):
+            self.registry.load('carol')
+
+    def test_hot_swap_while_processing(self):
+        pipeline = RealtimeBCIPipeline(model_path=None, classifier=ThresholdClassifier())
+        self.registry.register('alice', *_trained('LDA', 0))
+        stop_watch = self.registry.watch(pipeline, 'alice', interval=0.02)
+
+        window = np.random.randn(Config.WINDOW_SAMPLES) * 5
+        errors = []
+        stop = threading.Event()
+
+        def loop():
+            while not stop.is_set():
+                try:
+                    pipeline.process_window(window)
+                except Exception as e:
+                    errors.append(e)
+
+        worker = threading.Thread(target=loop)
+        worker.start()
+        try:
+            deadline = time.time() + 5
+            while pipeline.model_version != 1 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(pipeline.model_version, 1)
+            self.registry.register('alice', *_trained('SVM', 1))
+            while pipeline.model_version != 2 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            stop.set()
+            stop_watch.set()
+            worker.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(pipeline.model_version, 2)
+        self.assertEqual(pipeline.classifier.model_type, 'SVM')
+        self.assertTrue(pipeline.normalizer.is_fitted)
+        self.assertEqual(pipeline.model_swaps, 2)
+
+    def test_failed_warmup_keeps_old_model(self):
+        pipeline = RealtimeBCIPipeline(model_path=None, classifier=ThresholdClassifier())
+        classifier, normalizer = _trained('LDA', 0)
+        normalizer.scaler.mean_ = np.zeros(3)  # Wrong feature count
+        with self.assertRaises(ValueError):
+            pipeline.swap_model(classifier, normalizer)
+        self.assertIsInstance(pipeline.classifier, ThresholdClassifier)
+
+    def test_concurrent_trainer_processes_keep_every_version(self):
+        # Each process registers versions as fast as it can, all at once
+        script = (
+            "import sys, time\n"
+            f"sys.path.insert(0, {str(project_root)!r})\n"
+            "from tests.test_registry import _trained\n"
+            "from src.models.registry import ModelRegistry\n"
+            "registry = ModelRegistry(root=sys.argv[1])\n"
+            "model = _trained('LDA', 0)\n"
+            "time.sleep(max(float(sys.argv[2]) - time.time(), 0))\n"
+            "for _ in range(5):\n"
+            "    registry.register('alice', *model)\n"
+        )
+        start = str(time.time() + 5)
+        processes = [subprocess.Popen([sys.executable, '-c', script, self.tmp.name, start],
+                                      stdout=subprocess.DEVNULL) for _ in range(4)]
+        for process in processes:
+            self.assertEqual(process.wait(timeout=60), 0)
+        versions = [e['version'] for e in self.registry.versions('alice')]
+        self.assertEqual(versions, list(range(1, 21)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from hardware.robot_controller import RobotController
+from hardware.simulated_robot import SimulatedRobot
+from src.monitoring.latency import LatencyHistogram
+
+class TestRobotAck(unittest.TestCase):
+    def test_ack_round_trip(self):
+        with SimulatedRobot(ack_delay=0.01) as sim:
+            robot = RobotController(port=sim.port, use_ack=True, reset_delay=0)
+            self.assertTrue(robot.connect())
+            try:
+                seqs = [robot.send_command(cmd) for cmd in ['FORWARD', 'LEFT', 'STOP']]
+                for seq in seqs:
+                    self.assertTrue(robot.wait_for_ack(seq, timeout=2))
+            finally:
+                robot.disconnect()
+
+        report = robot.ack_report()
+        self.assertEqual(report['acked'], 3)
+        self.assertEqual(report['timeouts'], 0)
+        self.assertGreaterEqual(report['latency_ms']['p50'], 10)
+        self.assertEqual([c for c, _ in sim.received], ['F', 'L', 'S'])
+
+    def test_retry_and_timeout(self):
+        with SimulatedRobot(drop_first=1) as sim:
+            robot = RobotController(port=sim.port, use_ack=True, reset_delay=0,
+                                    ack_timeout=0.05, max_retries=1)
+            robot.connect()
+            try:
+                seq = robot.send_command('FORWARD')
+                self.assertTrue(robot.wait_for_ack(seq, timeout=2))
+            finally:
+                robot.disconnect()
+
+        self.assertEqual(robot.stats['retries'], 1)
+        self.assertEqual(robot.stats['acked'], 1)
+
+        with SimulatedRobot(drop_first=10) as sim:
+            robot = RobotController(port=sim.port, use_ack=True, reset_delay=0,
+                                    ack_timeout=0.05, max_retries=2)
+            robot.connect()
+            try:
+                seq = robot.send_command('STOP')
+                self.assertFalse(robot.wait_for_ack(seq, timeout=2))  # Given up on
+                self.assertEqual(robot.pending_count(), 0)
+            finally:
+                robot.disconnect()
+
+        self.assertEqual(robot.stats['timeouts'], 1)
+        self.assertEqual(robot.stats['acked'], 0)
+
+    def test_histogram_percentiles(self):
+        hist = LatencyHistogram()
+        hist.record_many(list(range(1, 101)))
+        self.assertAlmostEqual(hist.percentile(50), 50, delta=2)
+        self.assertAlmostEqual(hist.percentile(99), 99, delta=4)
+        self.assertEqual(hist.max, 100)
+
+if __name__ == '__main__':
+    unittest.main()
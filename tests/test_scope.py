@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import matplotlib
+matplotlib.use('Agg')
+from src.visualization.scope import LiveScope, SummaryPyramid, minmax_decimate
+from config.settings import SessionConfig
+
+class TestSummaryPyramid(unittest.TestCase):
+    def setUp(self):
+        self.config = SessionConfig(SAMPLING_RATE=100)
+        self.x = np.random.default_rng(0).normal(0, 10, 50000)
+
+    def _pyramid(self, chunks=53):
+        pyramid = SummaryPyramid(raw_seconds=20, factor=4, levels=5, config=self.config)
+        for chunk in np.array_split(self.x, chunks):
+            pyramid.add_samples(chunk)
+        return pyramid
+
+    def test_levels_match_brute_force(self):
+        pyramid = self._pyramid()
+        for level in range(pyramid.n_levels):
+            size = pyramid.bin_size(level)
+            n_bins = len(self.x) // size
+            bins = self.x[:n_bins * size].reshape(-1, size)
+            first = max(n_bins - pyramid.capacity, 0)
+            mins, maxs = pyramid._read(level, first, n_bins)
+            np.testing.assert_array_equal(mins, bins[first:].min(axis=1))
+            np.testing.assert_array_equal(maxs, bins[first:].max(axis=1))
+        np.testing.assert_array_equal(pyramid.recent(300), self.x[-300:])
+
+    def test_chunking_does_not_matter(self):
+        a, b = self._pyramid(7), self._pyramid(499)
+        self.assertEqual(a.counts, b.counts)
+        np.testing.assert_array_equal(a.mins, b.mins)
+        np.testing.assert_array_equal(a.maxs, b.maxs)
+
+    def test_query_is_bounded_and_keeps_extremes(self):
+        pyramid = self._pyramid()
+        x = self.x
+        for seconds in [1, 10, 100, 400]:
+            t, mins, maxs = pyramid.query(seconds, 200)
+            self.assertLessEqual(len(t), 200)
+            span = x[-int(seconds * 100):]
+            # Everything but the newest partial bin, nothing invented
+            size = pyramid.bin_size(pyramid.level_for(seconds, 200))
+            self.assertGreaterEqual(np.min(mins), np.min(span))
+            self.assertLessEqual(np.max(maxs), np.max(span))
+            self.assertEqual(np.max(maxs), np.max(x[-len(span):len(x) - len(x) % size]))
+            self.assertAlmostEqual(t[0], (len(x) - len(span)) / 100, delta=size / 100)
+
+    def test_coarse_levels_reach_back(self):
+        pyramid = self._pyramid()
+        self.assertEqual(pyramid.level_for(300, 2000), 2)
+        # Level 2 only reaches back 320 s
+        self.assertEqual(pyramid.level_for(400, 2000), 3)
+        # 500 s of data, raw ring holds 20 s: whole recording from level 3
+        t, mins, maxs = pyramid.query(500, 1000)
+        self.assertEqual(t[0], 0.0)
+        self.assertEqual((np.min(mins), np.max(maxs)), (np.min(self.x), np.max(self.x)))
+
+    def test_minmax_decimate(self):
+        starts, mins, maxs = minmax_decimate(self.x[:1001], self.x[:1001], 10)
+        self.assertEqual(len(starts), 10)
+        self.assertEqual(mins[3], np.min(self.x[starts[3]:starts[4]]))
+        self.assertEqual(maxs[-1], np.max(self.x[starts[-1]:1001]))
+
+class TestLiveScope(unittest.TestCase):
+    def test_blits_until_rescale(self):
+        config = SessionConfig(SAMPLING_RATE=100)
+        pyramid = SummaryPyramid(raw_seconds=20, config=config)
+        scope = LiveScope(pyramid, seconds=5, fps=0.1, config=config)
+        rng = np.random.default_rng(1)
+        pyramid.add_samples(rng.normal(0, 20, 1000))
+        self.assertTrue(scope.update(force=True))
+        self.assertEqual((scope.redraws, scope.blits), (1, 0))
+        for _ in range(3):
+            pyramid.add_samples(rng.normal(0, 20, 10))
+            scope.update(force=True)
+        self.assertEqual((scope.redraws, scope.blits), (1, 3))
+        self.assertLessEqual(len(scope.line.get_xdata()), 2 * scope.n_pixels)
+
+        pyramid.add_samples([500.0])  # Off the axes: rescale and full redraw
+        scope.update(force=True)
+        self.assertEqual(scope.redraws, 2)
+        self.assertGreater(scope.ax.get_ylim()[1], 500)
+        self.assertFalse(scope.update())  # Throttled
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from src.monitoring.signal_quality import SignalQualityMonitor
+from config.settings import Config, SessionConfig
+
+def _stream(n, seed=0, **kwargs):
+    """Synthetic EEG quantized like the BioAmp stream (microvolts)"""
+    adc = SyntheticEEGGenerator(seed=seed, **kwargs).generate_adc(n)
+    return Config.voltage_to_uv(Config.adc_to_voltage(adc))
+
+class TestSignalQualityMonitor(unittest.TestCase):
+    def test_reports_match_numpy(self):
+        fs = Config.SAMPLING_RATE
+        x = _stream(5 * fs, mains_amp=15, drift_amp=30)
+        reports = SignalQualityMonitor().add_samples(x)
+        self.assertEqual(len(reports), 5)
+        bin_ = int(round(Config.NOTCH_FREQ))  # 1 s blocks: 1 Hz per bin
+        for i, report in enumerate(reports):
+            second = x[i * fs:(i + 1) * fs]
+            self.assertAlmostEqual(report['rms_uv'], np.std(second), places=6)
+            self.assertAlmostEqual(report['dc_uv'], np.mean(second), places=6)
+            self.assertAlmostEqual(report['mains_uv'],
+                                   2 * np.abs(np.fft.rfft(second)[bin_]) / fs, places=6)
+            if i:
+                self.assertAlmostEqual(report['drift_uv_s'],
+                                       np.mean(second) - np.mean(x[(i - 1) * fs:i * fs]))
+        self.assertAlmostEqual(np.mean([r['mains_uv'] for r in reports]), 15, delta=1)
+
+    def test_chunked_matches_per_sample(self):
+        x = _stream(3333, seed=1, mains_amp=5)
+        single = SignalQualityMonitor()
+        expected = [r for r in map(single.add_sample, x) if r is not None]
+        chunked = SignalQualityMonitor()
+        reports = []
+        for chunk in np.array_split(x, 41):
+            reports.extend(chunked.add_samples(chunk))
+        self.assertEqual(len(reports), len(expected))
+        for a, b in zip(reports, expected):
+            for key in ['rms_uv', 'mains_uv', 'dc_uv', 'drift_uv_s', 'clip_ratio']:
+                self.assertAlmostEqual(a[key], b[key], places=6)
+
+    def test_issues(self):
+        fs = Config.SAMPLING_RATE
+        top = Config.voltage_to_uv(Config.adc_to_voltage(1023))
+        clean = _stream(fs)
+        cases = {
+            (): clean,
+            ('flat',): np.full(fs, 3.0),
+            ('noisy',): clean + np.random.default_rng(2).normal(0, 80, fs),
+            ('mains',): _stream(fs, mains_amp=20),
+            ('clipping',): np.r_[clean[:-1], top]
+        }
+        for expected, x in cases.items():
+            report = SignalQualityMonitor().add_samples(x)[0]
+            self.assertEqual(tuple(report['issues']), expected)
+
+        monitor = SignalQualityMonitor()
+        monitor.add_samples(clean)
+        report = monitor.add_samples(clean + 50.0)[0]
+        self.assertEqual(report['issues'], ['drift'])
+
+    def test_mains_frequency_follows_config(self):
+        config = SessionConfig(NOTCH_FREQ=60.0)
+        x = _stream(Config.SAMPLING_RATE, mains_amp=20, mains_freq=60.0)
+        self.assertIn('mains', SignalQualityMonitor(config=config).add_samples(x)[0]['issues'])
+        self.assertNotIn('mains', SignalQualityMonitor().add_samples(x)[0]['issues'])
+
+    def test_summary_is_bounded(self):
+        config = SessionConfig(QUALITY_HISTORY_SECONDS=3)
+        monitor = SignalQualityMonitor(config=config)
+        self.assertEqual(monitor.summary()['seconds'], 0)
+        monitor.add_samples(_stream(5 * Config.SAMPLING_RATE, mains_amp=20))
+        summary = monitor.summary()
+        self.assertEqual(summary['seconds'], 3)
+        self.assertEqual(summary['issues'], {'mains': 3})
+        self.assertIs(summary['latest'], monitor.latest())
+
+if __name__ == '__main__':
+    unittest.main()
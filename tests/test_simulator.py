@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from hardware.bioamp_reader import BioAmpReader
+from hardware.simulated_bioamp import SimulatedBioAmp, LineProtocol
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from src.features.band_power import BandPowerExtractor
+from config.settings import Config
+
+class TestSyntheticEEG(unittest.TestCase):
+    def test_erd_lowers_mu_power(self):
+        fs = Config.SAMPLING_RATE
+        gen = SyntheticEEGGenerator(fs=fs, rest_duration=4.0, imagery_duration=4.0, seed=0)
+        signal, labels = gen.generate(8 * fs, return_labels=True)
+
+        extractor = BandPowerExtractor()
+        rest_mu = extractor.extract(signal[labels == 0])[0]
+        imagery_mu = extractor.extract(signal[labels == 1])[0]
+        self.assertLess(imagery_mu, 0.5 * rest_mu)
+
+    def test_chunking_is_continuous(self):
+        gen_a = SyntheticEEGGenerator(noise_amp=0.0, seed=1)
+        gen_b = SyntheticEEGGenerator(noise_amp=0.0, seed=1)
+        whole = gen_a.generate(1000)
+        parts = np.concatenate([gen_b.generate(n) for n in (123, 500, 377)])
+        np.testing.assert_allclose(whole, parts)
+
+    def test_adc_round_trip(self):
+        uv = np.array([-100.0, 0.0, 50.0])
+        adc = Config.uv_to_adc(uv)
+        back = Config.voltage_to_uv(Config.adc_to_voltage(adc))
+        np.testing.assert_allclose(back, uv, atol=2.1)  # one LSB ~ 2 μV
+        self.assertEqual(Config.uv_to_adc(1e6), 1023)
+
+class TestSimulatedBioAmp(unittest.TestCase):
+    def test_line_protocol_matches_firmware(self):
+        protocol = LineProtocol(fs=500)
+        self.assertTrue(protocol.header().startswith(b"BioAmp EXG Pill streaming at 500 Hz"))
+        self.assertEqual(protocol.encode(np.array([512, 7])), b"512\r\n7\r\n")
+
+    def test_reader_streams_from_pty(self):
+        fs = 2000
+        with SimulatedBioAmp(fs=fs) as sim:
+            reader = BioAmpReader(port=sim.port, reset_delay=0, fs=fs)
+            self.assertTrue(reader.connect())
+            try:
+                samples = []
+                for sample, _ in reader.stream_continuous():
+                    samples.append(sample)
+                    if len(samples) >= fs // 2:
+                        break
+            finally:
+                reader.disconnect()
+
+        self.assertEqual(len(samples), fs // 2)
+        self.assertLess(np.max(np.abs(samples)), 100)
+
+if __name__ == '__main__':
+    unittest.main()
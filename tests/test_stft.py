@@ -0,0 +1,155 @@
+import unittest
+import tempfile
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scipy.signal import welch
+from src.acquisition.circular_buffer import CircularBuffer
+from src.acquisition.synthetic_eeg import SyntheticEEGGenerator
+from src.dataset.epochs import window_features
+from src.features.band_power import BandPowerExtractor
+from src.features.stft import SpectrogramRing, stft_frames, stft_hop
+from src.models.classifier import ThresholdClassifier
+from src.monitoring.signal_quality import SignalQualityMonitor
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+from src.preprocessing.filters import RealtimePreprocessor
+from config.settings import Config, SessionConfig
+
+class TestSpectrogramRing(unittest.TestCase):
+    def setUp(self):
+        self.x = SyntheticEEGGenerator(seed=0, mains_amp=10).generate(6000)
+        self.ring = SpectrogramRing()
+
+    def test_frames_average_to_welch(self):
+        ring = self.ring
+        self.assertEqual((ring.nperseg, ring.hop), (256, 125))
+        self.assertEqual(Config.STEP_SAMPLES % ring.hop, 0)
+        window = self.x[:Config.WINDOW_SAMPLES]
+        frames = stft_frames(window, ring.nperseg, ring.hop, ring.fs)
+        self.assertEqual(len(frames), ring.frames_per_window(Config.WINDOW_SAMPLES))
+        freqs, psd = welch(window, fs=ring.fs, nperseg=ring.nperseg,
+                           noverlap=ring.nperseg - ring.hop)
+        np.testing.assert_allclose(ring.freqs, freqs)
+        np.testing.assert_allclose(frames.mean(axis=0), psd, rtol=1e-10)
+        self.assertEqual(stft_hop(256, 200), 100)
+
+    def test_streaming_matches_batch(self):
+        expected = stft_frames(self.x, self.ring.nperseg, self.ring.hop, self.ring.fs)
+        for chunks in [1, 17, 600]:
+            ring = SpectrogramRing()
+            for chunk in np.array_split(self.x, chunks):
+                ring.add_samples(chunk)
+            self.assertEqual(ring.frame_count, len(expected))
+            np.testing.assert_allclose(ring.latest(len(expected)), expected, rtol=1e-12)
+        ring = SpectrogramRing()
+        for x in self.x[:600]:
+            ring.add_sample(x)
+        np.testing.assert_allclose(ring.latest(10), expected[:ring.frame_count][-10:],
+                                   rtol=1e-12)
+
+    def test_window_frames_align_with_buffer(self):
+        buffer = CircularBuffer()
+        extractor = BandPowerExtractor()
+        for chunk in np.array_split(self.x, 23):
+            self.ring.add_samples(chunk)
+            windows = buffer.add_samples(chunk)
+            last_end = buffer.sample_count // buffer.step_size * buffer.step_size
+            for i, window in enumerate(windows):
+                end = last_end - (len(windows) - 1 - i) * buffer.step_size
+                own = stft_frames(window, self.ring.nperseg, self.ring.hop, self.ring.fs)
+                ring_frames = self.ring.window_frames(end=end)
+                np.testing.assert_allclose(extractor.extract_frames(ring_frames),
+                                           extractor.extract_frames(own), rtol=1e-10)
+
+    def test_ring_is_bounded(self):
+        ring = SpectrogramRing(seconds=5)
+        ring.add_samples(self.x)
+        self.assertEqual(len(ring.frames), ring.capacity)
+        with self.assertRaises(IndexError):
+            ring.read(0, ring.frame_count)
+        self.assertEqual(len(ring.latest(10 ** 6)), ring.capacity)
+
+    def test_save_and_load(self):
+        self.ring.add_samples(self.x)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'recording_spectrogram.npz'
+            self.ring.save(path, channel='C3')
+            saved = SpectrogramRing.load(path)
+        np.testing.assert_array_equal(saved['frames'], self.ring.latest(self.ring.capacity))
+        np.testing.assert_allclose(saved['times'],
+                                   self.ring.frame_times(0, self.ring.frame_count))
+        self.assertEqual((saved['hop'], str(saved['channel'])), (self.ring.hop, 'C3'))
+
+class TestSpectralFeatures(unittest.TestCase):
+    def setUp(self):
+        self.config = SessionConfig(FEATURE_ENGINE='stft')
+        self.x = SyntheticEEGGenerator(seed=1, mains_amp=10, drift_amp=20).generate(15000)
+
+    def test_close_to_welch_on_preprocessed(self):
+        preprocessor = RealtimePreprocessor()
+        extractor = BandPowerExtractor()
+        nperseg, hop = 256, 125
+        gain = preprocessor.power_response(np.fft.rfftfreq(nperseg, 1 / Config.SAMPLING_RATE))
+        errors = []
+        for start in range(0, len(self.x) - Config.WINDOW_SAMPLES, Config.STEP_SAMPLES):
+            window = self.x[start:start + Config.WINDOW_SAMPLES]
+            welch_features = extractor.extract(preprocessor.preprocess(window)[0])
+            frames = stft_frames(window, nperseg, hop, Config.SAMPLING_RATE)
+            errors.append(extractor.extract_frames(frames, gain) / welch_features - 1)
+        self.assertLess(np.max(np.median(np.abs(errors), axis=0)), 0.05)
+
+    def test_pipeline_engine_matches_offline_windows(self):
+        pipeline = RealtimeBCIPipeline(model_path=None, classifier=ThresholdClassifier(),
+                                       config=self.config)
+        self.assertIsNotNone(pipeline.stft)
+        live = []
+        step = Config.STEP_SAMPLES
+        for chunk in np.array_split(self.x, 90):  # At most one window per chunk
+            pipeline.stft.add_samples(chunk)
+            for window in pipeline.buffer.add_samples(chunk):
+                end = pipeline.buffer.sample_count // step * step
+                ring_features, _ = pipeline.extract_features(window, pipeline.window_spectrum(end))
+                own_features, _ = pipeline.extract_features(window)
+                np.testing.assert_allclose(ring_features, own_features, rtol=1e-10)
+                live.append(own_features)
+        offline, trials = window_features([self.x], self.config)
+        np.testing.assert_allclose(offline, live, rtol=1e-10)
+
+    def test_stream_engines_reject_artifacts_without_the_detector(self):
+        window = self.x[:Config.WINDOW_SAMPLES].copy()
+        burst = np.arange(200) / Config.SAMPLING_RATE
+        window[100:300] += 5 * Config.ARTIFACT_MAX_UV * np.sin(2 * np.pi * 12 * burst)
+        for engine in ('stft', 'filterbank', 'welch'):
+            config = SessionConfig(FEATURE_ENGINE=engine, STREAM_ARTIFACT_CHECK=False)
+            pipeline = RealtimeBCIPipeline(model_path=None, classifier=ThresholdClassifier(),
+                                           config=config)
+            self.assertIsNone(pipeline.artifact_detector)
+            self.assertEqual(pipeline.extract_features(window), (None, None))
+            self.assertEqual(pipeline.process_window(window)[:2], ('STOP', 0.0))
+            features, _ = pipeline.extract_features(self.x[:Config.WINDOW_SAMPLES])
+            self.assertIsNotNone(features)
+
+    def test_welch_pipeline_has_no_ring(self):
+        pipeline = RealtimeBCIPipeline(model_path=None, classifier=ThresholdClassifier())
+        self.assertIsNone(pipeline.stft)
+        self.assertIsNone(pipeline.window_spectrum())
+        with self.assertRaises(ValueError):
+            SessionConfig(FEATURE_ENGINE='wavelet')
+
+    def test_quality_monitor_reads_mains_share(self):
+        ratios = []
+        for mains_amp in [0.0, 20.0]:
+            x = SyntheticEEGGenerator(seed=2, mains_amp=mains_amp).generate(2000)
+            ring = SpectrogramRing()
+            monitor = SignalQualityMonitor(stft=ring)
+            ring.add_samples(x)
+            ratios.append(monitor.add_samples(x)[-1]['mains_ratio'])
+        self.assertLess(ratios[0], 0.05)
+        self.assertGreater(ratios[1], 0.5)
+        self.assertNotIn('mains_ratio', SignalQualityMonitor().add_samples(x)[0])
+
+if __name__ == '__main__':
+    unittest.main()
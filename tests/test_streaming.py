@@ -0,0 +1,80 @@
+import unittest
+import tempfile
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from src.dataset.store import DatasetStore
+from src.models.streaming import ClassMoments, OutOfCoreTrainer, shard_sessions
+
+class TestOutOfCoreTraining(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        tmp = Path(cls.tmp.name)
+        rng = np.random.default_rng(0)
+        for i in range(8):
+            X = np.vstack([rng.normal([10, 5], 2, (25, 2)), rng.normal([7, 4], 2, (25, 2))])
+            np.savez(tmp / f"s{i}_calibration.npz", features=X, labels=np.repeat([0, 1], 25),
+                     user_name=f"user{i % 3}", channel='C3', timestamp='2026-01-01')
+        cls.store = DatasetStore(root=tmp / 'dataset')
+        cls.store.ingest_dir(tmp)
+        cls.X = np.asarray(cls.store.features)
+        cls.y = np.asarray(cls.store.labels)
+        cls.scaler = StandardScaler().fit(cls.X)
+        cls.X_norm = cls.scaler.transform(cls.X)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_moments_merge_matches_single_pass(self):
+        whole = ClassMoments()
+        whole.update(self.X, self.y)
+        parts = ClassMoments()
+        for start in range(0, len(self.y), 37):
+            chunk = ClassMoments()
+            chunk.update(self.X[start:start + 37], self.y[start:start + 37])
+            parts.merge(chunk)
+        for label in [0, 1]:
+            for a, b in zip(whole.stats[label], parts.stats[label]):
+                np.testing.assert_allclose(a, b)
+
+    def test_lda_matches_sklearn(self):
+        classifier, normalizer = OutOfCoreTrainer('LDA', chunk_rows=16).fit(self.store)
+        reference = LinearDiscriminantAnalysis(solver='lsqr').fit(self.X_norm, self.y)
+
+        np.testing.assert_allclose(normalizer.scaler.scale_, self.scaler.scale_)
+        np.testing.assert_allclose(classifier.model.coef_, reference.coef_)
+        np.testing.assert_allclose(classifier.predict_proba(self.X_norm),
+                                   reference.predict_proba(self.X_norm), atol=1e-12)
+
+    def test_logistic_matches_sklearn_across_shards(self):
+        reference = LogisticRegression(tol=1e-10, max_iter=1000).fit(self.X_norm, self.y)
+        for n_jobs in [1, 2]:
+            classifier, _ = OutOfCoreTrainer('LogisticRegression', chunk_rows=16,
+                                             n_jobs=n_jobs).fit(self.store)
+            np.testing.assert_allclose(classifier.model.coef_, reference.coef_, atol=1e-6)
+            np.testing.assert_allclose(classifier.model.intercept_, reference.intercept_,
+                                       atol=1e-6)
+
+    def test_selection_shards_and_score(self):
+        sessions = self.store.sessions('user1')
+        trainer = OutOfCoreTrainer('LDA')
+        classifier, normalizer = trainer.fit(self.store, users='user1')
+        self.assertGreater(trainer.score(self.store, classifier, normalizer, sessions), 0.6)
+
+        shards = shard_sessions(self.store.sessions(), 3)
+        self.assertEqual(len(shards), 3)
+        self.assertEqual(sum(len(s) for s in shards), 8)
+
+        with self.assertRaises(ValueError):
+            OutOfCoreTrainer('SVM')
+
+if __name__ == '__main__':
+    unittest.main()
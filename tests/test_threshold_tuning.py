@@ -0,0 +1,102 @@
+import unittest
+import tempfile
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sklearn.metrics import roc_auc_score
+from src.features.band_power import BandPowerExtractor
+from src.models.classifier import ThresholdClassifier
+from src.models.model_cache import ModelCache
+from src.models.threshold_tuning import (ThresholdTuner, erd_from_features, roc_auc,
+                                         roc_curves)
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+
+class TestThresholdTuning(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        rest = rng.normal([10, 5], [1.5, 1], (300, 2))
+        imagery = rng.normal([6, 4.5], [1.5, 1], (300, 2))  # Mu ERD
+        self.X = np.vstack([rest, imagery])
+        self.y = np.repeat([0, 1], 300)
+
+    def test_roc_matches_brute_force(self):
+        rng = np.random.default_rng(1)
+        scores = np.round(rng.normal(size=(40, 3)), 1)  # With ties
+        labels = rng.integers(0, 2, 40)
+        fpr, tpr, cuts, valid = roc_curves(scores, labels)
+        for c in range(3):
+            for i in np.flatnonzero(valid[:, c]):
+                predicted = scores[:, c] > cuts[i, c]
+                self.assertEqual(np.sum(predicted), i)
+                self.assertAlmostEqual(tpr[i, c], np.mean(predicted[labels == 1]))
+                self.assertAlmostEqual(fpr[i, c], np.mean(predicted[labels == 0]))
+        np.testing.assert_allclose(roc_auc(scores, labels),
+                                   [roc_auc_score(labels, scores[:, c]) for c in range(3)])
+
+    def test_erd_matches_extractor(self):
+        extractor = BandPowerExtractor()
+        extractor.baseline_mu, extractor.baseline_beta = 9.0, 4.0
+        np.testing.assert_allclose(erd_from_features(self.X[:5], [9.0, 4.0]),
+                                   [extractor.calculate_erd(x) for x in self.X[:5]])
+
+    def test_operating_point_respects_target(self):
+        for target in [0.01, 0.05, 0.2]:
+            tuner = ThresholdTuner(target_fpr=target)
+            classifier = tuner.fit(self.X, self.y)
+            self.assertEqual((classifier.feature, classifier.above), (0, True))
+            erd = erd_from_features(self.X, classifier.baseline)
+            predicted = np.array([classifier.predict(e) for e in erd])
+            self.assertLessEqual(np.mean(predicted[self.y == 0]), target)
+            self.assertAlmostEqual(np.mean(predicted[self.y == 1]), tuner.report_['tpr'])
+        self.assertGreater(tuner.report_['tpr'], 0.8)
+
+    def test_confidence_is_calibrated(self):
+        classifier = ThresholdTuner().fit(self.X, self.y)
+        erd = erd_from_features(self.X, classifier.baseline)
+        p = np.array([classifier.predict_proba(e)[0, 1] for e in erd])
+        for low, high in [(0.0, 0.3), (0.7, 1.0)]:
+            selected = (p >= low) & (p < high)
+            self.assertAlmostEqual(np.mean(self.y[selected]), np.mean(p[selected]), delta=0.1)
+
+    def test_untuned_behaviour_unchanged(self):
+        classifier = ThresholdClassifier()
+        self.assertEqual(classifier.predict(np.array([-0.5, 0.0])), 1)
+        self.assertEqual(classifier.predict(np.array([0.1, 0.0])), 0)
+        np.testing.assert_allclose(classifier.predict_proba(np.array([-0.6, 0.0])),
+                                   [[0.05, 0.95]])
+
+    def test_saved_model_serves_with_its_baseline(self):
+        classifier = ThresholdTuner().fit(self.X, self.y)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'threshold_model.json'
+            classifier.save(path, auc=0.9)
+            loaded = ModelCache().load_classifier(path)
+            self.assertIsInstance(loaded, ThresholdClassifier)
+            self.assertEqual(loaded.calibration, classifier.calibration)
+
+            pipeline = RealtimeBCIPipeline(str(path))
+            self.assertEqual(pipeline.classifier.mu_threshold, classifier.mu_threshold)
+            self.assertEqual(pipeline.erd_baseline, classifier.baseline)
+
+        pipeline = RealtimeBCIPipeline(model_path=None, classifier=ThresholdClassifier())
+        self.assertIsNone(pipeline.erd_baseline)
+        pipeline.swap_model(classifier, warmup_windows=0)
+        self.assertEqual(pipeline.erd_baseline, classifier.baseline)
+        features = np.array([classifier.baseline[0] * 0.5, classifier.baseline[1]])
+        self.assertEqual(pipeline.classify(features, np.zeros(2))[0],
+                         classifier.predict(erd_from_features(features[None], classifier.baseline)[0]))
+
+        # A model without a baseline drops the tuned one
+        pipeline.swap_model(ThresholdClassifier(), warmup_windows=0)
+        self.assertIsNone(pipeline.erd_baseline)
+        self.assertEqual(pipeline.classify(features, np.zeros(2))[0], 0)
+
+    def test_needs_both_classes(self):
+        with self.assertRaises(ValueError):
+            ThresholdTuner().fit(self.X[:10], self.y[:10])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import json
+import tempfile
+import numpy as np
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.monitoring.tracing import StageTracer
+from src.pipeline.realtime_bci import RealtimeBCIPipeline
+from src.models.classifier import ThresholdClassifier
+from config.settings import Config
+
+class TestStageTracer(unittest.TestCase):
+    def test_disabled_records_nothing(self):
+        tracer = StageTracer(capacity=8)
+        with tracer.span('stage'):
+            pass
+        self.assertEqual(tracer.count, 0)
+
+        tracer.enable()
+        with tracer.span('stage'):
+            pass
+        self.assertEqual([s[0] for s in tracer.spans()], ['stage'])
+
+    def test_ring_keeps_most_recent(self):
+        tracer = StageTracer(capacity=4, enabled=True)
+        for i in range(10):
+            tracer.record(f"s{i}", i * 1000, i * 1000 + 500)
+        spans = tracer.spans()
+        self.assertEqual([s[0] for s in spans], ['s6', 's7', 's8', 's9'])
+        self.assertTrue(all(s[2] == 500 for s in spans))
+
+    def test_pipeline_stages_and_chrome_export(self):
+        tracer = StageTracer(enabled=True, profile_threshold_ms=0.0, profile_every=2)
+        pipeline = RealtimeBCIPipeline(model_path=None, classifier=ThresholdClassifier(),
+                                       tracer=tracer)
+        window = np.random.randn(Config.WINDOW_SAMPLES) * 5
+        for _ in range(4):
+            pipeline.process_window(window)
+
+        stages = tracer.stage_summary()
+        for name in ['process_window', 'preprocess', 'detrend', 'notch', 'bandpass',
+                     'welch', 'classify', 'command']:
+            self.assertEqual(stages[name]['count'], 4)
+        self.assertEqual(len(tracer.profiles), 2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'trace.json'
+            n = tracer.export_chrome(path)
+            events = json.loads(path.read_text())['traceEvents']
+            self.assertEqual(len(tracer.dump_profiles(tmp)), 2)
+
+        spans = [e for e in events if e['ph'] == 'X']
+        self.assertEqual(len(spans), n)
+        self.assertEqual(spans[-1]['name'], 'process_window')
+        self.assertEqual(spans[-1]['args']['window'], 4)
+
+if __name__ == '__main__':
+    unittest.main()